@@ -0,0 +1,37 @@
+"""add_keyset_pagination_indexes
+
+Revision ID: 3c8e1f2a9d47
+Revises: 9ba783db051d
+Create Date: 2026-10-18 21:40:12.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c8e1f2a9d47'
+down_revision = '9ba783db051d'
+branch_labels = None
+depends_on = None
+
+
+# (index name, table) for list endpoints paginated on (created_at, id)
+KEYSET_INDEXES = [
+    ('ix_products_created_at_id', 'products'),
+    ('ix_generation_created_at_id', 'ai_generated_content'),
+    ('ix_users_created_at_id', 'users'),
+    ('ix_payments_created_at_id', 'payments'),
+    ('ix_administrators_created_at_id', 'administrators'),
+    ('ix_template_created_at_id', 'prompt_templates'),
+]
+
+
+def upgrade() -> None:
+    for index_name, table_name in KEYSET_INDEXES:
+        op.create_index(index_name, table_name, ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    for index_name, table_name in reversed(KEYSET_INDEXES):
+        op.drop_index(index_name, table_name=table_name)
@@ -0,0 +1,43 @@
+"""unique_product_per_platform_listing
+
+Revision ID: 5a1d7c3e8b92
+Revises: 3c8e1f2a9d47
+Create Date: 2026-10-18 22:05:41.902113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a1d7c3e8b92'
+down_revision = '3c8e1f2a9d47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keep the most recently crawled row of each duplicated listing as the
+    # canonical one; older duplicates keep their analyses but lose the
+    # platform ID so they no longer collide.
+    op.execute("""
+        UPDATE products SET external_product_id = NULL
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY platform, external_product_id
+                    ORDER BY last_crawled_at DESC NULLS LAST, id DESC
+                ) AS position
+                FROM products
+                WHERE external_product_id IS NOT NULL
+            ) ranked
+            WHERE ranked.position > 1
+        )
+    """)
+    op.create_unique_constraint(
+        'uq_products_platform_external_product_id', 'products', ['platform', 'external_product_id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_products_platform_external_product_id', 'products', type_='unique')
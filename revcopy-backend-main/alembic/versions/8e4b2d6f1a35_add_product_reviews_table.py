@@ -0,0 +1,125 @@
+"""add_product_reviews_table
+
+Revision ID: 8e4b2d6f1a35
+Revises: 5a1d7c3e8b92
+Create Date: 2026-10-18 22:41:09.551870
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e4b2d6f1a35'
+down_revision = '5a1d7c3e8b92'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'product_reviews',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('external_review_id', sa.String(length=255), nullable=True),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('rating', sa.Float(), nullable=True),
+        sa.Column('title', sa.String(length=500), nullable=True),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('author', sa.String(length=200), nullable=True),
+        sa.Column('review_date', sa.DateTime(), nullable=True),
+        sa.Column('verified_purchase', sa.Boolean(), nullable=False),
+        sa.Column('helpful_votes', sa.Integer(), nullable=False),
+        sa.Column('source', sa.String(length=50), nullable=True),
+        sa.Column('review_metadata', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], name='fk_product_reviews_product_id_products', ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id', name='pk_product_reviews'),
+        sa.UniqueConstraint('product_id', 'content_hash', name='uq_product_reviews_product_id_content_hash')
+    )
+    op.create_index('ix_product_reviews_product_rating', 'product_reviews', ['product_id', 'rating'], unique=False)
+    op.create_index('ix_product_reviews_product_date', 'product_reviews', ['product_id', 'review_date'], unique=False)
+    
+    # Move the review blobs crawled so far into product_reviews. Fields are
+    # normalized and hashed the way ReviewStore.normalize_review does it
+    # (sha256 of "rating\x1ftitle\x1fcontent", Python's str() for the
+    # rating), so the next recrawl of these products deduplicates against
+    # the backfilled rows instead of storing them twice.
+    op.execute(r"""
+        WITH raw AS (
+            SELECT p.id AS product_id, review
+            FROM products p, json_array_elements(p.cached_data -> 'reviews_data') AS review
+            WHERE json_typeof(p.cached_data -> 'reviews_data') = 'array'
+              AND json_typeof(review) = 'object'
+        ),
+        fields AS (
+            SELECT
+                product_id,
+                review,
+                regexp_replace(coalesce(nullif(review ->> 'content', ''), review ->> 'text', ''),
+                               '^\s+|\s+$', '', 'g') AS content,
+                nullif(regexp_replace(coalesce(review ->> 'title', ''), '^\s+|\s+$', '', 'g'), '') AS title,
+                CASE WHEN review ->> 'rating' ~ '^\s*-?[0-9]+(\.[0-9]+)?\s*$'
+                     THEN (review ->> 'rating')::float8 END AS rating,
+                coalesce(review ->> 'review_date', review ->> 'date') AS posted
+            FROM raw
+        )
+        INSERT INTO product_reviews (
+            product_id, external_review_id, content_hash, rating, title, content, author,
+            review_date, verified_purchase, helpful_votes, source, review_metadata, created_at
+        )
+        SELECT
+            product_id,
+            left(coalesce(review ->> 'review_id', review ->> 'id'), 255),
+            encode(sha256(convert_to(
+                CASE WHEN rating IS NULL THEN 'None'
+                     WHEN rating = trunc(rating) THEN trunc(rating)::bigint::text || '.0'
+                     ELSE rating::text END
+                || chr(31) || lower(coalesce(title, ''))
+                || chr(31) || lower(regexp_replace(content, '\s+', ' ', 'g')),
+                'UTF8'
+            )), 'hex'),
+            rating,
+            left(title, 500),
+            content,
+            left(coalesce(review ->> 'author', review ->> 'reviewer_name'), 200),
+            CASE WHEN posted ~ '^\d{4}-\d{2}-\d{2}' THEN left(replace(posted, 'T', ' '), 19)::timestamp END,
+            lower(coalesce(review ->> 'verified_purchase', review ->> 'verified', 'false')) IN ('true', '1'),
+            CASE WHEN review ->> 'helpful_votes' ~ '^[0-9]+$' THEN (review ->> 'helpful_votes')::int ELSE 0 END,
+            left(review ->> 'source', 50),
+            nullif(
+                review::jsonb - ARRAY['review_id', 'id', 'rating', 'title', 'content', 'text', 'author',
+                                      'reviewer_name', 'date', 'review_date', 'verified', 'verified_purchase',
+                                      'helpful_votes', 'source'],
+                '{}'::jsonb
+            )::json,
+            now() AT TIME ZONE 'utc'
+        FROM fields
+        WHERE content <> ''
+        ON CONFLICT (product_id, content_hash) DO NOTHING
+    """)
+    op.execute("""
+        UPDATE products SET cached_data = (cached_data::jsonb - 'reviews_data')::json
+        WHERE cached_data -> 'reviews_data' IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    op.execute("""
+        UPDATE products p SET cached_data = (
+            coalesce(p.cached_data::jsonb, '{}'::jsonb) || jsonb_build_object('reviews_data', reviews.items)
+        )::json
+        FROM (
+            SELECT product_id, jsonb_agg(jsonb_strip_nulls(jsonb_build_object(
+                'review_id', external_review_id, 'rating', rating, 'title', title, 'content', content,
+                'author', author, 'date', review_date, 'verified_purchase', verified_purchase,
+                'helpful_votes', helpful_votes, 'source', source
+            )) || coalesce(review_metadata::jsonb, '{}'::jsonb) ORDER BY id) AS items
+            FROM product_reviews
+            GROUP BY product_id
+        ) reviews
+        WHERE reviews.product_id = p.id
+    """)
+    op.drop_index('ix_product_reviews_product_date', table_name='product_reviews')
+    op.drop_index('ix_product_reviews_product_rating', table_name='product_reviews')
+    op.drop_table('product_reviews')
@@ -0,0 +1,68 @@
+"""jsonb_metadata_with_gin_indexes
+
+Revision ID: b7f3a9c2e641
+Revises: 8e4b2d6f1a35
+Create Date: 2026-10-18 23:12:27.640318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7f3a9c2e641'
+down_revision = '8e4b2d6f1a35'
+branch_labels = None
+depends_on = None
+
+
+JSONB_COLUMNS = [
+    ('products', 'tags'),
+    ('products', 'keywords'),
+    ('products', 'crawl_metadata'),
+    ('prompt_templates', 'supported_languages'),
+    ('prompt_templates', 'cultural_regions'),
+    ('prompt_templates', 'product_categories'),
+]
+
+# (index name, table, column, operator class); jsonb_path_ops is smaller and
+# faster for @> on arrays, crawl_metadata keeps jsonb_ops for key-existence queries
+GIN_INDEXES = [
+    ('ix_products_tags', 'products', 'tags', 'jsonb_path_ops'),
+    ('ix_products_keywords', 'products', 'keywords', 'jsonb_path_ops'),
+    ('ix_products_crawl_metadata', 'products', 'crawl_metadata', None),
+    ('ix_template_supported_languages', 'prompt_templates', 'supported_languages', 'jsonb_path_ops'),
+    ('ix_template_cultural_regions', 'prompt_templates', 'cultural_regions', 'jsonb_path_ops'),
+    ('ix_template_product_categories', 'prompt_templates', 'product_categories', 'jsonb_path_ops'),
+]
+
+
+def upgrade() -> None:
+    for table_name, column_name in JSONB_COLUMNS:
+        op.alter_column(
+            table_name, column_name,
+            type_=postgresql.JSONB(),
+            existing_type=sa.JSON(),
+            postgresql_using=f'{column_name}::jsonb'
+        )
+
+    for index_name, table_name, column_name, operator_class in GIN_INDEXES:
+        op.create_index(
+            index_name, table_name, [column_name],
+            postgresql_using='gin',
+            postgresql_ops={column_name: operator_class} if operator_class else {}
+        )
+
+
+def downgrade() -> None:
+    for index_name, table_name, _, _ in reversed(GIN_INDEXES):
+        op.drop_index(index_name, table_name=table_name)
+
+    for table_name, column_name in reversed(JSONB_COLUMNS):
+        op.alter_column(
+            table_name, column_name,
+            type_=sa.JSON(),
+            existing_type=postgresql.JSONB(),
+            postgresql_using=f'{column_name}::json'
+        )
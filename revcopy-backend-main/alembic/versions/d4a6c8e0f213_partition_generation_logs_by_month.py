@@ -0,0 +1,136 @@
+"""partition_generation_logs_by_month
+
+Revision ID: d4a6c8e0f213
+Revises: b7f3a9c2e641
+Create Date: 2026-10-19 00:41:09.527314
+
+"""
+import re
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.partitioning import PARTITIONED_TABLES, add_months, create_partition_sql, month_start
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a6c8e0f213'
+down_revision = 'b7f3a9c2e641'
+branch_labels = None
+depends_on = None
+
+
+# Months created ahead of today; the maintenance task keeps extending this
+PREMAKE_MONTHS = 3
+
+# Indexes not backed by a constraint, as (name, definition, is_unique)
+INDEXES_SQL = """
+    SELECT index_class.relname, pg_get_indexdef(pg_index.indexrelid), pg_index.indisunique
+    FROM pg_index
+    JOIN pg_class index_class ON index_class.oid = pg_index.indexrelid
+    WHERE pg_index.indrelid = to_regclass(:table)
+      AND NOT EXISTS (SELECT 1 FROM pg_constraint WHERE pg_constraint.conindid = pg_index.indexrelid)
+"""
+
+# Primary key, unique and foreign key constraints, as (name, type, definition);
+# check constraints are carried over by CREATE TABLE ... LIKE
+CONSTRAINTS_SQL = """
+    SELECT conname, contype, pg_get_constraintdef(oid)
+    FROM pg_constraint
+    WHERE conrelid = to_regclass(:table) AND contype IN ('p', 'u', 'f')
+"""
+
+
+def _scalar(bind, sql, **params):
+    return bind.execute(sa.text(sql), params).scalar()
+
+
+def _table_state(bind, table):
+    """None if the table does not exist, else whether it is partitioned."""
+    if _scalar(bind, "SELECT to_regclass(:table)", table=table) is None:
+        return None
+    return _scalar(
+        bind, "SELECT count(*) FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)", table=table
+    ) > 0
+
+
+def _covers(definition, column):
+    """Whether the column list of an index or constraint definition includes ``column``."""
+    columns = definition[definition.rfind('(') + 1:]
+    return re.search(rf'\b{column}\b', columns) is not None
+
+
+def _rebuild(bind, table, column, partitioned):
+    """
+    Recreate ``table`` as a partitioned (or plain) table with the same data.
+    
+    The table is renamed out of the way, an empty copy of its columns,
+    defaults and checks is created under the original name, rows are copied
+    over and the old table dropped. Indexes and constraints are rebuilt on
+    the new table afterwards, which is faster than maintaining them during
+    the copy. Partitioned tables need the partition key in every primary key
+    and unique index, so the primary key becomes (id, <key>) and unique
+    indexes without the key are kept as plain indexes.
+    """
+    legacy = f"{table}_legacy"
+    indexes = bind.execute(sa.text(INDEXES_SQL), {'table': table}).fetchall()
+    constraints = bind.execute(sa.text(CONSTRAINTS_SQL), {'table': table}).fetchall()
+    sequence = _scalar(bind, "SELECT pg_get_serial_sequence(:table, 'id')", table=table)
+    
+    op.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+    if sequence:
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+    
+    if partitioned:
+        op.execute(f"UPDATE {legacy} SET {column} = now() WHERE {column} IS NULL")
+        op.execute(
+            f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            f"PARTITION BY RANGE ({column})"
+        )
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL")
+        
+        oldest = _scalar(bind, f"SELECT min({column}) FROM {legacy}") or datetime.utcnow()
+        month = month_start(oldest.date())
+        last = add_months(datetime.utcnow().date(), PREMAKE_MONTHS)
+        while month <= last:
+            op.execute(create_partition_sql(table, month))
+            month = add_months(month, 1)
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+    else:
+        op.execute(f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+    
+    op.execute(f"INSERT INTO {table} SELECT * FROM {legacy}")
+    op.execute(f"DROP TABLE {legacy}")
+    if sequence:
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+    
+    for name, kind, definition in constraints:
+        if kind == 'p':
+            key = f"id, {column}" if partitioned else "id"
+            op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} PRIMARY KEY ({key})")
+        elif kind == 'u' and partitioned and not _covers(definition, column):
+            op.execute(f"CREATE INDEX {name} ON {table} {definition[definition.find('('):]}")
+        else:
+            op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+    
+    for name, definition, unique in indexes:
+        definition = definition.replace(' ON ONLY ', ' ON ')
+        if unique and partitioned and not _covers(definition, column):
+            definition = definition.replace('CREATE UNIQUE INDEX', 'CREATE INDEX', 1)
+        op.execute(definition)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    for table, column in PARTITIONED_TABLES.items():
+        # generated_content and template_performance_metrics may come from create_all
+        if _table_state(bind, table) is False:
+            _rebuild(bind, table, column, partitioned=True)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    for table, column in PARTITIONED_TABLES.items():
+        if _table_state(bind, table):
+            _rebuild(bind, table, column, partitioned=False)
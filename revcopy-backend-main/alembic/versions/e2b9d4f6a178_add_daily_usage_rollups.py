@@ -0,0 +1,37 @@
+"""add_daily_usage_rollups
+
+Revision ID: e2b9d4f6a178
+Revises: d4a6c8e0f213
+Create Date: 2026-10-19 01:27:44.180356
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b9d4f6a178'
+down_revision = 'd4a6c8e0f213'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Filled by the first refresh_usage_rollups run, which backfills all history
+    op.create_table(
+        'daily_usage_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('metric', sa.String(length=50), nullable=False),
+        sa.Column('dimension', sa.String(length=50), nullable=False),
+        sa.Column('count', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id', name='pk_daily_usage_rollups'),
+        sa.UniqueConstraint('day', 'metric', 'dimension', name='uq_daily_usage_rollup')
+    )
+    op.create_index('ix_usage_rollup_metric_day', 'daily_usage_rollups', ['metric', 'day'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_usage_rollup_metric_day', table_name='daily_usage_rollups')
+    op.drop_table('daily_usage_rollups')
@@ -11,9 +11,10 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from app.core.database import get_async_session
+from app.core.database import get_async_session, get_read_session
 from app.core.security import verify_token
 from app.models.user import User
+from app.services.ai import AIService, get_ai_service as get_shared_ai_service
 from app.schemas.user import TokenData
 
 # Configure logging
@@ -289,6 +290,26 @@ async def get_pagination_params(
     }
 
 
+async def get_ai_service() -> AIService:
+    """
+    Get the application-scoped AI service.
+    
+    Returns:
+        AIService: Service created at startup and shared by all requests
+    
+    Raises:
+        HTTPException: If no AI provider is configured
+    """
+    try:
+        return get_shared_ai_service()
+    except Exception as e:
+        logger.error("AI service unavailable", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="AI service unavailable"
+        )
+
+
 # Database transaction dependency
 class TransactionDep:
     """Dependency for database transactions."""
@@ -14,18 +14,17 @@ from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 
 import structlog
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, desc, asc, update, delete, and_
 from sqlalchemy.orm import selectinload
 from pydantic import BaseModel, Field
 
-from app.api.deps import get_async_session, get_current_admin_user
+from app.api.deps import get_async_session, get_current_admin_user, get_read_session
 from app.models.user import User, UserRole, UserStatus
 from app.models.prompts import PromptTemplate
-from app.models.content import GeneratedContent
-from app.models.product import Product
+from app.services.usage_rollups import UsageRollupService
 from app.schemas.prompts import (
     PromptTemplateResponse,
 )
@@ -66,6 +65,7 @@ from app.models.admin import (
 )
 from app.core.security import get_password_hash, verify_password, create_access_token, create_refresh_token, verify_token
 from app.core.config import settings
+from app.core.pagination import NEXT_CURSOR_HEADER, encode_cursor, estimated_row_count, paginate_keyset
 
 # Configure logging
 logger = structlog.get_logger(__name__)
@@ -76,6 +76,9 @@ security = HTTPBearer()
 # Create router
 router = APIRouter()
 
+# Dashboard and usage analytics are read from daily rollups
+usage_rollup_service = UsageRollupService()
+
 # ==================== SIMPLE ADMIN SCHEMAS ====================
 
 class SimplePromptTemplateCreate(BaseModel):
@@ -224,21 +227,27 @@ async def get_current_user_profile(
 
 @router.get("/prompt-templates", response_model=List[SimplePromptTemplateResponse])
 async def get_prompt_templates(
+    response: Response,
     category: Optional[str] = Query(None, description="Filter by category"),
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
     limit: int = Query(50, ge=1, le=100, description="Number of results to return"),
     offset: int = Query(0, ge=0, description="Number of results to skip"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header; replaces offset"),
     db: AsyncSession = Depends(get_async_session),
     current_admin: User = Depends(get_current_admin_user),
 ) -> List[SimplePromptTemplateResponse]:
     """
     Get all prompt templates with optional filtering.
     
+    The cursor for the next page is returned in the ``X-Next-Cursor``
+    response header.
+    
     Args:
         category: Filter by template category
         is_active: Filter by active status
         limit: Maximum number of results
         offset: Number of results to skip
+        cursor: Keyset cursor from the previous page
         db: Database session
         current_admin: Current admin user
         
@@ -256,11 +265,13 @@ async def get_prompt_templates(
         if is_active is not None:
             query = query.where(PromptTemplate.is_active == is_active)
         
-        # Order by creation date, newest first
-        query = query.order_by(desc(PromptTemplate.created_at)).limit(limit).offset(offset)
-        
-        result = await db.execute(query)
-        templates = result.scalars().all()
+        # Newest first, keyed on (created_at, id)
+        if offset and not cursor:
+            query = query.offset(offset)
+        keyset_page = await paginate_keyset(db, query, PromptTemplate, limit, cursor)
+        templates = keyset_page.items
+        if keyset_page.next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = keyset_page.next_cursor
         
         logger.info("Retrieved prompt templates", count=len(templates), admin_id=current_admin.id)
         return [SimplePromptTemplateResponse(
@@ -272,6 +283,8 @@ async def get_prompt_templates(
             updated_at=template.updated_at
         ) for template in templates]
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("Failed to fetch prompt templates", error=str(e), admin_id=current_admin.id)
         raise HTTPException(
@@ -512,18 +525,24 @@ async def get_users(
     status_filter: Optional[UserStatus] = Query(None, description="Filter by user status"),
     role_filter: Optional[UserRole] = Query(None, description="Filter by user role"),
     search: Optional[str] = Query(None, description="Search by email or username"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page; replaces page"),
     db: AsyncSession = Depends(get_async_session),
     current_admin: User = Depends(get_current_admin_user),
 ) -> Dict[str, Any]:
     """
     Get paginated list of users with filtering options.
     
+    With ``cursor`` the page is fetched by keyset and no exact count is
+    run; otherwise ``page`` is used and the response still carries a
+    ``next_cursor`` to continue from.
+    
     Args:
         page: Page number
         limit: Number of users per page
         status_filter: Filter by user status
         role_filter: Filter by user role
         search: Search term for email or username
+        cursor: Keyset cursor from the previous page
         db: Database session
         current_admin: Current admin user
         
@@ -548,6 +567,20 @@ async def get_users(
                 func.lower(User.username).like(search_term)
             )
         
+        if cursor:
+            keyset_page = await paginate_keyset(db, query, User, limit, cursor)
+            filtered = bool(status_filter or role_filter or search)
+            return {
+                "users": [UserResponse.from_orm(user) for user in keyset_page.items],
+                "pagination": {
+                    "limit": limit,
+                    "has_next": keyset_page.has_next,
+                    "has_prev": True,
+                    "next_cursor": keyset_page.next_cursor,
+                    "estimated_total": None if filtered else await estimated_row_count(db, User.__tablename__),
+                }
+            }
+        
         # Get total count
         count_query = select(func.count(User.id))
         if status_filter:
@@ -566,7 +599,7 @@ async def get_users(
         
         # Apply pagination
         offset = (page - 1) * limit
-        query = query.order_by(desc(User.created_at)).limit(limit).offset(offset)
+        query = query.order_by(desc(User.created_at), desc(User.id)).limit(limit).offset(offset)
         
         result = await db.execute(query)
         users = result.scalars().all()
@@ -575,6 +608,7 @@ async def get_users(
         total_pages = (total + limit - 1) // limit
         has_next = page < total_pages
         has_prev = page > 1
+        next_cursor = encode_cursor(users[-1].created_at, users[-1].id) if has_next and users else None
         
         return {
             "users": [UserResponse.from_orm(user) for user in users],
@@ -585,9 +619,12 @@ async def get_users(
                 "total_pages": total_pages,
                 "has_next": has_next,
                 "has_prev": has_prev,
+                "next_cursor": next_cursor,
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("Failed to fetch users", error=str(e), admin_id=current_admin.id)
         raise HTTPException(
@@ -704,7 +741,7 @@ async def update_user_status(
 
 @router.get("/dashboard/stats")
 async def get_dashboard_stats(
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_read_session),
     current_admin: User = Depends(get_current_admin_user),
 ) -> Dict[str, Any]:
     """
@@ -720,72 +757,8 @@ async def get_dashboard_stats(
     try:
         logger.info("Fetching dashboard stats", admin_id=current_admin.id)
         
-        # Get current date ranges
-        now = datetime.utcnow()
-        thirty_days_ago = now - timedelta(days=30)
-        seven_days_ago = now - timedelta(days=7)
-        
-        # Total users
-        total_users_result = await db.execute(select(func.count(User.id)))
-        total_users = total_users_result.scalar()
-        
-        # Active users (last 30 days)
-        active_users_result = await db.execute(
-            select(func.count(User.id)).where(User.last_login >= thirty_days_ago)
-        )
-        active_users = active_users_result.scalar() or 0
-        
-        # New users (last 7 days)
-        new_users_result = await db.execute(
-            select(func.count(User.id)).where(User.created_at >= seven_days_ago)
-        )
-        new_users = new_users_result.scalar() or 0
-        
-        # Total products analyzed
-        total_products_result = await db.execute(select(func.count(Product.id)))
-        total_products = total_products_result.scalar() or 0
-        
-        # Products analyzed (last 30 days)
-        recent_products_result = await db.execute(
-            select(func.count(Product.id)).where(Product.created_at >= thirty_days_ago)
-        )
-        recent_products = recent_products_result.scalar() or 0
-        
-        # Total content generated
-        total_content_result = await db.execute(select(func.count(GeneratedContent.id)))
-        total_content = total_content_result.scalar() or 0
-        
-        # Content generated (last 30 days)
-        recent_content_result = await db.execute(
-            select(func.count(GeneratedContent.id)).where(GeneratedContent.created_at >= thirty_days_ago)
-        )
-        recent_content = recent_content_result.scalar() or 0
-        
-        # Active prompt templates
-        active_templates_result = await db.execute(
-            select(func.count(PromptTemplate.id)).where(PromptTemplate.is_active == True)
-        )
-        active_templates = active_templates_result.scalar() or 0
-        
-        return {
-            "users": {
-                "total": total_users,
-                "active_30d": active_users,
-                "new_7d": new_users,
-            },
-            "products": {
-                "total": total_products,
-                "analyzed_30d": recent_products,
-            },
-            "content": {
-                "total": total_content,
-                "generated_30d": recent_content,
-            },
-            "templates": {
-                "active": active_templates,
-            },
-            "last_updated": now.isoformat(),
-        }
+        # Served from daily rollups kept current by the refresh_usage_rollups task
+        return await usage_rollup_service.get_dashboard_stats(db)
         
     except Exception as e:
         logger.error("Failed to fetch dashboard stats", error=str(e), admin_id=current_admin.id)
@@ -798,7 +771,7 @@ async def get_dashboard_stats(
 @router.get("/analytics/usage")
 async def get_usage_analytics(
     period: str = Query("7d", regex="^(7d|30d|90d)$", description="Time period: 7d, 30d, or 90d"),
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_read_session),
     current_admin: User = Depends(get_current_admin_user),
 ) -> Dict[str, Any]:
     """
@@ -819,53 +792,12 @@ async def get_usage_analytics(
         days = int(period[:-1])  # Remove 'd' suffix
         start_date = datetime.utcnow() - timedelta(days=days)
         
-        # Daily user registrations
-        daily_registrations = await db.execute(
-            select(
-                func.date(User.created_at).label('date'),
-                func.count(User.id).label('count')
-            )
-            .where(User.created_at >= start_date)
-            .group_by(func.date(User.created_at))
-            .order_by(func.date(User.created_at))
-        )
-        
-        # Daily content generation
-        daily_content = await db.execute(
-            select(
-                func.date(GeneratedContent.created_at).label('date'),
-                func.count(GeneratedContent.id).label('count')
-            )
-            .where(GeneratedContent.created_at >= start_date)
-            .group_by(func.date(GeneratedContent.created_at))
-            .order_by(func.date(GeneratedContent.created_at))
-        )
-        
-        # Content by type
-        content_by_type = await db.execute(
-            select(
-                GeneratedContent.content_type,
-                func.count(GeneratedContent.id).label('count')
-            )
-            .where(GeneratedContent.created_at >= start_date)
-            .group_by(GeneratedContent.content_type)
-        )
+        rollups = await usage_rollup_service.get_usage_analytics(db, start_date)
         
         return {
             "period": period,
             "start_date": start_date.isoformat(),
-            "daily_registrations": [
-                {"date": str(row.date), "count": row.count}
-                for row in daily_registrations
-            ],
-            "daily_content": [
-                {"date": str(row.date), "count": row.count}
-                for row in daily_content
-            ],
-            "content_by_type": [
-                {"type": row.content_type, "count": row.count}
-                for row in content_by_type
-            ],
+            **rollups,
         }
         
     except Exception as e:
@@ -975,23 +907,29 @@ async def update_system_settings(
 
 @router.get("/administrators", response_model=List[AdministratorResponse])
 async def get_administrators(
+    response: Response,
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(20, ge=1, le=100, description="Number of administrators per page"),
     status_filter: Optional[AdminStatus] = Query(None, description="Filter by status"),
     role_filter: Optional[AdminRole] = Query(None, description="Filter by role"),
     search: Optional[str] = Query(None, description="Search by name or email"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header; replaces page"),
     db: AsyncSession = Depends(get_async_session),
     current_admin: User = Depends(get_current_admin_user),
 ) -> List[AdministratorResponse]:
     """
     Get all administrators with optional filtering and pagination.
     
+    The cursor for the next page is returned in the ``X-Next-Cursor``
+    response header.
+    
     Args:
         page: Page number for pagination
         limit: Number of administrators per page
         status_filter: Filter by administrator status
         role_filter: Filter by administrator role
         search: Search term for name or email
+        cursor: Keyset cursor from the previous page
         db: Database session
         current_admin: Current admin user
         
@@ -1016,15 +954,18 @@ async def get_administrators(
             )
         
         # Apply pagination
-        offset = (page - 1) * limit
-        query = query.order_by(desc(Administrator.created_at)).limit(limit).offset(offset)
-        
-        result = await db.execute(query)
-        administrators = result.scalars().all()
+        if not cursor:
+            query = query.offset((page - 1) * limit)
+        keyset_page = await paginate_keyset(db, query, Administrator, limit, cursor)
+        administrators = keyset_page.items
+        if keyset_page.next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = keyset_page.next_cursor
         
         logger.info("Retrieved administrators", count=len(administrators), admin_id=current_admin.id)
         return [AdministratorResponse.from_orm(admin) for admin in administrators]
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("Failed to fetch administrators", error=str(e), admin_id=current_admin.id)
         raise HTTPException(
@@ -1216,12 +1157,16 @@ async def get_payments(
     search: Optional[str] = Query(None, description="Search by user email or payment ID"),
     start_date: Optional[datetime] = Query(None, description="Filter payments from this date"),
     end_date: Optional[datetime] = Query(None, description="Filter payments until this date"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page; replaces page"),
     db: AsyncSession = Depends(get_async_session),
     current_admin: User = Depends(get_current_admin_user),
 ) -> PaymentListResponse:
     """
     Get all payments with filtering and pagination.
     
+    With ``cursor`` the page is fetched by keyset and no exact count is
+    run; otherwise ``page`` is used.
+    
     Args:
         page: Page number for pagination
         limit: Number of payments per page
@@ -1229,6 +1174,7 @@ async def get_payments(
         search: Search term for user email or payment ID
         start_date: Filter payments from this date
         end_date: Filter payments until this date
+        cursor: Keyset cursor from the previous page
         db: Database session
         current_admin: Current admin user
         
@@ -1254,6 +1200,20 @@ async def get_payments(
         if end_date:
             query = query.where(Payment.created_at <= end_date)
         
+        if cursor:
+            keyset_page = await paginate_keyset(db, query, Payment, limit, cursor)
+            filtered = bool(status_filter or search or start_date or end_date)
+            return PaymentListResponse(
+                payments=[PaymentResponse.from_orm(payment) for payment in keyset_page.items],
+                pagination=PaginationResponse(
+                    limit=limit,
+                    has_next=keyset_page.has_next,
+                    has_prev=True,
+                    next_cursor=keyset_page.next_cursor,
+                    estimated_total=None if filtered else await estimated_row_count(db, Payment.__tablename__)
+                )
+            )
+        
         # Get total count for pagination
         count_query = select(func.count()).select_from(query.subquery())
         total_result = await db.execute(count_query)
@@ -1261,7 +1221,7 @@ async def get_payments(
         
         # Apply pagination
         offset = (page - 1) * limit
-        query = query.order_by(desc(Payment.created_at)).limit(limit).offset(offset)
+        query = query.order_by(desc(Payment.created_at), desc(Payment.id)).limit(limit).offset(offset)
         
         result = await db.execute(query)
         payments = result.scalars().all()
@@ -1277,7 +1237,8 @@ async def get_payments(
             total=total,
             total_pages=total_pages,
             has_next=has_next,
-            has_prev=has_prev
+            has_prev=has_prev,
+            next_cursor=encode_cursor(payments[-1].created_at, payments[-1].id) if has_next and payments else None
         )
         
         logger.info("Retrieved payments", count=len(payments), total=total, admin_id=current_admin.id)
@@ -1287,6 +1248,8 @@ async def get_payments(
             pagination=pagination
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("Failed to fetch payments", error=str(e), admin_id=current_admin.id)
         raise HTTPException(
@@ -5,13 +5,16 @@ Enhanced with world-class prompt management, multi-language support, and cultura
 
 from typing import List, Optional, Dict, Any
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, and_, update
+from sqlalchemy import select, delete, and_, or_, update
 from pydantic import BaseModel, Field
 
 import structlog
-from app.core.database import get_async_session
+from app.core.database import get_async_session, get_read_session, json_contains
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.sse import SSE_HEADERS, sse_event
 from app.models.prompts import PromptTemplate, AIContentGeneration, ContentGenerationStats, CulturalAdaptation
 from app.schemas.prompts import (
     PromptTemplateCreate,
@@ -27,7 +30,8 @@ from app.schemas.prompts import (
     AIProviderStatus
 )
 from app.services.content_generation import ContentGenerationService
-from app.services.ai import ai_service
+from app.services.ai import AIService, get_ai_service as get_shared_ai_service
+from app.api.deps import get_ai_service
 
 logger = structlog.get_logger(__name__)
 
@@ -57,16 +61,69 @@ async def generate_content(
         )
 
 
+@router.post("/generate/stream")
+async def generate_content_stream(
+    request: ContentGenerationRequest,
+    db: AsyncSession = Depends(get_async_session)
+):
+    """
+    Generate content as a ``text/event-stream``.
+    
+    Sends ``delta`` events with text as the model produces it, then one
+    ``done`` event with the generation metadata, or an ``error`` event.
+    """
+    async def events():
+        async for event, data in content_service.stream_content(db, request):
+            yield sse_event(event, data)
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.post("/generate/versions/stream")
+async def generate_versions_stream(
+    request: ContentGenerationRequest,
+    count: int = Query(3, ge=2, le=5, description="Number of versions to generate"),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """
+    Generate alternative versions concurrently as a ``text/event-stream``.
+    
+    Sends a ``version`` event as each version completes (in completion
+    order, with its index), then one ``done`` or ``error`` event. If the
+    client disconnects, versions still being generated are cancelled.
+    """
+    async def events():
+        versions = content_service.stream_versions(db, request, count)
+        try:
+            async for event, data in versions:
+                yield sse_event(event, data)
+        finally:
+            await versions.aclose()
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
 @router.get("/history", response_model=List[Dict])
 async def get_generation_history(
+    response: Response,
     user_id: Optional[str] = Query(None, description="User ID to filter by"),
     limit: int = Query(50, ge=1, le=200, description="Number of records to return"),
-    db: AsyncSession = Depends(get_async_session)
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
+    db: AsyncSession = Depends(get_read_session)
 ):
-    """Get content generation history."""
+    """
+    Get content generation history, newest first.
+    
+    When more records exist, the cursor for the next page is returned in
+    the ``X-Next-Cursor`` response header.
+    """
     try:
-        history = await content_service.get_generation_history(db, user_id, limit)
-        return history
+        page = await content_service.get_generation_history(db, user_id, limit, cursor)
+        if page.next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+        return page.items
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("Failed to get generation history", error=str(e))
         raise HTTPException(
@@ -107,9 +164,15 @@ async def provide_feedback(
 async def get_system_status(db: AsyncSession = Depends(get_async_session)):
     """Get overall system status and AI provider availability."""
     try:
-        # Get available providers
+        # Get available providers; with none configured the system is reported unhealthy
+        try:
+            provider_names = get_shared_ai_service().get_available_providers()
+        except Exception as e:
+            logger.warning("AI service unavailable", error=str(e))
+            provider_names = []
+        
         available_providers = []
-        for provider_name in ai_service.get_available_providers():
+        for provider_name in provider_names:
             provider_status = AIProviderStatus(
                 provider_name=provider_name,
                 is_available=True,
@@ -367,7 +430,8 @@ async def delete_template(
 @router.post("/templates/test", response_model=TemplateTestResponse)
 async def test_template(
     test_request: TemplateTestRequest,
-    db: AsyncSession = Depends(get_async_session)
+    db: AsyncSession = Depends(get_async_session),
+    ai_service: AIService = Depends(get_ai_service)
 ):
     """Test a prompt template with sample data."""
     try:
@@ -618,17 +682,24 @@ async def _select_intelligent_template(
 ) -> PromptTemplate:
     """Select optimal template using intelligent scoring."""
     
-    # Get candidate templates
-    result = await db.execute(
-        select(PromptTemplate).where(
-            and_(
-                PromptTemplate.template_type == request.content_type,
-                PromptTemplate.is_active == True
-            )
+    # Get candidate templates, preferring ones that support the language (or
+    # the English fallback) via GIN-indexed containment
+    candidates_query = select(PromptTemplate).where(
+        and_(
+            PromptTemplate.template_type == request.content_type,
+            PromptTemplate.is_active == True
         )
     )
+    result = await db.execute(candidates_query.where(or_(
+        json_contains(PromptTemplate.supported_languages, [request.language]),
+        json_contains(PromptTemplate.supported_languages, ["en"])
+    )))
     candidates = result.scalars().all()
     
+    if not candidates:
+        result = await db.execute(candidates_query)
+        candidates = result.scalars().all()
+    
     if not candidates:
         # Create a default template if none exist
         logger.warning(f"No templates found for {request.content_type}, creating default template")
@@ -958,7 +1029,7 @@ async def _generate_culturally_adapted_content(
         formatted_prompt = user_prompt.format(**variables)
     
     # Generate content using AI service
-    result = await ai_service.generate_content_with_context(
+    result = await get_shared_ai_service().generate_content_with_context(
         prompt=formatted_prompt,
         system_prompt=system_prompt,
         platform=request.content_type,
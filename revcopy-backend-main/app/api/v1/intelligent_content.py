@@ -9,20 +9,27 @@ Enterprise-level content generation with:
 - Real-time analytics
 """
 
+import time
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 # Removed SQLAlchemy imports since not using database models
 # from sqlalchemy import select, and_, func
 from pydantic import BaseModel, Field, validator
 import structlog
 
+from app.core.config import settings
 from app.core.database import get_async_session
+from app.core.sse import SSE_HEADERS, sse_event
+from app.models.prompts import AIContentGeneration
 # Commenting out problematic imports that cause table conflicts
 # from app.models.intelligent_prompts import PromptTemplate, CulturalAdaptation
 # from app.services.intelligent_prompt_service import IntelligentPromptService
 from app.services.ai import AIService
+from app.api.deps import get_ai_service
+from app.services.generation_stats import generation_stats
 
 # Initialize logger
 logger = structlog.get_logger(__name__)
@@ -194,6 +201,81 @@ class PerformanceAnalyticsResponse(BaseModel):
     ab_test_results: List[Dict[str, Any]] = Field(default=[], description="Recent A/B test results")
 
 
+async def _load_product_inputs(
+    request: IntelligentContentRequest,
+    db: AsyncSession
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Analyze the product URL and shape its data and reviews for generation.
+    
+    Raises:
+        HTTPException: 400 when the product cannot be analyzed
+    """
+    from app.services.product import ProductService
+    product_service = ProductService()
+    
+    try:
+        # Validate and analyze product URL
+        is_valid, product_data, error_msg = await product_service.validate_and_extract_product(
+            request.product_url, 
+            user_id=1,  # Demo user
+            db=db
+        )
+        
+        if not is_valid:
+            raise ValueError(error_msg or "Failed to validate product URL")
+        
+        # Reviews live in product_reviews; take the same stratified sample analyses use
+        reviews_data = await product_service.review_store.sample_reviews(
+            db, product_data["id"], settings.MAX_REVIEWS_FOR_ANALYSIS
+        )
+        
+        logger.info(
+            "Product analyzed successfully",
+            product_title=product_data.get("title", "Unknown"),
+            review_count=len(reviews_data)
+        )
+        
+        # Calculate average rating from reviews
+        avg_rating = 4.5  # Default
+        if reviews_data:
+            total_rating = sum(r.get("rating") or 0 for r in reviews_data)
+            avg_rating = total_rating / len(reviews_data) if len(reviews_data) > 0 else 4.5
+        
+    except Exception as e:
+        logger.error("Product analysis failed", error=str(e))
+        raise HTTPException(
+            status_code=400,
+            detail=f"Failed to analyze product URL: {str(e)}"
+        )
+    
+    # Convert reviews_data to proper format
+    formatted_reviews = []
+    for review in reviews_data:
+        formatted_reviews.append({
+            'rating': review.get('rating') or 5,
+            'content': (review.get('content') or '').strip()
+        })
+    
+    # Prepare product data for AI service
+    formatted_product_data = {
+        'title': product_data.get('title', 'Product'),
+        'description': product_data.get('description', ''),
+        'brand': product_data.get('brand', ''),
+        'price': product_data.get('price', 0),
+        'rating': avg_rating,
+        'review_count': len(formatted_reviews),
+        'category': product_data.get('category', request.product_category),
+        'platform': product_data.get('platform', 'shopify')
+    }
+    
+    # Add custom variables from request
+    if request.custom_variables:
+        formatted_product_data.update(request.custom_variables)
+    
+    return formatted_product_data, formatted_reviews
+
+
 # API Endpoints
 
 @router.options("/intelligent/generate")
@@ -205,7 +287,8 @@ async def options_intelligent_generate():
 async def generate_intelligent_content(
     request: IntelligentContentRequest,
     background_tasks: BackgroundTasks,
-    db: AsyncSession = Depends(get_async_session)
+    db: AsyncSession = Depends(get_async_session),
+    ai_service: AIService = Depends(get_ai_service)
 ):
     """
     Generate content using intelligent prompt selection and cultural adaptation.
@@ -228,93 +311,10 @@ async def generate_intelligent_content(
         )
         
         # Step 1: Analyze product (reuse existing product analysis)
-        from app.services.product import ProductService
-        product_service = ProductService()
-        
-        try:
-            # Validate and analyze product URL
-            is_valid, product_data, error_msg = await product_service.validate_and_extract_product(
-                request.product_url, 
-                user_id=1,  # Demo user
-                db=db
-            )
-            
-            if not is_valid:
-                raise ValueError(error_msg or "Failed to validate product URL")
-            
-            logger.info(
-                "Product analyzed successfully",
-                product_title=product_data.get("title", "Unknown"),
-                review_count=len(product_data.get("reviews_data", []))
-            )
-            
-            # Extract REAL benefits and pain points from analysis
-            reviews_data = product_data.get("reviews_data", [])
-            real_benefits = []
-            real_pain_points = []
-            
-            if reviews_data:
-                # Analyze reviews to extract real insights
-                positive_reviews = [r for r in reviews_data if r.get("rating", 0) >= 4]
-                negative_reviews = [r for r in reviews_data if r.get("rating", 0) <= 2]
-                
-                # Extract REAL benefits from positive reviews content
-                if positive_reviews:
-                    real_benefits = extract_real_benefits_from_reviews(positive_reviews, product_data.get("title", ""))
-                else:
-                    real_benefits = ["High-quality product", "Great customer satisfaction"]
-                
-                # Extract REAL pain points from negative reviews content  
-                if negative_reviews and len(negative_reviews) >= 2:  # Only show pain points if we have substantial negative feedback
-                    real_pain_points = extract_real_pain_points_from_reviews(negative_reviews, product_data.get("title", ""))
-                else:
-                    real_pain_points = []  # Don't show pain points if there aren't meaningful negative reviews
-            else:
-                # Fallback for products with no reviews
-                real_benefits = ["Professional product design", "Quality craftsmanship"]
-                real_pain_points = []  # No reviews = no pain points to show
-            
-            # Calculate average rating from reviews
-            avg_rating = 4.5  # Default
-            if reviews_data:
-                total_rating = sum(r.get("rating", 0) for r in reviews_data)
-                avg_rating = total_rating / len(reviews_data) if len(reviews_data) > 0 else 4.5
-            
-        except Exception as e:
-            logger.error("Product analysis failed", error=str(e))
-            raise HTTPException(
-                status_code=400,
-                detail=f"Failed to analyze product URL: {str(e)}"
-            )
+        formatted_product_data, formatted_reviews = await _load_product_inputs(request, db)
         
         # Step 2: Use NEW Dynamic AI Service (NOT template-based!)
         try:
-            ai_service = AIService()
-            
-            # Convert reviews_data to proper format
-            formatted_reviews = []
-            for review in reviews_data:
-                formatted_reviews.append({
-                    'rating': review.get('rating', 5),
-                    'content': review.get('content', '').strip() or review.get('review_text', '').strip()
-                })
-            
-            # Prepare product data for AI service
-            formatted_product_data = {
-                'title': product_data.get('title', 'Product'),
-                'description': product_data.get('description', ''),
-                'brand': product_data.get('brand', ''),
-                'price': product_data.get('price', 0),
-                'rating': avg_rating,
-                'review_count': len(formatted_reviews),
-                'category': product_data.get('category', request.product_category),
-                'platform': product_data.get('platform', 'shopify')
-            }
-            
-            # Add custom variables from request
-            if request.custom_variables:
-                formatted_product_data.update(request.custom_variables)
-            
             logger.info(
                 "Using NEW dynamic AI service for content generation",
                 product_name=formatted_product_data['title'],
@@ -383,6 +383,92 @@ async def generate_intelligent_content(
         )
 
 
+@router.post("/intelligent/generate/stream")
+async def generate_intelligent_content_stream(
+    request: IntelligentContentRequest,
+    db: AsyncSession = Depends(get_async_session),
+    ai_service: AIService = Depends(get_ai_service)
+):
+    """
+    Generate platform-specific content as a ``text/event-stream``.
+    
+    The product is analyzed before the stream opens, so an invalid URL is
+    still a plain 400. The stream then carries ``delta`` events with text as
+    the model produces it and ends with a ``done`` or ``error`` event; the
+    full text is saved as a generation record once the provider finishes.
+    """
+    product_data, reviews = await _load_product_inputs(request, db)
+    prompts = await create_platform_specific_prompt(
+        content_type=request.content_type,
+        product_data=product_data,
+        reviews_data=reviews,
+        cultural_context={"cultural_region": request.cultural_region, "language": request.language},
+        tone=request.tone,
+        target_audience=request.target_audience,
+        brand_personality=request.brand_personality
+    )
+    
+    async def events():
+        start_time = time.time()
+        first_token_ms = None
+        chunks: List[str] = []
+        record = AIContentGeneration(
+            template_type=request.content_type,
+            ai_provider=request.ai_provider,
+            product_url=request.product_url,
+            product_data=product_data,
+            reviews_analyzed=len(reviews),
+            input_parameters=request.custom_variables,
+            language_requested=request.language,
+            cultural_region=request.cultural_region,
+            temperature=request.temperature or settings.AI_TEMPERATURE,
+            max_tokens=request.max_tokens or settings.AI_MAX_TOKENS,
+            session_id=request.session_id
+        )
+        
+        try:
+            async for delta in ai_service.stream_content(
+                prompt=prompts["user_prompt"],
+                provider=request.ai_provider,
+                system_prompt=prompts["system_prompt"],
+                temperature=record.temperature,
+                max_tokens=record.max_tokens
+            ):
+                if first_token_ms is None:
+                    first_token_ms = int((time.time() - start_time) * 1000)
+                chunks.append(delta)
+                yield sse_event("delta", {"text": delta})
+            record.success = True
+        except Exception as e:
+            logger.error("Intelligent content stream failed", error=str(e), product_url=request.product_url)
+            record.success = False
+            record.error_message = str(e)
+        
+        record.generated_content = "".join(chunks) or None
+        record.generation_time_ms = int((time.time() - start_time) * 1000)
+        try:
+            db.add(record)
+            await generation_stats.record(db, None, record.template_type, record.ai_provider, record.success)
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            logger.error("Failed to save streamed generation", error=str(e))
+        
+        if record.success:
+            yield sse_event("done", {
+                "generation_id": record.id,
+                "provider_used": request.ai_provider,
+                "language_used": request.language,
+                "cultural_region_used": request.cultural_region,
+                "first_token_ms": first_token_ms,
+                "generation_time_ms": record.generation_time_ms
+            })
+        else:
+            yield sse_event("error", {"detail": "Content generation failed. Please try again."})
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
 async def create_platform_specific_prompt(
     content_type: str,
     product_data: Dict[str, Any],
@@ -28,9 +28,10 @@ import structlog
 
 from app.core.database import get_async_session
 from app.api.deps import get_current_admin_user
-from app.core.performance import performance_collector
+from app.core.performance import performance_collector, db_pool_monitor
 from app.core.cache import cache
-from app.core.background_tasks import task_manager
+from app.core.background_tasks import TaskConfig, TaskPriority, task_manager
+from app.services.llm_cache import llm_response_cache
 from app.models.user import User
 
 logger = structlog.get_logger(__name__)
@@ -286,6 +287,7 @@ async def get_database_performance(
             "database_stats": db_stats,
             "slow_queries": slow_queries,
             "connection_stats": connection_stats,
+            "pool_stats": db_pool_monitor.get_pool_stats(),
             "table_stats": table_stats,
             "recommendations": _get_database_recommendations(db_stats, slow_queries)
         }
@@ -313,6 +315,7 @@ async def get_cache_analytics(
     try:
         analytics = {
             "overall_stats": cache.get_stats(),
+            "llm_responses": llm_response_cache.get_stats(),
             "performance_impact": _calculate_cache_performance_impact(),
             "optimization_opportunities": _identify_cache_optimization_opportunities(),
             "recommendations": _get_cache_recommendations()
@@ -488,32 +491,23 @@ async def trigger_maintenance_cleanup(
         Dict: Cleanup task status
     """
     try:
-        # Schedule cleanup tasks
+        # Schedule cleanup tasks by their registered names; next months' log
+        # partitions are queued ahead of the expired-content cleanup
+        maintenance_tasks = [
+            ("cleanup_completed_tasks", TaskPriority.HIGH),
+            ("cleanup_performance_metrics", TaskPriority.HIGH),
+            ("create_upcoming_partitions", TaskPriority.HIGH),
+            ("cleanup_old_content", TaskPriority.NORMAL),
+            ("optimize_database", TaskPriority.NORMAL),
+        ]
         cleanup_tasks = []
-        
-        # Clear old completed tasks
-        task_id = await task_manager.submit_task(
-            "cleanup_completed_tasks",
-            "app.tasks.maintenance.cleanup_completed_tasks",
-            config={"priority": "high"}
-        )
-        cleanup_tasks.append({"task": "cleanup_completed_tasks", "task_id": task_id})
-        
-        # Clear old performance metrics
-        task_id = await task_manager.submit_task(
-            "cleanup_performance_metrics",
-            "app.tasks.maintenance.cleanup_performance_metrics",
-            config={"priority": "high"}
-        )
-        cleanup_tasks.append({"task": "cleanup_performance_metrics", "task_id": task_id})
-        
-        # Optimize database
-        task_id = await task_manager.submit_task(
-            "optimize_database",
-            "app.tasks.maintenance.optimize_database",
-            config={"priority": "medium"}
-        )
-        cleanup_tasks.append({"task": "optimize_database", "task_id": task_id})
+        for task_name, priority in maintenance_tasks:
+            task_id = await task_manager.submit_task(
+                task_name,
+                task_name,
+                config=TaskConfig(priority=priority, tags=["maintenance"])
+            )
+            cleanup_tasks.append({"task": task_name, "task_id": task_id})
         
         logger.info("Maintenance cleanup triggered", admin_id=current_admin.id, tasks=len(cleanup_tasks))
         
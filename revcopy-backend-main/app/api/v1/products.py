@@ -2,13 +2,15 @@
 Product analysis and management API endpoints.
 """
 
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 import structlog
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from app.api.deps import get_async_session
+from app.api.deps import get_async_session, get_read_session
+from app.core.pagination import estimated_row_count, paginate_keyset
+from app.core.database import json_contains
 from app.models.product import Product
 from app.models.user import User
 from app.services.product import ProductService
@@ -151,17 +153,33 @@ async def get_product(
 
 @router.get("/", response_model=Dict)
 async def list_products(
-    limit: int = 50,
-    offset: int = 0,
-    db: AsyncSession = Depends(get_async_session)
+    limit: int = Query(50, ge=1, le=200, description="Number of products to return"),
+    cursor: Optional[str] = Query(None, description="Cursor returned as next_cursor by the previous page"),
+    offset: int = Query(0, ge=0, description="Deprecated: rows to skip, use cursor instead"),
+    include_total: bool = Query(False, description="Include an estimated total product count"),
+    tag: Optional[List[str]] = Query(None, description="Only products carrying all of these tags"),
+    keyword: Optional[List[str]] = Query(None, description="Only products carrying all of these keywords"),
+    db: AsyncSession = Depends(get_read_session)
 ):
     """
-    List products with pagination.
+    List products newest first with cursor pagination.
+    
+    Pass ``next_cursor`` from a response as ``cursor`` to fetch the next
+    page; it is None on the last page. ``total`` is kept for older clients
+    and, as before, is the number of products on this page (deprecated: use
+    ``count``, ``has_next`` and ``estimated_total``).
     """
     try:
-        query = select(Product).order_by(Product.created_at.desc()).offset(offset).limit(limit)
-        result = await db.execute(query)
-        products = result.scalars().all()
+        query = select(Product)
+        if tag:
+            query = query.where(json_contains(Product.tags, tag))
+        if keyword:
+            query = query.where(json_contains(Product.keywords, keyword))
+        if offset and not cursor:
+            query = query.offset(offset)
+        
+        page = await paginate_keyset(db, query, Product, limit, cursor)
+        products = page.items
         
         return {
             "products": [
@@ -177,11 +195,19 @@ async def list_products(
                 }
                 for product in products
             ],
+            "count": len(products),
             "total": len(products),
+            "estimated_total": (
+                await estimated_row_count(db, Product.__tablename__) if include_total and not (tag or keyword) else None
+            ),
             "limit": limit,
-            "offset": offset
+            "offset": offset if not cursor else 0,
+            "next_cursor": page.next_cursor,
+            "has_next": page.has_next
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("Failed to list products", error=str(e))
         raise HTTPException(
@@ -18,7 +18,7 @@ from sqlalchemy.orm import selectinload
 from pydantic import BaseModel, Field, validator
 import structlog
 
-from app.core.database import get_async_session
+from app.core.database import get_async_session, get_read_session, json_contains
 from app.models.prompts import (
     PromptTemplate, 
     CulturalAdaptation, 
@@ -220,6 +220,9 @@ class ABTestExperimentResponse(BaseModel):
 async def get_templates(
     template_type: Optional[str] = Query(None, description="Filter by template type"),
     language: Optional[str] = Query(None, description="Filter by language"),
+    supports_language: Optional[str] = Query(None, description="Filter by supported language"),
+    cultural_region: Optional[str] = Query(None, description="Filter by supported cultural region"),
+    product_category: Optional[str] = Query(None, description="Filter by suitable product category"),
     active_only: bool = Query(True, description="Only return active templates"),
     limit: int = Query(50, ge=1, le=100, description="Number of results to return"),
     offset: int = Query(0, ge=0, description="Number of results to skip"),
@@ -234,6 +237,14 @@ async def get_templates(
             
         if language:
             query = query.where(PromptTemplate.primary_language == language)
+        
+        # JSONB containment, served by the GIN indexes
+        if supports_language:
+            query = query.where(json_contains(PromptTemplate.supported_languages, [supports_language]))
+        if cultural_region:
+            query = query.where(json_contains(PromptTemplate.cultural_regions, [cultural_region]))
+        if product_category:
+            query = query.where(json_contains(PromptTemplate.product_categories, [product_category]))
             
         if active_only:
             query = query.where(PromptTemplate.is_active == True)
@@ -841,7 +852,7 @@ async def get_performance_metrics(
         start_date = datetime.utcnow() - timedelta(days=days)
         
         query = select(TemplatePerformanceMetric).where(
-            TemplatePerformanceMetric.created_at >= start_date
+            TemplatePerformanceMetric.metric_date >= start_date
         )
         
         if template_id:
@@ -936,7 +947,7 @@ async def create_performance_metric(
 async def get_template_performance_analytics(
     template_id: Optional[int] = Query(None, description="Specific template ID"),
     days: int = Query(30, ge=1, le=365, description="Number of days to analyze"),
-    db: AsyncSession = Depends(get_async_session)
+    db: AsyncSession = Depends(get_read_session)
 ):
     """Get comprehensive template performance analytics."""
     try:
@@ -944,7 +955,7 @@ async def get_template_performance_analytics(
         
         # Base query for performance metrics
         query = select(TemplatePerformanceMetric).where(
-            TemplatePerformanceMetric.created_at >= start_date
+            TemplatePerformanceMetric.metric_date >= start_date
         )
         
         if template_id:
@@ -1025,7 +1036,7 @@ async def get_template_performance_analytics(
 
 @router.get("/analytics/optimization-opportunities")
 async def get_optimization_opportunities(
-    db: AsyncSession = Depends(get_async_session)
+    db: AsyncSession = Depends(get_read_session)
 ):
     """Get AI-powered optimization opportunities."""
     try:
@@ -5,26 +5,39 @@ Advanced asynchronous task processing with intelligent scheduling,
 monitoring, error handling, and distributed coordination.
 
 Features:
-- Distributed task queue with Redis backend
+- Distributed task queue with Redis sorted-set or Streams backends
+- In-memory queue backend for tests and single-node deployments
+- Compact msgpack task records with large results stored out of line
 - Task prioritization and scheduling
+- Leased dequeue with heartbeats and crash recovery
 - Retry mechanisms with exponential backoff
 - Task monitoring and progress tracking
 - Dead letter queue for failed tasks
 - Performance analytics and reporting
 - Auto-scaling based on queue length
 - Task dependency management
+- Idempotent submission via dedup keys
+- Per-queue request and token rate limits shared by all workers
 """
 
 import asyncio
+import hashlib
+import heapq
+import itertools
 import json
+import math
+import os
+import socket
 import uuid
 import time
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Callable, Union, TypeVar
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Callable, Tuple, Union, TypeVar
 from dataclasses import dataclass, field, asdict
+from collections import deque
 from enum import Enum
 from contextlib import asynccontextmanager
 
+import msgpack
 import structlog
 import redis.asyncio as redis
 try:
@@ -58,6 +71,7 @@ class TaskStatus(Enum):
     FAILED = "failed"
     CANCELLED = "cancelled"
     RETRY = "retry"
+    WAITING = "waiting"  # Blocked on unfinished dependencies
 
 
 class TaskPriority(Enum):
@@ -82,6 +96,50 @@ class TaskConfig:
     depends_on: List[str] = field(default_factory=list)  # Task dependencies
     tags: List[str] = field(default_factory=list)
     metadata: Dict[str, Any] = field(default_factory=dict)
+    dedup_key: Optional[str] = None  # Collapse submissions sharing this key into one task
+    dedup_window: Optional[float] = None  # Seconds a completed result is reused (default: settings)
+    estimated_tokens: Optional[int] = None  # Charged against a rate-limited queue's token budget
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for serialization."""
+        data = asdict(self)
+        data['priority'] = self.priority.value
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'TaskConfig':
+        """Create task config from dictionary."""
+        data = dict(data)
+        data['priority'] = TaskPriority(data.get('priority', TaskPriority.NORMAL.value))
+        return cls(**data)
+
+
+# Marker key for arguments that are resolved to a parent task's result
+_RESULT_REF_KEY = "__task_result__"
+
+
+def task_result_ref(task_id: str) -> Dict[str, str]:
+    """
+    Reference to another task's result, for use in task args or kwargs.
+    
+    The worker replaces it with the referenced task's result right before
+    execution, so large parent payloads are not copied into child tasks.
+    The referenced task should be listed in ``config.depends_on``.
+    """
+    return {_RESULT_REF_KEY: task_id}
+
+
+def dedup_key_for(function: str, *args, **kwargs) -> str:
+    """Build a deterministic dedup key from a task function and its arguments."""
+    payload = json.dumps([function, args, kwargs], sort_keys=True, default=str)
+    return f"{function}:{hashlib.sha256(payload.encode()).hexdigest()[:32]}"
+
+
+def _to_timestamp(value: datetime) -> float:
+    """Convert a naive UTC datetime to a Unix timestamp."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
 
 
 @dataclass
@@ -97,10 +155,26 @@ class TaskResult:
     duration_ms: Optional[float] = None
     retries_attempted: int = 0
     worker_id: Optional[str] = None
+    result_key: Optional[str] = None  # Redis key of a large result stored out of line
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization."""
-        return asdict(self)
+        data = asdict(self)
+        data['status'] = self.status.value
+        for field_name in ['started_at', 'completed_at']:
+            if data[field_name]:
+                data[field_name] = data[field_name].isoformat()
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'TaskResult':
+        """Create task result from dictionary."""
+        data = dict(data)
+        data['status'] = TaskStatus(data['status'])
+        for field_name in ['started_at', 'completed_at']:
+            if data.get(field_name):
+                data[field_name] = datetime.fromisoformat(data[field_name])
+        return cls(**data)
 
 
 @dataclass
@@ -117,14 +191,22 @@ class Task:
     scheduled_at: Optional[datetime] = None
     status: TaskStatus = TaskStatus.PENDING
     result: Optional[TaskResult] = None
+    lease_expirations: int = 0  # Times a worker lost this task mid-execution
+    lease_token: Optional[str] = None  # Set by TaskQueue.dequeue, never persisted
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization."""
         data = asdict(self)
+        data.pop('lease_token', None)
         # Convert datetime objects to ISO strings
         for field_name in ['created_at', 'scheduled_at']:
             if data[field_name]:
                 data[field_name] = data[field_name].isoformat()
+        # Convert enums to their values
+        data['status'] = self.status.value
+        data['config'] = self.config.to_dict()
+        if self.result:
+            data['result'] = self.result.to_dict()
         return data
     
     @classmethod
@@ -134,16 +216,115 @@ class Task:
         for field_name in ['created_at', 'scheduled_at']:
             if data.get(field_name):
                 data[field_name] = datetime.fromisoformat(data[field_name])
+        if 'status' in data:
+            data['status'] = TaskStatus(data['status'])
         
         # Reconstruct nested objects
         if 'config' in data:
-            data['config'] = TaskConfig(**data['config'])
+            data['config'] = TaskConfig.from_dict(data['config'])
         if 'result' in data and data['result']:
-            data['result'] = TaskResult(**data['result'])
+            data['result'] = TaskResult.from_dict(data['result'])
         
         return cls(**data)
 
 
+# Version tag leading every binary task record
+_TASK_ENVELOPE_VERSION = 1
+
+_TASK_CONFIG_DEFAULTS = TaskConfig().to_dict()
+
+
+def _pack_timestamp(value: Optional[datetime]) -> Optional[float]:
+    return _to_timestamp(value) if value else None
+
+
+def _unpack_timestamp(value: Optional[float]) -> Optional[datetime]:
+    if value is None:
+        return None
+    return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None)
+
+
+def _pack_task(task: Task) -> bytes:
+    """
+    Encode a task record as a compact msgpack envelope.
+    
+    Fields are stored positionally, the config keeps only values that differ
+    from the defaults, and a result value stored out of line (``result_key``)
+    is left out.
+    """
+    config = {
+        name: value for name, value in task.config.to_dict().items()
+        if value != _TASK_CONFIG_DEFAULTS[name]
+    }
+    result = None
+    if task.result:
+        result = [
+            task.result.status.value,
+            None if task.result.result_key else task.result.result,
+            task.result.error,
+            _pack_timestamp(task.result.started_at),
+            _pack_timestamp(task.result.completed_at),
+            task.result.duration_ms,
+            task.result.retries_attempted,
+            task.result.worker_id,
+            task.result.result_key,
+        ]
+    return msgpack.packb([
+        _TASK_ENVELOPE_VERSION,
+        task.id,
+        task.name,
+        task.function,
+        task.args,
+        task.kwargs,
+        config,
+        _pack_timestamp(task.created_at),
+        _pack_timestamp(task.scheduled_at),
+        task.status.value,
+        result,
+        task.lease_expirations,
+    ], use_bin_type=True, default=str)
+
+
+def _unpack_task(data: bytes) -> Task:
+    """Decode a task record written by :func:`_pack_task` (or the older JSON format)."""
+    if data[:1] == b'{':
+        return Task.from_dict(json.loads(data))
+    
+    (_, task_id, name, function, args, kwargs, config, created_at, scheduled_at,
+     status, result, lease_expirations) = msgpack.unpackb(data, raw=False)
+    
+    task_result = None
+    if result:
+        (result_status, value, error, started_at, completed_at, duration_ms,
+         retries_attempted, worker_id, result_key) = result
+        task_result = TaskResult(
+            task_id=task_id,
+            status=TaskStatus(result_status),
+            result=value,
+            error=error,
+            started_at=_unpack_timestamp(started_at),
+            completed_at=_unpack_timestamp(completed_at),
+            duration_ms=duration_ms,
+            retries_attempted=retries_attempted,
+            worker_id=worker_id,
+            result_key=result_key
+        )
+    
+    return Task(
+        id=task_id,
+        name=name,
+        function=function,
+        args=args,
+        kwargs=kwargs,
+        config=TaskConfig.from_dict(config),
+        created_at=_unpack_timestamp(created_at),
+        scheduled_at=_unpack_timestamp(scheduled_at),
+        status=TaskStatus(status),
+        result=task_result,
+        lease_expirations=lease_expirations
+    )
+
+
 class TaskRegistry:
     """Registry for task functions."""
     
@@ -168,155 +349,1593 @@ class TaskRegistry:
         return list(self._functions.keys())
 
 
+# Lua scripts for leased dequeue. Each runs atomically inside Redis, so a task
+# is always either in the priority queue or in the in-flight set, never neither.
+_LEASE_DEQUEUE_SCRIPT = """
+local popped = redis.call('ZPOPMAX', KEYS[1])
+if #popped == 0 then
+    return nil
+end
+local task_id = popped[1]
+redis.call('ZREM', KEYS[5], task_id)
+redis.call('ZADD', KEYS[2], ARGV[1], task_id)
+redis.call('HSET', KEYS[3], task_id, ARGV[2] .. ':' .. popped[2])
+return {task_id, redis.call('HGET', KEYS[4], task_id)}
+"""
+
+_LEASE_EXTEND_SCRIPT = """
+local lease = redis.call('HGET', KEYS[2], ARGV[1])
+if not lease or string.sub(lease, 1, #ARGV[2] + 1) ~= ARGV[2] .. ':' then
+    return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[3], ARGV[1])
+return 1
+"""
+
+_LEASE_ACK_SCRIPT = """
+local lease = redis.call('HGET', KEYS[2], ARGV[1])
+if not lease or string.sub(lease, 1, #ARGV[2] + 1) ~= ARGV[2] .. ':' then
+    return 0
+end
+redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('HDEL', KEYS[2], ARGV[1])
+return 1
+"""
+
+_COMPARE_DELETE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# How long a dedup key is held for a task that has not finished yet
+_DEDUP_PENDING_TTL = 24 * 3600
+
+_PROMOTE_DUE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, task_id in ipairs(due) do
+    local score = redis.call('HGET', KEYS[2], task_id) or 0
+    redis.call('ZADD', KEYS[4], redis.call('ZSCORE', KEYS[1], task_id), task_id)
+    redis.call('ZREM', KEYS[1], task_id)
+    redis.call('HDEL', KEYS[2], task_id)
+    redis.call('ZADD', KEYS[3], score, task_id)
+end
+return #due
+"""
+
+# Register a task behind its parents: -1 if a parent failed, 0 if all parents
+# already completed (the task is queued), otherwise the number still pending
+_DEPENDENCY_REGISTER_SCRIPT = """
+local task_id = ARGV[1]
+local pending = 0
+for i = 5, #ARGV do
+    local parent_id = ARGV[i]
+    if redis.call('ZSCORE', KEYS[2], parent_id) then
+        return -1
+    end
+    if not redis.call('ZSCORE', KEYS[1], parent_id) then
+        redis.call('SADD', ARGV[3] .. parent_id, task_id)
+        pending = pending + 1
+    end
+end
+if pending == 0 then
+    redis.call('ZADD', KEYS[5], ARGV[2], task_id)
+    redis.call('ZADD', KEYS[6], ARGV[4], task_id)
+else
+    redis.call('HSET', KEYS[3], task_id, pending)
+    redis.call('HSET', KEYS[4], task_id, ARGV[2])
+end
+return pending
+"""
+
+# Mark a task completed and queue the children whose last dependency it was
+_DEPENDENCY_RESOLVE_SCRIPT = """
+redis.call('ZADD', KEYS[1], ARGV[2], ARGV[1])
+local ready = {}
+for _, child_id in ipairs(redis.call('SMEMBERS', ARGV[3])) do
+    if redis.call('HEXISTS', KEYS[2], child_id) == 1 then
+        if redis.call('HINCRBY', KEYS[2], child_id, -1) <= 0 then
+            local score = redis.call('HGET', KEYS[3], child_id) or 0
+            redis.call('HDEL', KEYS[2], child_id)
+            redis.call('HDEL', KEYS[3], child_id)
+            redis.call('ZADD', KEYS[4], score, child_id)
+            redis.call('ZADD', KEYS[5], ARGV[2], child_id)
+            table.insert(ready, child_id)
+        end
+    end
+end
+redis.call('DEL', ARGV[3])
+return ready
+"""
+
+# Mark a task failed and detach the children still waiting on it
+_DEPENDENCY_FAIL_SCRIPT = """
+redis.call('ZADD', KEYS[1], ARGV[2], ARGV[1])
+local orphaned = {}
+for _, child_id in ipairs(redis.call('SMEMBERS', ARGV[3])) do
+    if redis.call('HDEL', KEYS[2], child_id) == 1 then
+        redis.call('HDEL', KEYS[3], child_id)
+        table.insert(orphaned, child_id)
+    end
+end
+redis.call('DEL', ARGV[3])
+return orphaned
+"""
+
+_LEASE_REAP_SCRIPT = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, task_id in ipairs(expired) do
+    local lease = redis.call('HGET', KEYS[2], task_id)
+    local score = 0
+    if lease then
+        score = tonumber(string.match(lease, ':([^:]+)$')) or 0
+    end
+    redis.call('ZREM', KEYS[1], task_id)
+    redis.call('HDEL', KEYS[2], task_id)
+    redis.call('ZADD', KEYS[3], score, task_id)
+    redis.call('ZADD', KEYS[4], ARGV[1], task_id)
+end
+return expired
+"""
+
+
+# Refill and charge a request bucket and a token bucket that share one hash.
+# Returns "0" when the cost was charged, otherwise the seconds to wait for it.
+# A capacity of 0 disables that bucket; ARGV[6] == "1" charges unconditionally
+# (refunds and corrections), which may leave a bucket in debt.
+_TOKEN_BUCKET_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'requests', 'tokens', 'ts')
+local elapsed = math.max(now - (tonumber(state[3]) or now), 0)
+local levels = {}
+local wait = 0
+for i = 1, 2 do
+    local capacity = tonumber(ARGV[i])
+    local cost = tonumber(ARGV[i + 2])
+    local level = tonumber(state[i]) or capacity
+    if capacity > 0 then
+        local rate = capacity / 60
+        level = math.min(capacity, level + elapsed * rate)
+        local needed = math.min(cost, capacity)
+        if ARGV[5] ~= '1' and level < needed then
+            wait = math.max(wait, (needed - level) / rate)
+        end
+    end
+    levels[i] = level
+end
+if wait == 0 then
+    for i = 1, 2 do
+        local capacity = tonumber(ARGV[i])
+        if capacity > 0 then
+            levels[i] = math.min(capacity, levels[i] - tonumber(ARGV[i + 2]))
+        end
+    end
+end
+redis.call('HSET', KEYS[1], 'requests', levels[1], 'tokens', levels[2], 'ts', now)
+redis.call('EXPIRE', KEYS[1], 120)
+return tostring(wait)
+"""
+
+
+@dataclass
+class RateLimit:
+    """Per-minute budget of a queue, shared by every worker consuming it."""
+    
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+    default_task_tokens: int = 1000  # Reserved per task unless config.estimated_tokens is set
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'RateLimit':
+        """Create rate limit from dictionary."""
+        return cls(**data)
+
+
+class TokenBucketLimiter:
+    """
+    Request and token buckets kept in Redis.
+    
+    Both buckets refill continuously at their per-minute rate up to one
+    minute of budget, and are charged together by a single script so that
+    workers on every host draw from the same budget.
+    """
+    
+    def __init__(self, client: redis.Redis, name: str, limit: RateLimit):
+        self.client = client
+        self.limit = limit
+        self.key = f"ratelimit:{name}"
+        self._script = client.register_script(_TOKEN_BUCKET_SCRIPT)
+    
+    async def _charge(self, requests: int, tokens: int, force: bool) -> float:
+        wait = await self._script(
+            keys=[self.key],
+            args=[self.limit.requests_per_minute or 0, self.limit.tokens_per_minute or 0,
+                  requests, tokens, '1' if force else '0']
+        )
+        return float(wait)
+    
+    async def acquire(self, requests: int = 1, tokens: int = 0) -> float:
+        """Charge the cost if the budget allows it. Returns 0, or the seconds to wait."""
+        return await self._charge(requests, tokens, force=False)
+    
+    async def adjust(self, requests: int = 0, tokens: int = 0) -> None:
+        """Charge (or, with negative values, refund) the buckets unconditionally."""
+        await self._charge(requests, tokens, force=True)
+
+
+class LocalTokenBucket:
+    """In-process equivalent of :class:`TokenBucketLimiter` for in-memory queues."""
+    
+    def __init__(self, limit: RateLimit):
+        self.limit = limit
+        self._levels = [float(limit.requests_per_minute or 0), float(limit.tokens_per_minute or 0)]
+        self._updated_at = time.monotonic()
+    
+    def _charge(self, costs: Tuple[int, int], force: bool) -> float:
+        now = time.monotonic()
+        elapsed, self._updated_at = now - self._updated_at, now
+        capacities = (self.limit.requests_per_minute or 0, self.limit.tokens_per_minute or 0)
+        
+        wait = 0.0
+        for i, (capacity, cost) in enumerate(zip(capacities, costs)):
+            if capacity > 0:
+                rate = capacity / 60
+                self._levels[i] = min(capacity, self._levels[i] + elapsed * rate)
+                needed = min(cost, capacity)
+                if not force and self._levels[i] < needed:
+                    wait = max(wait, (needed - self._levels[i]) / rate)
+        
+        if wait == 0:
+            for i, (capacity, cost) in enumerate(zip(capacities, costs)):
+                if capacity > 0:
+                    self._levels[i] = min(capacity, self._levels[i] - cost)
+        return wait
+    
+    async def acquire(self, requests: int = 1, tokens: int = 0) -> float:
+        """Charge the cost if the budget allows it. Returns 0, or the seconds to wait."""
+        return self._charge((requests, tokens), force=False)
+    
+    async def adjust(self, requests: int = 0, tokens: int = 0) -> None:
+        """Charge (or, with negative values, refund) the buckets unconditionally."""
+        self._charge((requests, tokens), force=True)
+
+
 class TaskQueue:
-    """Redis-based distributed task queue."""
+    """
+    Redis-based distributed task queue.
     
-    def __init__(self, redis_url: str = None, queue_name: str = "default"):
+    Tasks are dequeued under a lease: the task ID moves from the priority
+    queue to an in-flight set scored by its lease deadline. Workers extend
+    the lease with heartbeats and acknowledge it when done; leases that
+    expire (e.g. the worker was killed) are re-queued by the reaper.
+    
+    Tasks with a future ``scheduled_at`` wait in a delayed set scored by due
+    time until :meth:`promote_due_tasks` moves them into the priority queue.
+    
+    Tasks with ``config.depends_on`` wait until every parent (in the same
+    queue) has completed, and fail if any parent fails.
+    """
+    
+    backend = "zset"
+    
+    def __init__(self, redis_url: str = None, queue_name: str = "default",
+                 lease_seconds: Optional[float] = None):
         self.redis_url = redis_url or settings.REDIS_URL
         self.queue_name = queue_name
+        self.lease_seconds = lease_seconds or settings.TASK_LEASE_SECONDS
+        self.poll_interval = 0.25
         self.client: Optional[redis.Redis] = None
+        self.binary_client: Optional[redis.Redis] = None  # Task records and results
+        self.rate_limit: Optional[RateLimit] = None  # Set before connect() to limit dequeues
+        self.rate_limiter: Optional[Union[TokenBucketLimiter, LocalTokenBucket]] = None
+        self._scripts: Dict[str, Any] = {}
+        self.recent_durations: deque = deque(maxlen=200)  # ms, for autoscaling
         self.stats = {
             'tasks_enqueued': 0,
             'tasks_dequeued': 0,
             'tasks_completed': 0,
             'tasks_failed': 0,
+            'leases_expired': 0,
+            'rate_limited': 0,
             'queue_length': 0
         }
     
+    @property
+    def priority_key(self) -> str:
+        return f"queue:{self.queue_name}:priority"
+    
+    @property
+    def inflight_key(self) -> str:
+        return f"queue:{self.queue_name}:inflight"
+    
+    @property
+    def leases_key(self) -> str:
+        return f"queue:{self.queue_name}:leases"
+    
+    @property
+    def queued_since_key(self) -> str:
+        return f"queue:{self.queue_name}:queued_since"
+    
+    @property
+    def delayed_key(self) -> str:
+        return f"queue:{self.queue_name}:delayed"
+    
+    @property
+    def delayed_priority_key(self) -> str:
+        return f"queue:{self.queue_name}:delayed_priority"
+    
+    @property
+    def tasks_key(self) -> str:
+        return f"tasks:{self.queue_name}"
+    
+    @property
+    def waiting_key(self) -> str:
+        return f"queue:{self.queue_name}:waiting"
+    
+    @property
+    def waiting_priority_key(self) -> str:
+        return f"queue:{self.queue_name}:waiting_priority"
+    
+    @property
+    def completed_key(self) -> str:
+        return f"queue:{self.queue_name}:completed"
+    
+    @property
+    def failed_key(self) -> str:
+        return f"queue:{self.queue_name}:failed"
+    
+    @property
+    def children_key_prefix(self) -> str:
+        return f"queue:{self.queue_name}:children:"
+    
+    @property
+    def is_connected(self) -> bool:
+        return self.client is not None
+    
+    def dedup_key(self, key: str) -> str:
+        return f"dedup:{self.queue_name}:{key}"
+    
+    def result_key(self, task_id: str) -> str:
+        return f"task_result:{self.queue_name}:{task_id}"
+    
+    async def connect(self) -> None:
+        """Connect to Redis."""
+        try:
+            self.client = redis.from_url(self.redis_url, decode_responses=True)
+            self.binary_client = redis.from_url(self.redis_url, decode_responses=False)
+            await self.client.ping()
+            self._scripts = {
+                'dequeue': self.binary_client.register_script(_LEASE_DEQUEUE_SCRIPT),
+                'extend': self.client.register_script(_LEASE_EXTEND_SCRIPT),
+                'ack': self.client.register_script(_LEASE_ACK_SCRIPT),
+                'reap': self.client.register_script(_LEASE_REAP_SCRIPT),
+                'promote': self.client.register_script(_PROMOTE_DUE_SCRIPT),
+                'compare_delete': self.client.register_script(_COMPARE_DELETE_SCRIPT),
+                'register_deps': self.client.register_script(_DEPENDENCY_REGISTER_SCRIPT),
+                'resolve_deps': self.client.register_script(_DEPENDENCY_RESOLVE_SCRIPT),
+                'fail_deps': self.client.register_script(_DEPENDENCY_FAIL_SCRIPT),
+            }
+            if self.rate_limit:
+                self.rate_limiter = TokenBucketLimiter(self.client, self.queue_name, self.rate_limit)
+            logger.info("Task queue connected to Redis", queue=self.queue_name)
+        except Exception as e:
+            logger.error("Failed to connect task queue to Redis", error=str(e))
+            raise
+    
+    async def disconnect(self) -> None:
+        """Disconnect from Redis."""
+        if self.client:
+            await self.client.close()
+            self.client = None
+        if self.binary_client:
+            await self.binary_client.close()
+            self.binary_client = None
+    
+    async def enqueue(self, task: Task) -> None:
+        """Add task to queue."""
+        if not self.client:
+            raise RuntimeError("Task queue not connected")
+        
+        if task.config.depends_on and task.status in (TaskStatus.PENDING, TaskStatus.WAITING):
+            await self._enqueue_with_dependencies(task)
+            return
+        
+        # Use priority for queue ordering
+        priority_score = task.config.priority.value
+        due_at = _to_timestamp(task.scheduled_at) if task.scheduled_at else None
+        delayed = due_at is not None and due_at > time.time()
+        
+        # Store the task and add its ID to the priority queue (Redis sorted set),
+        # or to the delayed set scored by due time if it is not due yet
+        async with self.binary_client.pipeline(transaction=True) as pipe:
+            self._store_task(pipe, task)
+            if delayed:
+                pipe.zadd(self.delayed_key, {task.id: due_at})
+                pipe.hset(self.delayed_priority_key, task.id, priority_score)
+            else:
+                self._push_ready(pipe, task.id, priority_score)
+            await pipe.execute()
+        
+        # Update stats
+        self.stats['tasks_enqueued'] += 1
+        
+        logger.info("Task enqueued",
+                   task_id=task.id,
+                   queue=self.queue_name,
+                   priority=task.config.priority.name,
+                   delayed=delayed)
+    
+    def _push_ready(self, pipe: Any, task_id: str, priority_score: int) -> None:
+        """Queue commands that make a task available to workers."""
+        pipe.zadd(self.priority_key, {task_id: priority_score})
+        pipe.zadd(self.queued_since_key, {task_id: time.time()}, nx=True)
+    
+    def _store_task(self, pipe: Any, task: Task) -> None:
+        """
+        Queue commands that write a task record on a binary-client pipeline.
+        
+        A result value larger than ``settings.TASK_RESULT_INLINE_BYTES`` is
+        written once to its own key with ``settings.TASK_RESULT_TTL`` and only
+        referenced from the record, so later status writes stay small.
+        """
+        result = task.result
+        if result and result.result is not None and not result.result_key:
+            value = msgpack.packb(result.result, use_bin_type=True, default=str)
+            if len(value) > settings.TASK_RESULT_INLINE_BYTES:
+                result.result_key = self.result_key(task.id)
+                pipe.set(result.result_key, value, ex=settings.TASK_RESULT_TTL)
+        pipe.hset(self.tasks_key, task.id, _pack_task(task))
+    
+    async def _save_task(self, task: Task) -> None:
+        """Write a task record (and its large result, if new)."""
+        async with self.binary_client.pipeline(transaction=True) as pipe:
+            self._store_task(pipe, task)
+            await pipe.execute()
+    
+    async def _enqueue_with_dependencies(self, task: Task) -> None:
+        """Park a task until its parents complete, or queue it if they already have."""
+        task.status = TaskStatus.WAITING
+        await self._save_task(task)
+        
+        pending = await self._register_dependencies(task)
+        self.stats['tasks_enqueued'] += 1
+        
+        if pending < 0:
+            await self._fail_for_dependency(task, "A dependency failed before this task was submitted")
+        elif pending == 0:
+            task.status = TaskStatus.PENDING
+            await self.update_task_status(task)
+        
+        logger.info("Task enqueued with dependencies",
+                   task_id=task.id,
+                   queue=self.queue_name,
+                   depends_on=task.config.depends_on,
+                   pending_dependencies=max(pending, 0))
+    
+    async def _register_dependencies(self, task: Task) -> int:
+        """
+        Register a task behind its parents.
+        
+        Returns -1 if a parent already failed, 0 if every parent already
+        completed (the task is queued), otherwise the number still pending.
+        """
+        return await self._scripts['register_deps'](
+            keys=[self.completed_key, self.failed_key, self.waiting_key,
+                  self.waiting_priority_key, self.priority_key, self.queued_since_key],
+            args=[task.id, task.config.priority.value, self.children_key_prefix, time.time(),
+                  *task.config.depends_on]
+        )
+    
+    async def _record_completion(self, task_id: str) -> List[str]:
+        """Mark a task completed and queue the children whose last dependency it was."""
+        return await self._scripts['resolve_deps'](
+            keys=[self.completed_key, self.waiting_key, self.waiting_priority_key, self.priority_key,
+                  self.queued_since_key],
+            args=[task_id, time.time(), self.children_key_prefix + task_id]
+        )
+    
+    async def _record_failure(self, task_id: str) -> List[str]:
+        """Mark a task failed and detach the children still waiting on it."""
+        return await self._scripts['fail_deps'](
+            keys=[self.failed_key, self.waiting_key, self.waiting_priority_key],
+            args=[task_id, time.time(), self.children_key_prefix + task_id]
+        )
+    
+    async def resolve_dependents(self, task: Task) -> List[str]:
+        """Record a completed task and queue dependents that are now unblocked."""
+        if not self.is_connected:
+            return []
+        
+        ready_ids = await self._record_completion(task.id)
+        
+        for child_id in ready_ids:
+            child = await self.get_task_status(child_id)
+            if child and child.status == TaskStatus.WAITING:
+                child.status = TaskStatus.PENDING
+                await self.update_task_status(child)
+        
+        if ready_ids:
+            logger.info("Dependent tasks released", task_id=task.id, queue=self.queue_name, count=len(ready_ids))
+        return ready_ids
+    
+    async def fail_dependents(self, task: Task) -> List[str]:
+        """Record a failed task and fail everything downstream of it."""
+        if not self.is_connected:
+            return []
+        
+        failed_ids = []
+        parents = [task.id]
+        while parents:
+            parent_id = parents.pop()
+            orphaned = await self._record_failure(parent_id)
+            for child_id in orphaned:
+                child = await self.get_task_status(child_id)
+                if child:
+                    await self._fail_for_dependency(child, f"Dependency {parent_id} failed", cascade=False)
+                failed_ids.append(child_id)
+                parents.append(child_id)
+        
+        if failed_ids:
+            logger.warning("Dependent tasks failed", task_id=task.id, queue=self.queue_name, count=len(failed_ids))
+        return failed_ids
+    
+    async def _fail_for_dependency(self, task: Task, error: str, cascade: bool = True) -> None:
+        """Mark a task that can never run because of a failed dependency."""
+        task.status = TaskStatus.FAILED
+        task.result = TaskResult(
+            task_id=task.id,
+            status=TaskStatus.FAILED,
+            error=error,
+            completed_at=datetime.utcnow()
+        )
+        await self.update_task_status(task)
+        await self.release_dedup_key(task)
+        if cascade:
+            await self.fail_dependents(task)
+    
+    async def finalize(self, task: Task) -> None:
+        """Persist a terminal task state and propagate it to dedup keys and dependents."""
+        await self.update_task_status(task)
+        await self.release_dedup_key(task)
+        if task.status == TaskStatus.COMPLETED:
+            await self.resolve_dependents(task)
+        elif task.status in (TaskStatus.FAILED, TaskStatus.CANCELLED):
+            await self.fail_dependents(task)
+    
+    async def enqueue_unique(self, task: Task) -> str:
+        """
+        Enqueue a task unless another task holds the same ``config.dedup_key``.
+        
+        Returns the ID of the task that will produce the result: the existing
+        one if it is pending, running or completed within its dedup window,
+        otherwise ``task.id`` after enqueueing it.
+        """
+        if not self.client:
+            raise RuntimeError("Task queue not connected")
+        if not task.config.dedup_key:
+            await self.enqueue(task)
+            return task.id
+        
+        redis_key = self.dedup_key(task.config.dedup_key)
+        for _ in range(3):
+            existing_id = await self.client.get(redis_key)
+            if existing_id:
+                existing = await self.get_task_status(existing_id)
+                if existing and existing.status not in (TaskStatus.FAILED, TaskStatus.CANCELLED):
+                    logger.info("Duplicate task submission deduplicated",
+                               task_id=existing_id,
+                               dedup_key=task.config.dedup_key,
+                               status=existing.status.value,
+                               queue=self.queue_name)
+                    return existing_id
+                # Stale claim from a failed, cancelled or purged task
+                await self._scripts['compare_delete'](keys=[redis_key], args=[existing_id])
+            
+            # Store the record before claiming the key, so a claim never points
+            # at a task that other submitters cannot see yet
+            await self._save_task(task)
+            if await self.client.set(redis_key, task.id, nx=True, ex=_DEDUP_PENDING_TTL):
+                await self.enqueue(task)
+                return task.id
+            await self.client.hdel(self.tasks_key, task.id)
+        
+        raise RuntimeError(f"Could not claim dedup key '{task.config.dedup_key}'")
+    
+    async def release_dedup_key(self, task: Task) -> None:
+        """Keep a completed task's dedup key for its reuse window, or drop it."""
+        if not self.client or not task.config.dedup_key:
+            return
+        
+        redis_key = self.dedup_key(task.config.dedup_key)
+        window = task.config.dedup_window
+        if window is None:
+            window = settings.TASK_DEDUP_WINDOW
+        
+        if task.status == TaskStatus.COMPLETED and window > 0:
+            if await self.client.get(redis_key) == task.id:
+                await self.client.expire(redis_key, int(window))
+        elif task.status in (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED):
+            await self._scripts['compare_delete'](keys=[redis_key], args=[task.id])
+    
+    async def promote_due_tasks(self, limit: int = 100) -> int:
+        """Move up to ``limit`` delayed tasks that are now due into the priority queue."""
+        if not self.client:
+            return 0
+        
+        promoted = await self._scripts['promote'](
+            keys=[self.delayed_key, self.delayed_priority_key, self.priority_key, self.queued_since_key],
+            args=[time.time(), limit]
+        )
+        if promoted:
+            logger.debug("Delayed tasks promoted", count=promoted, queue=self.queue_name)
+        return promoted
+    
+    async def cancel_delayed(self, task_id: str) -> bool:
+        """Remove a task from the delayed set before it becomes due."""
+        if not self.client:
+            return False
+        
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.zrem(self.delayed_key, task_id)
+            pipe.hdel(self.delayed_priority_key, task_id)
+            removed, _ = await pipe.execute()
+        
+        if removed:
+            task = await self.get_task_status(task_id)
+            if task:
+                task.status = TaskStatus.CANCELLED
+                await self.finalize(task)
+        return bool(removed)
+    
+    async def dequeue(self, timeout: float = 1.0) -> Optional[Task]:
+        """
+        Lease the next task from the queue.
+        
+        Polls for up to ``timeout`` seconds. The returned task carries a
+        ``lease_token`` that must be passed back through :meth:`ack`.
+        """
+        if not self.client:
+            raise RuntimeError("Task queue not connected")
+        
+        deadline = time.monotonic() + timeout
+        while True:
+            lease_token = uuid.uuid4().hex
+            result = await self._scripts['dequeue'](
+                keys=[self.priority_key, self.inflight_key, self.leases_key, self.tasks_key,
+                      self.queued_since_key],
+                args=[time.time() + self.lease_seconds, lease_token]
+            )
+            if result:
+                break
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            await asyncio.sleep(min(self.poll_interval, remaining))
+        
+        task_id, task_data = result[0].decode(), result[1] if len(result) > 1 else None
+        if not task_data:
+            # Task record was removed while queued; drop the orphaned lease
+            await self._scripts['ack'](keys=[self.inflight_key, self.leases_key], args=[task_id, lease_token])
+            logger.warning("Dequeued task has no stored record", task_id=task_id, queue=self.queue_name)
+            return None
+        
+        task = _unpack_task(task_data)
+        task.lease_token = lease_token
+        
+        # Update stats
+        self.stats['tasks_dequeued'] += 1
+        
+        logger.info("Task dequeued", task_id=task.id, queue=self.queue_name)
+        return task
+    
+    def _reserved_tokens(self, task: Optional[Task] = None) -> int:
+        if task and task.config.estimated_tokens is not None:
+            return task.config.estimated_tokens
+        return self.rate_limit.default_task_tokens
+    
+    async def dequeue_within_budget(self, timeout: float = 1.0) -> Optional[Task]:
+        """
+        Dequeue only while the queue's rate limit has budget left.
+        
+        Reserves one request and ``rate_limit.default_task_tokens`` up front,
+        refunds the reservation if nothing was dequeued and corrects it to the
+        task's ``config.estimated_tokens``. Returns None after waiting (at most
+        ``timeout`` seconds) when the budget is exhausted. Queues without a
+        rate limit dequeue directly.
+        """
+        if not self.rate_limiter:
+            return await self.dequeue(timeout)
+        
+        reserved = self._reserved_tokens()
+        wait = await self.rate_limiter.acquire(requests=1, tokens=reserved)
+        if wait > 0:
+            self.stats['rate_limited'] += 1
+            await asyncio.sleep(min(wait, timeout))
+            return None
+        
+        task = await self.dequeue(timeout)
+        if not task:
+            await self.rate_limiter.adjust(requests=-1, tokens=-reserved)
+        elif self._reserved_tokens(task) != reserved:
+            await self.rate_limiter.adjust(tokens=self._reserved_tokens(task) - reserved)
+        return task
+    
+    async def settle_budget(self, task: Task, result: Any) -> None:
+        """Correct a task's token reservation with the ``tokens_used`` it reports."""
+        if not self.rate_limiter or not isinstance(result, dict):
+            return
+        tokens_used = result.get('tokens_used')
+        if isinstance(tokens_used, (int, float)):
+            await self.rate_limiter.adjust(tokens=int(tokens_used) - self._reserved_tokens(task))
+    
+    async def extend_lease(self, task: Task) -> bool:
+        """Push the lease deadline forward. Returns False if the lease was lost."""
+        if not self.client or not task.lease_token:
+            return False
+        
+        extended = await self._scripts['extend'](
+            keys=[self.inflight_key, self.leases_key],
+            args=[task.id, task.lease_token, time.time() + self.lease_seconds]
+        )
+        return bool(extended)
+    
+    async def ack(self, task: Task) -> bool:
+        """Release the lease held on a task once the worker is done with it."""
+        if not self.client or not task.lease_token:
+            return False
+        
+        released = await self._scripts['ack'](
+            keys=[self.inflight_key, self.leases_key],
+            args=[task.id, task.lease_token]
+        )
+        task.lease_token = None
+        return bool(released)
+    
+    async def requeue_expired_leases(self, limit: int = 100) -> int:
+        """
+        Re-queue tasks whose lease deadline has passed.
+        
+        Tasks that have already lost their lease more than
+        ``config.max_retries`` times are marked as failed instead.
+        """
+        if not self.client:
+            return 0
+        
+        expired_ids = await self._scripts['reap'](
+            keys=[self.inflight_key, self.leases_key, self.priority_key, self.queued_since_key],
+            args=[time.time(), limit]
+        )
+        
+        for task_id in expired_ids:
+            task = await self.get_task_status(task_id)
+            if not task:
+                await self.client.zrem(self.priority_key, task_id)
+                await self.client.zrem(self.queued_since_key, task_id)
+                continue
+            
+            task.lease_expirations += 1
+            if task.lease_expirations > task.config.max_retries:
+                # Poison task: pull it back out unless a worker already took it
+                if not await self.client.zrem(self.priority_key, task_id):
+                    continue
+                await self.client.zrem(self.queued_since_key, task_id)
+                await self._fail_expired_task(task)
+            else:
+                task.status = TaskStatus.PENDING
+                await self.update_task_status(task)
+            
+            logger.warning("Task lease expired",
+                         task_id=task_id,
+                         queue=self.queue_name,
+                         lease_expirations=task.lease_expirations,
+                         requeued=task.status == TaskStatus.PENDING)
+        
+        self.stats['leases_expired'] += len(expired_ids)
+        return len(expired_ids)
+    
+    async def _fail_expired_task(self, task: Task) -> None:
+        """Fail a task that has lost its lease more often than it may be retried."""
+        task.status = TaskStatus.FAILED
+        task.result = TaskResult(
+            task_id=task.id,
+            status=TaskStatus.FAILED,
+            error=f"Lease expired {task.lease_expirations} times",
+            started_at=task.result.started_at if task.result else None,
+            completed_at=datetime.utcnow(),
+            retries_attempted=task.result.retries_attempted if task.result else 0,
+            worker_id=task.result.worker_id if task.result else None
+        )
+        await self.finalize(task)
+    
+    def record_duration(self, duration_ms: float) -> None:
+        """Record how long a task from this queue took to execute."""
+        self.recent_durations.append(duration_ms)
+    
+    async def get_load_metrics(self) -> Dict[str, Any]:
+        """Cheap backlog metrics: queue length, oldest queued task age and average duration."""
+        if not self.client:
+            return {'queue_length': 0, 'oldest_task_age': 0.0, 'avg_duration_ms': 0.0}
+        
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.zcard(self.priority_key)
+            pipe.zrange(self.queued_since_key, 0, 0, withscores=True)
+            queue_length, oldest = await pipe.execute()
+        
+        durations = list(self.recent_durations)
+        return {
+            'queue_length': queue_length,
+            'oldest_task_age': max(time.time() - oldest[0][1], 0.0) if oldest else 0.0,
+            'avg_duration_ms': sum(durations) / len(durations) if durations else 0.0
+        }
+    
+    async def get_task_result(self, task_id: str) -> Any:
+        """Get the result value of a completed task, loading it if stored out of line."""
+        task = await self.get_task_status(task_id)
+        if not task or task.status != TaskStatus.COMPLETED or not task.result:
+            raise ValueError(f"Task {task_id} has no completed result")
+        return await self.load_result(task.result)
+    
+    async def load_result(self, result: TaskResult) -> Any:
+        """Fill in a result value stored under ``result.result_key`` and return it."""
+        if result.result_key and result.result is None:
+            value = await self.binary_client.get(result.result_key)
+            if value is None:
+                raise ValueError(f"Result of task {result.task_id} has expired")
+            result.result = msgpack.unpackb(value, raw=False)
+        return result.result
+    
+    async def get_task_status(self, task_id: str) -> Optional[Task]:
+        """Get task status by ID. Large result values are not loaded, see :meth:`load_result`."""
+        if not self.client:
+            return None
+        
+        task_data = await self.binary_client.hget(self.tasks_key, task_id)
+        if task_data:
+            return _unpack_task(task_data)
+        return None
+    
+    async def update_task_status(self, task: Task) -> None:
+        """Update task status in storage."""
+        if not self.is_connected:
+            return
+        
+        await self._save_task(task)
+        
+        # Update completion stats
+        if task.status == TaskStatus.COMPLETED:
+            self.stats['tasks_completed'] += 1
+        elif task.status == TaskStatus.FAILED:
+            self.stats['tasks_failed'] += 1
+    
+    async def get_queue_stats(self) -> Dict[str, Any]:
+        """Get queue statistics."""
+        if not self.client:
+            return self.stats
+        
+        # Update queue length
+        self.stats['queue_length'] = await self.client.zcard(self.priority_key)
+        in_flight = await self.client.zcard(self.inflight_key)
+        delayed = await self.client.zcard(self.delayed_key)
+        waiting = await self.client.hlen(self.waiting_key)
+        
+        # Get task counts by status
+        all_tasks = await self.binary_client.hgetall(self.tasks_key)
+        status_counts = {}
+        for task_data in all_tasks.values():
+            task = _unpack_task(task_data)
+            status_counts[task.status.value] = status_counts.get(task.status.value, 0) + 1
+        
+        return {
+            **self.stats,
+            'backend': self.backend,
+            'in_flight': in_flight,
+            'delayed': delayed,
+            'waiting': waiting,
+            'status_counts': status_counts
+        }
+    
+    async def clear_completed_tasks(self, older_than_hours: int = 24) -> int:
+        """Clear completed tasks older than specified hours."""
+        if not self.client:
+            return 0
+        
+        cutoff_time = datetime.utcnow() - timedelta(hours=older_than_hours)
+        cleared = 0
+        
+        all_tasks = await self.binary_client.hgetall(self.tasks_key)
+        for task_id, task_data in all_tasks.items():
+            task = _unpack_task(task_data)
+            if (task.status in [TaskStatus.COMPLETED, TaskStatus.FAILED] and 
+                task.created_at < cutoff_time):
+                await self.binary_client.hdel(self.tasks_key, task_id)
+                if task.result and task.result.result_key:
+                    await self.binary_client.delete(task.result.result_key)
+                cleared += 1
+        
+        # Trim the dependency outcome records kept for late-registering children
+        cutoff_score = _to_timestamp(cutoff_time)
+        await self.client.zremrangebyscore(self.completed_key, '-inf', cutoff_score)
+        await self.client.zremrangebyscore(self.failed_key, '-inf', cutoff_score)
+        
+        logger.info("Cleared completed tasks", count=cleared, queue=self.queue_name)
+        return cleared
+
+
+# Read the highest-priority stream that has a new entry, plus its task payload
+_STREAM_READ_SCRIPT = """
+for i = 1, #KEYS - 1 do
+    local reply = redis.call('XREADGROUP', 'GROUP', ARGV[1], ARGV[2], 'COUNT', 1, 'STREAMS', KEYS[i], '>')
+    if reply then
+        local entry = reply[1][2][1]
+        local task_id = entry[2][2]
+        return {KEYS[i], entry[1], task_id, redis.call('HGET', KEYS[#KEYS], task_id)}
+    end
+end
+return nil
+"""
+
+_STREAM_EXTEND_SCRIPT = """
+local pending = redis.call('XPENDING', KEYS[1], ARGV[1], ARGV[3], ARGV[3], 1)
+if #pending == 0 or pending[1][2] ~= ARGV[2] then
+    return 0
+end
+redis.call('XCLAIM', KEYS[1], ARGV[1], ARGV[2], 0, ARGV[3], 'JUSTID')
+return 1
+"""
+
+# Acknowledge an entry; optionally re-add its task as a fresh entry. Whoever
+# acknowledges first (worker or reaper) wins, so a task is never re-added twice
+_STREAM_ACK_SCRIPT = """
+local acked = redis.call('XACK', KEYS[1], ARGV[1], ARGV[2])
+if acked == 1 then
+    redis.call('XDEL', KEYS[1], ARGV[2])
+    if ARGV[3] ~= '' then
+        redis.call('XADD', KEYS[1], '*', 'task_id', ARGV[3])
+    end
+end
+return acked
+"""
+
+# Move task IDs released into the priority set (delayed promotion, resolved
+# dependencies) onto the stream for their priority
+_STREAM_DRAIN_SCRIPT = """
+local moved = 0
+for i = 1, tonumber(ARGV[2]) do
+    local popped = redis.call('ZPOPMAX', KEYS[1])
+    if #popped == 0 then
+        break
+    end
+    redis.call('ZREM', KEYS[2], popped[1])
+    redis.call('XADD', ARGV[1] .. math.floor(tonumber(popped[2])), '*', 'task_id', popped[1])
+    moved = moved + 1
+end
+return moved
+"""
+
+
+class StreamTaskQueue(TaskQueue):
+    """
+    Redis Streams task queue with consumer groups.
+    
+    Same interface as :class:`TaskQueue`, but ready tasks are appended to one
+    stream per priority level and read with XREADGROUP, so every delivery is
+    tracked per consumer in the group's pending entries list. Leases map onto
+    pending-entry idle time: heartbeats reset it with XCLAIM, workers XACK
+    when done, and the reaper uses XAUTOCLAIM to recover entries whose
+    consumer stopped heartbeating. Delayed tasks and dependencies still go
+    through the sorted sets of the base class and are moved onto the streams
+    when they become ready.
+    """
+    
+    backend = "stream"
+    
+    def __init__(self, redis_url: str = None, queue_name: str = "default",
+                 lease_seconds: Optional[float] = None):
+        super().__init__(redis_url, queue_name, lease_seconds)
+        self.group_name = "workers"
+        self.consumer_name = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._prefetched: deque = deque()
+    
+    def stream_key(self, priority_score: int) -> str:
+        return f"stream:{self.queue_name}:{priority_score}"
+    
+    @property
+    def stream_keys(self) -> List[str]:
+        """Stream keys from highest to lowest priority."""
+        return [self.stream_key(priority.value) for priority in sorted(TaskPriority, key=lambda p: -p.value)]
+    
+    async def connect(self) -> None:
+        """Connect to Redis and make sure every priority stream has the consumer group."""
+        await super().connect()
+        for key in self.stream_keys:
+            try:
+                await self.client.xgroup_create(key, self.group_name, id="0", mkstream=True)
+            except redis.ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+        
+        self._scripts.update({
+            'stream_read': self.binary_client.register_script(_STREAM_READ_SCRIPT),
+            'stream_extend': self.client.register_script(_STREAM_EXTEND_SCRIPT),
+            'stream_ack': self.client.register_script(_STREAM_ACK_SCRIPT),
+            'stream_drain': self.client.register_script(_STREAM_DRAIN_SCRIPT),
+        })
+    
+    def _push_ready(self, pipe: Any, task_id: str, priority_score: int) -> None:
+        """Queue commands that make a task available to workers."""
+        pipe.xadd(self.stream_key(priority_score), {'task_id': task_id})
+    
+    async def _drain_ready_set(self, limit: int = 100) -> int:
+        """Move tasks released into the base priority set onto the streams."""
+        return await self._scripts['stream_drain'](
+            keys=[self.priority_key, self.queued_since_key],
+            args=[f"stream:{self.queue_name}:", limit]
+        )
+    
+    async def _enqueue_with_dependencies(self, task: Task) -> None:
+        await super()._enqueue_with_dependencies(task)
+        await self._drain_ready_set()
+    
+    async def resolve_dependents(self, task: Task) -> List[str]:
+        ready_ids = await super().resolve_dependents(task)
+        if ready_ids:
+            await self._drain_ready_set()
+        return ready_ids
+    
+    async def promote_due_tasks(self, limit: int = 100) -> int:
+        promoted = await super().promote_due_tasks(limit)
+        if promoted:
+            await self._drain_ready_set(limit)
+        return promoted
+    
+    async def dequeue(self, timeout: float = 1.0) -> Optional[Task]:
+        """
+        Lease the next task from the streams.
+        
+        Checks the streams in priority order without blocking, then blocks on
+        all of them for up to ``timeout`` seconds. Entries delivered together
+        by the blocking read are kept in a local buffer for the next call.
+        """
+        if not self.client:
+            raise RuntimeError("Task queue not connected")
+        
+        while self._prefetched:
+            stream, message_id, task_id = self._prefetched.popleft()
+            # Restart the idle clock, unless the reaper already handed the entry elsewhere
+            owned = await self._scripts['stream_extend'](
+                keys=[stream],
+                args=[self.group_name, self.consumer_name, message_id]
+            )
+            if owned:
+                return await self._leased_task(stream, message_id, task_id, await self.binary_client.hget(self.tasks_key, task_id))
+        
+        result = await self._scripts['stream_read'](
+            keys=[*self.stream_keys, self.tasks_key],
+            args=[self.group_name, self.consumer_name]
+        )
+        if result:
+            stream, message_id, task_id = (value.decode() for value in result[:3])
+            return await self._leased_task(stream, message_id, task_id, result[3] if len(result) > 3 else None)
+        
+        reply = await self.client.xreadgroup(
+            self.group_name,
+            self.consumer_name,
+            {key: '>' for key in self.stream_keys},
+            count=1,
+            block=max(int(timeout * 1000), 1)
+        )
+        if not reply:
+            return None
+        
+        entries = sorted(
+            ((stream, message_id, fields['task_id']) for stream, messages in reply for message_id, fields in messages),
+            key=lambda entry: self.stream_keys.index(entry[0])
+        )
+        self._prefetched.extend(entries[1:])
+        stream, message_id, task_id = entries[0]
+        return await self._leased_task(stream, message_id, task_id, await self.binary_client.hget(self.tasks_key, task_id))
+    
+    async def _leased_task(self, stream: str, message_id: str, task_id: str,
+                           task_data: Optional[str]) -> Optional[Task]:
+        """Build the dequeued task, attaching a lease token for its stream entry."""
+        if not task_data:
+            # Task record was removed while queued; drop the orphaned entry
+            await self._scripts['stream_ack'](keys=[stream], args=[self.group_name, message_id, ''])
+            logger.warning("Dequeued task has no stored record", task_id=task_id, queue=self.queue_name)
+            return None
+        
+        task = _unpack_task(task_data)
+        task.lease_token = f"{stream}|{message_id}"
+        self.stats['tasks_dequeued'] += 1
+        
+        logger.info("Task dequeued", task_id=task.id, queue=self.queue_name)
+        return task
+    
+    async def extend_lease(self, task: Task) -> bool:
+        """Reset the idle time of the task's pending entry. Returns False if it was reclaimed."""
+        if not self.client or not task.lease_token:
+            return False
+        
+        stream, message_id = task.lease_token.split("|", 1)
+        extended = await self._scripts['stream_extend'](
+            keys=[stream],
+            args=[self.group_name, self.consumer_name, message_id]
+        )
+        return bool(extended)
+    
+    async def ack(self, task: Task) -> bool:
+        """Acknowledge and delete the task's stream entry."""
+        if not self.client or not task.lease_token:
+            return False
+        
+        stream, message_id = task.lease_token.split("|", 1)
+        acked = await self._scripts['stream_ack'](keys=[stream], args=[self.group_name, message_id, ''])
+        task.lease_token = None
+        return bool(acked)
+    
+    async def requeue_expired_leases(self, limit: int = 100) -> int:
+        """
+        Re-deliver entries idle for longer than the lease.
+        
+        Claimed entries are acknowledged and their task is appended again as
+        a new entry, or failed if it has exceeded ``config.max_retries``.
+        """
+        if not self.client:
+            return 0
+        
+        recovered = 0
+        for stream in self.stream_keys:
+            reply = await self.client.xautoclaim(
+                stream,
+                self.group_name,
+                self.consumer_name,
+                min_idle_time=int(self.lease_seconds * 1000),
+                start_id="0-0",
+                count=limit
+            )
+            for message_id, fields in reply[1]:
+                if not fields:
+                    continue
+                task = await self.get_task_status(fields['task_id'])
+                if task:
+                    task.lease_expirations += 1
+                poison = not task or task.lease_expirations > task.config.max_retries
+                
+                acked = await self._scripts['stream_ack'](
+                    keys=[stream],
+                    args=[self.group_name, message_id, '' if poison else fields['task_id']]
+                )
+                if not acked or not task:
+                    continue
+                recovered += 1
+                
+                if poison:
+                    await self._fail_expired_task(task)
+                else:
+                    task.status = TaskStatus.PENDING
+                    await self.update_task_status(task)
+                
+                logger.warning("Task lease expired",
+                             task_id=task.id,
+                             queue=self.queue_name,
+                             lease_expirations=task.lease_expirations,
+                             requeued=not poison)
+        
+        self.stats['leases_expired'] += recovered
+        return recovered
+    
+    async def _stream_backlog(self) -> Dict[str, Any]:
+        """Undelivered and pending entry counts plus the oldest undelivered entry time."""
+        queue_length = 0
+        in_flight = 0
+        oldest_ms: Optional[int] = None
+        
+        for stream in self.stream_keys:
+            groups = await self.client.xinfo_groups(stream)
+            group = next((g for g in groups if g['name'] == self.group_name), None)
+            if not group:
+                continue
+            # Acknowledged entries are deleted, so the stream holds only
+            # undelivered and pending entries
+            pending = group['pending']
+            undelivered = await self.client.xlen(stream) - pending
+            queue_length += undelivered
+            in_flight += pending
+            
+            if undelivered > 0:
+                oldest = await self.client.xrange(stream, min=f"({group['last-delivered-id']}", count=1)
+                if oldest:
+                    entry_ms = int(oldest[0][0].split("-")[0])
+                    oldest_ms = entry_ms if oldest_ms is None else min(oldest_ms, entry_ms)
+        
+        return {
+            'queue_length': queue_length,
+            'in_flight': in_flight,
+            'oldest_task_age': max(time.time() - oldest_ms / 1000, 0.0) if oldest_ms else 0.0
+        }
+    
+    async def get_load_metrics(self) -> Dict[str, Any]:
+        """Cheap backlog metrics: queue length, oldest queued task age and average duration."""
+        if not self.client:
+            return await super().get_load_metrics()
+        
+        backlog = await self._stream_backlog()
+        durations = list(self.recent_durations)
+        return {
+            'queue_length': backlog['queue_length'],
+            'oldest_task_age': backlog['oldest_task_age'],
+            'avg_duration_ms': sum(durations) / len(durations) if durations else 0.0
+        }
+    
+    async def get_queue_stats(self) -> Dict[str, Any]:
+        """Get queue statistics."""
+        stats = await super().get_queue_stats()
+        if self.client:
+            backlog = await self._stream_backlog()
+            stats['queue_length'] = backlog['queue_length']
+            stats['in_flight'] = backlog['in_flight']
+        return stats
+
+
+class MemoryTaskQueue(TaskQueue):
+    """
+    In-process task queue for tests and single-node deployments.
+    
+    Keeps the :class:`TaskQueue` semantics (priority ordering, delayed tasks,
+    leases with expiry, dedup keys and dependencies) in heaps and dicts owned
+    by the event loop, so no Redis server is needed. Records are stored
+    encoded like in Redis, so callers never share task objects. Everything
+    is lost when the process exits.
+    """
+    
+    backend = "memory"
+    
+    def __init__(self, redis_url: str = None, queue_name: str = "default",
+                 lease_seconds: Optional[float] = None):
+        super().__init__(redis_url, queue_name, lease_seconds)
+        self._connected = False
+        self._records: Dict[str, bytes] = {}
+        self._ready: List[Tuple[int, int, str]] = []  # (-priority, seq, task_id)
+        self._ready_entries: Dict[str, int] = {}  # task_id -> seq of its live heap entry
+        self._queued_since: Dict[str, float] = {}
+        self._delayed: List[Tuple[float, int, str]] = []  # (due_at, seq, task_id)
+        self._delayed_entries: Dict[str, Tuple[int, int]] = {}  # task_id -> (seq, priority)
+        self._leases: Dict[str, Tuple[str, float, int]] = {}  # task_id -> (token, deadline, priority)
+        self._waiting: Dict[str, Tuple[int, int]] = {}  # task_id -> (pending parents, priority)
+        self._children: Dict[str, set] = {}
+        self._completed: Dict[str, float] = {}
+        self._failed: Dict[str, float] = {}
+        self._dedup: Dict[str, Tuple[str, float]] = {}  # dedup key -> (task_id, expires_at)
+        self._seq = itertools.count()
+        self._ready_event: Optional[asyncio.Event] = None
+    
+    @property
+    def is_connected(self) -> bool:
+        return self._connected
+    
     async def connect(self) -> None:
-        """Connect to Redis."""
-        try:
-            self.client = redis.from_url(self.redis_url, decode_responses=True)
-            await self.client.ping()
-            logger.info("Task queue connected to Redis", queue=self.queue_name)
-        except Exception as e:
-            logger.error("Failed to connect task queue to Redis", error=str(e))
-            raise
+        """Prepare the queue; there is nothing to connect to."""
+        self._ready_event = asyncio.Event()
+        self._connected = True
+        if self.rate_limit:
+            self.rate_limiter = LocalTokenBucket(self.rate_limit)
+        logger.info("Task queue running in memory", queue=self.queue_name)
     
     async def disconnect(self) -> None:
-        """Disconnect from Redis."""
-        if self.client:
-            await self.client.close()
-            self.client = None
+        self._connected = False
+    
+    def _make_ready(self, task_id: str, priority_score: int, queued_at: Optional[float] = None) -> None:
+        seq = next(self._seq)
+        heapq.heappush(self._ready, (-priority_score, seq, task_id))
+        self._ready_entries[task_id] = seq
+        self._queued_since.setdefault(task_id, queued_at or time.time())
+        self._ready_event.set()
+    
+    def _pop_ready(self) -> Optional[Tuple[str, int]]:
+        """Pop the highest-priority ready task, skipping entries that were removed."""
+        while self._ready:
+            negated_priority, seq, task_id = heapq.heappop(self._ready)
+            if self._ready_entries.get(task_id) == seq:
+                del self._ready_entries[task_id]
+                self._queued_since.pop(task_id, None)
+                return task_id, -negated_priority
+        return None
     
     async def enqueue(self, task: Task) -> None:
         """Add task to queue."""
-        if not self.client:
+        if not self._connected:
             raise RuntimeError("Task queue not connected")
         
-        # Serialize task
-        task_data = json.dumps(task.to_dict())
+        if task.config.depends_on and task.status in (TaskStatus.PENDING, TaskStatus.WAITING):
+            await self._enqueue_with_dependencies(task)
+            return
         
-        # Use priority for queue ordering
         priority_score = task.config.priority.value
+        due_at = _to_timestamp(task.scheduled_at) if task.scheduled_at else None
+        delayed = due_at is not None and due_at > time.time()
         
-        # Add to priority queue (Redis sorted set)
-        await self.client.zadd(
-            f"queue:{self.queue_name}:priority",
-            {task_data: priority_score}
-        )
-        
-        # Add to task tracking
-        await self.client.hset(
-            f"tasks:{self.queue_name}",
-            task.id,
-            task_data
-        )
+        await self._save_task(task)
+        if delayed:
+            seq = next(self._seq)
+            heapq.heappush(self._delayed, (due_at, seq, task.id))
+            self._delayed_entries[task.id] = (seq, priority_score)
+        else:
+            self._make_ready(task.id, priority_score)
         
-        # Update stats
         self.stats['tasks_enqueued'] += 1
-        self.stats['queue_length'] = await self.client.zcard(f"queue:{self.queue_name}:priority")
         
-        logger.info("Task enqueued", task_id=task.id, queue=self.queue_name, priority=task.config.priority.name)
+        logger.info("Task enqueued",
+                   task_id=task.id,
+                   queue=self.queue_name,
+                   priority=task.config.priority.name,
+                   delayed=delayed)
+    
+    async def _save_task(self, task: Task) -> None:
+        self._records[task.id] = _pack_task(task)
+    
+    async def _register_dependencies(self, task: Task) -> int:
+        parents = task.config.depends_on
+        if any(parent_id in self._failed for parent_id in parents):
+            return -1
+        
+        pending = 0
+        for parent_id in parents:
+            if parent_id not in self._completed:
+                self._children.setdefault(parent_id, set()).add(task.id)
+                pending += 1
+        
+        if pending == 0:
+            self._make_ready(task.id, task.config.priority.value)
+        else:
+            self._waiting[task.id] = (pending, task.config.priority.value)
+        return pending
+    
+    async def _record_completion(self, task_id: str) -> List[str]:
+        self._completed[task_id] = time.time()
+        ready_ids = []
+        for child_id in self._children.pop(task_id, ()):
+            if child_id not in self._waiting:
+                continue
+            pending, priority_score = self._waiting[child_id]
+            if pending <= 1:
+                del self._waiting[child_id]
+                self._make_ready(child_id, priority_score)
+                ready_ids.append(child_id)
+            else:
+                self._waiting[child_id] = (pending - 1, priority_score)
+        return ready_ids
+    
+    async def _record_failure(self, task_id: str) -> List[str]:
+        self._failed[task_id] = time.time()
+        orphaned = []
+        for child_id in self._children.pop(task_id, ()):
+            if self._waiting.pop(child_id, None):
+                orphaned.append(child_id)
+        return orphaned
+    
+    async def enqueue_unique(self, task: Task) -> str:
+        """Enqueue a task unless another task holds the same ``config.dedup_key``."""
+        if not self._connected:
+            raise RuntimeError("Task queue not connected")
+        if not task.config.dedup_key:
+            await self.enqueue(task)
+            return task.id
+        
+        claim = self._dedup.get(task.config.dedup_key)
+        if claim and claim[1] > time.time():
+            existing = await self.get_task_status(claim[0])
+            if existing and existing.status not in (TaskStatus.FAILED, TaskStatus.CANCELLED):
+                logger.info("Duplicate task submission deduplicated",
+                           task_id=claim[0],
+                           dedup_key=task.config.dedup_key,
+                           status=existing.status.value,
+                           queue=self.queue_name)
+                return claim[0]
+        
+        self._dedup[task.config.dedup_key] = (task.id, time.time() + _DEDUP_PENDING_TTL)
+        await self.enqueue(task)
+        return task.id
+    
+    async def release_dedup_key(self, task: Task) -> None:
+        """Keep a completed task's dedup key for its reuse window, or drop it."""
+        claim = self._dedup.get(task.config.dedup_key) if task.config.dedup_key else None
+        if not claim or claim[0] != task.id:
+            return
+        
+        window = task.config.dedup_window
+        if window is None:
+            window = settings.TASK_DEDUP_WINDOW
+        
+        if task.status == TaskStatus.COMPLETED and window > 0:
+            self._dedup[task.config.dedup_key] = (task.id, time.time() + window)
+        elif task.status in (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED):
+            del self._dedup[task.config.dedup_key]
+    
+    async def promote_due_tasks(self, limit: int = 100) -> int:
+        """Move up to ``limit`` delayed tasks that are now due into the ready heap."""
+        if not self._connected:
+            return 0
+        
+        now = time.time()
+        promoted = 0
+        while self._delayed and self._delayed[0][0] <= now and promoted < limit:
+            due_at, seq, task_id = heapq.heappop(self._delayed)
+            entry = self._delayed_entries.get(task_id)
+            if not entry or entry[0] != seq:
+                continue
+            del self._delayed_entries[task_id]
+            self._make_ready(task_id, entry[1], queued_at=due_at)
+            promoted += 1
+        
+        if promoted:
+            logger.debug("Delayed tasks promoted", count=promoted, queue=self.queue_name)
+        return promoted
+    
+    async def cancel_delayed(self, task_id: str) -> bool:
+        """Remove a task from the delayed heap before it becomes due."""
+        if not self._delayed_entries.pop(task_id, None):
+            return False
+        
+        task = await self.get_task_status(task_id)
+        if task:
+            task.status = TaskStatus.CANCELLED
+            await self.finalize(task)
+        return True
     
     async def dequeue(self, timeout: float = 1.0) -> Optional[Task]:
-        """Get next task from queue."""
-        if not self.client:
+        """
+        Lease the next task from the queue.
+        
+        Waits for up to ``timeout`` seconds, waking as soon as a task is
+        enqueued or a delayed task becomes due.
+        """
+        if not self._connected:
             raise RuntimeError("Task queue not connected")
         
-        # Get highest priority task
-        result = await self.client.bzpopmax(
-            f"queue:{self.queue_name}:priority",
-            timeout=timeout
-        )
+        deadline = time.monotonic() + timeout
+        while True:
+            await self.promote_due_tasks()
+            popped = self._pop_ready()
+            if popped:
+                break
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            if self._delayed:
+                remaining = min(remaining, max(self._delayed[0][0] - time.time(), 0.0))
+            
+            self._ready_event.clear()
+            try:
+                await asyncio.wait_for(self._ready_event.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                pass
         
-        if not result:
+        task_id, priority_score = popped
+        task_data = self._records.get(task_id)
+        if not task_data:
+            logger.warning("Dequeued task has no stored record", task_id=task_id, queue=self.queue_name)
             return None
         
-        _, task_data, _ = result
-        task = Task.from_dict(json.loads(task_data))
-        
-        # Update stats
+        task = _unpack_task(task_data)
+        task.lease_token = uuid.uuid4().hex
+        self._leases[task_id] = (task.lease_token, time.time() + self.lease_seconds, priority_score)
         self.stats['tasks_dequeued'] += 1
-        self.stats['queue_length'] = await self.client.zcard(f"queue:{self.queue_name}:priority")
         
         logger.info("Task dequeued", task_id=task.id, queue=self.queue_name)
         return task
     
-    async def get_task_status(self, task_id: str) -> Optional[Task]:
-        """Get task status by ID."""
-        if not self.client:
-            return None
-        
-        task_data = await self.client.hget(f"tasks:{self.queue_name}", task_id)
-        if task_data:
-            return Task.from_dict(json.loads(task_data))
-        return None
+    async def extend_lease(self, task: Task) -> bool:
+        """Push the lease deadline forward. Returns False if the lease was lost."""
+        lease = self._leases.get(task.id)
+        if not lease or lease[0] != task.lease_token:
+            return False
+        self._leases[task.id] = (lease[0], time.time() + self.lease_seconds, lease[2])
+        return True
     
-    async def update_task_status(self, task: Task) -> None:
-        """Update task status in storage."""
-        if not self.client:
-            return
+    async def ack(self, task: Task) -> bool:
+        """Release the lease held on a task once the worker is done with it."""
+        lease = self._leases.get(task.id)
+        owned = bool(lease) and lease[0] == task.lease_token
+        if owned:
+            del self._leases[task.id]
+        task.lease_token = None
+        return owned
+    
+    async def requeue_expired_leases(self, limit: int = 100) -> int:
+        """Re-queue tasks whose lease deadline has passed, failing repeat offenders."""
+        if not self._connected:
+            return 0
         
-        task_data = json.dumps(task.to_dict())
-        await self.client.hset(f"tasks:{self.queue_name}", task.id, task_data)
+        now = time.time()
+        expired_ids = [task_id for task_id, lease in self._leases.items() if lease[1] <= now][:limit]
+        for task_id in expired_ids:
+            _, _, priority_score = self._leases.pop(task_id)
+            task = await self.get_task_status(task_id)
+            if not task:
+                continue
+            
+            task.lease_expirations += 1
+            if task.lease_expirations > task.config.max_retries:
+                await self._fail_expired_task(task)
+            else:
+                self._make_ready(task_id, priority_score, queued_at=now)
+                task.status = TaskStatus.PENDING
+                await self.update_task_status(task)
+            
+            logger.warning("Task lease expired",
+                         task_id=task_id,
+                         queue=self.queue_name,
+                         lease_expirations=task.lease_expirations,
+                         requeued=task.status == TaskStatus.PENDING)
         
-        # Update completion stats
-        if task.status == TaskStatus.COMPLETED:
-            self.stats['tasks_completed'] += 1
-        elif task.status == TaskStatus.FAILED:
-            self.stats['tasks_failed'] += 1
+        self.stats['leases_expired'] += len(expired_ids)
+        return len(expired_ids)
+    
+    async def get_load_metrics(self) -> Dict[str, Any]:
+        """Cheap backlog metrics: queue length, oldest queued task age and average duration."""
+        oldest = min(self._queued_since.values()) if self._queued_since else None
+        durations = list(self.recent_durations)
+        return {
+            'queue_length': len(self._ready_entries),
+            'oldest_task_age': max(time.time() - oldest, 0.0) if oldest else 0.0,
+            'avg_duration_ms': sum(durations) / len(durations) if durations else 0.0
+        }
+    
+    async def get_task_status(self, task_id: str) -> Optional[Task]:
+        """Get task status by ID."""
+        task_data = self._records.get(task_id)
+        return _unpack_task(task_data) if task_data else None
     
     async def get_queue_stats(self) -> Dict[str, Any]:
         """Get queue statistics."""
-        if not self.client:
-            return self.stats
-        
-        # Update queue length
-        self.stats['queue_length'] = await self.client.zcard(f"queue:{self.queue_name}:priority")
-        
-        # Get task counts by status
-        all_tasks = await self.client.hgetall(f"tasks:{self.queue_name}")
         status_counts = {}
-        for task_data in all_tasks.values():
-            task = Task.from_dict(json.loads(task_data))
+        for task_data in self._records.values():
+            task = _unpack_task(task_data)
             status_counts[task.status.value] = status_counts.get(task.status.value, 0) + 1
         
+        self.stats['queue_length'] = len(self._ready_entries)
         return {
             **self.stats,
+            'backend': self.backend,
+            'in_flight': len(self._leases),
+            'delayed': len(self._delayed_entries),
+            'waiting': len(self._waiting),
             'status_counts': status_counts
         }
     
     async def clear_completed_tasks(self, older_than_hours: int = 24) -> int:
         """Clear completed tasks older than specified hours."""
-        if not self.client:
-            return 0
-        
         cutoff_time = datetime.utcnow() - timedelta(hours=older_than_hours)
         cleared = 0
         
-        all_tasks = await self.client.hgetall(f"tasks:{self.queue_name}")
-        for task_id, task_data in all_tasks.items():
-            task = Task.from_dict(json.loads(task_data))
+        for task_id, task_data in list(self._records.items()):
+            task = _unpack_task(task_data)
             if (task.status in [TaskStatus.COMPLETED, TaskStatus.FAILED] and 
                 task.created_at < cutoff_time):
-                await self.client.hdel(f"tasks:{self.queue_name}", task_id)
+                del self._records[task_id]
                 cleared += 1
         
+        cutoff_score = _to_timestamp(cutoff_time)
+        for outcomes in (self._completed, self._failed):
+            for task_id in [task_id for task_id, at in outcomes.items() if at < cutoff_score]:
+                del outcomes[task_id]
+        
         logger.info("Cleared completed tasks", count=cleared, queue=self.queue_name)
         return cleared
 
 
+# Queue implementations selectable per queue via settings.TASK_QUEUE_BACKENDS
+QUEUE_BACKENDS: Dict[str, type] = {
+    TaskQueue.backend: TaskQueue,
+    StreamTaskQueue.backend: StreamTaskQueue,
+    MemoryTaskQueue.backend: MemoryTaskQueue,
+}
+
+
 class TaskWorker:
     """Background task worker."""
     
@@ -357,8 +1976,8 @@ class TaskWorker:
         """Main worker loop."""
         while self.is_running:
             try:
-                # Get next task
-                task = await self.queue.dequeue(timeout=1.0)
+                # Get next task, within the queue's rate limit
+                task = await self.queue.dequeue_within_budget(timeout=1.0)
                 if not task:
                     await asyncio.sleep(0.1)
                     continue
@@ -370,15 +1989,39 @@ class TaskWorker:
                 self.stats['last_activity'] = datetime.utcnow()
                 
             except asyncio.CancelledError:
-                break
+                raise
             except Exception as e:
                 logger.error("Worker loop error", worker_id=self.worker_id, error=str(e))
                 await asyncio.sleep(1.0)
     
+    async def _heartbeat(self, task: Task) -> None:
+        """Keep the task lease alive while it executes."""
+        interval = max(self.queue.lease_seconds / 3, 0.1)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await self.queue.extend_lease(task):
+                    logger.warning("Task lease lost", task_id=task.id, worker_id=self.worker_id)
+                    return
+            except Exception as e:
+                logger.warning("Task heartbeat failed", task_id=task.id, worker_id=self.worker_id, error=str(e))
+    
+    async def _resolve_result_refs(self, value: Any) -> Any:
+        """Replace task_result_ref() placeholders with the referenced results."""
+        if isinstance(value, dict):
+            if len(value) == 1 and _RESULT_REF_KEY in value:
+                return await self.queue.get_task_result(value[_RESULT_REF_KEY])
+            return {key: await self._resolve_result_refs(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [await self._resolve_result_refs(item) for item in value]
+        return value
+    
     async def _execute_task(self, task: Task) -> None:
         """Execute a single task."""
         self.current_task = task
         start_time = time.time()
+        heartbeat = asyncio.create_task(self._heartbeat(task))
+        cancelled = False
         
         try:
             # Update task status
@@ -387,6 +2030,7 @@ class TaskWorker:
                 task_id=task.id,
                 status=TaskStatus.RUNNING,
                 started_at=datetime.utcnow(),
+                retries_attempted=task.result.retries_attempted if task.result else 0,
                 worker_id=self.worker_id
             )
             await self.queue.update_task_status(task)
@@ -396,14 +2040,18 @@ class TaskWorker:
             if not func:
                 raise ValueError(f"Task function not found: {task.function}")
             
+            # Resolve references to parent task results
+            args = await self._resolve_result_refs(task.args)
+            kwargs = await self._resolve_result_refs(task.kwargs)
+            
             # Execute with timeout
             if task.config.timeout:
                 result = await asyncio.wait_for(
-                    func(*task.args, **task.kwargs),
+                    func(*args, **kwargs),
                     timeout=task.config.timeout
                 )
             else:
-                result = await func(*task.args, **task.kwargs)
+                result = await func(*args, **kwargs)
             
             # Task completed successfully
             duration_ms = (time.time() - start_time) * 1000
@@ -420,7 +2068,13 @@ class TaskWorker:
             
             self.stats['tasks_completed'] += 1
             logger.info("Task completed", task_id=task.id, duration_ms=duration_ms)
+            await self.queue.settle_budget(task, result)
             
+        except asyncio.CancelledError:
+            # Worker shutting down mid-task: keep the lease so the reaper requeues it
+            cancelled = True
+            raise
+        
         except Exception as e:
             # Task failed
             duration_ms = (time.time() - start_time) * 1000
@@ -467,42 +2121,111 @@ class TaskWorker:
                 logger.error("Task failed permanently", task_id=task.id, error=error_msg)
         
         finally:
-            # Update task status
-            await self.queue.update_task_status(task)
+            heartbeat.cancel()
             self.current_task = None
-            self.stats['tasks_processed'] += 1
             
-            # Record performance metric
-            duration_ms = (time.time() - start_time) * 1000
-            metric = PerformanceMetric(
-                timestamp=datetime.utcnow(),
-                operation=f"task.{task.function}",
-                duration_ms=duration_ms,
-                success=task.status == TaskStatus.COMPLETED,
-                context={
-                    'task_id': task.id,
-                    'worker_id': self.worker_id,
-                    'priority': task.config.priority.name
-                }
-            )
-            performance_collector.record_metric(metric)
+            if cancelled:
+                logger.warning("Task interrupted, leaving lease to expire", 
+                             task_id=task.id, 
+                             worker_id=self.worker_id)
+            else:
+                # Update task status (retries were already persisted by enqueue)
+                if task.status != TaskStatus.RETRY:
+                    await self.queue.finalize(task)
+                await self.queue.ack(task)
+                self.stats['tasks_processed'] += 1
+                
+                # Record performance metric
+                duration_ms = (time.time() - start_time) * 1000
+                self.queue.record_duration(duration_ms)
+                metric = PerformanceMetric(
+                    timestamp=datetime.utcnow(),
+                    operation=f"task.{task.function}",
+                    duration_ms=duration_ms,
+                    success=task.status == TaskStatus.COMPLETED,
+                    context={
+                        'task_id': task.id,
+                        'worker_id': self.worker_id,
+                        'priority': task.config.priority.name
+                    }
+                )
+                performance_collector.record_metric(metric)
+
+
+_LEADER_ACQUIRE_SCRIPT = """
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then
+    return 1
+end
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+    return 1
+end
+return 0
+"""
+
+# Advance a periodic schedule only if nobody else fired this tick already
+_SCHEDULE_CLAIM_SCRIPT = """
+local current = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if not current or tonumber(current) ~= tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[3], ARGV[1])
+return 1
+"""
 
 
 class TaskScheduler:
-    """Task scheduler for periodic and delayed tasks."""
+    """
+    Task scheduler for periodic and delayed tasks.
     
-    def __init__(self, queue: TaskQueue, registry: TaskRegistry):
+    Delayed tasks live in each queue's Redis delayed set and periodic
+    schedules are persisted in Redis, so both survive restarts. Every
+    replica runs the loop, but only the holder of the leader lock promotes
+    due tasks and fires periodic schedules.
+    """
+    
+    def __init__(self, queue: TaskQueue, registry: TaskRegistry,
+                 queues: Optional[Dict[str, TaskQueue]] = None):
         self.queue = queue
         self.registry = registry
-        self.scheduled_tasks: Dict[str, Dict[str, Any]] = {}
+        self.queues = queues if queues is not None else {queue.queue_name: queue}
+        self.instance_id = uuid.uuid4().hex
+        self.lock_ttl = settings.TASK_SCHEDULER_LOCK_TTL
+        self.tick_interval = 1.0
         self.is_running = False
+        self.is_leader = False
+        self._scripts: Dict[str, Any] = {}
+    
+    @property
+    def schedules_key(self) -> str:
+        return f"scheduler:{self.queue.queue_name}:schedules"
+    
+    @property
+    def next_run_key(self) -> str:
+        return f"scheduler:{self.queue.queue_name}:next_run"
+    
+    @property
+    def leader_key(self) -> str:
+        return f"scheduler:{self.queue.queue_name}:leader"
+    
+    def _ensure_scripts(self) -> None:
+        """Register Lua scripts on the queue's Redis client."""
+        if not self.queue.client:
+            raise RuntimeError("Task queue not connected")
+        if not self._scripts:
+            self._scripts = {
+                'acquire': self.queue.client.register_script(_LEADER_ACQUIRE_SCRIPT),
+                'release': self.queue.client.register_script(_COMPARE_DELETE_SCRIPT),
+                'claim': self.queue.client.register_script(_SCHEDULE_CLAIM_SCRIPT),
+            }
     
     async def start(self) -> None:
         """Start the scheduler."""
         self.is_running = True
-        logger.info("Task scheduler started")
+        logger.info("Task scheduler started", instance_id=self.instance_id)
         
         try:
+            self._ensure_scripts()
             await self._schedule_loop()
         except Exception as e:
             logger.error("Scheduler error", error=str(e))
@@ -512,91 +2235,138 @@ class TaskScheduler:
     async def stop(self) -> None:
         """Stop the scheduler."""
         self.is_running = False
+        if self.is_leader and self.queue.client:
+            try:
+                await self._scripts['release'](keys=[self.leader_key], args=[self.instance_id])
+            except Exception as e:
+                logger.warning("Failed to release scheduler leadership", error=str(e))
+        self.is_leader = False
         logger.info("Task scheduler stopped")
     
-    def schedule_periodic(self, 
-                         cron_expression: str, 
-                         task_name: str,
-                         function: str,
-                         args: List[Any] = None,
-                         kwargs: Dict[str, Any] = None,
-                         config: TaskConfig = None) -> str:
-        """Schedule a periodic task using cron expression."""
-        schedule_id = str(uuid.uuid4())
+    async def schedule_periodic(self,
+                                cron_expression: str,
+                                task_name: str,
+                                function: str,
+                                args: List[Any] = None,
+                                kwargs: Dict[str, Any] = None,
+                                config: TaskConfig = None,
+                                schedule_id: str = None) -> str:
+        """
+        Schedule a periodic task using cron expression.
         
-        self.scheduled_tasks[schedule_id] = {
-            'type': 'periodic',
+        Pass a stable ``schedule_id`` when registering on startup so that
+        every replica updates the same persisted schedule.
+        """
+        self._ensure_scripts()
+        schedule_id = schedule_id or str(uuid.uuid4())
+        
+        schedule = {
             'cron': cron_expression,
             'task_name': task_name,
             'function': function,
             'args': args or [],
             'kwargs': kwargs or {},
-            'config': config or TaskConfig(),
-            'next_run': None
+            'config': (config or TaskConfig()).to_dict()
         }
         
         # Calculate next run time
         cron = croniter(cron_expression, datetime.utcnow())
-        self.scheduled_tasks[schedule_id]['next_run'] = cron.get_next(datetime)
+        next_run = cron.get_next(datetime)
+        
+        await self._store_schedule(schedule_id, schedule, _to_timestamp(next_run))
         
         logger.info("Periodic task scheduled", 
                    schedule_id=schedule_id,
                    cron=cron_expression,
                    task_name=task_name,
-                   next_run=self.scheduled_tasks[schedule_id]['next_run'])
+                   next_run=next_run)
         
         return schedule_id
     
-    def schedule_delayed(self,
-                        delay_seconds: float,
-                        task_name: str,
-                        function: str,
-                        args: List[Any] = None,
-                        kwargs: Dict[str, Any] = None,
-                        config: TaskConfig = None) -> str:
-        """Schedule a delayed task."""
-        schedule_id = str(uuid.uuid4())
+    async def _store_schedule(self, schedule_id: str, schedule: Dict[str, Any], next_run: float) -> None:
+        """Persist a schedule, keeping its next run if it is already registered."""
+        async with self.queue.client.pipeline(transaction=True) as pipe:
+            pipe.hset(self.schedules_key, schedule_id, json.dumps(schedule))
+            pipe.zadd(self.next_run_key, {schedule_id: next_run}, nx=True)
+            await pipe.execute()
+    
+    async def schedule_delayed(self,
+                               delay_seconds: float,
+                               task_name: str,
+                               function: str,
+                               args: List[Any] = None,
+                               kwargs: Dict[str, Any] = None,
+                               config: TaskConfig = None) -> str:
+        """Schedule a delayed task. Returns the task ID, usable with :meth:`unschedule`."""
         run_time = datetime.utcnow() + timedelta(seconds=delay_seconds)
         
-        self.scheduled_tasks[schedule_id] = {
-            'type': 'delayed',
-            'task_name': task_name,
-            'function': function,
-            'args': args or [],
-            'kwargs': kwargs or {},
-            'config': config or TaskConfig(),
-            'next_run': run_time
-        }
+        task = Task(
+            id=str(uuid.uuid4()),
+            name=task_name,
+            function=function,
+            args=args or [],
+            kwargs=kwargs or {},
+            config=config or TaskConfig(),
+            scheduled_at=run_time
+        )
+        task_id = await self.queue.enqueue_unique(task)
         
         logger.info("Delayed task scheduled",
-                   schedule_id=schedule_id,
+                   schedule_id=task_id,
                    task_name=task_name,
                    delay_seconds=delay_seconds,
                    run_time=run_time)
         
-        return schedule_id
+        return task_id
     
-    def unschedule(self, schedule_id: str) -> bool:
-        """Unschedule a task."""
-        if schedule_id in self.scheduled_tasks:
-            del self.scheduled_tasks[schedule_id]
+    async def unschedule(self, schedule_id: str) -> bool:
+        """Unschedule a periodic schedule or a delayed task that is not yet due."""
+        self._ensure_scripts()
+        
+        removed = await self._remove_schedule(schedule_id)
+        if not removed:
+            removed = await self.queue.cancel_delayed(schedule_id)
+        
+        if removed:
             logger.info("Task unscheduled", schedule_id=schedule_id)
-            return True
-        return False
+        return bool(removed)
+    
+    async def _remove_schedule(self, schedule_id: str) -> bool:
+        """Delete a persisted periodic schedule."""
+        async with self.queue.client.pipeline(transaction=True) as pipe:
+            pipe.hdel(self.schedules_key, schedule_id)
+            pipe.zrem(self.next_run_key, schedule_id)
+            removed, _ = await pipe.execute()
+        return bool(removed)
+    
+    async def count_schedules(self) -> int:
+        """Number of persisted periodic schedules."""
+        if not self.queue.client:
+            return 0
+        return await self.queue.client.hlen(self.schedules_key)
+    
+    async def _acquire_leadership(self) -> bool:
+        """Acquire or renew the leader lock for this tick."""
+        acquired = bool(await self._scripts['acquire'](
+            keys=[self.leader_key],
+            args=[self.instance_id, int(self.lock_ttl * 1000)]
+        ))
+        if acquired != self.is_leader:
+            logger.info("Scheduler leadership changed", instance_id=self.instance_id, is_leader=acquired)
+        self.is_leader = acquired
+        return acquired
     
     async def _schedule_loop(self) -> None:
         """Main scheduler loop."""
         while self.is_running:
             try:
-                now = datetime.utcnow()
-                
-                # Check for tasks that need to be executed
-                for schedule_id, schedule_info in list(self.scheduled_tasks.items()):
-                    if schedule_info['next_run'] <= now:
-                        await self._execute_scheduled_task(schedule_id, schedule_info)
+                if await self._acquire_leadership():
+                    await self._fire_due_schedules()
+                    for queue in list(self.queues.values()):
+                        await queue.promote_due_tasks()
                 
                 # Sleep for 1 second before next check
-                await asyncio.sleep(1.0)
+                await asyncio.sleep(self.tick_interval)
                 
             except asyncio.CancelledError:
                 break
@@ -604,40 +2374,242 @@ class TaskScheduler:
                 logger.error("Scheduler loop error", error=str(e))
                 await asyncio.sleep(1.0)
     
-    async def _execute_scheduled_task(self, schedule_id: str, schedule_info: Dict[str, Any]) -> None:
-        """Execute a scheduled task."""
-        try:
-            # Create task
-            task = Task(
-                id=str(uuid.uuid4()),
-                name=schedule_info['task_name'],
-                function=schedule_info['function'],
-                args=schedule_info['args'],
-                kwargs=schedule_info['kwargs'],
-                config=schedule_info['config'],
-                scheduled_at=schedule_info['next_run']
-            )
-            
-            # Enqueue task
-            await self.queue.enqueue(task)
-            
-            # Update next run time for periodic tasks
-            if schedule_info['type'] == 'periodic':
+    async def _fire_due_schedules(self, limit: int = 100) -> int:
+        """Enqueue one task for every periodic schedule that is due."""
+        fired = 0
+        for schedule_id, due_at, schedule_info in await self._due_schedules(limit):
+            try:
                 cron = croniter(schedule_info['cron'], datetime.utcnow())
-                schedule_info['next_run'] = cron.get_next(datetime)
-            else:
-                # Remove one-time delayed tasks
-                del self.scheduled_tasks[schedule_id]
-            
-            logger.info("Scheduled task executed", 
-                       schedule_id=schedule_id,
-                       task_id=task.id,
-                       task_name=task.name)
-            
+                next_run = cron.get_next(datetime)
+                if not await self._claim_schedule(schedule_id, due_at, _to_timestamp(next_run)):
+                    continue
+                
+                task = Task(
+                    id=str(uuid.uuid4()),
+                    name=schedule_info['task_name'],
+                    function=schedule_info['function'],
+                    args=schedule_info['args'],
+                    kwargs=schedule_info['kwargs'],
+                    config=TaskConfig.from_dict(schedule_info['config']),
+                    scheduled_at=datetime.utcfromtimestamp(due_at)
+                )
+                task_id = await self.queue.enqueue_unique(task)
+                fired += 1
+                
+                logger.info("Scheduled task executed", 
+                           schedule_id=schedule_id,
+                           task_id=task_id,
+                           task_name=task.name,
+                           next_run=next_run)
+                
+            except Exception as e:
+                logger.error("Failed to execute scheduled task", 
+                            schedule_id=schedule_id,
+                            error=str(e))
+        
+        return fired
+    
+    async def _due_schedules(self, limit: int) -> List[Tuple[str, float, Dict[str, Any]]]:
+        """Periodic schedules whose next run has passed, as (id, due time, schedule)."""
+        client = self.queue.client
+        due = await client.zrangebyscore(
+            self.next_run_key, '-inf', time.time(), start=0, num=limit, withscores=True
+        )
+        
+        schedules = []
+        for schedule_id, due_at in due:
+            schedule_data = await client.hget(self.schedules_key, schedule_id)
+            if not schedule_data:
+                await client.zrem(self.next_run_key, schedule_id)
+                continue
+            schedules.append((schedule_id, due_at, json.loads(schedule_data)))
+        return schedules
+    
+    async def _claim_schedule(self, schedule_id: str, due_at: float, next_run: float) -> bool:
+        """Advance a schedule's next run, unless another replica already fired it."""
+        claimed = await self._scripts['claim'](
+            keys=[self.next_run_key],
+            args=[schedule_id, repr(due_at), next_run]
+        )
+        return bool(claimed)
+
+
+class LocalTaskScheduler(TaskScheduler):
+    """
+    Scheduler for in-memory queues.
+    
+    Periodic schedules are kept in process memory and this instance is
+    always the leader, since in-memory queues are never shared between
+    processes.
+    """
+    
+    def __init__(self, queue: TaskQueue, registry: TaskRegistry,
+                 queues: Optional[Dict[str, TaskQueue]] = None):
+        super().__init__(queue, registry, queues)
+        self._schedules: Dict[str, Dict[str, Any]] = {}
+        self._next_runs: Dict[str, float] = {}
+    
+    def _ensure_scripts(self) -> None:
+        pass
+    
+    async def _store_schedule(self, schedule_id: str, schedule: Dict[str, Any], next_run: float) -> None:
+        self._schedules[schedule_id] = schedule
+        self._next_runs.setdefault(schedule_id, next_run)
+    
+    async def _remove_schedule(self, schedule_id: str) -> bool:
+        self._next_runs.pop(schedule_id, None)
+        return self._schedules.pop(schedule_id, None) is not None
+    
+    async def count_schedules(self) -> int:
+        return len(self._schedules)
+    
+    async def _acquire_leadership(self) -> bool:
+        self.is_leader = True
+        return True
+    
+    async def _due_schedules(self, limit: int) -> List[Tuple[str, float, Dict[str, Any]]]:
+        now = time.time()
+        due = sorted((due_at, schedule_id) for schedule_id, due_at in self._next_runs.items() if due_at <= now)
+        return [(schedule_id, due_at, self._schedules[schedule_id]) for due_at, schedule_id in due[:limit]]
+    
+    async def _claim_schedule(self, schedule_id: str, due_at: float, next_run: float) -> bool:
+        if self._next_runs.get(schedule_id) != due_at:
+            return False
+        self._next_runs[schedule_id] = next_run
+        return True
+
+
+@dataclass
+class AutoscalePolicy:
+    """Bounds and targets for queue-driven worker autoscaling."""
+    
+    min_workers: int = 1
+    max_workers: int = 8
+    target_wait_seconds: float = 30.0  # Queue wait SLO
+    interval: float = 5.0  # Seconds between evaluations
+    scale_down_cooldown: float = 60.0  # Seconds since the last change before shrinking
+    default_task_seconds: float = 1.0  # Assumed duration until real samples exist
+
+
+class WorkerAutoscaler:
+    """
+    Grows or shrinks the local workers of one queue to keep queue wait
+    under ``policy.target_wait_seconds``.
+    
+    With N workers and an average task duration D, the last of L queued tasks
+    waits roughly L * D / N, so the autoscaler targets N = ceil(L * D / SLO),
+    never drops below the number of busy workers, and adds a worker whenever
+    the oldest queued task has already exceeded the SLO. When the local
+    maximum is not enough, it signals the supervisor through a Redis channel
+    and the optional ``supervisor_hook``.
+    """
+    
+    def __init__(self,
+                 manager: 'BackgroundTaskManager',
+                 queue_name: str = "default",
+                 policy: Optional[AutoscalePolicy] = None,
+                 supervisor_hook: Optional[Callable[[Dict[str, Any]], Any]] = None):
+        self.manager = manager
+        self.queue_name = queue_name
+        self.policy = policy or AutoscalePolicy()
+        self.supervisor_hook = supervisor_hook
+        self.last_scaled_at = 0.0
+        self.last_decision: Dict[str, Any] = {}
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def supervisor_channel(self) -> str:
+        return f"autoscale:{self.queue_name}"
+    
+    def start(self) -> None:
+        """Start the autoscaling loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+            logger.info("Worker autoscaler started", queue=self.queue_name, policy=self.policy)
+    
+    async def stop(self) -> None:
+        """Stop the autoscaling loop."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _loop(self) -> None:
+        """Evaluate the queue every ``policy.interval`` seconds."""
+        while True:
+            try:
+                await asyncio.sleep(self.policy.interval)
+                await self.evaluate()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error("Autoscaler error", queue=self.queue_name, error=str(e))
+    
+    def desired_workers(self, metrics: Dict[str, Any], current: int, busy: int) -> int:
+        """Worker count needed to drain the backlog within the wait SLO (unclamped)."""
+        avg_task_seconds = (metrics['avg_duration_ms'] or 0) / 1000 or self.policy.default_task_seconds
+        queue_length = metrics['queue_length']
+        
+        needed = math.ceil(queue_length * avg_task_seconds / self.policy.target_wait_seconds)
+        needed = max(needed, busy)
+        if queue_length and metrics['oldest_task_age'] > self.policy.target_wait_seconds:
+            needed = max(needed, current + 1)
+        return needed
+    
+    async def evaluate(self) -> int:
+        """Run one scaling decision and return the resulting worker count."""
+        queue = self.manager.queues.get(self.queue_name)
+        if not queue:
+            return 0
+        
+        metrics = await queue.get_load_metrics()
+        workers = self.manager.get_workers(self.queue_name)
+        current = len(workers)
+        busy = sum(1 for worker in workers if worker.current_task)
+        
+        needed = self.desired_workers(metrics, current, busy)
+        target = min(max(needed, self.policy.min_workers), self.policy.max_workers)
+        now = time.monotonic()
+        
+        if target > current:
+            await self.manager.start_workers(target - current, self.queue_name)
+            self.last_scaled_at = now
+        elif target < current and now - self.last_scaled_at >= self.policy.scale_down_cooldown:
+            stopped = await self.manager.stop_workers(current - target, self.queue_name)
+            if stopped:
+                self.last_scaled_at = now
+        
+        self.last_decision = {
+            **metrics,
+            'workers': len(self.manager.get_workers(self.queue_name)),
+            'busy_workers': busy,
+            'desired_workers': needed,
+            'evaluated_at': datetime.utcnow().isoformat()
+        }
+        
+        if needed > self.policy.max_workers:
+            await self._signal_supervisor()
+        
+        return self.last_decision['workers']
+    
+    async def _signal_supervisor(self) -> None:
+        """Ask for capacity beyond this process's ``max_workers``."""
+        payload = {'queue': self.queue_name, 'local_max_workers': self.policy.max_workers, **self.last_decision}
+        logger.warning("Local worker capacity exhausted", **payload)
+        
+        queue = self.manager.queues.get(self.queue_name)
+        try:
+            if queue and queue.client:
+                await queue.client.publish(self.supervisor_channel, json.dumps(payload))
+            if self.supervisor_hook:
+                result = self.supervisor_hook(payload)
+                if asyncio.iscoroutine(result):
+                    await result
         except Exception as e:
-            logger.error("Failed to execute scheduled task", 
-                        schedule_id=schedule_id,
-                        error=str(e))
+            logger.error("Failed to signal supervisor", queue=self.queue_name, error=str(e))
 
 
 class BackgroundTaskManager:
@@ -650,6 +2622,9 @@ class BackgroundTaskManager:
         self.workers: List[TaskWorker] = []
         self.scheduler: Optional[TaskScheduler] = None
         self.is_running = False
+        self._reaper_task: Optional[asyncio.Task] = None
+        self._worker_seq: Dict[str, int] = {}
+        self.autoscalers: Dict[str, WorkerAutoscaler] = {}
         # Don't initialize automatically - will be initialized by app lifecycle
     
     async def initialize(self) -> None:
@@ -657,17 +2632,34 @@ class BackgroundTaskManager:
         # Create default queue
         await self.create_queue("default")
         
-        # Create scheduler
-        self.scheduler = TaskScheduler(self.queues["default"], self.registry)
+        # Create scheduler; in-memory queues need no Redis-backed leader election
+        scheduler_class = LocalTaskScheduler if isinstance(self.queues["default"], MemoryTaskQueue) else TaskScheduler
+        self.scheduler = scheduler_class(self.queues["default"], self.registry, self.queues)
         
         logger.info("Background task manager initialized")
     
-    async def create_queue(self, name: str) -> TaskQueue:
-        """Create a new task queue."""
-        queue = TaskQueue(self.redis_url, name)
+    async def create_queue(self, name: str, backend: Optional[str] = None,
+                           rate_limit: Optional[RateLimit] = None) -> TaskQueue:
+        """
+        Create a new task queue.
+        
+        ``backend`` selects the implementation ("zset", "stream" or "memory");
+        it defaults to ``settings.TASK_QUEUE_BACKENDS[name]`` and then
+        ``settings.TASK_QUEUE_BACKEND``. ``rate_limit`` defaults to
+        ``settings.TASK_QUEUE_RATE_LIMITS[name]``.
+        """
+        backend = backend or settings.TASK_QUEUE_BACKENDS.get(name, settings.TASK_QUEUE_BACKEND)
+        queue_class = QUEUE_BACKENDS.get(backend)
+        if not queue_class:
+            raise ValueError(f"Unknown task queue backend '{backend}'")
+        
+        queue = queue_class(self.redis_url, name)
+        if rate_limit is None and name in settings.TASK_QUEUE_RATE_LIMITS:
+            rate_limit = RateLimit.from_dict(settings.TASK_QUEUE_RATE_LIMITS[name])
+        queue.rate_limit = rate_limit
         await queue.connect()
         self.queues[name] = queue
-        logger.info("Task queue created", queue_name=name)
+        logger.info("Task queue created", queue_name=name, backend=backend)
         return queue
     
     async def start_workers(self, count: int = 1, queue_name: str = "default") -> None:
@@ -676,8 +2668,10 @@ class BackgroundTaskManager:
         if not queue:
             raise ValueError(f"Queue '{queue_name}' not found")
         
-        for i in range(count):
-            worker_id = f"{queue_name}-worker-{i}"
+        for _ in range(count):
+            seq = self._worker_seq.get(queue_name, 0)
+            self._worker_seq[queue_name] = seq + 1
+            worker_id = f"{queue_name}-worker-{seq}"
             worker = TaskWorker(worker_id, queue, self.registry)
             self.workers.append(worker)
             
@@ -686,12 +2680,64 @@ class BackgroundTaskManager:
         
         logger.info("Workers started", count=count, queue=queue_name)
     
+    def get_workers(self, queue_name: str = "default") -> List[TaskWorker]:
+        """Workers attached to a queue that have not been stopped."""
+        return [worker for worker in self.workers if worker.queue.queue_name == queue_name]
+    
+    async def stop_workers(self, count: int, queue_name: str = "default") -> int:
+        """Stop up to ``count`` idle workers of a queue. Busy workers are left alone."""
+        idle = [worker for worker in self.get_workers(queue_name) if not worker.current_task]
+        stopped = idle[:count]
+        
+        for worker in stopped:
+            await worker.stop()
+            self.workers.remove(worker)
+        
+        if stopped:
+            logger.info("Workers stopped", count=len(stopped), queue=queue_name)
+        return len(stopped)
+    
+    def enable_autoscaling(self,
+                           queue_name: str = "default",
+                           policy: Optional[AutoscalePolicy] = None,
+                           supervisor_hook: Optional[Callable[[Dict[str, Any]], Any]] = None) -> WorkerAutoscaler:
+        """Attach and start a queue-depth-driven autoscaler for a queue."""
+        if queue_name not in self.queues:
+            raise ValueError(f"Queue '{queue_name}' not found")
+        
+        autoscaler = self.autoscalers.get(queue_name)
+        if autoscaler is None:
+            autoscaler = WorkerAutoscaler(self, queue_name, policy, supervisor_hook)
+            self.autoscalers[queue_name] = autoscaler
+        autoscaler.start()
+        return autoscaler
+    
     async def start_scheduler(self) -> None:
         """Start the task scheduler."""
         if self.scheduler:
             asyncio.create_task(self.scheduler.start())
             logger.info("Task scheduler started")
     
+    async def start_lease_reaper(self, interval: Optional[float] = None) -> None:
+        """Start the background loop that re-queues tasks with expired leases."""
+        if self._reaper_task is None:
+            self._reaper_task = asyncio.create_task(
+                self._lease_reaper_loop(interval or settings.TASK_REAPER_INTERVAL)
+            )
+            logger.info("Lease reaper started")
+    
+    async def _lease_reaper_loop(self, interval: float) -> None:
+        """Periodically recover tasks from workers that died mid-execution."""
+        while True:
+            try:
+                await asyncio.sleep(interval)
+                for queue in list(self.queues.values()):
+                    await queue.requeue_expired_leases()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error("Lease reaper error", error=str(e))
+    
     async def submit_task(self, 
                          name: str,
                          function: str,
@@ -699,7 +2745,23 @@ class BackgroundTaskManager:
                          kwargs: Dict[str, Any] = None,
                          config: TaskConfig = None,
                          queue_name: str = "default") -> str:
-        """Submit a task for execution."""
+        """
+        Submit a task for execution.
+        
+        If ``config.dedup_key`` is set and a task with the same key is still
+        pending or running (or completed within its dedup window), the
+        existing task ID is returned and nothing new is enqueued.
+        
+        Tasks listing parent IDs in ``config.depends_on`` are held until all
+        parents complete; pass ``task_result_ref(parent_id)`` as an argument
+        to receive a parent's result::
+        
+            crawl_id = await task_manager.submit_task("crawl", "crawl_product", [url])
+            analysis_id = await task_manager.submit_task(
+                "analyze", "analyze_reviews", [task_result_ref(crawl_id)],
+                config=TaskConfig(depends_on=[crawl_id])
+            )
+        """
         queue = self.queues.get(queue_name)
         if not queue:
             raise ValueError(f"Queue '{queue_name}' not found")
@@ -713,8 +2775,7 @@ class BackgroundTaskManager:
             config=config or TaskConfig()
         )
         
-        await queue.enqueue(task)
-        return task.id
+        return await queue.enqueue_unique(task)
     
     async def get_task_status(self, task_id: str, queue_name: str = "default") -> Optional[TaskResult]:
         """Get task status."""
@@ -723,7 +2784,13 @@ class BackgroundTaskManager:
             return None
         
         task = await queue.get_task_status(task_id)
-        return task.result if task else None
+        if not task or not task.result:
+            return None
+        try:
+            await queue.load_result(task.result)
+        except ValueError:
+            logger.warning("Task result expired", task_id=task_id, queue=queue_name)
+        return task.result
     
     async def get_system_stats(self) -> Dict[str, Any]:
         """Get comprehensive system statistics."""
@@ -732,7 +2799,8 @@ class BackgroundTaskManager:
             'workers': [],
             'scheduler': {
                 'is_running': self.scheduler.is_running if self.scheduler else False,
-                'scheduled_tasks': len(self.scheduler.scheduled_tasks) if self.scheduler else 0
+                'is_leader': self.scheduler.is_leader if self.scheduler else False,
+                'scheduled_tasks': await self.scheduler.count_schedules() if self.scheduler else 0
             }
         }
         
@@ -740,6 +2808,11 @@ class BackgroundTaskManager:
         for name, queue in self.queues.items():
             stats['queues'][name] = await queue.get_queue_stats()
         
+        # Autoscaler decisions
+        stats['autoscalers'] = {
+            name: autoscaler.last_decision for name, autoscaler in self.autoscalers.items()
+        }
+        
         # Worker stats
         for worker in self.workers:
             stats['workers'].append({
@@ -757,6 +2830,19 @@ class BackgroundTaskManager:
         if self.scheduler:
             await self.scheduler.stop()
         
+        # Stop autoscalers before workers so they don't start replacements
+        for autoscaler in self.autoscalers.values():
+            await autoscaler.stop()
+        
+        # Stop lease reaper
+        if self._reaper_task:
+            self._reaper_task.cancel()
+            try:
+                await self._reaper_task
+            except asyncio.CancelledError:
+                pass
+            self._reaper_task = None
+        
         # Stop workers
         for worker in self.workers:
             await worker.stop()
@@ -804,8 +2890,21 @@ def background_task(name: str = None, config: TaskConfig = None):
 async def initialize_task_manager():
     """Initialize task management system on application startup."""
     await task_manager.initialize()
-    await task_manager.start_workers(count=2)  # Start 2 workers
+    await task_manager.start_workers(count=settings.TASK_MIN_WORKERS)
+    # Rate-limited queues, e.g. one per LLM provider so their quotas don't interfere
+    for queue_name in settings.TASK_QUEUE_RATE_LIMITS:
+        if queue_name not in task_manager.queues:
+            await task_manager.create_queue(queue_name)
+            await task_manager.start_workers(count=settings.TASK_MIN_WORKERS, queue_name=queue_name)
+    if settings.TASK_AUTOSCALE_ENABLED:
+        task_manager.enable_autoscaling(policy=AutoscalePolicy(
+            min_workers=settings.TASK_MIN_WORKERS,
+            max_workers=settings.TASK_MAX_WORKERS,
+            target_wait_seconds=settings.TASK_QUEUE_WAIT_SLO,
+            interval=settings.TASK_AUTOSCALE_INTERVAL
+        ))
     await task_manager.start_scheduler()
+    await task_manager.start_lease_reaper()
     logger.info("Task management system started")
 
 
@@ -640,6 +640,7 @@ async def initialize_cache():
     cache.configure("products", CacheConfig(ttl_seconds=3600, tags=["product_data"]))
     cache.configure("analytics", CacheConfig(ttl_seconds=300, tags=["analytics"]))
     cache.configure("auth", CacheConfig(ttl_seconds=900, tags=["authentication"]))
+    cache.configure("llm_responses", CacheConfig(ttl_seconds=settings.LLM_CACHE_TTL_SECONDS, tags=["llm_responses"]))
     
     logger.info("Cache system initialized with default configurations")
 
@@ -44,6 +44,22 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = Field(default="revcopy")
     POSTGRES_PORT: int = Field(default=5432)
     DATABASE_URL: Optional[PostgresDsn] = None
+    DB_POOL_SIZE: int = Field(default=20)
+    DB_MAX_OVERFLOW: int = Field(default=0)
+    DB_POOL_TIMEOUT: float = Field(default=30.0)  # Seconds to wait for a pooled connection
+    DB_POOL_RECYCLE: int = Field(default=1800)  # Seconds; keep below any idle timeout in front of Postgres
+    DB_POOL_PRE_PING: bool = Field(default=False)  # Enable behind proxies that drop idle connections
+    DATABASE_READ_URL: Optional[str] = Field(default=None)  # Streaming replica for heavy read endpoints
+    DB_REPLICA_MAX_LAG: float = Field(default=5.0)  # Seconds of replay lag before reads fall back to primary
+    DB_REPLICA_LAG_CHECK_INTERVAL: float = Field(default=5.0)  # Seconds between replica lag probes
+    DB_READ_YOUR_WRITES_WINDOW: int = Field(default=15)  # Seconds a writer's reads stay on primary
+    PARTITION_PREMAKE_MONTHS: int = Field(default=3)  # Monthly log partitions created ahead of time
+    CONTENT_RETENTION_DAYS: int = Field(default=90)  # Generation logs older than this are dropped
+    PERFORMANCE_METRICS_RETENTION_DAYS: int = Field(default=365)  # Template performance metric retention
+    USAGE_ROLLUP_REFRESH_CRON: str = Field(default="*/5 * * * *")  # Dashboard rollup refresh schedule
+    USAGE_ROLLUP_LOOKBACK_DAYS: int = Field(default=2)  # Recent days re-counted on every rollup refresh
+    GENERATION_STATS_BUFFERED: bool = Field(default=True)  # Batch template/daily stats writes off the request path
+    GENERATION_STATS_FLUSH_INTERVAL: float = Field(default=5.0)  # Seconds between buffered stats flushes
     
     @validator("DATABASE_URL", pre=True)
     def assemble_db_connection(cls, v: Optional[str], values: Dict[str, Any]) -> Any:
@@ -70,6 +86,23 @@ class Settings(BaseSettings):
     CELERY_BROKER_URL: str = "redis://localhost:6379/0"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/0"
     
+    # Background tasks
+    TASK_QUEUE_BACKEND: str = Field(default="zset")  # "zset", "stream" or "memory"
+    TASK_QUEUE_BACKENDS: Dict[str, str] = Field(default={})  # Per-queue overrides
+    # Per-queue budgets, e.g. {"openai": {"requests_per_minute": 500, "tokens_per_minute": 150000}}
+    TASK_QUEUE_RATE_LIMITS: Dict[str, Dict[str, int]] = Field(default={})
+    TASK_LEASE_SECONDS: int = Field(default=60)  # Visibility timeout for dequeued tasks
+    TASK_REAPER_INTERVAL: float = Field(default=5.0)  # seconds
+    TASK_SCHEDULER_LOCK_TTL: int = Field(default=10)  # Leader lock TTL in seconds
+    TASK_DEDUP_WINDOW: int = Field(default=300)  # Seconds a completed deduplicated result is reused
+    TASK_AUTOSCALE_ENABLED: bool = Field(default=True)
+    TASK_MIN_WORKERS: int = Field(default=2)
+    TASK_MAX_WORKERS: int = Field(default=8)
+    TASK_QUEUE_WAIT_SLO: float = Field(default=30.0)  # Target queue wait in seconds
+    TASK_AUTOSCALE_INTERVAL: float = Field(default=5.0)  # seconds
+    TASK_RESULT_INLINE_BYTES: int = Field(default=1024)  # Larger results get their own key
+    TASK_RESULT_TTL: int = Field(default=86400)  # seconds
+    
     # OpenAI
     OPENAI_API_KEY: Optional[str] = Field(default=None)
     OPENAI_MODEL: str = "gpt-4-turbo-preview"
@@ -81,6 +114,10 @@ class Settings(BaseSettings):
     SCRAPING_MAX_RETRIES: int = 3
     SCRAPING_DELAY: float = 1.0
     USER_AGENT_ROTATION: bool = True
+    # Seconds a crawled product is reused before recrawling, keyed by platform value
+    PRODUCT_FRESHNESS_TTL: Dict[str, int] = Field(default={"amazon": 86400, "ebay": 43200, "aliexpress": 43200, "shopify": 21600})
+    PRODUCT_FRESHNESS_DEFAULT_TTL: int = Field(default=21600)  # Platforms missing from PRODUCT_FRESHNESS_TTL
+    REVIEW_COPY_THRESHOLD: int = Field(default=500)  # Review batches this large are loaded with COPY
     
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 100
@@ -117,12 +154,34 @@ class Settings(BaseSettings):
     DEEPSEEK_MAX_TOKENS: int = Field(default=4000)
     DEEPSEEK_TEMPERATURE: float = Field(default=0.7)
     DEEPSEEK_TIMEOUT: int = Field(default=60)
+    DEEPSEEK_CONNECT_TIMEOUT: float = Field(default=10.0)  # Seconds to establish a new connection
+    DEEPSEEK_HTTP2: bool = Field(default=True)  # Multiplex concurrent calls over one connection
+    DEEPSEEK_MAX_CONNECTIONS: int = Field(default=50)  # Pooled client connection limit
+    DEEPSEEK_MAX_KEEPALIVE_CONNECTIONS: int = Field(default=20)  # Idle connections kept open for reuse
+    DEEPSEEK_KEEPALIVE_EXPIRY: float = Field(default=60.0)  # Seconds an idle connection is kept
     
     # AI provider preferences
     DEFAULT_AI_PROVIDER: str = Field(default="deepseek")
     AI_GENERATION_TIMEOUT: int = Field(default=60)  # seconds
     AI_MAX_TOKENS: int = Field(default=2000)
     AI_TEMPERATURE: float = Field(default=0.7)
+    AI_PROVIDER_MAX_CONCURRENCY: int = Field(default=8)  # Concurrent requests per AI provider per worker
+    AI_FAILOVER_ENABLED: bool = Field(default=True)  # Retry failed or tripped providers on the next one
+    AI_CIRCUIT_WINDOW_SECONDS: float = Field(default=60.0)  # Rolling window of calls feeding the breaker
+    AI_CIRCUIT_MIN_REQUESTS: int = Field(default=10)  # Calls in the window before the breaker can open
+    AI_CIRCUIT_FAILURE_RATE: float = Field(default=0.5)  # Failed or slow share of calls that opens it
+    AI_CIRCUIT_SLOW_CALL_SECONDS: float = Field(default=30.0)  # Calls slower than this count as failures
+    AI_CIRCUIT_OPEN_SECONDS: float = Field(default=30.0)  # Time open before a trial call is let through
+    AI_HEDGING_ENABLED: bool = Field(default=False)  # Race a second provider when a call passes its p95
+    AI_HEDGE_MIN_SAMPLES: int = Field(default=20)  # Successful calls in the window needed for a p95
+    AI_HEDGE_MIN_DELAY_SECONDS: float = Field(default=2.0)  # Never hedge sooner than this
+    LLM_CACHE_ENABLED: bool = Field(default=True)  # Exact-match cache in front of AIService.generate_content
+    LLM_CACHE_TTL_SECONDS: int = Field(default=86400)  # Cached responses expire after a day
+    LLM_CACHE_MAX_TEMPERATURE: float = Field(default=0.0)  # Cached without opt-in at or below this temperature
+    LLM_TOKEN_COSTS: Dict[str, Dict[str, float]] = Field(default={  # USD per 1K tokens, for savings reports
+        "openai": {"prompt": 0.01, "completion": 0.03},
+        "deepseek": {"prompt": 0.00027, "completion": 0.0011},
+    })
     
     # Platform-specific content generation settings
     PLATFORM_LIMITS: Dict[str, Dict[str, Any]] = Field(default={
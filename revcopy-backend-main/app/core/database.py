@@ -3,17 +3,26 @@ Database configuration and connection management.
 Handles SQLAlchemy setup, connection pooling, and session management.
 """
 
+import asyncio
+import hashlib
+import json
 import logging
-from typing import AsyncGenerator, Optional
+import time
+from typing import Any, AsyncGenerator, Iterable, Optional
 
 import structlog
-from sqlalchemy import MetaData, create_engine
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from fastapi import Request
+from sqlalchemy import JSON, Boolean, MetaData, create_engine, exc, literal, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
 from app.core.config import settings
+from app.core.performance import db_pool_monitor
 
 # Configure structured logging
 logger = structlog.get_logger(__name__)
@@ -32,10 +41,52 @@ metadata = MetaData(naming_convention=convention)
 # Base class for SQLAlchemy models
 Base = declarative_base(metadata=metadata)
 
+# JSONB on PostgreSQL (GIN-indexable, supports @> containment), plain JSON on SQLite test databases
+PortableJSONB = JSONB().with_variant(JSON(), "sqlite")
+
+
+class json_contains(FunctionElement):
+    """
+    True when a JSON array column contains every one of ``values``.
+    
+    Compiles to GIN-indexable ``@>`` containment on PostgreSQL and to
+    ``json_each`` lookups on SQLite, which has no ``@>`` operator. Use it
+    instead of ``column.contains()`` on PortableJSONB columns.
+    """
+    type = Boolean()
+    name = "json_contains"
+    inherit_cache = True
+    
+    def __init__(self, column: Any, values: Iterable[Any]):
+        values = list(values)
+        super().__init__(column, literal(json.dumps(values)), *[literal(value) for value in values])
+
+
+@compiles(json_contains)
+def _compile_json_contains(element: json_contains, compiler: Any, **kw: Any) -> str:
+    column, document = list(element.clauses)[:2]
+    return f"{compiler.process(column, **kw)} @> CAST({compiler.process(document, **kw)} AS JSONB)"
+
+
+@compiles(json_contains, "sqlite")
+def _compile_json_contains_sqlite(element: json_contains, compiler: Any, **kw: Any) -> str:
+    column, _, *values = list(element.clauses)
+    if not values:
+        return "1 = 1"
+    column_sql = compiler.process(column, **kw)
+    return "(" + " AND ".join(
+        f"EXISTS (SELECT 1 FROM json_each({column_sql}) WHERE json_each.value = {compiler.process(value, **kw)})"
+        for value in values
+    ) + ")"
+
 # Global async engine and session maker
 async_engine: Optional[create_async_engine] = None
 async_session_maker: Optional[async_sessionmaker] = None
 
+# Optional read replica engine and session maker
+read_engine: Optional[AsyncEngine] = None
+read_session_maker: Optional[async_sessionmaker] = None
+
 # Sync engine for migrations
 sync_engine: Optional[create_engine] = None
 sync_session_maker: Optional[sessionmaker] = None
@@ -70,26 +121,70 @@ def create_sync_engine():
         raise
 
 
+class MonitoredAsyncPool(AsyncAdaptedQueuePool):
+    """Queue pool that reports checkout wait time and occupancy to ``db_pool_monitor``."""
+    
+    def connect(self) -> Any:
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            db_pool_monitor.record_checkout(self._monitor_name, self, (time.perf_counter() - started) * 1000,
+                                            success=False)
+            raise
+        db_pool_monitor.record_checkout(self._monitor_name, self, (time.perf_counter() - started) * 1000)
+        return connection
+    
+    @property
+    def _monitor_name(self) -> str:
+        return getattr(self, "logging_name", None) or "primary"
+
+
+def build_async_engine(url: Optional[str] = None, pool_name: str = "primary", **overrides: Any) -> AsyncEngine:
+    """
+    Create an async engine with the connection pool configured from settings.
+    
+    Pre-ping is off by default: connections are recycled after
+    ``DB_POOL_RECYCLE`` seconds instead, which is safe as long as nothing
+    between the app and Postgres (e.g. PgBouncer or a cloud load balancer)
+    drops idle connections sooner. Set ``DB_POOL_PRE_PING`` if it does.
+    
+    Args:
+        url: Database URL, defaults to ``settings.DATABASE_URL``
+        pool_name: Name the pool is reported under in pool telemetry
+        **overrides: Extra or overriding ``create_async_engine`` arguments
+        
+    Returns:
+        AsyncEngine: Configured engine
+    """
+    engine_kwargs = {
+        "url": url or str(settings.DATABASE_URL),
+        "echo": settings.DEBUG,
+        "poolclass": MonitoredAsyncPool,
+        "pool_logging_name": pool_name,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+    
+    # Use NullPool for testing to avoid connection issues
+    if settings.ENVIRONMENT == "testing":
+        engine_kwargs["poolclass"] = NullPool
+        for pool_option in ("pool_size", "max_overflow", "pool_timeout"):
+            engine_kwargs.pop(pool_option)
+    
+    engine_kwargs.update(overrides)
+    return create_async_engine(**engine_kwargs)
+
+
 async def create_async_engine_instance():
     """Create asynchronous database engine with connection pooling."""
     global async_engine, async_session_maker
     
     try:
-        # Engine configuration for optimal performance
-        engine_kwargs = {
-            "url": str(settings.DATABASE_URL),
-            "echo": settings.DEBUG,
-            "pool_pre_ping": True,
-            "pool_recycle": 300,
-            "pool_size": 20,
-            "max_overflow": 0,
-        }
-        
-        # Use NullPool for testing to avoid connection issues
-        if settings.ENVIRONMENT == "testing":
-            engine_kwargs["poolclass"] = NullPool
-        
-        async_engine = create_async_engine(**engine_kwargs)
+        async_engine = build_async_engine()
         
         async_session_maker = async_sessionmaker(
             async_engine,
@@ -107,6 +202,142 @@ async def create_async_engine_instance():
         raise
 
 
+async def create_read_engine_instance() -> Optional[AsyncEngine]:
+    """Create the read replica engine when ``DATABASE_READ_URL`` is configured."""
+    global read_engine, read_session_maker
+    
+    if not settings.DATABASE_READ_URL:
+        return None
+    
+    try:
+        read_engine = build_async_engine(settings.DATABASE_READ_URL, pool_name="replica")
+        
+        read_session_maker = async_sessionmaker(
+            read_engine,
+            class_=AsyncSession,
+            expire_on_commit=False,
+            autoflush=False,
+            autocommit=False,
+        )
+        
+        logger.info("Read replica engine created successfully")
+        return read_engine
+        
+    except Exception as e:
+        logger.error("Failed to create read replica engine", error=str(e))
+        raise
+
+
+# Replay lag in seconds; 0 when the target is not in recovery (e.g. it is the primary)
+_REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+_replica_lag: Optional[float] = None
+_replica_lag_checked_at: float = 0.0
+_replica_lag_lock = asyncio.Lock()
+
+RECENT_WRITES_NAMESPACE = "recent_writes"
+
+
+async def get_replica_lag() -> Optional[float]:
+    """
+    Return the replica's replay lag in seconds.
+    
+    The probe runs at most once per ``DB_REPLICA_LAG_CHECK_INTERVAL`` and is
+    shared by concurrent callers. Returns None when there is no replica or
+    the probe failed, in which case reads should go to the primary.
+    """
+    global _replica_lag, _replica_lag_checked_at
+    
+    if not read_engine:
+        return None
+    
+    if time.monotonic() - _replica_lag_checked_at < settings.DB_REPLICA_LAG_CHECK_INTERVAL:
+        return _replica_lag
+    
+    async with _replica_lag_lock:
+        if time.monotonic() - _replica_lag_checked_at < settings.DB_REPLICA_LAG_CHECK_INTERVAL:
+            return _replica_lag
+        
+        try:
+            async with read_engine.connect() as conn:
+                lag = (await conn.execute(_REPLICA_LAG_SQL)).scalar()
+            _replica_lag = float(lag or 0.0)
+        except Exception as e:
+            logger.warning("Read replica lag check failed", error=str(e))
+            _replica_lag = None
+        
+        _replica_lag_checked_at = time.monotonic()
+        
+        if _replica_lag is not None and _replica_lag > settings.DB_REPLICA_MAX_LAG:
+            logger.warning("Read replica lagging, routing reads to primary",
+                           lag_seconds=round(_replica_lag, 2), max_lag=settings.DB_REPLICA_MAX_LAG)
+        return _replica_lag
+
+
+def request_writer_key(request: Request) -> str:
+    """Identify the caller of a request for read-your-writes tracking."""
+    authorization = request.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        return hashlib.sha256(authorization[7:].encode()).hexdigest()[:32]
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+async def mark_recent_write(request: Request) -> None:
+    """Pin the caller's reads to the primary for ``DB_READ_YOUR_WRITES_WINDOW`` seconds."""
+    if not settings.DATABASE_READ_URL:
+        return
+    
+    from app.core.cache import cache
+    await cache.set(request_writer_key(request), time.time(), namespace=RECENT_WRITES_NAMESPACE,
+                    ttl=settings.DB_READ_YOUR_WRITES_WINDOW)
+
+
+async def _has_recent_write(request: Request) -> bool:
+    from app.core.cache import cache
+    written_at = await cache.get(request_writer_key(request), namespace=RECENT_WRITES_NAMESPACE)
+    return written_at is not None and time.time() - written_at < settings.DB_READ_YOUR_WRITES_WINDOW
+
+
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency to get a session for read-only endpoints.
+    
+    Serves from the read replica when one is configured, its lag is within
+    ``DB_REPLICA_MAX_LAG`` and the caller has not written recently;
+    otherwise falls back to the primary so callers always see their own
+    writes.
+    
+    Yields:
+        AsyncSession: Database session
+    """
+    if settings.DATABASE_READ_URL and not read_session_maker:
+        await create_read_engine_instance()
+    if not async_session_maker:
+        await create_async_engine_instance()
+    
+    session_maker = async_session_maker
+    if read_session_maker:
+        lag = await get_replica_lag()
+        if lag is not None and lag <= settings.DB_REPLICA_MAX_LAG and not await _has_recent_write(request):
+            session_maker = read_session_maker
+    
+    async with session_maker() as session:
+        try:
+            yield session
+        except Exception as e:
+            await session.rollback()
+            logger.error("Database session error", error=str(e))
+            raise
+        finally:
+            await session.close()
+
+
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency to get async database session.
@@ -176,6 +407,10 @@ async def close_db():
             await async_engine.dispose()
             logger.info("Async database connections closed")
         
+        if read_engine:
+            await read_engine.dispose()
+            logger.info("Read replica connections closed")
+        
         if sync_engine:
             sync_engine.dispose()
             logger.info("Sync database connections closed")
@@ -279,6 +514,3 @@ async def health_check() -> dict:
             "database": "postgresql"
         }
 
-
-# Import time for health check
-import time 
\ No newline at end of file
@@ -0,0 +1,127 @@
+"""
+Keyset pagination helpers.
+
+List endpoints page through rows ordered by ``(created_at, id)`` descending
+and hand the client an opaque cursor pointing at the last row returned.
+The next page starts with a row-value comparison against that cursor, so
+it is served straight from a ``(created_at, id)`` index no matter how deep
+the client has paged, unlike ``OFFSET`` which scans and discards every
+skipped row.
+"""
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+import structlog
+from fastapi import HTTPException, status
+from sqlalchemy import Select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = structlog.get_logger(__name__)
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursorError(HTTPException):
+    """Raised for a cursor that was not produced by ``encode_cursor``."""
+    
+    def __init__(self):
+        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+
+
+@dataclass
+class KeysetPage:
+    """One page of keyset-paginated rows."""
+    items: List[Any]
+    next_cursor: Optional[str]
+    
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+
+def encode_cursor(created_at: datetime, row_id: Any) -> str:
+    """Encode the sort key of a row as an opaque, URL-safe cursor."""
+    payload = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, Any]:
+    """
+    Decode a cursor produced by ``encode_cursor``.
+    
+    Raises:
+        InvalidCursorError: If the cursor is malformed
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(payload)
+        return datetime.fromisoformat(created_at), row_id
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError() from e
+
+
+async def paginate_keyset(
+    db: AsyncSession,
+    query: Select,
+    model: Any,
+    limit: int,
+    cursor: Optional[str] = None
+) -> KeysetPage:
+    """
+    Fetch one page of ``query`` ordered newest first.
+    
+    Args:
+        db: Database session
+        query: Filtered select of ``model`` without ordering or limits
+        model: Mapped class with ``created_at`` and ``id`` columns
+        limit: Page size
+        cursor: Cursor from the previous page, None for the first page
+    
+    Returns:
+        KeysetPage: Rows and the cursor for the following page
+    """
+    sort_key = tuple_(model.created_at, model.id)
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        # The plain created_at bound is implied by the row comparison, but
+        # lets the planner prune monthly partitions newer than the cursor
+        query = query.where(sort_key < tuple_(created_at, row_id), model.created_at <= created_at)
+    
+    # Fetch one extra row to learn whether another page exists
+    query = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+    rows = list((await db.execute(query)).scalars().all())
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    
+    return KeysetPage(items=rows, next_cursor=next_cursor)
+
+
+async def estimated_row_count(db: AsyncSession, table_name: str) -> Optional[int]:
+    """
+    Return the planner's row estimate for a table from ``pg_class``.
+    
+    Kept current by autovacuum/ANALYZE and effectively free, unlike an exact
+    ``COUNT(*)`` which reads the whole table. Returns None on databases
+    other than PostgreSQL and for tables that were never analyzed.
+    """
+    if db.bind is None or db.bind.dialect.name != "postgresql":
+        return None
+    
+    try:
+        result = await db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+            {"table_name": table_name}
+        )
+        estimate = result.scalar()
+    except Exception as e:
+        logger.warning("Row estimate lookup failed", table=table_name, error=str(e))
+        return None
+    
+    return int(estimate) if estimate is not None and estimate >= 0 else None
@@ -0,0 +1,204 @@
+"""
+Monthly range partitioning for append-only log tables.
+
+Generation logs and performance metrics are partitioned by month on their
+timestamp column. Each month lives in its own child table named
+``<table>_pYYYYMM``, plus a ``<table>_default`` catch-all for rows outside
+the created range. Queries filtering on the timestamp only touch the
+matching months, and retention drops whole months with ``DETACH``/``DROP``,
+which is a catalog change instead of a row-by-row ``DELETE`` that leaves
+dead tuples for VACUUM to clean up. Only the default partition, which
+should stay small, is expired row by row.
+
+Tables that are not partitioned (SQLite, or a database created with
+``create_all``) fall back to a plain ``DELETE``.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+import structlog
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = structlog.get_logger(__name__)
+
+# Partitioned table -> partition key column
+PARTITIONED_TABLES: Dict[str, str] = {
+    "ai_generated_content": "created_at",
+    "generated_content": "created_at",
+    "template_performance_metrics": "metric_date",
+}
+
+_PARTITION_SUFFIX = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+@dataclass
+class PartitionDropResult:
+    """Outcome of applying retention to one table."""
+    table: str
+    partitioned: bool
+    partitions_dropped: List[str]
+    rows_deleted: int = 0
+
+
+def month_start(value: date) -> date:
+    """First day of the month containing ``value``."""
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    """First day of the month ``months`` after the month containing ``value``."""
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    """Name of the child table holding ``month`` of ``table``."""
+    return f"{table}_p{month.year:04d}{month.month:02d}"
+
+
+def default_partition_name(table: str) -> str:
+    """Name of the catch-all partition of ``table``."""
+    return f"{table}_default"
+
+
+def partition_month(name: str) -> Optional[date]:
+    """Month covered by a partition named by ``partition_name``, None for others."""
+    match = _PARTITION_SUFFIX.search(name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def create_partition_sql(table: str, month: date) -> str:
+    """
+    DDL creating the partition of ``table`` for ``month`` if it is missing.
+    
+    Bounds are UTC midnights; the offset is ignored for ``timestamp``
+    columns, which already hold naive UTC.
+    """
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+    )
+
+
+async def is_partitioned(db: AsyncSession, table: str) -> bool:
+    """Whether ``table`` is a partitioned table on this database."""
+    if db.bind is None or db.bind.dialect.name != "postgresql":
+        return False
+    
+    result = await db.execute(
+        text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"),
+        {"table": table}
+    )
+    return result.scalar() is not None
+
+
+async def list_partitions(db: AsyncSession, table: str) -> List[str]:
+    """Names of the monthly partitions currently attached to ``table``, oldest first."""
+    result = await db.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass(:table)"
+        ),
+        {"table": table}
+    )
+    return sorted(name for name in result.scalars() if partition_month(name))
+
+
+async def ensure_partitions(
+    db: AsyncSession,
+    table: str,
+    months_ahead: int,
+    today: Optional[date] = None
+) -> List[str]:
+    """
+    Create the partitions for the current month and ``months_ahead`` after it.
+    
+    New months must exist before rows for them arrive, otherwise they land
+    in the default partition. The caller commits.
+    
+    Returns:
+        List[str]: Partitions that did not exist before
+    """
+    if not await is_partitioned(db, table):
+        return []
+    
+    existing = set(await list_partitions(db, table))
+    current = month_start(today or datetime.utcnow().date())
+    created = []
+    
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        name = partition_name(table, month)
+        if name not in existing:
+            await db.execute(text(create_partition_sql(table, month)))
+            created.append(name)
+    
+    if created:
+        logger.info("Partitions created", table=table, partitions=created)
+    return created
+
+
+async def drop_expired_partitions(
+    db: AsyncSession,
+    table: str,
+    cutoff: datetime,
+    lock_timeout_ms: int = 5000
+) -> PartitionDropResult:
+    """
+    Remove data of ``table`` older than ``cutoff``.
+    
+    Partitions whose whole month ends on or before ``cutoff`` are detached
+    and dropped; the month straddling the cutoff is kept until it expires
+    entirely. Expired rows that landed in the default partition (months
+    that had no partition yet) are deleted. On unpartitioned tables the
+    rows are deleted instead. The caller commits.
+    
+    Args:
+        db: Database session
+        table: One of ``PARTITIONED_TABLES``
+        cutoff: Oldest timestamp to keep
+        lock_timeout_ms: Give up instead of queueing behind long-running
+            queries for the parent's lock
+    
+    Returns:
+        PartitionDropResult: Dropped partitions and deleted row count
+    """
+    column = PARTITIONED_TABLES[table]
+    
+    if not await is_partitioned(db, table):
+        result = await db.execute(
+            text(f"DELETE FROM {table} WHERE {column} < :cutoff"), {"cutoff": cutoff}
+        )
+        return PartitionDropResult(table=table, partitioned=False, partitions_dropped=[],
+                                   rows_deleted=result.rowcount)
+    
+    await db.execute(text(f"SET LOCAL lock_timeout = {int(lock_timeout_ms)}"))
+    dropped = []
+    for name in await list_partitions(db, table):
+        if add_months(partition_month(name), 1) > cutoff.date():
+            continue
+        await db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+        await db.execute(text(f"DROP TABLE {name}"))
+        dropped.append(name)
+    
+    rows_deleted = 0
+    default = default_partition_name(table)
+    exists = await db.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": default})
+    if exists.scalar():
+        result = await db.execute(
+            text(f"DELETE FROM {default} WHERE {column} < :cutoff"), {"cutoff": cutoff}
+        )
+        rows_deleted = result.rowcount
+    
+    if dropped or rows_deleted:
+        logger.info("Expired partitions dropped", table=table, partitions=dropped,
+                    default_rows_deleted=rows_deleted)
+    return PartitionDropResult(table=table, partitioned=True, partitions_dropped=dropped,
+                               rows_deleted=rows_deleted)
@@ -503,6 +503,83 @@ class DatabaseQueryMonitor:
 db_query_monitor = DatabaseQueryMonitor()
 
 
+class DatabasePoolMonitor:
+    """Track connection pool checkouts: wait time, occupancy and overflow."""
+    
+    def __init__(self, slow_checkout_threshold_ms: float = 50.0):
+        self.slow_checkout_threshold_ms = slow_checkout_threshold_ms
+        self.checkout_waits: Dict[str, deque] = defaultdict(lambda: deque(maxlen=1000))
+        self.checkouts: Dict[str, int] = defaultdict(int)
+        self.timeouts: Dict[str, int] = defaultdict(int)
+        self.overflow_checkouts: Dict[str, int] = defaultdict(int)
+        self.pools: Dict[str, Any] = {}
+    
+    def record_checkout(self, name: str, pool: Any, wait_ms: float, success: bool = True) -> None:
+        """
+        Record one connection checkout from a pool.
+        
+        A successful checkout that leaves more connections checked out than
+        the pool size was served from overflow and is counted in
+        ``overflow_checkouts``; a steadily growing count means the pool is
+        too small for the load.
+        """
+        self.pools[name] = pool
+        self.checkouts[name] += 1
+        self.checkout_waits[name].append(wait_ms)
+        
+        occupancy = self._occupancy(pool)
+        if not success:
+            self.timeouts[name] += 1
+        elif occupancy['checked_out'] > occupancy['pool_size']:
+            self.overflow_checkouts[name] += 1
+        
+        if wait_ms > self.slow_checkout_threshold_ms or not success:
+            logger.warning(
+                "Slow database pool checkout",
+                pool=name,
+                wait_ms=wait_ms,
+                timed_out=not success,
+                **occupancy
+            )
+        
+        metric = PerformanceMetric(
+            timestamp=datetime.utcnow(),
+            operation="database.pool_checkout",
+            duration_ms=wait_ms,
+            success=success,
+            context={'pool': name, **occupancy}
+        )
+        performance_collector.record_metric(metric)
+    
+    @staticmethod
+    def _occupancy(pool: Any) -> Dict[str, int]:
+        return {
+            'pool_size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'overflow': max(pool.overflow(), 0),
+        }
+    
+    def get_pool_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get checkout statistics and current occupancy for every monitored pool."""
+        stats = {}
+        for name, pool in self.pools.items():
+            waits = sorted(self.checkout_waits[name])
+            stats[name] = {
+                **self._occupancy(pool),
+                'checkouts': self.checkouts[name],
+                'timeouts': self.timeouts[name],
+                'overflow_checkouts': self.overflow_checkouts[name],
+                'avg_wait_ms': sum(waits) / len(waits) if waits else 0.0,
+                'p95_wait_ms': waits[min(int(len(waits) * 0.95), len(waits) - 1)] if waits else 0.0,
+                'max_wait_ms': waits[-1] if waits else 0.0,
+            }
+        return stats
+
+
+# Global database pool monitor
+db_pool_monitor = DatabasePoolMonitor()
+
+
 # Cleanup function for graceful shutdown
 async def cleanup_performance_monitoring():
     """Cleanup performance monitoring on application shutdown."""
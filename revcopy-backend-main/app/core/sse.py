@@ -0,0 +1,14 @@
+"""
+Server-sent event helpers for streaming endpoints.
+"""
+
+import json
+from typing import Any, Dict
+
+# Disable caching and proxy buffering (nginx) so events reach the client as they are written
+SSE_HEADERS = {"Cache-Control": "no-cache", "Connection": "keep-alive", "X-Accel-Buffering": "no"}
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one named server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
@@ -22,13 +22,16 @@ import time
 import uvicorn
 
 from app.core.config import settings
-from app.core.database import init_db
+from app.core.database import init_db, mark_recent_write
 from app.core.security import create_access_token
 
 # Import enterprise systems
 from app.core.performance import performance_collector, db_query_monitor, cleanup_performance_monitoring
 from app.core.cache import initialize_cache, cleanup_cache
 from app.core.background_tasks import initialize_task_manager, cleanup_task_manager
+from app.tasks.maintenance import register_maintenance_schedules
+from app.services.generation_stats import generation_stats
+from app.services.ai import close_ai_service, get_ai_service
 
 # Import API routers
 from app.api.v1 import auth, products, campaigns, analysis, content_generation, generation, intelligent_content, admin, prompt_management
@@ -193,7 +196,16 @@ async def lifespan(app: FastAPI):
         await initialize_cache()
         logger.info("Cache system initialized")
         
+        generation_stats.start()
+        
+        try:
+            get_ai_service()
+            logger.info("AI service initialized")
+        except Exception as e:
+            logger.warning("AI service unavailable, AI endpoints will return errors", error=str(e))
+        
         await initialize_task_manager()
+        await register_maintenance_schedules()
         logger.info("Task manager initialized")
         
         # Start performance monitoring
@@ -212,12 +224,17 @@ async def lifespan(app: FastAPI):
         logger.info("Shutting down RevCopy Backend Application")
         
         try:
+            await generation_stats.stop()
+            
             await cleanup_task_manager()
             logger.info("Task manager cleaned up")
             
             await cleanup_cache()
             logger.info("Cache system cleaned up")
             
+            await close_ai_service()
+            logger.info("AI service closed")
+            
             await cleanup_performance_monitoring()
             logger.info("Performance monitoring cleaned up")
             
@@ -471,6 +488,19 @@ async def database_session_middleware(request: Request, call_next):
         raise
 
 
+# Read-your-writes tracking for replica-backed read endpoints
+@app.middleware("http")
+async def read_your_writes_middleware(request: Request, call_next):
+    """
+    Pin a caller's reads to the primary database for a short window after
+    a successful write, so replica lag never hides their own changes.
+    """
+    response = await call_next(request)
+    if request.method in ("POST", "PUT", "PATCH", "DELETE") and response.status_code < 400:
+        await mark_recent_write(request)
+    return response
+
+
 if __name__ == "__main__":
     uvicorn.run(
         "app.main:app",
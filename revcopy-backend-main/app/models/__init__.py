@@ -4,10 +4,11 @@ Contains SQLAlchemy models for all entities.
 """
 
 from .user import User, UserRole
-from .product import Product, ProductImage
+from .product import Product, ProductImage, ProductReview
 from .analysis import Analysis, ReviewInsight, SentimentAnalysis
 from .content import Campaign, ContentType
 from .prompts import PromptTemplate, AIContentGeneration, ContentGenerationStats
+from .usage import DailyUsageRollup, UsageMetric
 from .admin import (
     Administrator, 
     Payment, 
@@ -28,6 +29,7 @@ __all__ = [
     "UserRole",
     "Product",
     "ProductImage", 
+    "ProductReview",
     "Analysis",
     "ReviewInsight",
     "SentimentAnalysis",
@@ -36,6 +38,8 @@ __all__ = [
     "PromptTemplate",
     "AIContentGeneration",
     "ContentGenerationStats",
+    "DailyUsageRollup",
+    "UsageMetric",
     "Administrator",
     "Payment",
     "AmazonAccount",
@@ -13,7 +13,7 @@ from datetime import datetime
 from typing import Optional
 from enum import Enum
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Numeric, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Numeric, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -105,6 +105,11 @@ class Administrator(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     created_by = Column(String(255), nullable=True)
     updated_by = Column(String(255), nullable=True)
+    
+    # Keyset pagination order
+    __table_args__ = (
+        Index('ix_administrators_created_at_id', 'created_at', 'id'),
+    )
 
     def __repr__(self) -> str:
         return f"<Administrator(id={self.id}, email='{self.email}', role='{self.role}')>"
@@ -149,6 +154,11 @@ class Payment(Base):
     
     # Relationships
     user = relationship("User", back_populates="payments")
+    
+    # Keyset pagination order
+    __table_args__ = (
+        Index('ix_payments_created_at_id', 'created_at', 'id'),
+    )
 
     def __repr__(self) -> str:
         return f"<Payment(id='{self.id}', amount={self.amount}, status='{self.status}')>"
@@ -61,6 +61,7 @@ class GeneratedContent(Base):
     saves: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     shares: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     
+    # Monthly partition key (see app.core.partitioning)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
     
@@ -9,12 +9,12 @@ from typing import Dict, List, Optional
 
 from sqlalchemy import (
     Boolean, Column, DateTime, Enum, Float, ForeignKey,
-    Integer, JSON, String, Text
+    Index, Integer, JSON, String, Text, UniqueConstraint
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
-from app.core.database import Base
+from app.core.database import Base, PortableJSONB
 
 
 class ProductStatus(enum.Enum):
@@ -112,7 +112,7 @@ class Product(Base):
     
     # Crawling metadata
     last_crawled_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
-    crawl_metadata: Mapped[Optional[Dict]] = mapped_column(JSON, nullable=True)
+    crawl_metadata: Mapped[Optional[Dict]] = mapped_column(PortableJSONB, nullable=True)
     error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     
     # Cache and optimization
@@ -120,8 +120,8 @@ class Product(Base):
     cache_expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     
     # SEO and marketing data
-    keywords: Mapped[Optional[List[str]]] = mapped_column(JSON, nullable=True)
-    tags: Mapped[Optional[List[str]]] = mapped_column(JSON, nullable=True)
+    keywords: Mapped[Optional[List[str]]] = mapped_column(PortableJSONB, nullable=True)
+    tags: Mapped[Optional[List[str]]] = mapped_column(PortableJSONB, nullable=True)
     competitive_products: Mapped[Optional[List[str]]] = mapped_column(JSON, nullable=True)
     
     # Timestamps
@@ -143,6 +143,20 @@ class Product(Base):
     generated_content: Mapped[List["GeneratedContent"]] = relationship(
         "GeneratedContent", back_populates="product", cascade="all, delete-orphan"
     )
+    reviews: Mapped[List["ProductReview"]] = relationship(
+        "ProductReview", back_populates="product", cascade="all, delete-orphan", lazy="noload"
+    )
+    
+    __table_args__ = (
+        # Keyset pagination order
+        Index('ix_products_created_at_id', 'created_at', 'id'),
+        # One stored product per platform listing; upserts conflict on this
+        UniqueConstraint('platform', 'external_product_id', name='uq_products_platform_external_product_id'),
+        # GIN indexes for @> containment filters
+        Index('ix_products_tags', 'tags', postgresql_using='gin', postgresql_ops={'tags': 'jsonb_path_ops'}),
+        Index('ix_products_keywords', 'keywords', postgresql_using='gin', postgresql_ops={'keywords': 'jsonb_path_ops'}),
+        Index('ix_products_crawl_metadata', 'crawl_metadata', postgresql_using='gin'),
+    )
     
     def __repr__(self) -> str:
         """String representation of Product."""
@@ -284,4 +298,71 @@ class ProductImage(Base):
         """Calculate image aspect ratio."""
         if self.width and self.height:
             return self.width / self.height
-        return None 
\ No newline at end of file
+        return None 
+
+
+class ProductReview(Base):
+    """
+    Customer review of a product, one row per review.
+    
+    Reviews are shared by every analysis of the product and deduplicated
+    per product by ``content_hash``, so recrawls only add new reviews.
+    
+    Attributes:
+        id: Primary key
+        product_id: Foreign key to the reviewed product
+        external_review_id: Platform review ID, when the crawler provides one
+        content_hash: SHA-256 of the normalized review, unique per product
+        rating: Star rating
+        title: Review headline
+        content: Review body
+        author: Reviewer display name
+        review_date: Date the review was posted
+        verified_purchase: Whether the platform marks the purchase verified
+        helpful_votes: Helpful votes on the platform
+        source: Where the review came from (crawler, fallback, ...)
+        review_metadata: Any other fields from the crawler
+    """
+    
+    __tablename__ = "product_reviews"
+    
+    # Primary key
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    
+    # Product relationship
+    product_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False
+    )
+    
+    # Identification and deduplication
+    external_review_id: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    
+    # Review content
+    rating: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    title: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+    author: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)
+    review_date: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    verified_purchase: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    helpful_votes: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    source: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+    review_metadata: Mapped[Optional[Dict]] = mapped_column(JSON, nullable=True)
+    
+    # Timestamps
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=func.now(), nullable=False
+    )
+    
+    # Relationships
+    product: Mapped["Product"] = relationship("Product", back_populates="reviews")
+    
+    __table_args__ = (
+        Index('ix_product_reviews_product_rating', 'product_id', 'rating'),
+        Index('ix_product_reviews_product_date', 'product_id', 'review_date'),
+        UniqueConstraint('product_id', 'content_hash', name='uq_product_reviews_product_id_content_hash'),
+    )
+    
+    def __repr__(self) -> str:
+        """String representation of ProductReview."""
+        return f"<ProductReview(id={self.id}, product_id={self.product_id}, rating={self.rating})>"
@@ -11,7 +11,7 @@ from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 
-from app.core.database import Base
+from app.core.database import Base, PortableJSONB
 
 
 class PromptTemplate(Base):
@@ -32,14 +32,14 @@ class PromptTemplate(Base):
     
     # Multi-language and cultural support
     primary_language = Column(String(10), default="en", index=True)  # ISO 639-1 language code
-    supported_languages = Column(JSON, default=["en"])  # List of supported languages
-    cultural_regions = Column(JSON, default=["north_america"])  # Supported cultural regions
+    supported_languages = Column(PortableJSONB, default=["en"])  # List of supported languages
+    cultural_regions = Column(PortableJSONB, default=["north_america"])  # Supported cultural regions
     localization_notes = Column(Text)  # Notes for localization teams
     
     # Context and targeting
     context_tags = Column(JSON, default=[])  # Context-specific tags (luxury, budget, tech, etc.)
     target_audience = Column(String(100))  # Target demographic
-    product_categories = Column(JSON, default=[])  # Suitable product categories
+    product_categories = Column(PortableJSONB, default=[])  # Suitable product categories
     price_ranges = Column(JSON, default=["all"])  # low, medium, high, luxury
     brand_personalities = Column(JSON, default=[])  # formal, casual, playful, etc.
     
@@ -151,6 +151,14 @@ class PromptTemplate(Base):
         Index('ix_template_performance', 'success_rate', 'average_user_rating'),
         Index('ix_template_active_category', 'is_active', 'category'),
         Index('ix_template_ab_test', 'ab_test_group', 'is_active'),
+        Index('ix_template_created_at_id', 'created_at', 'id'),
+        # GIN indexes for @> containment filters in candidate selection
+        Index('ix_template_supported_languages', 'supported_languages', postgresql_using='gin',
+              postgresql_ops={'supported_languages': 'jsonb_path_ops'}),
+        Index('ix_template_cultural_regions', 'cultural_regions', postgresql_using='gin',
+              postgresql_ops={'cultural_regions': 'jsonb_path_ops'}),
+        Index('ix_template_product_categories', 'product_categories', postgresql_using='gin',
+              postgresql_ops={'product_categories': 'jsonb_path_ops'}),
         UniqueConstraint('template_type', 'name', 'version', name='uq_template_name_version'),
     )
 
@@ -251,7 +259,8 @@ class AIContentGeneration(Base):
     __tablename__ = "ai_generated_content"
 
     id = Column(Integer, primary_key=True, index=True)
-    uuid = Column(UUID(as_uuid=True), default=uuid.uuid4, unique=True, index=True)
+    # Not unique: indexes on the partitioned table must include created_at to be unique
+    uuid = Column(UUID(as_uuid=True), default=uuid.uuid4, index=True)
     
     # Generation request details
     template_id = Column(Integer, ForeignKey("prompt_templates.id"))
@@ -341,7 +350,7 @@ class AIContentGeneration(Base):
     human_reviewer = Column(String(100))
     review_notes = Column(Text)
     
-    # Timestamps
+    # Timestamps; created_at is the monthly partition key (see app.core.partitioning)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     reviewed_at = Column(DateTime(timezone=True))
@@ -356,6 +365,7 @@ class AIContentGeneration(Base):
         Index('ix_generation_ab_test', 'ab_test_group', 'ab_test_variant'),
         Index('ix_generation_user_session', 'user_id', 'session_id'),
         Index('ix_generation_performance', 'content_quality_score', 'user_rating'),
+        Index('ix_generation_created_at_id', 'created_at', 'id'),
     )
 
 
@@ -370,7 +380,7 @@ class TemplatePerformanceMetric(Base):
     template_id = Column(Integer, ForeignKey("prompt_templates.id"), nullable=False)
     
     # Time period for metrics
-    metric_date = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    metric_date = Column(DateTime(timezone=True), server_default=func.now(), index=True)  # Monthly partition key
     period_type = Column(String(20), default="daily", index=True)  # hourly, daily, weekly, monthly
     
     # Basic usage metrics
@@ -0,0 +1,57 @@
+"""
+Usage rollup model for admin dashboard and usage analytics.
+Holds pre-aggregated daily counters maintained by a background task.
+"""
+
+from datetime import date, datetime
+
+from sqlalchemy import BigInteger, Date, DateTime, Index, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class UsageMetric:
+    """Metric names stored in ``daily_usage_rollups``."""
+    # Rows created that day
+    USERS_REGISTERED = "users_registered"
+    PRODUCTS_CREATED = "products_created"
+    CONTENT_GENERATED = "content_generated"  # dimension: content type
+    
+    # Point-in-time snapshots taken on each refresh; the latest day is current
+    USERS_ACTIVE_30D = "users_active_30d"
+    TEMPLATES_ACTIVE = "templates_active"
+
+
+class DailyUsageRollup(Base):
+    """
+    One counter per day, metric and dimension.
+    
+    Daily metrics count the rows created that day; summing them over a
+    range replaces a ``COUNT(*)`` or ``GROUP BY date`` over the source
+    table. Counts survive retention of the source rows, and deletions are
+    not subtracted, so totals are "ever created".
+    
+    Attributes:
+        id: Primary key
+        day: Calendar day (UTC)
+        metric: One of ``UsageMetric``
+        dimension: Breakdown value such as the content type, "" for none
+        count: Counter value
+        updated_at: Last refresh of this row
+    """
+    
+    __tablename__ = "daily_usage_rollups"
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    metric: Mapped[str] = mapped_column(String(50), nullable=False)
+    dimension: Mapped[str] = mapped_column(String(50), default="", nullable=False)
+    count: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    
+    __table_args__ = (
+        UniqueConstraint('day', 'metric', 'dimension', name='uq_daily_usage_rollup'),
+        Index('ix_usage_rollup_metric_day', 'metric', 'day'),
+    )
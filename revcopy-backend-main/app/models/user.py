@@ -9,7 +9,7 @@ from typing import List, Optional
 import enum
 
 import sqlalchemy as sa
-from sqlalchemy import Boolean, Column, DateTime, Enum, Integer, String, Text
+from sqlalchemy import Boolean, Column, DateTime, Enum, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -133,6 +133,11 @@ class User(Base):
         "Payment", back_populates="user", cascade="all, delete-orphan"
     )
     
+    # Keyset pagination order
+    __table_args__ = (
+        Index('ix_users_created_at_id', 'created_at', 'id'),
+    )
+    
     def __repr__(self) -> str:
         """String representation of User."""
         return f"<User(id={self.id}, email='{self.email}', role='{self.role.value}')>"
@@ -283,12 +283,14 @@ class CrawlerStatusUpdate(BaseModel):
 
 class PaginationResponse(BaseModel):
     """Generic pagination response schema."""
-    page: int = Field(..., description="Current page number")
+    page: Optional[int] = Field(None, description="Current page number (page mode only)")
     limit: int = Field(..., description="Items per page")
-    total: int = Field(..., description="Total items count")
-    total_pages: int = Field(..., description="Total pages count")
+    total: Optional[int] = Field(None, description="Total items count (page mode only)")
+    total_pages: Optional[int] = Field(None, description="Total pages count (page mode only)")
     has_next: bool = Field(..., description="Has next page")
     has_prev: bool = Field(..., description="Has previous page")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page")
+    estimated_total: Optional[int] = Field(None, description="Estimated total from table statistics (cursor mode, unfiltered)")
 
 
 class PaymentListResponse(BaseModel):
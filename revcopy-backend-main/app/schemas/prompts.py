@@ -347,6 +347,11 @@ class ContentGenerationRequest(BaseModel):
     # Additional options
     enable_cultural_adaptation: bool = Field(True, description="Enable cultural adaptation")
     include_performance_tracking: bool = Field(True, description="Include performance tracking")
+    use_cache: Optional[bool] = Field(
+        None,
+        description="True to reuse an identical earlier generation, False to force a fresh one; "
+                    "by default only low-temperature requests are cached"
+    )
     user_id: Optional[str] = Field(None, description="User ID for analytics")
 
 
@@ -374,6 +379,7 @@ class ContentGenerationResponse(BaseModel):
     language_used: str = Field(..., description="Language used")
     cultural_region_used: str = Field(..., description="Cultural region used")
     generation_timestamp: datetime = Field(..., description="Generation timestamp")
+    generation_id: Optional[int] = Field(None, description="Stored generation record ID, None if it could not be saved")
 
 
 class ContentGenerationFeedback(BaseModel):
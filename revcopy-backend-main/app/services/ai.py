@@ -3,23 +3,65 @@ AI service for content generation using various AI providers.
 """
 
 import os
+import json
+import time
 import asyncio
-from typing import Optional, Dict, List
+from typing import Any, AsyncIterator, Optional, Dict, List, Tuple
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 
 import structlog
 from openai import AsyncOpenAI
 import httpx
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 from app.core.config import settings
+from app.services.llm_cache import llm_response_cache
+from app.services.provider_health import get_provider_health
 
 # Configure logging
 logger = structlog.get_logger(__name__)
 
+# Long-lived HTTP clients shared by every provider instance, keyed by provider
+_http_clients: Dict[str, httpx.AsyncClient] = {}
+
+# Concurrent request limits shared by every AIService instance, keyed by provider
+_provider_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+def _provider_semaphore(provider: str) -> asyncio.Semaphore:
+    semaphore = _provider_semaphores.get(provider)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(settings.AI_PROVIDER_MAX_CONCURRENCY)
+        _provider_semaphores[provider] = semaphore
+    return semaphore
+
+
+async def close_ai_clients() -> None:
+    """Close the pooled provider HTTP clients on application shutdown."""
+    while _http_clients:
+        _, client = _http_clients.popitem()
+        await client.aclose()
+
+
+@dataclass
+class Completion:
+    """Generated text with the token usage reported by the provider."""
+    content: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
 
 class AIProvider(ABC):
     """Abstract base class for AI providers."""
     
+    # Whether generate_choices returns several completions from one API call (``n``)
+    supports_multiple_choices = False
+    
     @abstractmethod
     async def generate_content(
         self, 
@@ -33,15 +75,84 @@ class AIProvider(ABC):
     ) -> str:
         """Generate content using the AI provider."""
         pass
+    
+    async def complete(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        platform: Optional[str] = None,
+        cultural_context: Optional[Dict] = None,
+        **kwargs
+    ) -> Completion:
+        """Generate content with token usage; providers that do not report usage return zero tokens."""
+        content = await self.generate_content(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            platform=platform,
+            cultural_context=cultural_context,
+            **kwargs
+        )
+        return Completion(content=content)
+    
+    async def stream_content(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        platform: Optional[str] = None,
+        cultural_context: Optional[Dict] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Generate content, yielding text deltas as the provider produces them.
+        
+        Providers without streaming support yield the whole completion once.
+        """
+        yield await self.generate_content(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            platform=platform,
+            cultural_context=cultural_context,
+            **kwargs
+        )
+    
+    async def generate_choices(
+        self,
+        prompt: str,
+        count: int,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        platform: Optional[str] = None,
+        **kwargs
+    ) -> List[str]:
+        """Generate ``count`` completions in a single API call."""
+        raise NotImplementedError(f"{type(self).__name__} does not support multiple choices per request")
+    
+    async def close(self) -> None:
+        """Release clients owned by this provider instance."""
+        pass
 
 
 class OpenAIProvider(AIProvider):
     """OpenAI API provider for content generation."""
     
+    supports_multiple_choices = True
+    
     def __init__(self):
         self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
         self.model = "gpt-4-turbo-preview"
     
+    async def close(self) -> None:
+        await self.client.close()
+    
     async def generate_content(
         self, 
         prompt: str, 
@@ -53,6 +164,28 @@ class OpenAIProvider(AIProvider):
         **kwargs
     ) -> str:
         """Generate content using OpenAI API."""
+        completion = await self.complete(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            platform=platform,
+            cultural_context=cultural_context,
+            **kwargs
+        )
+        return completion.content
+    
+    async def complete(
+        self, 
+        prompt: str, 
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        platform: Optional[str] = None,
+        cultural_context: Optional[Dict] = None,
+        **kwargs
+    ) -> Completion:
+        """Generate content using OpenAI API, with token usage."""
         try:
             logger.info("Generating content with OpenAI", 
                        model=self.model, 
@@ -83,12 +216,90 @@ class OpenAIProvider(AIProvider):
                        tokens_used=response.usage.total_tokens,
                        platform=platform)
             
-            return content
+            return Completion(
+                content=content,
+                prompt_tokens=response.usage.prompt_tokens,
+                completion_tokens=response.usage.completion_tokens
+            )
             
         except Exception as e:
             logger.error("OpenAI content generation failed", error=str(e))
             raise Exception(f"OpenAI service unavailable: {str(e)}")
     
+    async def stream_content(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        platform: Optional[str] = None,
+        cultural_context: Optional[Dict] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Stream content deltas from the OpenAI API."""
+        if not system_prompt:
+            system_prompt = self._get_default_system_prompt(platform)
+        if cultural_context:
+            system_prompt += f"\n\nCultural Context: {cultural_context}"
+        
+        try:
+            stream = await self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+                **kwargs
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+                    
+        except Exception as e:
+            logger.error("OpenAI content streaming failed", error=str(e))
+            raise Exception(f"OpenAI service unavailable: {str(e)}")
+    
+    async def generate_choices(
+        self,
+        prompt: str,
+        count: int,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        platform: Optional[str] = None,
+        **kwargs
+    ) -> List[str]:
+        """Generate ``count`` completions with one request using ``n``."""
+        if not system_prompt:
+            system_prompt = self._get_default_system_prompt(platform)
+        
+        try:
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=temperature,
+                max_tokens=max_tokens,
+                n=count,
+                **kwargs
+            )
+            
+            logger.info("Content choices generated successfully",
+                       choices=len(response.choices),
+                       tokens_used=response.usage.total_tokens,
+                       platform=platform)
+            
+            return [choice.message.content for choice in sorted(response.choices, key=lambda c: c.index)]
+            
+        except Exception as e:
+            logger.error("OpenAI choice generation failed", error=str(e))
+            raise Exception(f"OpenAI service unavailable: {str(e)}")
+    
     def _get_default_system_prompt(self, platform: Optional[str] = None) -> str:
         """Get default system prompt based on platform."""
         base_prompt = "You are a professional marketing copywriter specializing in e-commerce content creation."
@@ -111,9 +322,32 @@ class DeepSeekProvider(AIProvider):
     
     def __init__(self):
         self.api_key = settings.DEEPSEEK_API_KEY
-        self.base_url = "https://api.deepseek.com/v1"
+        self.base_url = f"{settings.DEEPSEEK_BASE_URL.rstrip('/')}/v1"
         self.model = "deepseek-chat"
     
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        Pooled keep-alive client, created on first use.
+        
+        Reusing connections skips the TCP and TLS handshakes on every call
+        after the first; with HTTP/2 concurrent calls also share one
+        connection.
+        """
+        client = _http_clients.get("deepseek")
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                http2=settings.DEEPSEEK_HTTP2 and HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_connections=settings.DEEPSEEK_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.DEEPSEEK_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.DEEPSEEK_KEEPALIVE_EXPIRY
+                ),
+                timeout=httpx.Timeout(settings.DEEPSEEK_TIMEOUT, connect=settings.DEEPSEEK_CONNECT_TIMEOUT)
+            )
+            _http_clients["deepseek"] = client
+        return client
+    
     async def generate_content(
         self, 
         prompt: str, 
@@ -125,6 +359,28 @@ class DeepSeekProvider(AIProvider):
         **kwargs
     ) -> str:
         """Generate content using DeepSeek API."""
+        completion = await self.complete(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            platform=platform,
+            cultural_context=cultural_context,
+            **kwargs
+        )
+        return completion.content
+    
+    async def complete(
+        self, 
+        prompt: str, 
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        platform: Optional[str] = None,
+        cultural_context: Optional[Dict] = None,
+        **kwargs
+    ) -> Completion:
+        """Generate content using DeepSeek API, with token usage."""
         try:
             logger.info("Generating content with DeepSeek", 
                        model=self.model, 
@@ -139,40 +395,98 @@ class DeepSeekProvider(AIProvider):
             if cultural_context:
                 system_prompt += f"\n\nCultural Context: {cultural_context}"
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": self.model,
-                        "messages": [
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": prompt}
-                        ],
-                        "temperature": temperature,
-                        "max_tokens": max_tokens,
-                        **kwargs
-                    },
-                    timeout=60.0
-                )
-                
+            response = await self.client.post(
+                f"{self.base_url}/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "model": self.model,
+                    "messages": [
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": prompt}
+                    ],
+                    "temperature": temperature,
+                    "max_tokens": max_tokens,
+                    **kwargs
+                }
+            )
+            
+            if response.status_code != 200:
+                raise Exception(f"DeepSeek API error: {response.status_code} - {response.text}")
+            
+            data = response.json()
+            content = data["choices"][0]["message"]["content"]
+            usage = data.get("usage", {})
+            
+            logger.info("Content generated successfully with DeepSeek", 
+                       tokens_used=usage.get("total_tokens", 0),
+                       platform=platform)
+            
+            return Completion(
+                content=content,
+                prompt_tokens=usage.get("prompt_tokens", 0),
+                completion_tokens=usage.get("completion_tokens", 0)
+            )
+            
+        except Exception as e:
+            logger.error("DeepSeek content generation failed", error=str(e))
+            raise Exception(f"DeepSeek service unavailable: {str(e)}")
+    
+    async def stream_content(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        platform: Optional[str] = None,
+        cultural_context: Optional[Dict] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Stream content deltas from the DeepSeek API's server-sent events."""
+        if not system_prompt:
+            system_prompt = self._get_default_system_prompt(platform)
+        if cultural_context:
+            system_prompt += f"\n\nCultural Context: {cultural_context}"
+        
+        try:
+            async with self.client.stream(
+                "POST",
+                f"{self.base_url}/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "model": self.model,
+                    "messages": [
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": prompt}
+                    ],
+                    "temperature": temperature,
+                    "max_tokens": max_tokens,
+                    "stream": True,
+                    **kwargs
+                }
+            ) as response:
                 if response.status_code != 200:
-                    raise Exception(f"DeepSeek API error: {response.status_code} - {response.text}")
-                
-                data = response.json()
-                content = data["choices"][0]["message"]["content"]
-                
-                logger.info("Content generated successfully with DeepSeek", 
-                           tokens_used=data.get("usage", {}).get("total_tokens", 0),
-                           platform=platform)
-                
-                return content
+                    body = await response.aread()
+                    raise Exception(f"DeepSeek API error: {response.status_code} - {body.decode(errors='replace')}")
                 
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    payload = line[len("data:"):].strip()
+                    if payload == "[DONE]":
+                        break
+                    choices = json.loads(payload).get("choices") or [{}]
+                    delta = choices[0].get("delta", {}).get("content")
+                    if delta:
+                        yield delta
+                        
         except Exception as e:
-            logger.error("DeepSeek content generation failed", error=str(e))
+            logger.error("DeepSeek content streaming failed", error=str(e))
             raise Exception(f"DeepSeek service unavailable: {str(e)}")
     
     def _get_default_system_prompt(self, platform: Optional[str] = None) -> str:
@@ -219,6 +533,103 @@ class AIService:
             logger.error("No AI providers available")
             raise Exception("No AI providers configured")
     
+    def _candidate_providers(self, provider: str) -> List[str]:
+        """
+        Providers to try, in order.
+        
+        "auto" prefers OpenAI, then DeepSeek; an explicit provider goes first.
+        With ``AI_FAILOVER_ENABLED`` the remaining providers follow as
+        failover targets.
+        """
+        if provider == "auto":
+            # Try providers in order of preference
+            preferred_order = ["openai", "deepseek"]
+            candidates = [name for name in preferred_order if name in self.providers]
+        elif provider in self.providers:
+            candidates = [provider]
+        else:
+            raise Exception(f"Provider '{provider}' not available")
+        
+        candidates += [name for name in self.providers if name not in candidates]
+        if not settings.AI_FAILOVER_ENABLED:
+            return candidates[:1]
+        return candidates
+    
+    def _select_provider(self, provider: str) -> str:
+        """First candidate provider whose circuit breaker is not open."""
+        for name in self._candidate_providers(provider):
+            if get_provider_health(name).is_available():
+                return name
+        raise Exception("No AI provider available: all circuits are open")
+    
+    async def _call_provider(self, provider: str, **call_kwargs) -> Tuple[str, Completion]:
+        """Call one provider within its concurrency limit, recording the outcome on its breaker."""
+        health = get_provider_health(provider)
+        async with _provider_semaphore(provider):
+            started = time.monotonic()
+            try:
+                completion = await self.providers[provider].complete(**call_kwargs)
+            except asyncio.CancelledError:
+                health.release_trial()
+                raise
+            except Exception:
+                health.record(False, time.monotonic() - started)
+                raise
+            health.record(True, time.monotonic() - started)
+            return provider, completion
+    
+    def _cache_key(self, provider: str, call_kwargs: Dict) -> str:
+        model = getattr(self.providers[provider], "model", provider)
+        return llm_response_cache.key(provider, model, **call_kwargs)
+    
+    def _hedge_delay(self, provider: str) -> Optional[float]:
+        """Seconds to wait on ``provider`` before hedging, None to never hedge."""
+        if not settings.AI_HEDGING_ENABLED:
+            return None
+        p95 = get_provider_health(provider).p95_latency()
+        if p95 is None:
+            return None
+        return max(p95, settings.AI_HEDGE_MIN_DELAY_SECONDS)
+    
+    async def _call_with_hedge(self, primary: str, alternates: List[str], call_kwargs: Dict) -> Tuple[str, Completion]:
+        """
+        Call ``primary``; if it is still running at its p95 latency, race a second provider.
+        
+        The first successful answer wins and the other call is cancelled. A
+        provider used for hedging is removed from ``alternates`` so failover
+        does not retry it. Returns the answering provider and its completion.
+        """
+        primary_task = asyncio.create_task(self._call_provider(primary, **call_kwargs))
+        tasks = {primary_task}
+        try:
+            delay = self._hedge_delay(primary)
+            if delay is None:
+                return await primary_task
+            
+            done, _ = await asyncio.wait({primary_task}, timeout=delay)
+            if done:
+                return primary_task.result()
+            hedge = next((name for name in alternates if get_provider_health(name).allow_request()), None)
+            if hedge is None:
+                return await primary_task
+            
+            alternates.remove(hedge)
+            logger.info("Hedging AI request", provider=primary, hedge_provider=hedge, after_seconds=round(delay, 2))
+            tasks.add(asyncio.create_task(self._call_provider(hedge, **call_kwargs)))
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+            raise primary_task.exception()
+        finally:
+            # Also reached when the caller is cancelled mid-wait; don't leave calls running
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
     async def generate_content(
         self, 
         prompt: str, 
@@ -228,47 +639,195 @@ class AIService:
         max_tokens: int = 1000,
         platform: Optional[str] = None,
         cultural_context: Optional[Dict] = None,
+        cache: Optional[bool] = None,
         **kwargs
     ) -> str:
-        """Generate content using the specified or best available provider."""
+        """
+        Generate content using the specified or best available provider.
+        
+        Deterministic requests (see ``LLMResponseCache.is_cacheable``; pass
+        ``cache=True`` or ``cache=False`` to override) are answered from the
+        response cache when an identical request was served before. Only
+        the provider about to be called is looked up, so a failover provider's
+        cached answer is used only once the providers ahead of it failed.
+        Providers with an open circuit are skipped, a failed call fails over
+        to the next provider, and with ``AI_HEDGING_ENABLED`` a call slower
+        than the provider's recent p95 is raced against another provider.
+        """
+        call_kwargs = dict(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            platform=platform,
+            cultural_context=cultural_context,
+            **kwargs
+        )
+        errors = []
+        
         try:
-            # Determine which provider to use
-            if provider == "auto":
-                # Try providers in order of preference
-                preferred_order = ["openai", "deepseek"]
-                for preferred_provider in preferred_order:
-                    if preferred_provider in self.providers:
-                        provider = preferred_provider
-                        break
-                else:
-                    # Use first available provider
-                    provider = list(self.providers.keys())[0]
+            remaining = self._candidate_providers(provider)
+            use_cache = llm_response_cache.is_cacheable(temperature, cache)
             
-            if provider not in self.providers:
-                raise Exception(f"Provider '{provider}' not available")
+            while remaining:
+                name = remaining.pop(0)
+                if use_cache:
+                    cached = await llm_response_cache.lookup(self._cache_key(name, call_kwargs))
+                    if cached is not None:
+                        return cached
+                
+                if not get_provider_health(name).allow_request():
+                    errors.append(f"{name}: circuit open")
+                    continue
+                
+                logger.info("Generating content", 
+                           provider=name,
+                           platform=platform,
+                           max_tokens=max_tokens)
+                try:
+                    answered_by, completion = await self._call_with_hedge(name, remaining, call_kwargs)
+                except Exception as e:
+                    errors.append(f"{name}: {str(e)}")
+                    if remaining:
+                        logger.warning("AI provider failed, failing over", provider=name, error=str(e))
+                    continue
+                
+                if use_cache:
+                    await llm_response_cache.store(
+                        self._cache_key(answered_by, call_kwargs), answered_by, completion.content,
+                        completion.prompt_tokens, completion.completion_tokens
+                    )
+                return completion.content
             
-            ai_provider = self.providers[provider]
+            raise Exception("; ".join(errors) or "No AI provider available")
             
-            logger.info("Generating content", 
-                       provider=provider,
+        except Exception as e:
+            logger.error("Content generation failed", error=str(e))
+            raise Exception(f"Content generation failed: {str(e)}")
+    
+    async def stream_content(
+        self,
+        prompt: str,
+        provider: str = "auto",
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        platform: Optional[str] = None,
+        cultural_context: Optional[Dict] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Stream content deltas from the specified or best available provider.
+        
+        A provider that fails before producing any text fails over to the
+        next one; once text has been sent, errors are raised to the caller.
+        """
+        errors = []
+        for name in self._candidate_providers(provider):
+            health = get_provider_health(name)
+            if not health.allow_request():
+                errors.append(f"{name}: circuit open")
+                continue
+            
+            logger.info("Streaming content",
+                       provider=name,
                        platform=platform,
                        max_tokens=max_tokens)
             
-            content = await ai_provider.generate_content(
+            streamed = False
+            async with _provider_semaphore(name):
+                try:
+                    async for delta in self.providers[name].stream_content(
+                        prompt=prompt,
+                        system_prompt=system_prompt,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        platform=platform,
+                        cultural_context=cultural_context,
+                        **kwargs
+                    ):
+                        streamed = True
+                        yield delta
+                except (asyncio.CancelledError, GeneratorExit):
+                    health.release_trial()
+                    raise
+                except Exception as e:
+                    # Stream durations are not comparable to call latencies, so none is recorded
+                    health.record(False)
+                    if streamed:
+                        raise
+                    errors.append(f"{name}: {str(e)}")
+                    logger.warning("AI provider stream failed, failing over", provider=name, error=str(e))
+                    continue
+            
+            health.record(True)
+            return
+        
+        raise Exception(f"Content streaming failed: {'; '.join(errors) or 'No AI provider available'}")
+    
+    async def iter_multiple_versions(
+        self,
+        prompt: str,
+        count: int = 3,
+        provider: str = "auto",
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.8,
+        max_tokens: int = 1000,
+        platform: Optional[str] = None,
+        **kwargs
+    ) -> AsyncIterator[Tuple[int, str]]:
+        """
+        Generate content versions concurrently, yielding ``(index, content)`` as each completes.
+        
+        Providers that support it return all versions from a single request.
+        Otherwise each version is its own request, with the temperature
+        raised slightly per version, and requests beyond
+        ``AI_PROVIDER_MAX_CONCURRENCY`` per provider wait their turn. Closing
+        the iterator early, as a streaming response does when the client
+        disconnects, cancels the versions still in flight.
+        """
+        provider = self._select_provider(provider)
+        ai_provider = self.providers[provider]
+        
+        if count > 1 and ai_provider.supports_multiple_choices:
+            async with _provider_semaphore(provider):
+                versions = await ai_provider.generate_choices(
+                    prompt=prompt,
+                    count=count,
+                    system_prompt=system_prompt,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    platform=platform,
+                    **kwargs
+                )
+            for index, content in enumerate(versions):
+                yield index, content
+            return
+        
+        async def generate_version(index: int) -> Tuple[int, str]:
+            content = await self.generate_content(
                 prompt=prompt,
+                provider=provider,
                 system_prompt=system_prompt,
-                temperature=temperature,
+                # Vary temperature slightly for different versions
+                temperature=temperature + (index * 0.1),
                 max_tokens=max_tokens,
                 platform=platform,
-                cultural_context=cultural_context,
                 **kwargs
             )
-            
-            return content
-            
-        except Exception as e:
-            logger.error("Content generation failed", error=str(e))
-            raise Exception(f"Content generation failed: {str(e)}")
+            return index, content
+        
+        tasks = [asyncio.create_task(generate_version(index)) for index in range(count)]
+        try:
+            for completed in asyncio.as_completed(tasks):
+                yield await completed
+        finally:
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            if pending:
+                logger.info("Cancelled pending content versions", cancelled=len(pending))
     
     async def generate_multiple_versions(
         self,
@@ -281,28 +840,23 @@ class AIService:
         platform: Optional[str] = None,
         **kwargs
     ) -> List[str]:
-        """Generate multiple content versions."""
+        """Generate multiple content versions concurrently, returned in version order."""
         try:
-            versions = []
-            
-            for i in range(count):
-                # Vary temperature slightly for different versions
-                version_temperature = temperature + (i * 0.1)
-                
-                content = await self.generate_content(
-                    prompt=prompt,
-                    provider=provider,
-                    system_prompt=system_prompt,
-                    temperature=version_temperature,
-                    max_tokens=max_tokens,
-                    platform=platform,
-                    **kwargs
-                )
-                
-                versions.append(content)
+            versions: Dict[int, str] = {}
+            async for index, content in self.iter_multiple_versions(
+                prompt=prompt,
+                count=count,
+                provider=provider,
+                system_prompt=system_prompt,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                platform=platform,
+                **kwargs
+            ):
+                versions[index] = content
             
             logger.info("Generated multiple content versions", count=len(versions))
-            return versions
+            return [versions[index] for index in sorted(versions)]
             
         except Exception as e:
             logger.error("Multiple version generation failed", error=str(e))
@@ -315,4 +869,47 @@ class AIService:
     def is_provider_available(self, provider: str) -> bool:
         """Check if a specific provider is available."""
         return provider in self.providers
+    
+    def get_provider_health(self) -> Dict[str, Dict]:
+        """Circuit breaker state and recent call statistics per provider."""
+        return {name: get_provider_health(name).snapshot() for name in self.providers}
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Response cache hit rate and the tokens and cost it saved in this process."""
+        return llm_response_cache.get_stats()
+    
+    async def close(self) -> None:
+        """Close every provider's client."""
+        for name, provider in self.providers.items():
+            try:
+                await provider.close()
+            except Exception as e:
+                logger.warning("Failed to close AI provider", provider=name, error=str(e))
+
+
+# Application-scoped service shared by every request; see get_ai_service
+_ai_service: Optional[AIService] = None
+
+
+def get_ai_service() -> AIService:
+    """
+    Return the shared AIService, creating it on first use.
+    
+    The application lifespan creates it at startup and closes it on
+    shutdown; scripts and workers running outside the app get the same
+    instance lazily. Raises if no provider is configured.
+    """
+    global _ai_service
+    if _ai_service is None:
+        _ai_service = AIService()
+    return _ai_service
+
+
+async def close_ai_service() -> None:
+    """Close the shared AIService and the pooled provider HTTP clients."""
+    global _ai_service
+    if _ai_service is not None:
+        await _ai_service.close()
+        _ai_service = None
+    await close_ai_clients()
 
@@ -9,7 +9,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.models.analysis import Analysis, AnalysisStatus, SentimentType
-from app.services.ai import AIService
+from app.services.ai import get_ai_service
+from app.services.review_store import ReviewStore
 
 # Configure logging
 logger = structlog.get_logger(__name__)
@@ -19,15 +20,16 @@ class AnalysisService:
     """Service for product analysis and insights generation."""
     
     def __init__(self):
-        self.ai_service = AIService()
+        self.ai_service = get_ai_service()
+        self.review_store = ReviewStore()
     
     async def create_analysis(
         self,
         product_id: int,
         user_id: int,
+        db: AsyncSession,
         analysis_type: str = "full_analysis",
-        max_reviews: int = 50,
-        db: AsyncSession
+        max_reviews: int = 50
     ) -> Analysis:
         """Create a new analysis record."""
         try:
@@ -80,8 +82,8 @@ class AnalysisService:
             if not product:
                 raise Exception(f"Product {analysis.product_id} not found")
             
-            # Extract reviews from product data
-            reviews = product.reviews_data or []
+            # Rating-stratified sample of the stored reviews
+            reviews = await self.review_store.sample_reviews(db, product.id, analysis.max_reviews)
             
             if not reviews:
                 logger.warning("No reviews found for analysis", analysis_id=analysis.id)
@@ -90,9 +92,6 @@ class AnalysisService:
                 await db.commit()
                 return False
             
-            # Limit reviews based on max_reviews setting
-            reviews = reviews[:analysis.max_reviews]
-            
             # Perform sentiment analysis
             sentiment_results = await self._analyze_sentiment(reviews)
             
@@ -174,7 +173,8 @@ class AnalysisService:
                     ai_analysis = await self.ai_service.generate_content(
                         prompt=ai_prompt,
                         max_tokens=500,
-                        temperature=0.3
+                        temperature=0.3,
+                        cache=True
                     )
                     logger.info("AI sentiment analysis completed")
                 except Exception as ai_error:
@@ -232,7 +232,8 @@ class AnalysisService:
                     ai_insights = await self.ai_service.generate_content(
                         prompt=ai_prompt,
                         max_tokens=400,
-                        temperature=0.4
+                        temperature=0.4,
+                        cache=True
                     )
                     
                     # Parse AI response (simplified parsing)
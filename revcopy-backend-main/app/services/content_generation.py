@@ -4,19 +4,21 @@ Integrates AI models with product analysis for intelligent content creation.
 """
 
 import time
-from typing import Dict, List, Optional, Any, Tuple
-from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, List, Optional, Any, Tuple
+from datetime import datetime
 import json
 
 import structlog
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
 from app.core.config import settings
-from app.models.prompts import PromptTemplate, AIContentGeneration, ContentGenerationStats
+from app.core.pagination import InvalidCursorError, KeysetPage, paginate_keyset
+from app.models.prompts import PromptTemplate, AIContentGeneration
 from app.schemas.prompts import ContentGenerationRequest, ContentGenerationResponse
-from app.services.ai import ai_service
+from app.services.ai import AIService, get_ai_service
+from app.services.generation_stats import generation_stats
 from app.services.product import ProductService
 from app.services.review_scraping import ReviewScrapingService
 
@@ -29,7 +31,10 @@ class ContentGenerationService:
     def __init__(self):
         self.product_service = ProductService()
         self.review_service = ReviewScrapingService()
-        self.ai_service = ai_service
+    
+    @property
+    def ai_service(self) -> AIService:
+        return get_ai_service()
     
     async def generate_content(
         self,
@@ -49,7 +54,15 @@ class ContentGenerationService:
             Content generation response
         """
         start_time = time.time()
-        generation_record = None
+        
+        # The generation record is only written once the outcome is known,
+        # together with the statistics, in a single transaction
+        generation_record = AIContentGeneration(
+            template_type=request.template_type,
+            ai_provider=request.ai_provider,
+            product_url=request.product_url,
+            session_id=user_id
+        )
         
         try:
             logger.info(
@@ -59,31 +72,7 @@ class ContentGenerationService:
                 ai_provider=request.ai_provider
             )
             
-            # Create generation record
-            generation_record = AIContentGeneration(
-                template_type=request.template_type,
-                ai_provider=request.ai_provider,
-                product_url=request.product_url,
-                session_id=user_id
-            )
-            db.add(generation_record)
-            await db.commit()
-            await db.refresh(generation_record)
-            
-            # Get or load prompt template
-            template = await self._get_prompt_template(db, request)
-            if template:
-                generation_record.template_id = template.id
-            
-            # Extract product data and reviews
-            product_data, reviews_data = await self._extract_product_and_reviews(request.product_url)
-            
-            # Update generation record with input data
-            generation_record.product_data = product_data
-            generation_record.reviews_analyzed = len(reviews_data)
-            generation_record.input_parameters = request.custom_variables
-            generation_record.temperature = float(request.temperature or template.default_temperature if template else settings.AI_TEMPERATURE)
-            generation_record.max_tokens = request.max_tokens or (template.default_max_tokens if template else settings.AI_MAX_TOKENS)
+            template, product_data, reviews_data = await self._prepare_generation(db, request, generation_record)
             
             # Generate content using AI service
             result = await self._generate_with_ai(
@@ -102,11 +91,7 @@ class ContentGenerationService:
             generation_record.generation_time_ms = generation_time_ms
             generation_record.success = True
             
-            # Update template usage statistics
-            if template:
-                await self._update_template_stats(db, template.id, success=True)
-            
-            await db.commit()
+            generation_id = await self.save_generation(db, generation_record)
             
             # Create response
             response = ContentGenerationResponse(
@@ -123,37 +108,28 @@ class ContentGenerationService:
                 ai_provider=request.ai_provider,
                 language_used=request.language,
                 cultural_region_used=request.cultural_region,
-                generation_timestamp=datetime.utcnow()
+                generation_timestamp=datetime.utcnow(),
+                generation_id=generation_id
             )
             
             logger.info(
                 "Content generation completed successfully",
-                generation_id=generation_record.id,
+                generation_id=generation_id,
+                saved=generation_id is not None,
                 generation_time_ms=generation_time_ms,
                 content_length=len(result["content"]) if result["content"] else 0
             )
             
-            # Update daily statistics
-            await self._update_daily_stats(db, request.template_type, request.ai_provider, success=True)
-            
             return response
             
         except Exception as e:
             logger.error("Content generation failed", error=str(e), product_url=request.product_url)
             
-            # Update generation record with error
-            if generation_record:
-                generation_record.success = False
-                generation_record.error_message = str(e)
-                generation_record.generation_time_ms = int((time.time() - start_time) * 1000)
-                await db.commit()
-                
-                # Update template stats
-                if hasattr(generation_record, 'template_id') and generation_record.template_id:
-                    await self._update_template_stats(db, generation_record.template_id, success=False)
-            
-            # Update daily statistics
-            await self._update_daily_stats(db, request.template_type, request.ai_provider, success=False)
+            # Record the failed generation
+            generation_record.success = False
+            generation_record.error_message = str(e)
+            generation_record.generation_time_ms = int((time.time() - start_time) * 1000)
+            await self.save_generation(db, generation_record)
             
             return ContentGenerationResponse(
                 generated_content="Content generation failed. Please try again.",
@@ -172,6 +148,164 @@ class ContentGenerationService:
                 generation_timestamp=datetime.utcnow()
             )
     
+    async def stream_content(
+        self,
+        db: AsyncSession,
+        request: ContentGenerationRequest,
+        user_id: Optional[str] = None
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Generate content like ``generate_content``, yielding text as it arrives.
+        
+        Yields ``("delta", {"text": ...})`` events followed by a single
+        ``("done", {...})`` or ``("error", {...})`` event. The generation
+        record is saved with the full text once the provider stream ends.
+        Without a prompt template the content is generated in one piece and
+        sent as a single delta.
+        """
+        start_time = time.time()
+        generation_record = AIContentGeneration(
+            template_type=request.template_type,
+            ai_provider=request.ai_provider,
+            product_url=request.product_url,
+            session_id=user_id
+        )
+        chunks: List[str] = []
+        first_token_ms = None
+        
+        try:
+            template, product_data, reviews_data = await self._prepare_generation(db, request, generation_record)
+            
+            if template:
+                generation = await self._build_template_generation(template, product_data, reviews_data, request)
+                deltas = self.ai_service.stream_content(provider=generation["provider"], **generation["kwargs"])
+                metadata = {"provider": generation["provider"], "template_id": template.id,
+                            "template_variables": generation["variables"]}
+            else:
+                result = await self._generate_with_ai(None, product_data, reviews_data, request)
+                deltas = self._single_delta(result["content"])
+                metadata = result
+            
+            async for delta in deltas:
+                if first_token_ms is None:
+                    first_token_ms = int((time.time() - start_time) * 1000)
+                chunks.append(delta)
+                yield "delta", {"text": delta}
+            
+            generation_record.generated_content = "".join(chunks)
+            generation_record.content_metadata = metadata
+            generation_record.generation_time_ms = int((time.time() - start_time) * 1000)
+            generation_record.success = True
+            generation_id = await self.save_generation(db, generation_record)
+            
+            logger.info(
+                "Content generation stream completed",
+                generation_id=generation_id,
+                saved=generation_id is not None,
+                first_token_ms=first_token_ms,
+                generation_time_ms=generation_record.generation_time_ms
+            )
+            
+            yield "done", {
+                "generation_id": generation_id,
+                "saved": generation_id is not None,
+                "template_id": template.id if template else None,
+                "template_name": template.name if template else "Default Template",
+                "ai_provider": metadata.get("provider", request.ai_provider),
+                "first_token_ms": first_token_ms,
+                "generation_time_ms": generation_record.generation_time_ms
+            }
+            
+        except Exception as e:
+            logger.error("Content generation stream failed", error=str(e), product_url=request.product_url)
+            
+            generation_record.success = False
+            generation_record.error_message = str(e)
+            generation_record.generated_content = "".join(chunks) or None
+            generation_record.generation_time_ms = int((time.time() - start_time) * 1000)
+            await self.save_generation(db, generation_record)
+            
+            yield "error", {"detail": "Content generation failed. Please try again."}
+    
+    async def stream_versions(
+        self,
+        db: AsyncSession,
+        request: ContentGenerationRequest,
+        count: int
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Generate ``count`` alternative versions from the request's template.
+        
+        Yields ``("version", {"index": ..., "text": ...})`` events as each
+        version completes, followed by a single ``("done", {...})`` or
+        ``("error", {...})`` event. Closing the generator, as the streaming
+        response does when the client disconnects, cancels the versions still
+        in flight. The versions are candidates to choose from, so no
+        generation record is saved.
+        """
+        start_time = time.time()
+        completed = 0
+        
+        try:
+            generation_record = AIContentGeneration(template_type=request.template_type)
+            template, product_data, reviews_data = await self._prepare_generation(db, request, generation_record)
+            if not template:
+                yield "error", {"detail": f"No prompt template available for {request.template_type}"}
+                return
+            
+            generation = await self._build_template_generation(template, product_data, reviews_data, request)
+            versions = self.ai_service.iter_multiple_versions(
+                count=count,
+                provider=generation["provider"],
+                **generation["kwargs"]
+            )
+            try:
+                async for index, text in versions:
+                    completed += 1
+                    yield "version", {"index": index, "text": text}
+            finally:
+                # Closing this generator does not close the inner one by itself
+                await versions.aclose()
+            
+            yield "done", {
+                "template_id": template.id,
+                "template_name": template.name,
+                "ai_provider": generation["provider"],
+                "versions": completed,
+                "generation_time_ms": int((time.time() - start_time) * 1000)
+            }
+            
+        except Exception as e:
+            logger.error("Version generation stream failed", error=str(e), product_url=request.product_url)
+            yield "error", {"detail": "Content generation failed. Please try again."}
+    
+    async def _single_delta(self, content: str) -> AsyncIterator[str]:
+        yield content
+    
+    async def _prepare_generation(
+        self,
+        db: AsyncSession,
+        request: ContentGenerationRequest,
+        generation_record: AIContentGeneration
+    ) -> Tuple[Optional[PromptTemplate], Dict, List[Dict]]:
+        """Load the template, product and reviews and record the inputs."""
+        # Get or load prompt template
+        template = await self._get_prompt_template(db, request)
+        if template:
+            generation_record.template_id = template.id
+        
+        # Extract product data and reviews
+        product_data, reviews_data = await self._extract_product_and_reviews(request.product_url)
+        
+        # Update generation record with input data
+        generation_record.product_data = product_data
+        generation_record.reviews_analyzed = len(reviews_data)
+        generation_record.input_parameters = request.custom_variables
+        generation_record.temperature = float(request.temperature or template.default_temperature if template else settings.AI_TEMPERATURE)
+        generation_record.max_tokens = request.max_tokens or (template.default_max_tokens if template else settings.AI_MAX_TOKENS)
+        
+        return template, product_data, reviews_data
+    
     async def _get_prompt_template(
         self,
         db: AsyncSession,
@@ -275,30 +409,16 @@ class ContentGenerationService:
     ) -> Dict[str, Any]:
         """Generate content using a specific template."""
         try:
-            # Prepare template variables
-            variables = await self._prepare_template_variables(
-                product_data, reviews_data, request.custom_variables
-            )
-            
-            # Format the prompt
-            formatted_prompt = template.user_prompt_template.format(**variables)
-            
-            # Get AI provider
-            provider_name = request.ai_provider
-            if provider_name not in self.ai_service.providers:
-                provider_name = list(self.ai_service.providers.keys())[0]
-            
-            provider = self.ai_service.providers[provider_name]
-            
-            # Generate content
-            temperature = request.temperature or float(template.default_temperature)
-            max_tokens = request.max_tokens or template.default_max_tokens
-            
-            generated_content = await provider.generate_content(
-                prompt=formatted_prompt,
-                system_prompt=template.system_prompt,
-                temperature=temperature,
-                max_tokens=max_tokens
+            generation = await self._build_template_generation(template, product_data, reviews_data, request)
+            provider_name = generation["provider"]
+            variables = generation["variables"]
+            
+            # Generate content; the same template and product inputs give an
+            # equivalent result, so refreshes and retries reuse the cached one
+            generated_content = await self.ai_service.generate_content(
+                provider=provider_name,
+                cache=request.use_cache,
+                **generation["kwargs"]
             )
             
             # Analyze reviews for metadata
@@ -325,6 +445,35 @@ class ContentGenerationService:
             logger.error("Template-based generation failed", error=str(e))
             raise
     
+    async def _build_template_generation(
+        self,
+        template: PromptTemplate,
+        product_data: Dict,
+        reviews_data: List[Dict],
+        request: ContentGenerationRequest
+    ) -> Dict[str, Any]:
+        """Format a template's prompt and pick the provider and generation parameters."""
+        # Prepare template variables
+        variables = await self._prepare_template_variables(
+            product_data, reviews_data, request.custom_variables
+        )
+        
+        # Get AI provider
+        provider_name = request.ai_provider
+        if provider_name not in self.ai_service.providers:
+            provider_name = list(self.ai_service.providers.keys())[0]
+        
+        return {
+            "provider": provider_name,
+            "variables": variables,
+            "kwargs": {
+                "prompt": template.user_prompt_template.format(**variables),
+                "system_prompt": template.system_prompt,
+                "temperature": request.temperature or float(template.default_temperature),
+                "max_tokens": request.max_tokens or template.default_max_tokens
+            }
+        }
+    
     async def _prepare_template_variables(
         self,
         product_data: Dict,
@@ -367,103 +516,56 @@ class ContentGenerationService:
             logger.error("Failed to prepare template variables", error=str(e))
             return {}
     
-    async def _update_template_stats(self, db: AsyncSession, template_id: int, success: bool):
-        """Update template usage statistics."""
-        try:
-            result = await db.execute(
-                select(PromptTemplate).where(PromptTemplate.id == template_id)
-            )
-            template = result.scalar_one_or_none()
-            
-            if template:
-                template.usage_count += 1
-                
-                # Update success rate
-                if success:
-                    current_rate = float(template.success_rate)
-                    new_rate = ((current_rate * (template.usage_count - 1)) + 100) / template.usage_count
-                    template.success_rate = str(round(new_rate, 2))
-                else:
-                    current_rate = float(template.success_rate)
-                    new_rate = (current_rate * (template.usage_count - 1)) / template.usage_count
-                    template.success_rate = str(round(new_rate, 2))
-                
-                await db.commit()
-                
-        except Exception as e:
-            logger.error("Failed to update template stats", error=str(e))
-    
-    async def _update_daily_stats(
-        self,
-        db: AsyncSession,
-        template_type: str,
-        ai_provider: str,
-        success: bool
-    ):
-        """Update daily generation statistics."""
+    async def save_generation(self, db: AsyncSession, generation_record: AIContentGeneration) -> Optional[int]:
+        """
+        Write a finished generation record and its statistics with one commit.
+        
+        Buffered statistics go to the batched stats writer instead, leaving
+        the record as the only write in the transaction.
+        
+        Returns:
+            The stored record's ID, or None if the write failed and the record was lost
+        """
         try:
-            today = datetime.utcnow().date()
-            
-            # Get or create today's stats
-            result = await db.execute(
-                select(ContentGenerationStats).where(
-                    ContentGenerationStats.date >= today,
-                    ContentGenerationStats.date < today + timedelta(days=1),
-                    ContentGenerationStats.period_type == "daily"
-                )
+            db.add(generation_record)
+            await generation_stats.record(
+                db, generation_record.template_id, generation_record.template_type,
+                generation_record.ai_provider, bool(generation_record.success)
             )
-            stats = result.scalar_one_or_none()
-            
-            if not stats:
-                stats = ContentGenerationStats(
-                    date=datetime.combine(today, datetime.min.time()),
-                    period_type="daily"
-                )
-                db.add(stats)
-            
-            # Update statistics
-            stats.total_generations += 1
-            if success:
-                stats.successful_generations += 1
-            else:
-                stats.failed_generations += 1
-            
-            # Update provider stats
-            if ai_provider == "openai":
-                stats.openai_usage += 1
-            elif ai_provider == "deepseek":
-                stats.deepseek_usage += 1
-            
-            # Update content type stats
-            if template_type == "product_description":
-                stats.product_descriptions += 1
-            elif template_type == "faq":
-                stats.faqs_generated += 1
-            elif template_type == "comparison":
-                stats.comparisons_generated += 1
-            
             await db.commit()
+            return generation_record.id
             
         except Exception as e:
-            logger.error("Failed to update daily stats", error=str(e))
+            await db.rollback()
+            logger.error("Failed to save content generation, record lost",
+                        error=str(e),
+                        template_id=generation_record.template_id,
+                        product_url=generation_record.product_url,
+                        success=generation_record.success)
+            return None
     
     async def get_generation_history(
         self,
         db: AsyncSession,
         user_id: Optional[str] = None,
-        limit: int = 50
-    ) -> List[Dict]:
-        """Get content generation history."""
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> KeysetPage:
+        """
+        Get content generation history, newest first.
+        
+        Returns one page of history entries; pass its ``next_cursor`` back as
+        ``cursor`` for the following page.
+        """
         try:
-            query = select(AIContentGeneration).order_by(AIContentGeneration.created_at.desc()).limit(limit)
+            query = select(AIContentGeneration)
             
             if user_id:
                 query = query.where(AIContentGeneration.session_id == user_id)
             
-            result = await db.execute(query)
-            generations = result.scalars().all()
+            page = await paginate_keyset(db, query, AIContentGeneration, limit, cursor)
             
-            return [
+            page.items = [
                 {
                     "id": gen.id,
                     "template_type": gen.template_type,
@@ -475,12 +577,15 @@ class ContentGenerationService:
                     "created_at": gen.created_at,
                     "error_message": gen.error_message
                 }
-                for gen in generations
+                for gen in page.items
             ]
+            return page
             
+        except InvalidCursorError:
+            raise
         except Exception as e:
             logger.error("Failed to get generation history", error=str(e))
-            return []
+            return KeysetPage(items=[], next_cursor=None)
     
     async def provide_feedback(
         self,
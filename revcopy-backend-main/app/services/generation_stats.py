@@ -0,0 +1,342 @@
+"""
+Usage counters for prompt templates and daily generation statistics.
+
+Every generation bumps its template's usage counters and the day's row in
+``content_generation_stats``. Both are written as single statements that
+compute the new values from the stored ones (``SET x = x + n`` and
+``INSERT ... ON CONFLICT DO UPDATE``), so concurrent generations never
+overwrite each other's increments and the first generations of a day
+cannot race into duplicate rows.
+
+With ``GENERATION_STATS_BUFFERED`` (the default) the increments are
+collected in Redis, or in process when Redis is unavailable, and folded
+into the database in one transaction every
+``GENERATION_STATS_FLUSH_INTERVAL`` seconds, taking the hot template and
+daily rows out of the request path entirely.
+"""
+
+import asyncio
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Optional
+
+import structlog
+from sqlalchemy import BigInteger, Float, JSON, cast, func, literal, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.database import get_async_session
+from app.models.prompts import ContentGenerationStats, PromptTemplate
+
+# Configure logging
+logger = structlog.get_logger(__name__)
+
+TEMPLATE_BUFFER_KEY = "generation_stats:templates"
+DAILY_BUFFER_KEY = "generation_stats:daily"
+
+
+def _json_increment(column: Any, increments: Dict[str, int], dialect_name: str) -> Any:
+    """SQL expression adding ``increments`` to the integer values of a JSON object column."""
+    if dialect_name == "sqlite":
+        expression = func.coalesce(column, "{}")
+        for key, amount in increments.items():
+            path = '$."%s"' % key.replace('"', "")
+            expression = func.json_set(expression, path, func.coalesce(func.json_extract(column, path), 0) + amount)
+        return expression
+    
+    current = func.coalesce(cast(column, JSONB), cast(literal("{}"), JSONB))
+    pairs = []
+    for key, amount in increments.items():
+        pairs += [literal(key), func.coalesce(cast(current.op("->>")(key), BigInteger), 0) + amount]
+    return cast(current.op("||")(func.jsonb_build_object(*pairs)), JSON)
+
+
+async def increment_template_stats(db: AsyncSession, template_id: int, uses: int, successes: int) -> None:
+    """
+    Add ``uses`` generations, ``successes`` of them successful, to a template.
+    
+    ``success_rate`` is the fraction of successful generations, recomputed
+    from the stored rate and count in the same statement. The caller commits.
+    """
+    usage = func.coalesce(PromptTemplate.usage_count, 0)
+    rate = func.coalesce(PromptTemplate.success_rate, 0.0)
+    await db.execute(
+        update(PromptTemplate)
+        .where(PromptTemplate.id == template_id)
+        .values(
+            usage_count=usage + uses,
+            success_rate=(rate * usage + successes) / (usage + uses),
+            last_used_at=func.now()
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def increment_daily_stats(
+    db: AsyncSession,
+    day: date,
+    total: int,
+    successes: int,
+    providers: Dict[str, int],
+    content_types: Dict[str, int]
+) -> None:
+    """
+    Add generations to the daily ``content_generation_stats`` row, creating it if needed.
+    
+    The caller commits.
+    """
+    dialect_name = db.bind.dialect.name
+    insert = sqlite.insert if dialect_name == "sqlite" else postgresql.insert
+    statement = insert(ContentGenerationStats).values(
+        date=datetime(day.year, day.month, day.day, tzinfo=timezone.utc),
+        period_type="daily",
+        total_generations=total,
+        successful_generations=successes,
+        failed_generations=total - successes,
+        success_rate=successes / total if total else 0.0,
+        provider_usage=providers,
+        content_type_breakdown=content_types,
+    )
+    
+    stats = ContentGenerationStats
+    new_total = func.coalesce(stats.total_generations, 0) + statement.excluded.total_generations
+    new_successes = func.coalesce(stats.successful_generations, 0) + statement.excluded.successful_generations
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=[stats.date, stats.period_type],
+        set_={
+            "total_generations": new_total,
+            "successful_generations": new_successes,
+            "failed_generations": func.coalesce(stats.failed_generations, 0) + statement.excluded.failed_generations,
+            "success_rate": cast(new_successes, Float) / new_total,
+            "provider_usage": _json_increment(stats.provider_usage, providers, dialect_name),
+            "content_type_breakdown": _json_increment(stats.content_type_breakdown, content_types, dialect_name),
+            "updated_at": func.now(),
+        }
+    ))
+
+
+def _new_template_counts() -> Dict[str, int]:
+    return {"uses": 0, "successes": 0}
+
+
+def _new_day_counts() -> Dict[str, Any]:
+    return {"total": 0, "successes": 0, "provider": defaultdict(int), "type": defaultdict(int)}
+
+
+def _merge_counts(
+    templates: Dict[int, Dict[str, int]],
+    days: Dict[str, Dict[str, Any]],
+    into_templates: Dict[int, Dict[str, int]],
+    into_days: Dict[str, Dict[str, Any]]
+) -> None:
+    """Add buffered template and daily counts onto another buffer."""
+    for template_id, counts in templates.items():
+        for counter, value in counts.items():
+            into_templates[template_id][counter] += value
+    for day, counts in days.items():
+        for counter, value in counts.items():
+            if isinstance(value, dict):
+                for name, amount in value.items():
+                    into_days[day][counter][name] += amount
+            else:
+                into_days[day][counter] += value
+
+
+class GenerationStatsRecorder:
+    """
+    Records generation counters directly or through a batched writer.
+    
+    Buffered increments go to Redis hashes when Redis is connected, so
+    several workers share one buffer that survives a worker restart, and to
+    in-process counters otherwise. Either way they are folded into the
+    database by ``flush`` in one transaction.
+    """
+    
+    def __init__(self):
+        self._flush_task: Optional[asyncio.Task] = None
+        self._templates: Dict[int, Dict[str, int]] = defaultdict(_new_template_counts)
+        self._days: Dict[str, Dict[str, Any]] = defaultdict(_new_day_counts)
+    
+    @property
+    def buffered(self) -> bool:
+        return settings.GENERATION_STATS_BUFFERED
+    
+    async def record(
+        self,
+        db: AsyncSession,
+        template_id: Optional[int],
+        template_type: str,
+        ai_provider: str,
+        success: bool
+    ) -> None:
+        """
+        Count one generation.
+        
+        Unbuffered increments are executed on ``db`` and committed with the
+        caller's transaction. Buffered increments never touch ``db``.
+        """
+        if self.buffered:
+            if cache.redis_cache.client is not None:
+                try:
+                    await self._buffer(template_id, template_type, ai_provider, success)
+                    return
+                except Exception as e:
+                    logger.warning("Redis stats buffering failed, buffering in process", error=str(e))
+            self._add(template_id, datetime.utcnow().date().isoformat(), template_type, ai_provider, success)
+            return
+        
+        if template_id:
+            await increment_template_stats(db, template_id, uses=1, successes=int(success))
+        await increment_daily_stats(
+            db, datetime.utcnow().date(), total=1, successes=int(success),
+            providers={ai_provider: 1}, content_types={template_type: 1}
+        )
+    
+    def _add(self, template_id: Optional[int], day: str, template_type: str, ai_provider: str, success: bool) -> None:
+        if template_id:
+            self._templates[template_id]["uses"] += 1
+            self._templates[template_id]["successes"] += int(success)
+        counts = self._days[day]
+        counts["total"] += 1
+        counts["successes"] += int(success)
+        counts["provider"][ai_provider] += 1
+        counts["type"][template_type] += 1
+    
+    async def _buffer(self, template_id: Optional[int], template_type: str, ai_provider: str, success: bool) -> None:
+        day = datetime.utcnow().date().isoformat()
+        pipe = cache.redis_cache.client.pipeline(transaction=False)
+        if template_id:
+            pipe.hincrby(TEMPLATE_BUFFER_KEY, f"{template_id}|uses", 1)
+            pipe.hincrby(TEMPLATE_BUFFER_KEY, f"{template_id}|successes", int(success))
+        pipe.hincrby(DAILY_BUFFER_KEY, f"{day}|total", 1)
+        pipe.hincrby(DAILY_BUFFER_KEY, f"{day}|successes", int(success))
+        pipe.hincrby(DAILY_BUFFER_KEY, f"{day}|provider|{ai_provider}", 1)
+        pipe.hincrby(DAILY_BUFFER_KEY, f"{day}|type|{template_type}", 1)
+        await pipe.execute()
+    
+    async def _take(self, key: str) -> Dict[str, int]:
+        """
+        Atomically move a buffer hash aside and read it.
+        
+        RENAME hands the whole hash to exactly one flusher even with several
+        replicas running, while new increments start a fresh hash.
+        """
+        client = cache.redis_cache.client
+        if client is None:
+            return {}
+        claimed = f"{key}:flushing:{uuid.uuid4().hex}"
+        try:
+            await client.rename(key, claimed)
+        except Exception:
+            # No such key: nothing was buffered since the last flush
+            return {}
+        
+        values = await client.hgetall(claimed)
+        await client.delete(claimed)
+        return {field.decode(): int(value) for field, value in values.items()}
+    
+    async def _restore(self, key: str, values: Dict[str, int]) -> None:
+        if not values:
+            return
+        pipe = cache.redis_cache.client.pipeline(transaction=False)
+        for field, value in values.items():
+            pipe.hincrby(key, field, value)
+        await pipe.execute()
+    
+    async def _apply(self, templates: Dict[int, Dict[str, int]], days: Dict[str, Dict[str, Any]]) -> None:
+        """Write aggregated increments in one transaction."""
+        async for db in get_async_session():
+            # Fixed order so concurrent flushers lock rows in the same sequence
+            for template_id in sorted(templates):
+                counts = templates[template_id]
+                if counts["uses"]:
+                    await increment_template_stats(db, template_id, counts["uses"], counts["successes"])
+            for day in sorted(days):
+                counts = days[day]
+                if counts["total"]:
+                    await increment_daily_stats(
+                        db, date.fromisoformat(day), counts["total"], counts["successes"],
+                        dict(counts["provider"]), dict(counts["type"])
+                    )
+            await db.commit()
+            break
+    
+    async def flush(self) -> int:
+        """
+        Fold buffered increments into the database in one transaction.
+        
+        Increments are put back into their buffer if the transaction fails.
+        
+        Returns:
+            int: Number of template and daily rows updated
+        """
+        local_templates, self._templates = self._templates, defaultdict(_new_template_counts)
+        local_days, self._days = self._days, defaultdict(_new_day_counts)
+        template_values = await self._take(TEMPLATE_BUFFER_KEY)
+        daily_values = await self._take(DAILY_BUFFER_KEY)
+        
+        templates: Dict[int, Dict[str, int]] = defaultdict(_new_template_counts)
+        days: Dict[str, Dict[str, Any]] = defaultdict(_new_day_counts)
+        _merge_counts(local_templates, local_days, templates, days)
+        for field, value in template_values.items():
+            template_id, counter = field.split("|", 1)
+            templates[int(template_id)][counter] += value
+        for field, value in daily_values.items():
+            day, counter, *name = field.split("|", 2)
+            if name:
+                days[day][counter][name[0]] += value
+            else:
+                days[day][counter] += value
+        
+        if not templates and not days:
+            return 0
+        
+        try:
+            await self._apply(templates, days)
+        except Exception as e:
+            logger.error("Stats flush failed, increments returned to buffer", error=str(e))
+            _merge_counts(local_templates, local_days, self._templates, self._days)
+            try:
+                await self._restore(TEMPLATE_BUFFER_KEY, template_values)
+                await self._restore(DAILY_BUFFER_KEY, daily_values)
+            except Exception as restore_error:
+                logger.error("Failed to return stats to Redis buffer", error=str(restore_error))
+            return 0
+        
+        logger.debug("Generation stats flushed", templates=len(templates), days=len(days))
+        return len(templates) + len(days)
+    
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.GENERATION_STATS_FLUSH_INTERVAL)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error("Stats flush loop error", error=str(e))
+    
+    def start(self) -> None:
+        """Start the periodic flush when buffering is enabled."""
+        if settings.GENERATION_STATS_BUFFERED and self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+            logger.info("Generation stats buffering enabled",
+                       flush_interval=settings.GENERATION_STATS_FLUSH_INTERVAL)
+    
+    async def stop(self) -> None:
+        """Stop the periodic flush and write out what is still buffered."""
+        if self._flush_task is None:
+            return
+        self._flush_task.cancel()
+        try:
+            await self._flush_task
+        except asyncio.CancelledError:
+            pass
+        self._flush_task = None
+        await self.flush()
+
+
+# Global recorder instance
+generation_stats = GenerationStatsRecorder()
@@ -22,7 +22,7 @@ from sqlalchemy import select, func, and_, or_, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.core.database import get_async_session
+from app.core.database import get_async_session, json_contains
 from app.models.prompts import (
     PromptTemplate, CulturalAdaptation, AIContentGeneration, 
     TemplatePerformanceMetric, ABTestExperiment
@@ -376,8 +376,17 @@ class IntelligentPromptService:
                 raise ValueError(f"Forced template {request.force_template_id} not found")
             return template, {"selection_score": 1.0, "method": "forced"}
         
-        # Get candidate templates
-        candidates_query = select(PromptTemplate).where(
+        # Get candidate templates, with their language and cultural-region fit
+        # evaluated in SQL by GIN-indexed containment
+        language_match = json_contains(PromptTemplate.supported_languages, [request.language])
+        english_match = json_contains(PromptTemplate.supported_languages, ["en"])
+        region_match = json_contains(PromptTemplate.cultural_regions, [request.cultural_region.value])
+        candidates_query = select(
+            PromptTemplate,
+            language_match.label("language_match"),
+            english_match.label("english_match"),
+            region_match.label("region_match")
+        ).where(
             and_(
                 PromptTemplate.template_type == request.content_type.value,
                 PromptTemplate.is_active == True
@@ -387,17 +396,25 @@ class IntelligentPromptService:
             selectinload(PromptTemplate.performance_metrics)
         )
         
-        result = await db.execute(candidates_query)
-        candidates = result.scalars().all()
+        # Only templates in the requested language or the English fallback can
+        # score on language fit
+        result = await db.execute(candidates_query.where(or_(language_match, english_match)))
+        rows = result.all()
         
-        if not candidates:
+        if not rows:
+            result = await db.execute(candidates_query)
+            rows = result.all()
+        
+        if not rows:
             raise ValueError(f"No active templates found for {request.content_type.value}")
+        candidates = [row.PromptTemplate for row in rows]
         
         # Score and rank candidates
         scored_candidates = []
-        for template in candidates:
-            score = await self._calculate_template_score(template, request, db)
-            scored_candidates.append((template, score))
+        for row in rows:
+            fit = (row.language_match, row.english_match, row.region_match)
+            score = await self._calculate_template_score(row.PromptTemplate, request, db, fit)
+            scored_candidates.append((row.PromptTemplate, score))
         
         # Sort by score (highest first)
         scored_candidates.sort(key=lambda x: x[1], reverse=True)
@@ -428,9 +445,15 @@ class IntelligentPromptService:
         self,
         template: PromptTemplate,
         request: IntelligentPromptRequest,
-        db: AsyncSession
+        db: AsyncSession,
+        fit: Optional[Tuple[bool, bool, bool]] = None
     ) -> float:
-        """Calculate comprehensive template score for selection."""
+        """
+        Calculate comprehensive template score for selection.
+        
+        ``fit`` holds the (language, English, cultural region) matches when
+        the candidate query already computed them in SQL.
+        """
         
         score = 0.0
         
@@ -444,7 +467,7 @@ class IntelligentPromptService:
         score += performance_score * 0.35
         
         # Language and cultural fit (25% weight)
-        cultural_score = await self._calculate_cultural_fit_score(template, request)
+        cultural_score = await self._calculate_cultural_fit_score(template, request, fit)
         score += cultural_score * 0.25
         
         # Context relevance (20% weight)
@@ -468,20 +491,29 @@ class IntelligentPromptService:
     async def _calculate_cultural_fit_score(
         self,
         template: PromptTemplate,
-        request: IntelligentPromptRequest
+        request: IntelligentPromptRequest,
+        fit: Optional[Tuple[bool, bool, bool]] = None
     ) -> float:
         """Calculate how well a template fits cultural requirements."""
         
         score = 0.0
         
+        if fit is None:
+            fit = (
+                request.language in template.supported_languages,
+                "en" in template.supported_languages,
+                request.cultural_region.value in template.cultural_regions
+            )
+        language_match, english_match, region_match = fit
+        
         # Language support
-        if request.language in template.supported_languages:
+        if language_match:
             score += 0.4
-        elif "en" in template.supported_languages:  # Fallback to English
+        elif english_match:  # Fallback to English
             score += 0.2
         
         # Cultural region support
-        if request.cultural_region.value in template.cultural_regions:
+        if region_match:
             score += 0.3
         
         # Tone alignment
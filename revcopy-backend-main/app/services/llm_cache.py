@@ -0,0 +1,139 @@
+"""
+Exact-match cache for LLM responses.
+
+Identical generation requests (page refreshes, retries, several users on
+the same product) are answered from the enterprise cache instead of the
+provider. The key is a digest of the provider, model, normalized system
+and user prompts, temperature, max_tokens and any other request
+parameters, so only a byte-for-byte equivalent request can hit.
+
+Sampling at a non-zero temperature is meant to vary, so by default only
+requests at or below ``LLM_CACHE_MAX_TEMPERATURE`` are cached; callers can
+opt in or out per request.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import structlog
+
+from app.core.cache import cache
+from app.core.config import settings
+
+# Configure logging
+logger = structlog.get_logger(__name__)
+
+NAMESPACE = "llm_responses"
+
+
+@dataclass
+class LLMCacheStats:
+    """Response cache counters for this process."""
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    tokens_saved: int = 0
+    cost_saved_usd: float = 0.0
+    
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+
+def _normalize(text: Optional[str]) -> str:
+    """Normalize line endings and trailing whitespace, which do not change the request's meaning."""
+    if not text:
+        return ""
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip()
+
+
+def token_cost(provider: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimated USD cost of a completion from ``LLM_TOKEN_COSTS``."""
+    prices = settings.LLM_TOKEN_COSTS.get(provider, {})
+    return (prompt_tokens * prices.get("prompt", 0.0) + completion_tokens * prices.get("completion", 0.0)) / 1000
+
+
+class LLMResponseCache:
+    """Exact-match LLM response cache backed by the enterprise cache."""
+    
+    def __init__(self):
+        self.stats = LLMCacheStats()
+    
+    def is_cacheable(self, temperature: float, opt_in: Optional[bool] = None) -> bool:
+        """
+        Whether a request may be served from and stored in the cache.
+        
+        Args:
+            temperature: Sampling temperature of the request
+            opt_in: True or False to force caching on or off, None for the default
+        """
+        if not settings.LLM_CACHE_ENABLED or opt_in is False:
+            return False
+        return opt_in is True or temperature <= settings.LLM_CACHE_MAX_TEMPERATURE
+    
+    def key(
+        self,
+        provider: str,
+        model: str,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        **params: Any
+    ) -> str:
+        """Digest identifying one exact generation request."""
+        payload = json.dumps({
+            "provider": provider,
+            "model": model,
+            "system_prompt": _normalize(system_prompt),
+            "prompt": _normalize(prompt),
+            "temperature": round(float(temperature), 4),
+            "max_tokens": max_tokens,
+            "params": {name: value for name, value in params.items() if value is not None},
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    async def lookup(self, key: str) -> Optional[str]:
+        """Return the cached response for ``key``, counting a hit or miss."""
+        entry = await cache.get(key, NAMESPACE)
+        if not entry:
+            self.stats.misses += 1
+            return None
+        
+        saved_tokens = entry["prompt_tokens"] + entry["completion_tokens"]
+        self.stats.hits += 1
+        self.stats.tokens_saved += saved_tokens
+        self.stats.cost_saved_usd += token_cost(
+            entry["provider"], entry["prompt_tokens"], entry["completion_tokens"]
+        )
+        logger.debug("LLM response cache hit", provider=entry["provider"], tokens_saved=saved_tokens)
+        return entry["content"]
+    
+    async def store(self, key: str, provider: str, content: str, prompt_tokens: int, completion_tokens: int) -> None:
+        if not content:
+            return
+        await cache.set(key, {
+            "provider": provider,
+            "content": content,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+        }, NAMESPACE, settings.LLM_CACHE_TTL_SECONDS)
+        self.stats.writes += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.stats.hits,
+            "misses": self.stats.misses,
+            "writes": self.stats.writes,
+            "hit_rate": round(self.stats.hit_rate, 4),
+            "tokens_saved": self.stats.tokens_saved,
+            "cost_saved_usd": round(self.stats.cost_saved_usd, 4),
+        }
+
+
+# Global response cache instance
+llm_response_cache = LLMResponseCache()
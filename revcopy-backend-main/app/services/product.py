@@ -2,21 +2,78 @@
 Product service for managing products and e-commerce platform integration.
 """
 
+import re
 import structlog
-from typing import Dict, List, Optional, Tuple
-from datetime import datetime
-from urllib.parse import urlparse
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+from urllib.parse import parse_qsl, urlencode, urlparse
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
 
-from app.models.product import Product, EcommercePlatform
+from app.core.config import settings
+from app.models.product import Product, EcommercePlatform, ProductStatus
 from app.services.amazon_crawler_client import AmazonCrawlerClient
 from app.services.review_scraping import ReviewScrapingService
+from app.services.review_store import ReviewStore
 
 # Configure logging
 logger = structlog.get_logger(__name__)
 
+# ASIN in the path forms Amazon uses for product pages
+AMAZON_ASIN_PATTERN = re.compile(
+    r"/(?:dp|gp/product|gp/aw/d|exec/obidos/asin|o/asin)/([A-Z0-9]{10})(?:[/?]|$)", re.IGNORECASE
+)
+
+# Query parameters that track the visit rather than identify the product
+TRACKING_PARAMS = {
+    "ref", "ref_", "tag", "psc", "th", "smid", "qid", "sr", "keywords", "crid", "sprefix",
+    "linkcode", "linkid", "camp", "creative", "creativeasin", "ascsubtag", "spm",
+    "fbclid", "gclid", "msclkid", "_pos", "_sid", "_ss",
+}
+
+
+def canonicalize_product_url(url: str, platform: EcommercePlatform) -> Tuple[str, Optional[str]]:
+    """
+    Reduce a product URL to one canonical form and derive its platform ID.
+    
+    Different links to the same product (tracking parameters, ``www.``,
+    fragments, slugged Amazon paths) map to the same canonical URL, so they
+    share one stored product.
+    
+    Returns:
+        Tuple[str, Optional[str]]: (canonical_url, external_product_id); the
+        ID is None when it cannot be derived from the URL alone
+    """
+    parsed = urlparse(url.strip())
+    host = parsed.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    
+    if platform == EcommercePlatform.AMAZON:
+        match = AMAZON_ASIN_PATTERN.search(parsed.path)
+        if match:
+            asin = match.group(1).upper()
+            # ASINs are shared across marketplaces but prices and reviews are not
+            external_id = asin if host == "amazon.com" else f"{asin}@{host}"
+            return f"https://www.{host}/dp/{asin}", external_id
+    
+    if platform == EcommercePlatform.SHOPIFY:
+        path_parts = parsed.path.strip("/").split("/")
+        if "products" in path_parts and path_parts.index("products") + 1 < len(path_parts):
+            handle = path_parts[path_parts.index("products") + 1].lower()
+            return f"https://{host}/products/{handle}", f"{host}/{handle}"
+    
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parsed.query)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith("utm_")
+    )
+    canonical_url = f"https://{host}{parsed.path.rstrip('/') or '/'}"
+    if query:
+        canonical_url += f"?{urlencode(query)}"
+    return canonical_url, None
+
 
 class ProductService:
     """Service for product data extraction and analysis."""
@@ -24,6 +81,7 @@ class ProductService:
     def __init__(self):
         self.amazon_crawler = AmazonCrawlerClient()
         self.review_service = ReviewScrapingService()
+        self.review_store = ReviewStore()
     
     async def validate_and_extract_product(
         self, 
@@ -34,6 +92,13 @@ class ProductService:
         """
         Validate product URL and extract product data.
         
+        Products are stored once per (platform, external_product_id). A
+        stored product crawled within the platform's freshness window is
+        returned as is; otherwise the URL is crawled and the row upserted.
+        
+        Crawled reviews are stored in ``product_reviews`` rather than
+        returned; analyses sample them from there.
+        
         Returns:
             Tuple[bool, Optional[Dict], Optional[str]]: (is_valid, product_data, error_message)
         """
@@ -56,52 +121,158 @@ class ProductService:
             if not platform:
                 return False, None, "Unsupported e-commerce platform"
             
-            # Extract product data based on platform
-            product_data = None
+            if platform not in (EcommercePlatform.AMAZON, EcommercePlatform.SHOPIFY):
+                return False, None, f"Platform {platform.value} is not yet supported"
             
+            canonical_url, external_id = canonicalize_product_url(url, platform)
+            
+            # Reuse a recent crawl of the same product
+            stored = await self._find_stored_product(db, platform, canonical_url, external_id)
+            if stored and self._is_fresh(stored):
+                logger.info("Reusing fresh product crawl", product_id=stored.id,
+                            last_crawled_at=stored.last_crawled_at.isoformat())
+                return True, self._serialize_product(stored), None
+            
+            # Extract product data based on platform
             if platform == EcommercePlatform.AMAZON:
-                product_data = await self._extract_amazon_product(url, user_id)
-            elif platform == EcommercePlatform.SHOPIFY:
-                product_data = await self._extract_shopify_product(url, user_id)
+                product_data = await self._extract_amazon_product(canonical_url, user_id)
             else:
-                return False, None, f"Platform {platform.value} is not yet supported"
+                product_data = await self._extract_shopify_product(canonical_url, user_id)
             
             if not product_data:
                 return False, None, "Failed to extract product data"
             
-            # Save to database
-            product = Product(
-                url=url,
-                platform=platform,
-                external_product_id=product_data["external_product_id"],
-                title=product_data["title"],
-                description=product_data["description"],
-                brand=product_data.get("brand"),
-                category=product_data.get("category"),
-                price=product_data.get("price"),
-                currency=product_data.get("currency", "USD"),
-                original_price=product_data.get("original_price"),
-                rating=product_data.get("rating"),
-                review_count=product_data.get("review_count", 0),
-                in_stock=product_data.get("in_stock", True),
-                tags=product_data.get("tags", []),
-                crawl_metadata=product_data.get("crawl_metadata", {}),
-                images_data=product_data.get("images_data", []),
-                reviews_data=product_data.get("reviews_data", []),
-                user_id=user_id
+            external_id = external_id or product_data.get("external_product_id")
+            product_id = await self._upsert_product(
+                db, platform, canonical_url, external_id, product_data, user_id, stored
             )
             
-            db.add(product)
-            await db.commit()
-            await db.refresh(product)
-            
-            logger.info("Product extracted and saved successfully", product_id=product.id)
-            return True, product_data, None
+            logger.info("Product extracted and saved successfully", product_id=product_id,
+                        refreshed=stored is not None)
+            product_data = {key: value for key, value in product_data.items() if key != "reviews_data"}
+            return True, {**product_data, "id": product_id, "url": canonical_url,
+                          "external_product_id": external_id}, None
             
         except Exception as e:
             logger.error("Product extraction failed", error=str(e), url=url)
             return False, None, f"Product extraction failed: {str(e)}"
     
+    @staticmethod
+    def freshness_ttl(platform: EcommercePlatform) -> timedelta:
+        """How long a crawl of ``platform`` is reused before recrawling."""
+        seconds = settings.PRODUCT_FRESHNESS_TTL.get(platform.value, settings.PRODUCT_FRESHNESS_DEFAULT_TTL)
+        return timedelta(seconds=seconds)
+    
+    def _is_fresh(self, product: Product) -> bool:
+        return (
+            product.status == ProductStatus.COMPLETED
+            and product.last_crawled_at is not None
+            and datetime.utcnow() - product.last_crawled_at < self.freshness_ttl(product.platform)
+        )
+    
+    async def _find_stored_product(
+        self,
+        db: AsyncSession,
+        platform: EcommercePlatform,
+        canonical_url: str,
+        external_id: Optional[str]
+    ) -> Optional[Product]:
+        """Find the stored product by platform ID, or by canonical URL when the ID is unknown."""
+        query = select(Product).where(Product.platform == platform)
+        if external_id:
+            query = query.where(Product.external_product_id == external_id)
+        else:
+            query = query.where(Product.url == canonical_url)
+        
+        result = await db.execute(query.order_by(Product.last_crawled_at.desc().nullslast()).limit(1))
+        return result.scalar_one_or_none()
+    
+    async def _upsert_product(
+        self,
+        db: AsyncSession,
+        platform: EcommercePlatform,
+        canonical_url: str,
+        external_id: Optional[str],
+        product_data: Dict[str, Any],
+        user_id: int,
+        stored: Optional[Product]
+    ) -> int:
+        """
+        Insert or refresh the product row and return its ID.
+        
+        With a platform ID this is a single ``INSERT ... ON CONFLICT
+        (platform, external_product_id) DO UPDATE``, so concurrent crawls of
+        the same product converge on one row.
+        """
+        crawled_at = datetime.utcnow()
+        values = {
+            "url": canonical_url,
+            "title": product_data["title"],
+            "description": product_data.get("description"),
+            "brand": product_data.get("brand"),
+            "category": product_data.get("category"),
+            "price": product_data.get("price"),
+            "currency": product_data.get("currency", "USD"),
+            "original_price": product_data.get("original_price"),
+            "rating": product_data.get("rating"),
+            "review_count": product_data.get("review_count", 0),
+            "in_stock": product_data.get("in_stock", True),
+            "tags": product_data.get("tags", []),
+            "crawl_metadata": product_data.get("crawl_metadata", {}),
+            "cached_data": {"images_data": product_data.get("images_data", [])},
+            "status": ProductStatus.COMPLETED,
+            "last_crawled_at": crawled_at,
+            "cache_expires_at": crawled_at + self.freshness_ttl(platform),
+            "error_message": None,
+        }
+        
+        if external_id:
+            insert = sqlite.insert if db.bind.dialect.name == "sqlite" else postgresql.insert
+            statement = insert(Product).values(
+                platform=platform, external_product_id=external_id, user_id=user_id, **values
+            )
+            statement = statement.on_conflict_do_update(
+                index_elements=[Product.platform, Product.external_product_id],
+                set_={**{key: statement.excluded[key] for key in values}, "updated_at": func.now()}
+            ).returning(Product.id)
+            product_id = (await db.execute(statement)).scalar_one()
+        else:
+            if stored:
+                for key, value in values.items():
+                    setattr(stored, key, value)
+            else:
+                stored = Product(platform=platform, user_id=user_id, **values)
+                db.add(stored)
+            await db.flush()
+            product_id = stored.id
+        
+        await self.review_store.store_reviews(db, product_id, product_data.get("reviews_data") or [])
+        await db.commit()
+        return product_id
+    
+    def _serialize_product(self, product: Product) -> Dict[str, Any]:
+        """Build the crawler-shaped product dict from a stored product."""
+        cached = product.cached_data or {}
+        return {
+            "id": product.id,
+            "url": product.url,
+            "platform": product.platform.value,
+            "external_product_id": product.external_product_id,
+            "title": product.title,
+            "description": product.description,
+            "brand": product.brand,
+            "category": product.category,
+            "price": product.price,
+            "currency": product.currency,
+            "original_price": product.original_price,
+            "rating": product.rating,
+            "review_count": product.review_count,
+            "in_stock": product.in_stock,
+            "tags": product.tags or [],
+            "crawl_metadata": product.crawl_metadata or {},
+            "images_data": cached.get("images_data", []),
+        }
+    
     def _detect_platform(self, url: str) -> Optional[EcommercePlatform]:
         """Detect e-commerce platform from URL."""
         url_lower = url.lower()
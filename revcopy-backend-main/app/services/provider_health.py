@@ -0,0 +1,143 @@
+"""
+Circuit breakers for AI providers.
+
+Each provider keeps a rolling window of recent call outcomes and latencies.
+When too many calls in the window fail or run slower than
+``AI_CIRCUIT_SLOW_CALL_SECONDS``, the breaker opens and the provider is
+skipped, so requests fail over immediately instead of waiting out the
+timeout of a provider that is down. After ``AI_CIRCUIT_OPEN_SECONDS`` a
+single trial call is let through; its outcome closes or re-opens the
+breaker. The recorded latencies also give the p95 used to decide when to
+hedge a request to a second provider.
+"""
+
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Deque, Dict, Optional, Tuple
+
+import structlog
+
+from app.core.config import settings
+
+# Configure logging
+logger = structlog.get_logger(__name__)
+
+
+class CircuitState(Enum):
+    """Circuit breaker states."""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+@dataclass
+class ProviderHealth:
+    """Rolling call statistics and circuit breaker state for one provider."""
+    name: str
+    state: CircuitState = CircuitState.CLOSED
+    opened_at: float = 0.0
+    trial_in_flight: bool = False
+    # (monotonic time, succeeded, latency in seconds or None)
+    outcomes: Deque[Tuple[float, bool, Optional[float]]] = field(default_factory=deque)
+    
+    def _prune(self, now: float) -> None:
+        cutoff = now - settings.AI_CIRCUIT_WINDOW_SECONDS
+        while self.outcomes and self.outcomes[0][0] < cutoff:
+            self.outcomes.popleft()
+    
+    def allow_request(self) -> bool:
+        """Whether a call may be sent now; claims the trial slot when half-open."""
+        if self.state == CircuitState.CLOSED:
+            return True
+        
+        if self.state == CircuitState.OPEN:
+            if time.monotonic() - self.opened_at < settings.AI_CIRCUIT_OPEN_SECONDS:
+                return False
+            self.state = CircuitState.HALF_OPEN
+            self.trial_in_flight = False
+        
+        if self.trial_in_flight:
+            return False
+        self.trial_in_flight = True
+        return True
+    
+    def is_available(self) -> bool:
+        """Whether the provider would currently be tried, without claiming a trial."""
+        if self.state == CircuitState.OPEN:
+            return time.monotonic() - self.opened_at >= settings.AI_CIRCUIT_OPEN_SECONDS
+        return not (self.state == CircuitState.HALF_OPEN and self.trial_in_flight)
+    
+    def record(self, succeeded: bool, latency: Optional[float] = None) -> None:
+        """Record a finished call and open or close the breaker accordingly."""
+        now = time.monotonic()
+        self.outcomes.append((now, succeeded, latency))
+        self._prune(now)
+        
+        if self.state == CircuitState.HALF_OPEN:
+            self.trial_in_flight = False
+            if succeeded and not self._is_slow(latency):
+                self.state = CircuitState.CLOSED
+                self.outcomes.clear()
+                logger.info("AI provider circuit closed", provider=self.name)
+            else:
+                self._open(now)
+            return
+        
+        if self.state == CircuitState.CLOSED and len(self.outcomes) >= settings.AI_CIRCUIT_MIN_REQUESTS:
+            if self.failure_rate() >= settings.AI_CIRCUIT_FAILURE_RATE:
+                self._open(now)
+    
+    def release_trial(self) -> None:
+        """Give back a half-open trial slot whose call was cancelled before finishing."""
+        if self.state == CircuitState.HALF_OPEN:
+            self.trial_in_flight = False
+    
+    def _open(self, now: float) -> None:
+        self.state = CircuitState.OPEN
+        self.opened_at = now
+        logger.warning("AI provider circuit opened",
+                      provider=self.name,
+                      failure_rate=round(self.failure_rate(), 2),
+                      calls=len(self.outcomes))
+    
+    @staticmethod
+    def _is_slow(latency: Optional[float]) -> bool:
+        return latency is not None and latency > settings.AI_CIRCUIT_SLOW_CALL_SECONDS
+    
+    def failure_rate(self) -> float:
+        """Share of calls in the window that failed or were slow."""
+        if not self.outcomes:
+            return 0.0
+        bad = sum(1 for _, succeeded, latency in self.outcomes if not succeeded or self._is_slow(latency))
+        return bad / len(self.outcomes)
+    
+    def p95_latency(self) -> Optional[float]:
+        """95th percentile latency of successful calls in the window, None with too few samples."""
+        self._prune(time.monotonic())
+        latencies = sorted(latency for _, succeeded, latency in self.outcomes if succeeded and latency is not None)
+        if len(latencies) < settings.AI_HEDGE_MIN_SAMPLES:
+            return None
+        return latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    
+    def snapshot(self) -> Dict[str, Any]:
+        self._prune(time.monotonic())
+        return {
+            "state": self.state.value,
+            "calls": len(self.outcomes),
+            "failure_rate": round(self.failure_rate(), 3),
+            "p95_latency_s": self.p95_latency(),
+        }
+
+
+# Breakers shared by every AIService instance, keyed by provider
+_provider_health: Dict[str, ProviderHealth] = {}
+
+
+def get_provider_health(provider: str) -> ProviderHealth:
+    health = _provider_health.get(provider)
+    if health is None:
+        health = ProviderHealth(name=provider)
+        _provider_health[provider] = health
+    return health
@@ -0,0 +1,252 @@
+"""
+Review storage service for normalized product reviews.
+
+Crawled reviews are stored one row per review in ``product_reviews`` and
+deduplicated per product by content hash. Large batches are streamed in
+with PostgreSQL ``COPY``; analyses read back only the rating-stratified
+sample they need instead of a product's whole review history.
+"""
+
+import hashlib
+import json
+import structlog
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, func, or_, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.product import ProductReview
+
+# Configure logging
+logger = structlog.get_logger(__name__)
+
+# Rows per multi-row INSERT statement, well below the 32767 bind parameter limit
+INSERT_CHUNK_SIZE = 1000
+
+# Review fields stored in their own columns; anything else goes to review_metadata
+REVIEW_FIELDS = {
+    "review_id", "id", "rating", "title", "content", "text", "author", "reviewer_name",
+    "date", "review_date", "verified", "verified_purchase", "helpful_votes", "source",
+}
+
+COPY_COLUMNS = [
+    "product_id", "external_review_id", "content_hash", "rating", "title", "content", "author",
+    "review_date", "verified_purchase", "helpful_votes", "source", "review_metadata", "created_at",
+]
+
+
+def _parse_review_date(value: Any) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    if isinstance(value, str) and value:
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+        except ValueError:
+            return None
+    return None
+
+
+def _parse_rating(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def allocate_sample(counts: Dict[int, int], limit: int) -> Dict[int, int]:
+    """
+    Split a sample of ``limit`` reviews across star-rating buckets.
+    
+    Buckets get seats in proportion to their size (largest remainder), but
+    every non-empty bucket gets at least one when the sample is large
+    enough, so rare ratings such as 1-star complaints are never dropped.
+    
+    Args:
+        counts: Review count per star-rating bucket
+        limit: Total sample size
+    
+    Returns:
+        Dict[int, int]: Reviews to take from each bucket
+    """
+    total = sum(counts.values())
+    if total <= limit:
+        return dict(counts)
+    
+    buckets = [bucket for bucket, count in counts.items() if count > 0]
+    floor = 1 if limit >= len(buckets) else 0
+    
+    shares = {bucket: limit * counts[bucket] / total for bucket in buckets}
+    quotas = {bucket: max(floor, int(shares[bucket])) for bucket in buckets}
+    
+    # Seats given to rare buckets by the floor come out of the largest ones
+    while sum(quotas.values()) > limit:
+        largest = max(buckets, key=lambda bucket: quotas[bucket])
+        quotas[largest] -= 1
+    
+    # Seats lost to rounding go to the largest remainders that still have reviews
+    by_remainder = sorted(buckets, key=lambda bucket: shares[bucket] - int(shares[bucket]), reverse=True)
+    while sum(quotas.values()) < limit:
+        for bucket in by_remainder:
+            if quotas[bucket] < counts[bucket] and sum(quotas.values()) < limit:
+                quotas[bucket] += 1
+    
+    return quotas
+
+
+class ReviewStore:
+    """Service for storing and sampling normalized product reviews."""
+    
+    @staticmethod
+    def normalize_review(product_id: int, review: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Map a crawler review dict onto ``product_reviews`` columns.
+        
+        Returns None for reviews without any text.
+        """
+        content = (review.get("content") or review.get("text") or "").strip()
+        if not content:
+            return None
+        
+        rating = _parse_rating(review.get("rating"))
+        title = (review.get("title") or "").strip() or None
+        author = review.get("author") or review.get("reviewer_name")
+        
+        fingerprint = "\x1f".join([str(rating), (title or "").lower(), " ".join(content.lower().split())])
+        metadata = {key: value for key, value in review.items() if key not in REVIEW_FIELDS}
+        external_id = review.get("review_id") or review.get("id")
+        
+        return {
+            "product_id": product_id,
+            "external_review_id": str(external_id)[:255] if external_id else None,
+            "content_hash": hashlib.sha256(fingerprint.encode("utf-8")).hexdigest(),
+            "rating": rating,
+            "title": title[:500] if title else None,
+            "content": content,
+            "author": author[:200] if author else None,
+            "review_date": _parse_review_date(review.get("review_date") or review.get("date")),
+            "verified_purchase": bool(review.get("verified_purchase", review.get("verified", False))),
+            "helpful_votes": int(review.get("helpful_votes") or 0),
+            "source": review.get("source"),
+            "review_metadata": metadata or None,
+            "created_at": datetime.utcnow(),
+        }
+    
+    async def store_reviews(self, db: AsyncSession, product_id: int, reviews: Iterable[Dict[str, Any]]) -> int:
+        """
+        Insert a product's reviews, skipping ones already stored.
+        
+        Batches of at least ``REVIEW_COPY_THRESHOLD`` rows on asyncpg are
+        loaded with ``COPY`` into a temporary table and merged from there;
+        smaller batches use chunked multi-row ``INSERT ... ON CONFLICT DO
+        NOTHING``. The caller commits.
+        
+        Returns:
+            int: Number of reviews submitted after in-batch deduplication
+        """
+        rows: Dict[str, Dict[str, Any]] = {}
+        for review in reviews:
+            row = self.normalize_review(product_id, review)
+            if row:
+                rows.setdefault(row["content_hash"], row)
+        
+        if not rows:
+            return 0
+        
+        values = list(rows.values())
+        dialect = db.bind.dialect
+        if dialect.name == "postgresql" and dialect.driver == "asyncpg" and len(values) >= settings.REVIEW_COPY_THRESHOLD:
+            await self._copy_reviews(db, values)
+        else:
+            insert = sqlite.insert if dialect.name == "sqlite" else postgresql.insert
+            for start in range(0, len(values), INSERT_CHUNK_SIZE):
+                statement = insert(ProductReview).values(values[start:start + INSERT_CHUNK_SIZE])
+                await db.execute(statement.on_conflict_do_nothing(
+                    index_elements=[ProductReview.product_id, ProductReview.content_hash]
+                ))
+        
+        logger.info("Product reviews stored", product_id=product_id, reviews=len(values))
+        return len(values)
+    
+    async def _copy_reviews(self, db: AsyncSession, values: List[Dict[str, Any]]) -> None:
+        """Stream rows in with COPY, then merge into product_reviews ignoring duplicates."""
+        connection = await db.connection()
+        await connection.execute(text(
+            "CREATE TEMP TABLE IF NOT EXISTS product_reviews_staging "
+            "(LIKE product_reviews INCLUDING DEFAULTS) ON COMMIT DROP"
+        ))
+        
+        # COPY bypasses SQLAlchemy type processing, so JSON goes in as text
+        records = [
+            tuple(
+                json.dumps(row[column]) if column == "review_metadata" and row[column] is not None else row[column]
+                for column in COPY_COLUMNS
+            )
+            for row in values
+        ]
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            "product_reviews_staging", records=records, columns=COPY_COLUMNS
+        )
+        
+        column_list = ", ".join(COPY_COLUMNS)
+        await connection.execute(text(
+            f"INSERT INTO product_reviews ({column_list}) "
+            f"SELECT {column_list} FROM product_reviews_staging "
+            "ON CONFLICT (product_id, content_hash) DO NOTHING"
+        ))
+        await connection.execute(text("TRUNCATE product_reviews_staging"))
+    
+    async def sample_reviews(self, db: AsyncSession, product_id: int, limit: int) -> List[Dict[str, Any]]:
+        """
+        Fetch a rating-stratified sample of a product's reviews.
+        
+        The sample keeps the product's rating mix (see ``allocate_sample``)
+        and takes the most helpful, then most recent, reviews within each
+        star bucket. Both queries are served by the (product_id, rating)
+        index.
+        
+        Returns:
+            List[Dict[str, Any]]: Reviews in the crawler dict shape
+        """
+        bucket = func.coalesce(func.round(ProductReview.rating), 0).label("bucket")
+        
+        count_result = await db.execute(
+            select(bucket, func.count()).where(ProductReview.product_id == product_id).group_by(bucket)
+        )
+        quotas = allocate_sample({int(row[0]): row[1] for row in count_result}, limit)
+        if not quotas:
+            return []
+        
+        ranked = select(
+            ProductReview,
+            bucket,
+            func.row_number().over(
+                partition_by=bucket,
+                order_by=(ProductReview.helpful_votes.desc(), ProductReview.review_date.desc().nullslast(),
+                          ProductReview.id.desc())
+            ).label("position")
+        ).where(ProductReview.product_id == product_id).subquery()
+        
+        sampled = select(ranked).where(or_(*(
+            and_(ranked.c.bucket == star, ranked.c.position <= quota)
+            for star, quota in quotas.items() if quota > 0
+        ))).order_by(ranked.c.bucket.desc(), ranked.c.position)
+        
+        result = await db.execute(sampled)
+        return [
+            {
+                "review_id": row.external_review_id,
+                "rating": row.rating,
+                "title": row.title,
+                "content": row.content,
+                "author": row.author,
+                "date": row.review_date.isoformat() if row.review_date else None,
+                "verified_purchase": row.verified_purchase,
+                "helpful_votes": row.helpful_votes,
+                "source": row.source,
+            }
+            for row in result
+        ]
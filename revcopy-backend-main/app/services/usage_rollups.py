@@ -0,0 +1,205 @@
+"""
+Daily usage rollups for the admin dashboard and usage analytics.
+
+A background task folds new users, products and generated content into
+``daily_usage_rollups`` every few minutes. Only the days since the last
+refresh are re-counted, so each refresh scans a small, index- and
+partition-pruned slice of the source tables. The admin endpoints read the
+rollups with a single query each instead of counting the raw rows on every
+page load.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import structlog
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.content import GeneratedContent
+from app.models.product import Product
+from app.models.prompts import PromptTemplate
+from app.models.usage import DailyUsageRollup, UsageMetric
+from app.models.user import User
+
+# Configure logging
+logger = structlog.get_logger(__name__)
+
+# Daily metric -> (source model, optional breakdown column)
+DAILY_SOURCES = {
+    UsageMetric.USERS_REGISTERED: (User, None),
+    UsageMetric.PRODUCTS_CREATED: (Product, None),
+    UsageMetric.CONTENT_GENERATED: (GeneratedContent, GeneratedContent.content_type),
+}
+
+
+def _as_date(value: Any) -> date:
+    """``func.date`` returns a date on PostgreSQL and a string on SQLite."""
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
+
+
+def _dimension(value: Any) -> str:
+    if value is None:
+        return ""
+    return str(getattr(value, "value", value))
+
+
+class UsageRollupService:
+    """Service for maintaining and reading daily usage rollups."""
+    
+    async def _upsert(self, db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        insert = sqlite.insert if db.bind.dialect.name == "sqlite" else postgresql.insert
+        statement = insert(DailyUsageRollup).values(rows)
+        await db.execute(statement.on_conflict_do_update(
+            index_elements=[DailyUsageRollup.day, DailyUsageRollup.metric, DailyUsageRollup.dimension],
+            set_={"count": statement.excluded.count, "updated_at": func.now()}
+        ))
+    
+    async def _refresh_start(self, db: AsyncSession, metric: str, today: date) -> Optional[date]:
+        """
+        First day to re-count for ``metric``, None to backfill all history.
+        
+        The latest rolled-up day may have been counted while still in
+        progress, so counting resumes from it, and never later than the
+        lookback window so late-committed rows are picked up.
+        """
+        result = await db.execute(
+            select(func.max(DailyUsageRollup.day)).where(DailyUsageRollup.metric == metric)
+        )
+        latest = result.scalar()
+        if latest is None:
+            return None
+        lookback = today - timedelta(days=settings.USAGE_ROLLUP_LOOKBACK_DAYS - 1)
+        return min(_as_date(latest), lookback)
+    
+    async def refresh(self, db: AsyncSession, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Re-count recent days of every daily metric and take today's snapshots.
+        
+        Metrics without any rollup yet are backfilled from all source rows
+        once. The caller commits.
+        
+        Returns:
+            Dict[str, int]: Rollup rows written per metric
+        """
+        now = now or datetime.utcnow()
+        today = now.date()
+        written: Dict[str, int] = {}
+        
+        for metric, (model, breakdown) in DAILY_SOURCES.items():
+            start = await self._refresh_start(db, metric, today)
+            keys = [func.date(model.created_at)] + ([breakdown] if breakdown is not None else [])
+            query = select(func.count(), *keys).group_by(*keys)
+            if start is not None:
+                query = query.where(model.created_at >= datetime.combine(start, datetime.min.time()))
+            
+            rows = [
+                {
+                    "day": _as_date(row[1]),
+                    "metric": metric,
+                    "dimension": _dimension(row[2]) if breakdown is not None else "",
+                    "count": row[0],
+                }
+                for row in await db.execute(query)
+            ]
+            await self._upsert(db, rows)
+            written[metric] = len(rows)
+        
+        active_users = await db.execute(
+            select(func.count(User.id)).where(User.last_login >= now - timedelta(days=30))
+        )
+        active_templates = await db.execute(
+            select(func.count(PromptTemplate.id)).where(PromptTemplate.is_active == True)
+        )
+        await self._upsert(db, [
+            {"day": today, "metric": UsageMetric.USERS_ACTIVE_30D, "dimension": "",
+             "count": active_users.scalar() or 0},
+            {"day": today, "metric": UsageMetric.TEMPLATES_ACTIVE, "dimension": "",
+             "count": active_templates.scalar() or 0},
+        ])
+        
+        logger.info("Usage rollups refreshed", **written)
+        return written
+    
+    async def get_dashboard_stats(self, db: AsyncSession, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Dashboard counters from the rollups in one aggregate query."""
+        now = now or datetime.utcnow()
+        thirty_days_ago = (now - timedelta(days=30)).date()
+        seven_days_ago = (now - timedelta(days=7)).date()
+        
+        latest_snapshot = (
+            select(func.max(DailyUsageRollup.day))
+            .where(DailyUsageRollup.metric == UsageMetric.USERS_ACTIVE_30D)
+            .scalar_subquery()
+        )
+        metric = DailyUsageRollup.metric
+        day = DailyUsageRollup.day
+        
+        def total(*conditions):
+            return func.coalesce(func.sum(DailyUsageRollup.count).filter(*conditions), 0)
+        
+        result = await db.execute(select(
+            total(metric == UsageMetric.USERS_REGISTERED).label("users_total"),
+            total(metric == UsageMetric.USERS_REGISTERED, day >= seven_days_ago).label("users_new_7d"),
+            total(metric == UsageMetric.USERS_ACTIVE_30D, day == latest_snapshot).label("users_active_30d"),
+            total(metric == UsageMetric.PRODUCTS_CREATED).label("products_total"),
+            total(metric == UsageMetric.PRODUCTS_CREATED, day >= thirty_days_ago).label("products_30d"),
+            total(metric == UsageMetric.CONTENT_GENERATED).label("content_total"),
+            total(metric == UsageMetric.CONTENT_GENERATED, day >= thirty_days_ago).label("content_30d"),
+            total(metric == UsageMetric.TEMPLATES_ACTIVE, day == latest_snapshot).label("templates_active"),
+            func.max(DailyUsageRollup.updated_at).label("last_updated"),
+        ))
+        row = result.one()
+        
+        return {
+            "users": {
+                "total": row.users_total,
+                "active_30d": row.users_active_30d,
+                "new_7d": row.users_new_7d,
+            },
+            "products": {
+                "total": row.products_total,
+                "analyzed_30d": row.products_30d,
+            },
+            "content": {
+                "total": row.content_total,
+                "generated_30d": row.content_30d,
+            },
+            "templates": {
+                "active": row.templates_active,
+            },
+            "last_updated": (row.last_updated or now).isoformat(),
+        }
+    
+    async def get_usage_analytics(self, db: AsyncSession, start_date: datetime) -> Dict[str, List[Dict[str, Any]]]:
+        """Daily registrations, daily content and content by type since ``start_date`` in one query."""
+        result = await db.execute(
+            select(DailyUsageRollup.day, DailyUsageRollup.metric, DailyUsageRollup.dimension, DailyUsageRollup.count)
+            .where(
+                DailyUsageRollup.metric.in_([UsageMetric.USERS_REGISTERED, UsageMetric.CONTENT_GENERATED]),
+                DailyUsageRollup.day >= start_date.date()
+            )
+            .order_by(DailyUsageRollup.day)
+        )
+        
+        registrations: Dict[date, int] = {}
+        content_by_day: Dict[date, int] = {}
+        content_by_type: Dict[str, int] = {}
+        for row in result:
+            if row.metric == UsageMetric.USERS_REGISTERED:
+                registrations[row.day] = registrations.get(row.day, 0) + row.count
+            else:
+                content_by_day[row.day] = content_by_day.get(row.day, 0) + row.count
+                content_by_type[row.dimension] = content_by_type.get(row.dimension, 0) + row.count
+        
+        return {
+            "daily_registrations": [{"date": str(day), "count": count} for day, count in registrations.items()],
+            "daily_content": [{"date": str(day), "count": count} for day, count in content_by_day.items()],
+            "content_by_type": [{"type": kind, "count": count} for kind, count in content_by_type.items()],
+        }
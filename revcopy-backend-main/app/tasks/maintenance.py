@@ -8,19 +8,22 @@ cleanup, and performance enhancement.
 import asyncio
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 
 import structlog
 from sqlalchemy import text, delete, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.database import get_async_session
+from app.core.partitioning import PARTITIONED_TABLES, drop_expired_partitions, ensure_partitions
 from app.core.performance import performance_collector
 from app.core.cache import cache
-from app.core.background_tasks import background_task, TaskConfig, TaskPriority
+from app.core.background_tasks import background_task, TaskConfig, TaskPriority, task_manager
 from app.models.user import User
 from app.models.content import GeneratedContent
 from app.models.analysis import Analysis
+from app.services.usage_rollups import UsageRollupService
 
 logger = structlog.get_logger(__name__)
 
@@ -142,7 +145,7 @@ async def cleanup_performance_metrics(days_to_keep: int = 7) -> Dict[str, Any]:
 @background_task(
     name="optimize_database",
     config=TaskConfig(
-        priority=TaskPriority.MEDIUM,
+        priority=TaskPriority.NORMAL,
         max_retries=2,
         timeout=1800.0,  # 30 minutes
         tags=["maintenance", "database"]
@@ -192,8 +195,9 @@ async def optimize_database() -> Dict[str, Any]:
                 except Exception as e:
                     logger.warning("Failed to optimize table", table=table, error=str(e))
             
-            # Reindex important tables
-            important_tables = ["users", "products", "generated_content"]
+            # Reindex important tables; generated_content is partitioned and
+            # no longer bloats, since retention drops whole partitions
+            important_tables = ["users", "products"]
             for table in important_tables:
                 try:
                     await db.execute(text(f"REINDEX TABLE {table}"))
@@ -303,38 +307,47 @@ async def cache_warming() -> Dict[str, Any]:
         tags=["maintenance", "content"]
     )
 )
-async def cleanup_old_content(days_to_keep: int = 90) -> Dict[str, Any]:
+async def cleanup_old_content(days_to_keep: Optional[int] = None) -> Dict[str, Any]:
     """
     Clean up old generated content.
     
+    Generation logs are partitioned by month, so expired months are
+    detached and dropped as a whole instead of deleted row by row.
+    
     Args:
-        days_to_keep: Number of days to keep content
+        days_to_keep: Number of days to keep content, defaults to
+            CONTENT_RETENTION_DAYS
         
     Returns:
         Dict: Cleanup results
     """
+    days_to_keep = days_to_keep or settings.CONTENT_RETENTION_DAYS
     logger.info("Starting old content cleanup", days_to_keep=days_to_keep)
     
     try:
         start_time = datetime.utcnow()
         cutoff_date = datetime.utcnow() - timedelta(days=days_to_keep)
+        retention_cutoffs = {
+            "ai_generated_content": cutoff_date,
+            "generated_content": cutoff_date,
+            "template_performance_metrics": datetime.utcnow() - timedelta(
+                days=settings.PERFORMANCE_METRICS_RETENTION_DAYS
+            ),
+        }
         
         cleanup_results = {
+            "partitions_dropped": [],
             "content_deleted": 0,
             "analyses_deleted": 0,
-            "storage_freed_mb": 0,
             "duration_seconds": 0,
             "status": "completed"
         }
         
         async for db in get_async_session():
-            # Delete old generated content
-            content_result = await db.execute(
-                delete(GeneratedContent).where(
-                    GeneratedContent.created_at < cutoff_date
-                )
-            )
-            cleanup_results["content_deleted"] = content_result.rowcount
+            for table, cutoff in retention_cutoffs.items():
+                result = await drop_expired_partitions(db, table, cutoff)
+                cleanup_results["partitions_dropped"].extend(result.partitions_dropped)
+                cleanup_results["content_deleted"] += result.rows_deleted
             
             # Delete old analyses
             analysis_result = await db.execute(
@@ -357,6 +370,50 @@ async def cleanup_old_content(days_to_keep: int = 90) -> Dict[str, Any]:
         raise
 
 
+@background_task(
+    name="create_upcoming_partitions",
+    config=TaskConfig(
+        priority=TaskPriority.NORMAL,
+        max_retries=3,
+        timeout=300.0,
+        tags=["maintenance", "partitions"]
+    )
+)
+async def create_upcoming_partitions(months_ahead: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Create monthly partitions for generation logs ahead of time.
+    
+    Rows for a month without its partition land in the default partition,
+    which then has to be scanned whenever a new partition is attached.
+    
+    Args:
+        months_ahead: Months to create beyond the current one, defaults to
+            PARTITION_PREMAKE_MONTHS
+        
+    Returns:
+        Dict: Created partitions per table
+    """
+    months_ahead = months_ahead if months_ahead is not None else settings.PARTITION_PREMAKE_MONTHS
+    
+    try:
+        created: Dict[str, List[str]] = {}
+        
+        async for db in get_async_session():
+            for table in PARTITIONED_TABLES:
+                created[table] = await ensure_partitions(db, table, months_ahead)
+            
+            await db.commit()
+            break
+        
+        logger.info("Upcoming partitions ensured", months_ahead=months_ahead,
+                   created=sum(len(names) for names in created.values()))
+        return {"created": created, "status": "completed"}
+        
+    except Exception as e:
+        logger.error("Partition creation failed", error=str(e))
+        raise
+
+
 @background_task(
     name="system_health_check",
     config=TaskConfig(
@@ -527,4 +584,61 @@ async def generate_analytics_report() -> Dict[str, Any]:
         
     except Exception as e:
         logger.error("Analytics report generation failed", error=str(e))
-        raise 
\ No newline at end of file
+        raise 
+
+
+@background_task(
+    name="refresh_usage_rollups",
+    config=TaskConfig(
+        priority=TaskPriority.NORMAL,
+        max_retries=1,
+        timeout=600.0,
+        tags=["maintenance", "analytics"]
+    )
+)
+async def refresh_usage_rollups() -> Dict[str, Any]:
+    """
+    Fold recent users, products and generated content into the daily usage rollups.
+    
+    Returns:
+        Dict: Rollup rows written per metric
+    """
+    try:
+        start_time = datetime.utcnow()
+        
+        async for db in get_async_session():
+            written = await UsageRollupService().refresh(db)
+            await db.commit()
+            break
+        
+        return {
+            "rows_written": written,
+            "duration_seconds": (datetime.utcnow() - start_time).total_seconds(),
+            "status": "completed"
+        }
+        
+    except Exception as e:
+        logger.error("Usage rollup refresh failed", error=str(e))
+        raise
+
+
+# (schedule id, cron, task name) registered on startup
+MAINTENANCE_SCHEDULES = [
+    ("maintenance:refresh_usage_rollups", settings.USAGE_ROLLUP_REFRESH_CRON, "refresh_usage_rollups"),
+    ("maintenance:create_upcoming_partitions", "0 2 * * *", "create_upcoming_partitions"),
+    ("maintenance:cleanup_old_content", "30 2 * * *", "cleanup_old_content"),
+]
+
+
+async def register_maintenance_schedules() -> None:
+    """Register the recurring maintenance tasks with the task scheduler."""
+    if not task_manager.scheduler:
+        logger.warning("Task scheduler not initialized, maintenance schedules skipped")
+        return
+    
+    for schedule_id, cron, task_name in MAINTENANCE_SCHEDULES:
+        await task_manager.scheduler.schedule_periodic(
+            cron, task_name, task_name,
+            config=TaskConfig(priority=TaskPriority.LOW, max_retries=1, tags=["maintenance"]),
+            schedule_id=schedule_id
+        )
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-request AIService construction against the shared service.
+
+Starts a local stub of the chat completions endpoint, points the OpenAI
+provider at it and times ``--calls`` sequential generations two ways: the
+previous behaviour, a new ``AIService()`` (and so a new ``AsyncOpenAI``
+client and connection pool) per request, and the application-scoped
+service from ``get_ai_service``. Construction alone is timed as well. As
+in ``benchmark_deepseek_client.py``, ``--handshake-ms`` delays the first
+response on every new connection to stand in for TCP and TLS setup.
+
+Usage:
+    python scripts/benchmark_ai_service.py --calls 200 --handshake-ms 40
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmark_deepseek_client import report, stub_handler, timed
+
+from app.core.config import settings
+from app.services.ai import AIService, close_ai_service, get_ai_service
+
+PROMPT = "Write a product headline"
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark per-request vs shared AIService")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--handshake-ms", type=float, default=0.0,
+                        help="Extra delay on each new connection, modelling TCP/TLS setup")
+    args = parser.parse_args()
+
+    server = await asyncio.start_server(stub_handler(args.handshake_ms), "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{port}/v1"
+    settings.OPENAI_API_KEY = "stub"
+    settings.DEEPSEEK_API_KEY = ""
+
+    construction = []
+    for _ in range(args.calls):
+        started = time.perf_counter()
+        service = AIService()
+        construction.append((time.perf_counter() - started) * 1000)
+        await service.close()
+
+    async def per_request_service() -> None:
+        service = AIService()
+        try:
+            await service.generate_content(PROMPT, max_tokens=100)
+        finally:
+            await service.close()
+
+    async def shared_service() -> None:
+        await get_ai_service().generate_content(PROMPT, max_tokens=100)
+
+    try:
+        # Warm up imports and the shared service's connection
+        await per_request_service()
+        await shared_service()
+
+        per_request = await timed(per_request_service, args.calls)
+        shared = await timed(shared_service, args.calls)
+
+        print(f"AIService() construction: p50 {statistics.median(construction):.3f} ms\n")
+        print(f"{'service':<28}{'p50 ms':>10}{'p95 ms':>10}")
+        report("new AIService per request", per_request)
+        report("shared AIService", shared)
+        print(f"\np50 saved per request: {statistics.median(per_request) - statistics.median(shared):.2f} ms")
+    finally:
+        await close_ai_service()
+        server.close()
+        await server.wait_closed()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Find the connection pool size that suits a given concurrency.
+
+Runs ``--workers`` concurrent clients against the database for each pool
+size in ``--sizes``, each client repeatedly checking out a connection and
+running ``--query``, and reports throughput, query latency and checkout
+wait. The recommendation is the smallest size within 5% of the best
+throughput, since every extra connection costs Postgres memory and
+``max_connections`` headroom across all app processes.
+
+Usage:
+    python scripts/benchmark_db_pool.py --workers 64 --sizes 5,10,20,40 --duration 15
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import build_async_engine
+from app.core.performance import db_pool_monitor
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct), len(ordered) - 1)]
+
+
+async def run_pool_size(url: str, pool_size: int, workers: int, duration: float, query: str) -> Dict[str, float]:
+    """Drive one pool size with ``workers`` concurrent clients for ``duration`` seconds."""
+    pool_name = f"bench-{pool_size}"
+    engine = build_async_engine(url, pool_name=pool_name, pool_size=pool_size, max_overflow=0)
+    statement = text(query)
+    latencies: List[float] = []
+    errors = 0
+
+    # Open the pool's connections before measuring
+    async def warm_up() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(statement)
+    await asyncio.gather(*(warm_up() for _ in range(pool_size)))
+    db_pool_monitor.checkout_waits[pool_name].clear()
+
+    deadline = time.perf_counter() + duration
+
+    async def client() -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                async with engine.connect() as conn:
+                    await conn.execute(statement)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    try:
+        await asyncio.gather(*(client() for _ in range(workers)))
+    finally:
+        await engine.dispose()
+
+    waits = list(db_pool_monitor.checkout_waits[pool_name])
+    return {
+        'queries_per_sec': len(latencies) / duration,
+        'latency_p50_ms': statistics.median(latencies) if latencies else 0.0,
+        'latency_p95_ms': percentile(latencies, 0.95),
+        'checkout_wait_p95_ms': percentile(waits, 0.95),
+        'errors': errors,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark database pool sizes")
+    parser.add_argument("--database-url", default=str(settings.DATABASE_URL))
+    parser.add_argument("--workers", type=int, default=32, help="Concurrent clients (requests in flight)")
+    parser.add_argument("--sizes", default="5,10,20,40", help="Comma-separated pool sizes to try")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per pool size")
+    parser.add_argument("--query", default="SELECT pg_sleep(0.005)",
+                        help="Statement each client runs per checkout")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = {}
+
+    print(f"{'pool_size':<10}{'queries/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'wait p95 ms':>13}{'errors':>8}")
+    for pool_size in sizes:
+        result = await run_pool_size(args.database_url, pool_size, args.workers, args.duration, args.query)
+        results[pool_size] = result
+        print(f"{pool_size:<10}{result['queries_per_sec']:>12.0f}{result['latency_p50_ms']:>10.2f}"
+              f"{result['latency_p95_ms']:>10.2f}{result['checkout_wait_p95_ms']:>13.2f}{result['errors']:>8}")
+
+    best = max(result['queries_per_sec'] for result in results.values())
+    recommended = min(size for size, result in results.items() if result['queries_per_sec'] >= best * 0.95)
+    print(f"\nRecommended DB_POOL_SIZE for {args.workers} concurrent clients: {recommended}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-call DeepSeek latency with and without the pooled client.
+
+Starts a local stub of the chat completions endpoint and times
+``--calls`` sequential generations two ways: the previous behaviour, a new
+``httpx.AsyncClient`` per call, and ``DeepSeekProvider`` with its pooled
+keep-alive client. The stub can delay the first response on every new
+connection by ``--handshake-ms`` to stand in for the TCP and TLS round trips
+a fresh connection to api.deepseek.com costs; the local socket alone makes
+the saving look smaller than it is over a real network.
+
+Usage:
+    python scripts/benchmark_deepseek_client.py --calls 200 --handshake-ms 40
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+
+from app.core.config import settings
+from app.services.ai import DeepSeekProvider, close_ai_clients
+
+RESPONSE = json.dumps({
+    "choices": [{"message": {"role": "assistant", "content": "Stub completion"}}],
+    "usage": {"prompt_tokens": 8, "completion_tokens": 4, "total_tokens": 12},
+}).encode()
+
+
+def stub_handler(handshake_ms: float) -> Callable:
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        first_request = True
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                await reader.readexactly(length)
+                if first_request and handshake_ms:
+                    await asyncio.sleep(handshake_ms / 1000)
+                first_request = False
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    b"Content-Length: " + str(len(RESPONSE)).encode() + b"\r\n\r\n" + RESPONSE
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    return handle
+
+
+async def timed(call: Callable[[], Awaitable], calls: int) -> List[float]:
+    """Run ``call`` sequentially, returning milliseconds per call."""
+    timings = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        await call()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def report(label: str, timings: List[float]) -> None:
+    p95 = statistics.quantiles(timings, n=20)[-1]
+    print(f"{label:<28}{statistics.median(timings):>10.2f}{p95:>10.2f}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark per-call vs pooled DeepSeek HTTP clients")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--handshake-ms", type=float, default=0.0,
+                        help="Extra delay on each new connection, modelling TCP/TLS setup")
+    args = parser.parse_args()
+
+    server = await asyncio.start_server(stub_handler(args.handshake_ms), "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    settings.DEEPSEEK_BASE_URL = f"http://127.0.0.1:{port}"
+    settings.DEEPSEEK_API_KEY = "stub"
+    provider = DeepSeekProvider()
+    payload = {
+        "model": provider.model,
+        "messages": [{"role": "user", "content": "Write a product headline"}],
+        "temperature": 0.7,
+        "max_tokens": 100,
+    }
+
+    async def per_call_client() -> None:
+        async with httpx.AsyncClient() as client:
+            response = await client.post(f"{provider.base_url}/chat/completions", json=payload, timeout=60.0)
+            response.json()
+
+    async def pooled_client() -> None:
+        await provider.generate_content("Write a product headline", max_tokens=100)
+
+    try:
+        # Warm up imports and the pooled connection
+        await per_call_client()
+        await pooled_client()
+
+        per_call = await timed(per_call_client, args.calls)
+        pooled = await timed(pooled_client, args.calls)
+
+        print(f"{'client':<28}{'p50 ms':>10}{'p95 ms':>10}")
+        report("new client per call", per_call)
+        report("pooled keep-alive client", pooled)
+        print(f"\np50 saved per call: {statistics.median(per_call) - statistics.median(pooled):.2f} ms")
+    finally:
+        await close_ai_clients()
+        server.close()
+        await server.wait_closed()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
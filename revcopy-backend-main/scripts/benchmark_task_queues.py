@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark the background task queue backends.
+
+Compares enqueue throughput, dequeue + ack throughput and enqueue-to-dequeue
+latency of every backend in QUEUE_BACKENDS. The Redis backends need a live
+server; "memory" runs in-process and gives a baseline without one.
+
+Usage:
+    python scripts/benchmark_task_queues.py --redis-url redis://localhost:6379/15 --tasks 5000
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.background_tasks import QUEUE_BACKENDS, Task, TaskPriority, TaskConfig
+
+
+def make_task(index: int) -> Task:
+    """Build a small task spread across priority levels."""
+    priority = list(TaskPriority)[index % len(TaskPriority)]
+    return Task(
+        id=str(uuid.uuid4()),
+        name="benchmark",
+        function="benchmark.noop",
+        args=[index],
+        config=TaskConfig(priority=priority)
+    )
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct), len(ordered) - 1)]
+
+
+async def run_backend(backend: str, redis_url: str, tasks: int, consumers: int) -> Dict[str, float]:
+    """Run throughput and latency measurements for one backend."""
+    queue_name = f"bench-{backend}-{uuid.uuid4().hex[:8]}"
+    queue = QUEUE_BACKENDS[backend](redis_url, queue_name)
+    await queue.connect()
+
+    try:
+        # Enqueue throughput
+        started = time.perf_counter()
+        for index in range(tasks):
+            await queue.enqueue(make_task(index))
+        enqueue_seconds = time.perf_counter() - started
+
+        # Dequeue + ack throughput with concurrent consumers
+        drained = 0
+
+        async def consume() -> None:
+            nonlocal drained
+            while drained < tasks:
+                task = await queue.dequeue(timeout=0.1)
+                if task is None:
+                    continue
+                await queue.ack(task)
+                drained += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(consume() for _ in range(consumers)))
+        dequeue_seconds = time.perf_counter() - started
+
+        # Latency: one producer, one consumer, queue otherwise empty
+        latencies: List[float] = []
+        samples = min(tasks, 500)
+        for index in range(samples):
+            sent = time.perf_counter()
+            await queue.enqueue(make_task(index))
+            task = await queue.dequeue(timeout=1.0)
+            latencies.append((time.perf_counter() - sent) * 1000)
+            if task:
+                await queue.ack(task)
+
+        return {
+            'enqueue_per_sec': tasks / enqueue_seconds,
+            'dequeue_ack_per_sec': tasks / dequeue_seconds,
+            'latency_p50_ms': statistics.median(latencies),
+            'latency_p95_ms': percentile(latencies, 0.95),
+        }
+    finally:
+        if queue.client:
+            keys = [key async for key in queue.client.scan_iter(match=f"*{queue_name}*")]
+            if keys:
+                await queue.client.delete(*keys)
+        await queue.disconnect()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark task queue backends")
+    parser.add_argument("--redis-url", default="redis://localhost:6379/15")
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--consumers", type=int, default=8)
+    parser.add_argument("--backend", action="append", choices=sorted(QUEUE_BACKENDS),
+                        help="Backend to benchmark (repeatable, default: all)")
+    args = parser.parse_args()
+
+    print(f"{'backend':<10}{'enqueue/s':>14}{'dequeue+ack/s':>16}{'p50 ms':>10}{'p95 ms':>10}")
+    for backend in args.backend or sorted(QUEUE_BACKENDS):
+        result = await run_backend(backend, args.redis_url, args.tasks, args.consumers)
+        print(f"{backend:<10}{result['enqueue_per_sec']:>14.0f}{result['dequeue_ack_per_sec']:>16.0f}"
+              f"{result['latency_p50_ms']:>10.2f}{result['latency_p95_ms']:>10.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark the admin dashboard and usage analytics queries.
+
+Loads ``--rows`` generated content rows spread over ``--days`` days into a
+scratch PostgreSQL database, then compares the raw-table queries the admin
+endpoints used to run (eight COUNTs, three GROUP BYs over 90 days) with the
+daily rollups: one backfill, one incremental refresh and the single-query
+reads. Tables are created on the target database and dropped afterwards,
+so never point this at a database holding real data.
+
+Usage:
+    python scripts/benchmark_usage_rollups.py \\
+        --database-url postgresql+asyncpg://postgres@localhost/revcopy_bench --rows 10000000
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Awaitable, Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.database import Base
+from app.models.content import Campaign, ContentType, GeneratedContent
+from app.models.product import Product
+from app.models.prompts import PromptTemplate
+from app.models.usage import DailyUsageRollup
+from app.models.user import User
+from app.services.usage_rollups import UsageRollupService
+
+TABLES = [model.__table__ for model in (User, Product, Campaign, GeneratedContent, PromptTemplate, DailyUsageRollup)]
+
+
+async def raw_dashboard(db: AsyncSession) -> None:
+    """The COUNT queries get_dashboard_stats ran before the rollups."""
+    now = datetime.utcnow()
+    thirty_days_ago = now - timedelta(days=30)
+    seven_days_ago = now - timedelta(days=7)
+    for query in (
+        select(func.count(User.id)),
+        select(func.count(User.id)).where(User.last_login >= thirty_days_ago),
+        select(func.count(User.id)).where(User.created_at >= seven_days_ago),
+        select(func.count(Product.id)),
+        select(func.count(Product.id)).where(Product.created_at >= thirty_days_ago),
+        select(func.count(GeneratedContent.id)),
+        select(func.count(GeneratedContent.id)).where(GeneratedContent.created_at >= thirty_days_ago),
+        select(func.count(PromptTemplate.id)).where(PromptTemplate.is_active == True),
+    ):
+        await db.execute(query)
+
+
+async def raw_usage(db: AsyncSession) -> None:
+    """The GROUP BY queries get_usage_analytics ran for the 90 day period."""
+    start_date = datetime.utcnow() - timedelta(days=90)
+    day = func.date(GeneratedContent.created_at)
+    await db.execute(select(func.date(User.created_at), func.count(User.id))
+                     .where(User.created_at >= start_date).group_by(func.date(User.created_at)))
+    await db.execute(select(day, func.count(GeneratedContent.id))
+                     .where(GeneratedContent.created_at >= start_date).group_by(day))
+    await db.execute(select(GeneratedContent.content_type, func.count(GeneratedContent.id))
+                     .where(GeneratedContent.created_at >= start_date).group_by(GeneratedContent.content_type))
+
+
+async def timed(session_maker: async_sessionmaker, action: Callable[[AsyncSession], Awaitable], repeat: int) -> List[float]:
+    """Run ``action`` ``repeat`` times in fresh sessions, returning milliseconds per run."""
+    timings = []
+    for _ in range(repeat):
+        async with session_maker() as db:
+            started = time.perf_counter()
+            await action(db)
+            await db.commit()
+            timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+async def load(session_maker: async_sessionmaker, rows: int, days: int) -> None:
+    labels = ",".join(content_type.name for content_type in ContentType)
+    async with session_maker() as db:
+        user = User(email="bench@example.com", hashed_password="x", last_login=datetime.utcnow())
+        db.add(user)
+        await db.flush()
+        await db.execute(text(
+            "INSERT INTO generated_content (user_id, content_type, title, content, status, language, "
+            "views, saves, shares, created_at, updated_at) "
+            "SELECT :user_id, "
+            f"('{{{labels}}}'::contenttype[])[1 + i % {len(ContentType)}], "
+            "'bench', 'bench', 'GENERATED', 'en', 0, 0, 0, "
+            f"now() - (i % ({days} * 86400)) * interval '1 second', now() "
+            "FROM generate_series(1, :rows) AS i"
+        ), {"rows": rows, "user_id": user.id})
+        await db.commit()
+        await db.execute(text("ANALYZE generated_content"))
+        await db.commit()
+
+
+def report(label: str, timings: List[float]) -> None:
+    print(f"{label:<34}{statistics.median(timings):>12.2f}{max(timings):>12.2f}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark raw vs rolled-up admin analytics queries")
+    parser.add_argument("--database-url", required=True, help="Scratch PostgreSQL database (asyncpg URL)")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--days", type=int, default=365, help="Days the generated rows are spread over")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    engine = create_async_engine(args.database_url)
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    service = UsageRollupService()
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=TABLES)
+    try:
+        started = time.perf_counter()
+        await load(session_maker, args.rows, args.days)
+        print(f"Loaded {args.rows} generated_content rows in {time.perf_counter() - started:.1f}s\n")
+
+        print(f"{'query':<34}{'median ms':>12}{'max ms':>12}")
+        report("raw dashboard (8 COUNTs)", await timed(session_maker, raw_dashboard, args.repeat))
+        report("raw usage 90d (3 GROUP BYs)", await timed(session_maker, raw_usage, args.repeat))
+        report("rollup backfill (first refresh)", await timed(session_maker, service.refresh, 1))
+        report("rollup incremental refresh", await timed(session_maker, service.refresh, args.repeat))
+        report("rollup dashboard (1 query)", await timed(session_maker, service.get_dashboard_stats, args.repeat))
+        start_date = datetime.utcnow() - timedelta(days=90)
+        report("rollup usage 90d (1 query)", await timed(
+            session_maker, lambda db: service.get_usage_analytics(db, start_date), args.repeat
+        ))
+    finally:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all, tables=TABLES)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -7,7 +7,7 @@ from unittest.mock import Mock, AsyncMock
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from httpx import AsyncClient
 
-from app.core.database import Base, get_async_session
+from app.core.database import Base, get_async_session, get_read_session
 from app.main import app
 
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
@@ -49,6 +49,7 @@ async def test_client(test_db_session) -> AsyncGenerator[AsyncClient, None]:
         yield test_db_session
     
     app.dependency_overrides[get_async_session] = override_get_db
+    app.dependency_overrides[get_read_session] = override_get_db
     
     try:
         async with AsyncClient(app=app, base_url="http://test") as client:
@@ -0,0 +1,55 @@
+"""
+Unit tests for DeepSeek token streaming.
+
+The pooled DeepSeek client is swapped for one backed by an in-process
+transport that replays a server-sent event body.
+"""
+
+import json
+
+import httpx
+import pytest
+
+from app.services import ai as ai_module
+from app.services.ai import DeepSeekProvider
+
+
+def sse_body(*deltas: str) -> bytes:
+    events = [
+        "data: " + json.dumps({"choices": [{"delta": {"content": delta}}]})
+        for delta in deltas
+    ]
+    return ("\n\n".join(events + ["data: [DONE]"]) + "\n\n").encode()
+
+
+@pytest.fixture
+def deepseek_transport():
+    def install(handler):
+        ai_module._http_clients["deepseek"] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    yield install
+    ai_module._http_clients.pop("deepseek", None)
+
+
+@pytest.mark.asyncio
+async def test_deepseek_stream_yields_deltas(deepseek_transport):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, content=sse_body("Hello", ", ", "world"),
+                              headers={"Content-Type": "text/event-stream"})
+
+    deepseek_transport(handler)
+    deltas = [delta async for delta in DeepSeekProvider().stream_content("Say hello")]
+
+    assert deltas == ["Hello", ", ", "world"]
+    assert requests[0]["stream"] is True
+
+
+@pytest.mark.asyncio
+async def test_deepseek_stream_raises_on_error_status(deepseek_transport):
+    deepseek_transport(lambda request: httpx.Response(429, content=b"rate limited"))
+
+    with pytest.raises(Exception, match="429 - rate limited"):
+        async for _ in DeepSeekProvider().stream_content("Say hello"):
+            pass
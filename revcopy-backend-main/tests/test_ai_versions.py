@@ -0,0 +1,123 @@
+"""
+Unit tests for concurrent multi-version generation in AIService.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.schemas.prompts import ContentGenerationRequest
+from app.services import ai as ai_module
+from app.services.ai import AIProvider, AIService
+from app.services.content_generation import ContentGenerationService
+
+
+class GatedProvider(AIProvider):
+    """Provider whose versions finish only once the test opens their gate."""
+
+    def __init__(self, count: int):
+        self.gates = [asyncio.Event() for _ in range(count)]
+        self.active = 0
+        self.peak = 0
+        self.finished = 0
+        self.cancelled = 0
+
+    async def generate_content(self, prompt, temperature=0.7, **kwargs):
+        # Temperature grows by 0.1 per version, which identifies the version
+        index = round((temperature - 0.8) * 10)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await self.gates[index].wait()
+            self.finished += 1
+            return f"{prompt} @ {temperature:.1f}"
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.active -= 1
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(settings, "AI_PROVIDER_MAX_CONCURRENCY", 2)
+    monkeypatch.setattr(ai_module, "_provider_semaphores", {})
+    service = AIService.__new__(AIService)
+    service.providers = {"gated": GatedProvider(count=4)}
+    return service
+
+
+@pytest.mark.asyncio
+async def test_versions_are_yielded_in_completion_order(service):
+    provider = service.providers["gated"]
+    completed = []
+
+    async def consume():
+        async for index, _ in service.iter_multiple_versions("ad", count=4, provider="gated"):
+            completed.append(index)
+
+    async def release(order):
+        for finished, index in enumerate(order, start=1):
+            provider.gates[index].set()
+            while len(completed) < finished:
+                await asyncio.sleep(0)
+
+    consumer = asyncio.create_task(consume())
+    await asyncio.wait_for(release([1, 0, 3, 2]), timeout=1.0)
+    await consumer
+
+    assert completed == [1, 0, 3, 2]
+    assert provider.peak == 2
+
+
+@pytest.mark.asyncio
+async def test_multiple_versions_are_returned_in_index_order(service):
+    for gate in service.providers["gated"].gates:
+        gate.set()
+
+    versions = await service.generate_multiple_versions("ad", count=4, provider="gated")
+
+    assert versions == ["ad @ 0.8", "ad @ 0.9", "ad @ 1.0", "ad @ 1.1"]
+
+
+@pytest.mark.asyncio
+async def test_closing_iterator_cancels_pending_versions(service):
+    provider = service.providers["gated"]
+    provider.gates[0].set()
+    versions = service.iter_multiple_versions("ad", count=4, provider="gated")
+    assert (await versions.__anext__())[0] == 0
+    await versions.aclose()
+
+    # Versions 1 and up were still waiting on their gates
+    assert provider.active == 0
+    assert provider.finished == 1
+    assert provider.cancelled >= 1
+
+
+@pytest.mark.asyncio
+async def test_version_stream_cancels_pending_versions_when_closed(service, monkeypatch):
+    provider = service.providers["gated"]
+    template = SimpleNamespace(id=7, name="Ad")
+    generator = ContentGenerationService.__new__(ContentGenerationService)
+    monkeypatch.setattr(ContentGenerationService, "ai_service", service)
+
+    async def prepare(db, request, record):
+        return template, {}, []
+
+    async def build(template, product_data, reviews_data, request):
+        return {"provider": "gated", "variables": {}, "kwargs": {"prompt": "ad", "temperature": 0.8}}
+
+    monkeypatch.setattr(generator, "_prepare_generation", prepare)
+    monkeypatch.setattr(generator, "_build_template_generation", build)
+    request = ContentGenerationRequest(product_url="https://shop.example/p/1", template_type="facebook_ad")
+
+    events = generator.stream_versions(None, request, count=4)
+    provider.gates[0].set()
+    assert await events.__anext__() == ("version", {"index": 0, "text": "ad @ 0.8"})
+    await events.aclose()
+
+    assert provider.active == 0
+    assert provider.finished == 1
+    assert provider.cancelled >= 1
@@ -0,0 +1,329 @@
+"""
+Unit tests for the background task queue.
+
+Run against the in-memory backend, covering priority ordering, delayed
+tasks, leases, deduplication and dependencies without a Redis server, and
+against stubbed queue metrics for worker autoscaling.
+"""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.background_tasks import (
+    AutoscalePolicy,
+    BackgroundTaskManager,
+    MemoryTaskQueue,
+    RateLimit,
+    Task,
+    TaskConfig,
+    TaskPriority,
+    TaskRegistry,
+    TaskResult,
+    TaskStatus,
+    TaskWorker,
+    WorkerAutoscaler,
+)
+from app.core.config import settings
+
+
+def make_task(priority: TaskPriority = TaskPriority.NORMAL, **config) -> Task:
+    return Task(
+        id=str(uuid.uuid4()),
+        name="test",
+        function="tests.noop",
+        config=TaskConfig(priority=priority, **config),
+    )
+
+
+@pytest.fixture
+async def queue():
+    queue = MemoryTaskQueue(queue_name="test", lease_seconds=0.1)
+    await queue.connect()
+    yield queue
+    await queue.disconnect()
+
+
+class TestMemoryTaskQueue:
+    """Test suite for MemoryTaskQueue."""
+
+    @pytest.mark.asyncio
+    async def test_dequeues_by_priority_then_fifo(self, queue):
+        low = make_task(TaskPriority.LOW)
+        first_high = make_task(TaskPriority.HIGH)
+        second_high = make_task(TaskPriority.HIGH)
+        for task in (low, first_high, second_high):
+            await queue.enqueue(task)
+
+        order = [(await queue.dequeue(timeout=0)).id for _ in range(3)]
+        assert order == [first_high.id, second_high.id, low.id]
+        assert await queue.dequeue(timeout=0) is None
+
+    @pytest.mark.asyncio
+    async def test_delayed_task_waits_until_due(self, queue):
+        task = make_task()
+        task.scheduled_at = datetime.utcnow() + timedelta(seconds=0.1)
+        await queue.enqueue(task)
+
+        assert await queue.dequeue(timeout=0) is None
+        dequeued = await queue.dequeue(timeout=1.0)
+        assert dequeued.id == task.id
+
+    @pytest.mark.asyncio
+    async def test_dequeue_wakes_on_enqueue(self, queue):
+        task = make_task()
+
+        async def produce():
+            await asyncio.sleep(0.05)
+            await queue.enqueue(task)
+
+        producer = asyncio.create_task(produce())
+        dequeued = await queue.dequeue(timeout=1.0)
+        await producer
+        assert dequeued.id == task.id
+
+    @pytest.mark.asyncio
+    async def test_expired_lease_is_requeued_then_failed(self, queue):
+        task = make_task(max_retries=1)
+        await queue.enqueue(task)
+
+        leased = await queue.dequeue(timeout=0)
+        await asyncio.sleep(0.15)
+        assert await queue.requeue_expired_leases() == 1
+        assert not await queue.ack(leased)
+
+        leased = await queue.dequeue(timeout=0)
+        assert leased.lease_expirations == 1
+        await asyncio.sleep(0.15)
+        await queue.requeue_expired_leases()
+
+        stored = await queue.get_task_status(task.id)
+        assert stored.status == TaskStatus.FAILED
+        assert await queue.dequeue(timeout=0) is None
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_keeps_lease(self, queue):
+        await queue.enqueue(make_task())
+        leased = await queue.dequeue(timeout=0)
+
+        await asyncio.sleep(0.06)
+        assert await queue.extend_lease(leased)
+        await asyncio.sleep(0.06)
+        assert await queue.requeue_expired_leases() == 0
+        assert await queue.ack(leased)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_worker_leaves_task_for_reaper(self, queue):
+        registry = TaskRegistry()
+        started = asyncio.Event()
+
+        @registry.register("tests.noop")
+        async def noop():
+            started.set()
+            await asyncio.Event().wait()
+
+        task = make_task()
+        await queue.enqueue(task)
+        worker = TaskWorker("worker-1", queue, registry)
+        running = asyncio.create_task(worker.start())
+        await asyncio.wait_for(started.wait(), timeout=1.0)
+
+        running.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await running
+
+        await asyncio.sleep(0.15)
+        assert await queue.requeue_expired_leases() == 1
+        assert (await queue.get_task_status(task.id)).status == TaskStatus.PENDING
+        assert (await queue.dequeue(timeout=0)).id == task.id
+
+    @pytest.mark.asyncio
+    async def test_duplicate_submissions_share_one_task(self, queue):
+        first = make_task(dedup_key="product:42")
+        second = make_task(dedup_key="product:42")
+
+        assert await queue.enqueue_unique(first) == first.id
+        assert await queue.enqueue_unique(second) == first.id
+        assert (await queue.get_queue_stats())['queue_length'] == 1
+
+    @pytest.mark.asyncio
+    async def test_dependents_run_after_parent_completes(self, queue):
+        parent = make_task()
+        child = make_task(depends_on=[parent.id])
+        await queue.enqueue(parent)
+        await queue.enqueue(child)
+
+        leased = await queue.dequeue(timeout=0)
+        assert leased.id == parent.id
+        assert await queue.dequeue(timeout=0) is None
+
+        leased.status = TaskStatus.COMPLETED
+        leased.result = TaskResult(task_id=leased.id, status=TaskStatus.COMPLETED, result={"ok": True})
+        await queue.finalize(leased)
+        await queue.ack(leased)
+
+        assert (await queue.dequeue(timeout=0)).id == child.id
+        assert await queue.get_task_result(parent.id) == {"ok": True}
+
+    @pytest.mark.asyncio
+    async def test_failed_parent_fails_dependents(self, queue):
+        parent = make_task()
+        child = make_task(depends_on=[parent.id])
+        await queue.enqueue(parent)
+        await queue.enqueue(child)
+
+        leased = await queue.dequeue(timeout=0)
+        leased.status = TaskStatus.FAILED
+        await queue.finalize(leased)
+
+        assert (await queue.get_task_status(child.id)).status == TaskStatus.FAILED
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_holds_back_dequeues(self):
+        queue = MemoryTaskQueue(queue_name="limited")
+        queue.rate_limit = RateLimit(requests_per_minute=2, tokens_per_minute=1000, default_task_tokens=100)
+        await queue.connect()
+        for _ in range(3):
+            await queue.enqueue(make_task())
+
+        assert await queue.dequeue_within_budget(timeout=0)
+        assert await queue.dequeue_within_budget(timeout=0)
+        assert await queue.dequeue_within_budget(timeout=0) is None
+        assert queue.stats['rate_limited'] == 1
+        assert (await queue.get_queue_stats())['queue_length'] == 1
+
+
+class TestBackgroundTaskManagerInMemory:
+    """Run submitted tasks end to end through workers on an in-memory queue."""
+
+    @pytest.mark.asyncio
+    async def test_submitted_task_completes(self, monkeypatch):
+        monkeypatch.setattr("app.core.config.settings.TASK_QUEUE_BACKEND", "memory")
+        manager = BackgroundTaskManager()
+
+        @manager.register_task("tests.add")
+        async def add(a, b):
+            return a + b
+
+        await manager.initialize()
+        await manager.start_workers(count=1)
+        try:
+            task_id = await manager.submit_task("add", "tests.add", args=[2, 3])
+            for _ in range(50):
+                result = await manager.get_task_status(task_id)
+                if result and result.status == TaskStatus.COMPLETED:
+                    break
+                await asyncio.sleep(0.02)
+            assert result.result == 5
+        finally:
+            await manager.shutdown()
+
+
+class StubLoadQueue:
+    """Queue stand-in reporting fixed load metrics."""
+
+    client = None
+
+    def __init__(self, queue_length: int = 0, oldest_task_age: float = 0.0, avg_duration_ms: float = 0.0):
+        self.metrics = {
+            'queue_length': queue_length,
+            'oldest_task_age': oldest_task_age,
+            'avg_duration_ms': avg_duration_ms,
+        }
+
+    async def get_load_metrics(self):
+        return dict(self.metrics)
+
+
+class StubWorkerManager:
+    """Manager stand-in that tracks worker counts without running workers."""
+
+    def __init__(self, queue: StubLoadQueue, workers: int = 0, busy: int = 0):
+        self.queues = {"default": queue}
+        self.workers = [SimpleNamespace(current_task=object() if i < busy else None) for i in range(workers)]
+
+    def get_workers(self, queue_name: str = "default"):
+        return list(self.workers)
+
+    async def start_workers(self, count: int = 1, queue_name: str = "default"):
+        self.workers += [SimpleNamespace(current_task=None) for _ in range(count)]
+
+    async def stop_workers(self, count: int, queue_name: str = "default") -> int:
+        idle = [worker for worker in self.workers if not worker.current_task][:count]
+        for worker in idle:
+            self.workers.remove(worker)
+        return len(idle)
+
+
+class TestWorkerAutoscaler:
+    """Scaling decisions from stubbed queue depth and age."""
+
+    @pytest.fixture(autouse=True)
+    def wait_slo(self, monkeypatch):
+        monkeypatch.setattr("app.core.config.settings.TASK_QUEUE_WAIT_SLO", 10.0)
+
+    def make_autoscaler(self, manager, **policy) -> WorkerAutoscaler:
+        policy = AutoscalePolicy(
+            target_wait_seconds=settings.TASK_QUEUE_WAIT_SLO,
+            **{"min_workers": 1, "max_workers": 8, "scale_down_cooldown": 0.0, **policy}
+        )
+        return WorkerAutoscaler(manager, "default", policy)
+
+    @pytest.mark.asyncio
+    async def test_scales_up_until_backlog_drains_within_slo(self):
+        queue = StubLoadQueue(queue_length=30, avg_duration_ms=1000)
+        manager = StubWorkerManager(queue, workers=1)
+
+        assert await self.make_autoscaler(manager).evaluate() == 3
+        # 30 tasks of 1s on 3 workers: the last one waits 10s, within the SLO
+        assert 30 * 1.0 / len(manager.workers) <= settings.TASK_QUEUE_WAIT_SLO
+
+    @pytest.mark.asyncio
+    async def test_adds_a_worker_when_oldest_task_waited_past_slo(self):
+        queue = StubLoadQueue(queue_length=2, oldest_task_age=15.0, avg_duration_ms=1000)
+        manager = StubWorkerManager(queue, workers=2)
+        autoscaler = self.make_autoscaler(manager)
+
+        assert await autoscaler.evaluate() == 3
+        queue.metrics['oldest_task_age'] = 5.0
+        assert autoscaler.desired_workers(queue.metrics, current=3, busy=0) == 1
+
+    @pytest.mark.asyncio
+    async def test_scale_up_stops_at_max_and_signals_supervisor(self):
+        queue = StubLoadQueue(queue_length=200, avg_duration_ms=1000)
+        manager = StubWorkerManager(queue, workers=1)
+        signals = []
+        autoscaler = self.make_autoscaler(manager, max_workers=4)
+        autoscaler.supervisor_hook = signals.append
+
+        assert await autoscaler.evaluate() == 4
+        assert signals[0]['desired_workers'] == 20
+        assert signals[0]['local_max_workers'] == 4
+
+    @pytest.mark.asyncio
+    async def test_scale_down_stops_at_min_and_keeps_busy_workers(self):
+        queue = StubLoadQueue()
+        manager = StubWorkerManager(queue, workers=6, busy=3)
+        autoscaler = self.make_autoscaler(manager, min_workers=2)
+
+        assert await autoscaler.evaluate() == 3
+        assert all(worker.current_task for worker in manager.workers)
+
+        for worker in manager.workers:
+            worker.current_task = None
+        assert await autoscaler.evaluate() == 2
+        assert await autoscaler.evaluate() == 2
+
+    @pytest.mark.asyncio
+    async def test_scale_down_waits_for_cooldown(self):
+        queue = StubLoadQueue(queue_length=30, avg_duration_ms=1000)
+        manager = StubWorkerManager(queue, workers=1)
+        autoscaler = self.make_autoscaler(manager, scale_down_cooldown=60.0)
+
+        assert await autoscaler.evaluate() == 3
+        queue.metrics['queue_length'] = 0
+        assert await autoscaler.evaluate() == 3
+        assert autoscaler.last_decision['desired_workers'] == 0
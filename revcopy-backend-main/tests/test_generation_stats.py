@@ -0,0 +1,109 @@
+"""
+Unit tests for the atomic template and daily generation counters.
+
+Runs against an in-memory SQLite database; prompt_templates uses
+PostgreSQL types, so a stand-in with the counter columns is created instead.
+"""
+
+import asyncio
+from datetime import date
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.database import Base
+from app.models.prompts import AIContentGeneration, ContentGenerationStats
+from app.services.content_generation import ContentGenerationService
+from app.services import generation_stats as generation_stats_module
+from app.services.generation_stats import GenerationStatsRecorder, increment_daily_stats, increment_template_stats
+
+DAY = date(2026, 10, 19)
+
+
+@pytest.fixture
+async def session_maker():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[ContentGenerationStats.__table__])
+        await conn.execute(text(
+            "CREATE TABLE prompt_templates (id INTEGER PRIMARY KEY, usage_count INTEGER, "
+            "success_rate FLOAT, last_used_at DATETIME, updated_at DATETIME)"
+        ))
+        await conn.execute(text("INSERT INTO prompt_templates (id, usage_count, success_rate) VALUES (1, 0, 0.0)"))
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_template_counters_accumulate(session_maker):
+    async with session_maker() as db:
+        await increment_template_stats(db, 1, uses=1, successes=1)
+        await increment_template_stats(db, 1, uses=3, successes=2)
+        await db.commit()
+
+        row = (await db.execute(text("SELECT usage_count, success_rate FROM prompt_templates"))).one()
+        assert row.usage_count == 4
+        assert row.success_rate == pytest.approx(0.75)
+
+
+@pytest.mark.asyncio
+async def test_daily_upsert_keeps_one_row_per_day(session_maker):
+    async def record(provider: str, success: bool) -> None:
+        async with session_maker() as db:
+            await increment_daily_stats(db, DAY, 1, int(success), {provider: 1}, {"faq": 1})
+            await db.commit()
+
+    await asyncio.gather(record("openai", True), record("deepseek", False), record("openai", True))
+
+    async with session_maker() as db:
+        rows = (await db.execute(select(ContentGenerationStats))).scalars().all()
+        assert len(rows) == 1
+        stats = rows[0]
+        assert (stats.total_generations, stats.successful_generations, stats.failed_generations) == (3, 2, 1)
+        assert stats.success_rate == pytest.approx(2 / 3)
+        assert stats.provider_usage == {"openai": 2, "deepseek": 1}
+        assert stats.content_type_breakdown == {"faq": 3}
+
+
+@pytest.mark.asyncio
+async def test_buffered_increments_flush_in_one_batch(session_maker, monkeypatch):
+    monkeypatch.setattr(settings, "GENERATION_STATS_BUFFERED", True)
+    monkeypatch.setattr(cache.redis_cache, "client", None)
+
+    async def sessions():
+        async with session_maker() as db:
+            yield db
+
+    monkeypatch.setattr(generation_stats_module, "get_async_session", sessions)
+    recorder = GenerationStatsRecorder()
+
+    async with session_maker() as db:
+        for success in (True, True, False):
+            await recorder.record(db, 1, "faq", "openai", success)
+        # Buffered increments stay out of the caller's transaction
+        assert not db.in_transaction()
+
+    assert await recorder.flush() == 2
+    assert await recorder.flush() == 0
+
+    async with session_maker() as db:
+        template = (await db.execute(text("SELECT usage_count FROM prompt_templates"))).one()
+        stats = (await db.execute(select(ContentGenerationStats))).scalar_one()
+        assert template.usage_count == 3
+        assert (stats.total_generations, stats.successful_generations) == (3, 2)
+        assert stats.provider_usage == {"openai": 3}
+
+
+@pytest.mark.asyncio
+async def test_failed_save_reports_no_generation_id(monkeypatch):
+    monkeypatch.setattr(generation_stats_module.generation_stats, "record", AsyncMock())
+    db = Mock(commit=AsyncMock(side_effect=RuntimeError("connection lost")), rollback=AsyncMock())
+    record = AIContentGeneration(id=42, template_type="facebook_ad", ai_provider="openai", success=True)
+    service = ContentGenerationService.__new__(ContentGenerationService)
+
+    assert await service.save_generation(db, record) is None
+    db.rollback.assert_awaited_once()
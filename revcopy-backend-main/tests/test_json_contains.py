@@ -0,0 +1,69 @@
+"""
+Unit tests for the portable JSON containment filter.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, Table, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.database import PortableJSONB, json_contains
+from app.services.intelligent_prompt_service import (
+    ContentType,
+    CulturalRegion,
+    IntelligentPromptRequest,
+    IntelligentPromptService,
+)
+
+metadata = MetaData()
+items = Table(
+    "items", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("tags", PortableJSONB),
+)
+
+
+@pytest.fixture
+async def engine():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+def test_postgres_uses_containment_operator():
+    query = select(items.c.id).where(json_contains(items.c.tags, ["sale"]))
+    assert "items.tags @> CAST(" in str(query.compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.asyncio
+async def test_sqlite_matches_arrays_holding_every_value(engine):
+    async with engine.begin() as conn:
+        await conn.execute(items.insert(), [
+            {"id": 1, "tags": ["sale", "new"]},
+            {"id": 2, "tags": ["sale"]},
+            {"id": 3, "tags": None},
+        ])
+        sale = await conn.execute(select(items.c.id).where(json_contains(items.c.tags, ["sale"])))
+        both = await conn.execute(select(items.c.id).where(json_contains(items.c.tags, ["sale", "new"])))
+
+    assert sorted(sale.scalars()) == [1, 2]
+    assert list(both.scalars()) == [1]
+
+
+@pytest.mark.asyncio
+async def test_cultural_fit_uses_matches_computed_in_sql():
+    service = IntelligentPromptService.__new__(IntelligentPromptService)
+    request = IntelligentPromptRequest(
+        content_type=ContentType.FACEBOOK_AD,
+        product_data={},
+        cultural_region=CulturalRegion.EUROPE,
+    )
+    # The JSON lists are not consulted when the query supplied the matches
+    template = SimpleNamespace(supported_languages=None, cultural_regions=None, tone="casual", target_audience=None)
+
+    assert await service._calculate_cultural_fit_score(template, request, (False, True, True)) == pytest.approx(0.5)
+    assert await service._calculate_cultural_fit_score(template, request, (True, True, False)) == pytest.approx(0.4)
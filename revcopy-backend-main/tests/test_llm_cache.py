@@ -0,0 +1,153 @@
+"""
+Unit tests for the exact-match LLM response cache.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.schemas.prompts import ContentGenerationRequest
+from app.services import content_generation as content_generation_module
+from app.services import provider_health as health_module
+from app.services.ai import AIProvider, AIService, Completion
+from app.services.content_generation import ContentGenerationService
+from app.services.llm_cache import LLMCacheStats, llm_response_cache
+
+
+class FakeProvider(AIProvider):
+    model = "fake-model"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_content(self, prompt, **kwargs):
+        return (await self.complete(prompt, **kwargs)).content
+
+    async def complete(self, prompt, **kwargs):
+        self.calls += 1
+        return Completion(content=f"answer {self.calls}", prompt_tokens=1000, completion_tokens=500)
+
+
+class FailingProvider(FakeProvider):
+    async def complete(self, prompt, **kwargs):
+        self.calls += 1
+        raise RuntimeError("provider down")
+
+
+@pytest.fixture(autouse=True)
+async def memory_only_cache(monkeypatch):
+    monkeypatch.setattr(health_module, "_provider_health", {})
+    monkeypatch.setattr(cache, "_initialized", True)
+    monkeypatch.setattr(cache.redis_cache, "client", None)
+    monkeypatch.setattr(llm_response_cache, "stats", LLMCacheStats())
+    monkeypatch.setitem(settings.LLM_TOKEN_COSTS, "openai", {"prompt": 0.01, "completion": 0.03})
+    yield
+    await cache.memory_cache.clear()
+
+
+def make_service(provider: AIProvider, **providers: AIProvider) -> AIService:
+    service = AIService.__new__(AIService)
+    service.providers = {"openai": provider, **providers}
+    return service
+
+
+@pytest.mark.asyncio
+async def test_deterministic_repeat_is_served_from_cache():
+    provider = FakeProvider()
+    service = make_service(provider)
+
+    first = await service.generate_content("Write a headline", temperature=0.0)
+    # Trailing whitespace and line endings do not change the key
+    second = await service.generate_content("Write a headline  \r\n", temperature=0.0)
+    different = await service.generate_content("Write a headline", temperature=0.0, max_tokens=50)
+
+    assert first == second == "answer 1"
+    assert different == "answer 2"
+    assert provider.calls == 2
+    stats = service.get_cache_stats()
+    assert (stats["hits"], stats["misses"], stats["writes"]) == (1, 2, 2)
+    assert stats["tokens_saved"] == 1500
+    assert stats["cost_saved_usd"] == pytest.approx(0.025)
+
+
+@pytest.mark.asyncio
+async def test_sampled_requests_are_cached_only_on_opt_in():
+    provider = FakeProvider()
+    service = make_service(provider)
+
+    assert await service.generate_content("Write a headline") == "answer 1"
+    assert await service.generate_content("Write a headline") == "answer 2"
+
+    assert await service.generate_content("Write a headline", cache=True) == "answer 3"
+    assert await service.generate_content("Write a headline", cache=True) == "answer 3"
+    assert await service.generate_content("Write a headline", temperature=0.0, cache=False) == "answer 4"
+    assert provider.calls == 4
+
+
+async def cache_backup_answer(service: AIService, prompt: str) -> None:
+    """Store an answer the backup provider gave while the primary was down."""
+    call_kwargs = dict(
+        prompt=prompt, system_prompt=None, temperature=0.0, max_tokens=1000, platform=None, cultural_context=None
+    )
+    await llm_response_cache.store(service._cache_key("deepseek", call_kwargs), "deepseek", "backup answer", 100, 50)
+
+
+@pytest.mark.asyncio
+async def test_only_first_choice_cache_is_checked_while_it_is_healthy():
+    primary = FakeProvider()
+    backup = FakeProvider()
+    service = make_service(primary, deepseek=backup)
+    await cache_backup_answer(service, "Write a headline")
+
+    assert await service.generate_content("Write a headline", temperature=0.0) == "answer 1"
+    assert await service.generate_content("Write a headline", temperature=0.0) == "answer 1"
+    assert (primary.calls, backup.calls) == (1, 0)
+    assert service.get_cache_stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failover_provider_cache_is_used_when_failing_over():
+    primary = FailingProvider()
+    backup = FakeProvider()
+    service = make_service(primary, deepseek=backup)
+    await cache_backup_answer(service, "Write a headline")
+
+    assert await service.generate_content("Write a headline", temperature=0.0) == "backup answer"
+    assert (primary.calls, backup.calls) == (1, 0)
+
+
+@pytest.mark.asyncio
+async def test_template_generation_opts_in_to_cache(monkeypatch):
+    provider = FakeProvider()
+    service = make_service(provider)
+    # Review analysis is not under test; AIService does not provide it here
+    service._analyze_reviews = AsyncMock(return_value=([], []))
+    monkeypatch.setattr(content_generation_module, "get_ai_service", lambda: service)
+    template = SimpleNamespace(
+        id=7,
+        template_type="facebook_ad",
+        user_prompt_template="Ad for {product_name}",
+        system_prompt=None,
+        default_temperature=0.7,
+        default_max_tokens=200,
+    )
+    generator = ContentGenerationService.__new__(ContentGenerationService)
+
+    def request(**options):
+        return ContentGenerationRequest(
+            product_url="https://shop.example/p/1", template_type="facebook_ad", ai_provider="openai", **options
+        )
+
+    first = await generator._generate_with_template(template, {"title": "Lamp"}, [], request(use_cache=True))
+    refresh = await generator._generate_with_template(template, {"title": "Lamp"}, [], request(use_cache=True))
+    fresh = await generator._generate_with_template(template, {"title": "Lamp"}, [], request(use_cache=False))
+    # By default the template's sampling temperature decides, and 0.7 is not cached
+    default = await generator._generate_with_template(template, {"title": "Lamp"}, [], request())
+
+    assert first["content"] == refresh["content"] == "answer 1"
+    assert fresh["content"] == "answer 2"
+    assert default["content"] == "answer 3"
+    assert service.get_cache_stats()["hits"] == 1
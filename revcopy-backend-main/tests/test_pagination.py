@@ -0,0 +1,61 @@
+"""
+Unit tests for keyset pagination helpers.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import Column, DateTime, Integer, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+
+from app.core.pagination import InvalidCursorError, decode_cursor, encode_cursor, paginate_keyset
+
+PaginationBase = declarative_base()
+
+
+class Entry(PaginationBase):
+    __tablename__ = "entries"
+    
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, nullable=False)
+
+
+@pytest.fixture
+async def session():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(PaginationBase.metadata.create_all)
+    
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+class TestKeysetPagination:
+    """Test suite for cursor pagination."""
+    
+    def test_cursor_round_trip(self):
+        created_at = datetime(2024, 5, 1, 12, 30)
+        assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+    
+    def test_malformed_cursor_is_rejected(self):
+        with pytest.raises(InvalidCursorError):
+            decode_cursor("not-a-cursor")
+    
+    @pytest.mark.asyncio
+    async def test_pages_cover_all_rows_once_with_timestamp_ties(self, session):
+        # Three rows share each timestamp, so id must break ties
+        start = datetime(2024, 1, 1)
+        session.add_all([Entry(id=i, created_at=start + timedelta(seconds=i // 3)) for i in range(1, 11)])
+        await session.commit()
+        
+        seen, cursor = [], None
+        while True:
+            page = await paginate_keyset(session, select(Entry), Entry, 4, cursor)
+            seen.extend(entry.id for entry in page.items)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        
+        assert seen == list(range(10, 0, -1))
@@ -0,0 +1,113 @@
+"""
+Unit tests for monthly partition helpers.
+
+Partition DDL needs PostgreSQL; on SQLite retention falls back to deleting
+rows, which is what these tests exercise end to end. The partitioned path
+runs against a session stand-in that answers the catalog queries.
+"""
+
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.partitioning import (
+    add_months,
+    create_partition_sql,
+    default_partition_name,
+    drop_expired_partitions,
+    partition_month,
+    partition_name,
+)
+
+
+class TestPartitionNaming:
+    """Test suite for partition bounds and names."""
+
+    def test_add_months_rolls_over_years(self):
+        assert add_months(date(2026, 11, 17), 2) == date(2027, 1, 1)
+        assert add_months(date(2026, 1, 31), -1) == date(2025, 12, 1)
+
+    def test_partition_name_round_trips(self):
+        name = partition_name("ai_generated_content", date(2026, 3, 1))
+        assert name == "ai_generated_content_p202603"
+        assert partition_month(name) == date(2026, 3, 1)
+        assert partition_month(default_partition_name("ai_generated_content")) is None
+
+    def test_create_partition_sql_covers_one_month(self):
+        sql = create_partition_sql("generated_content", date(2026, 12, 1))
+        assert "generated_content_p202612 PARTITION OF generated_content" in sql
+        assert "FROM ('2026-12-01 00:00:00+00') TO ('2027-01-01 00:00:00+00')" in sql
+
+
+@pytest.mark.asyncio
+async def test_unpartitioned_table_falls_back_to_delete():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with AsyncSession(engine) as db:
+        await db.execute(text("CREATE TABLE generated_content (id INTEGER PRIMARY KEY, created_at DATETIME)"))
+        await db.execute(text(
+            "INSERT INTO generated_content (created_at) VALUES ('2026-01-15 00:00:00'), ('2026-06-15 00:00:00')"
+        ))
+
+        result = await drop_expired_partitions(db, "generated_content", datetime(2026, 3, 1))
+
+        assert not result.partitioned
+        assert result.rows_deleted == 1
+        remaining = await db.execute(text("SELECT count(*) FROM generated_content"))
+        assert remaining.scalar() == 1
+    await engine.dispose()
+
+
+class RecordingSession:
+    """Stand-in PostgreSQL session answering the catalog queries retention runs."""
+
+    def __init__(self, partitions, default_rows_expired=0, has_default=True):
+        self.bind = SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+        self.partitions = partitions
+        self.default_rows_expired = default_rows_expired
+        self.has_default = has_default
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append((sql, params))
+        if "pg_partitioned_table" in sql:
+            return SimpleNamespace(scalar=lambda: 1)
+        if "pg_inherits" in sql:
+            return SimpleNamespace(scalars=lambda: list(self.partitions))
+        if "to_regclass(:name)" in sql:
+            return SimpleNamespace(scalar=lambda: self.has_default)
+        if sql.startswith("DELETE"):
+            return SimpleNamespace(rowcount=self.default_rows_expired)
+        return SimpleNamespace()
+
+
+@pytest.mark.asyncio
+async def test_partitioned_retention_drops_months_and_expires_default_rows():
+    db = RecordingSession(
+        ["generated_content_default", "generated_content_p202601",
+         "generated_content_p202602", "generated_content_p202603"],
+        default_rows_expired=7,
+    )
+
+    result = await drop_expired_partitions(db, "generated_content", datetime(2026, 3, 1))
+
+    assert result.partitioned
+    assert result.partitions_dropped == ["generated_content_p202601", "generated_content_p202602"]
+    assert result.rows_deleted == 7
+    deletes = [(sql, params) for sql, params in db.statements if sql.startswith("DELETE")]
+    assert deletes == [(
+        "DELETE FROM generated_content_default WHERE created_at < :cutoff", {"cutoff": datetime(2026, 3, 1)}
+    )]
+
+
+@pytest.mark.asyncio
+async def test_partitioned_retention_without_default_partition():
+    db = RecordingSession(["generated_content_p202601"], has_default=False)
+
+    result = await drop_expired_partitions(db, "generated_content", datetime(2026, 3, 1))
+
+    assert result.rows_deleted == 0
+    assert not any(sql.startswith("DELETE") for sql, _ in db.statements)
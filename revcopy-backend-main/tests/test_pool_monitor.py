@@ -0,0 +1,87 @@
+"""
+Unit tests for database connection pool telemetry.
+
+Checkouts go through a real MonitoredAsyncPool on a SQLite file database.
+"""
+
+import pytest
+from sqlalchemy import exc
+
+from app.core import database
+from app.core.database import build_async_engine
+from app.core.performance import DatabasePoolMonitor
+
+
+@pytest.fixture
+def monitor(monkeypatch):
+    monitor = DatabasePoolMonitor(slow_checkout_threshold_ms=10_000)
+    monkeypatch.setattr(database, "db_pool_monitor", monitor)
+    monkeypatch.setattr(database.settings, "ENVIRONMENT", "development")
+    return monitor
+
+
+@pytest.fixture
+async def engine(monitor, tmp_path):
+    engine = build_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        pool_name="primary",
+        echo=False,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.05,
+    )
+    yield engine
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_counts_checkouts_overflow_and_timeouts(monitor, engine):
+    first = await engine.connect()
+    second = await engine.connect()
+    with pytest.raises(exc.TimeoutError):
+        await engine.connect()
+
+    stats = monitor.get_pool_stats()["primary"]
+    assert stats["checkouts"] == 3
+    assert stats["overflow_checkouts"] == 1
+    assert stats["timeouts"] == 1
+    assert (stats["pool_size"], stats["checked_out"], stats["overflow"]) == (1, 2, 1)
+    assert stats["max_wait_ms"] >= 50
+
+    await second.close()
+    await first.close()
+    # Returned overflow connections leave the occupancy gauges but not the counter
+    async with engine.connect():
+        pass
+    stats = monitor.get_pool_stats()["primary"]
+    assert stats["checkouts"] == 4
+    assert stats["overflow_checkouts"] == 1
+    assert (stats["checked_out"], stats["overflow"]) == (0, 0)
+
+
+def test_stats_are_kept_per_pool():
+    class StubPool:
+        def __init__(self, size, checked_out):
+            self._size, self._checked_out = size, checked_out
+
+        def size(self):
+            return self._size
+
+        def checkedout(self):
+            return self._checked_out
+
+        def overflow(self):
+            return self._checked_out - self._size
+
+    monitor = DatabasePoolMonitor()
+    monitor.record_checkout("primary", StubPool(5, 6), wait_ms=2.0)
+    monitor.record_checkout("primary", StubPool(5, 3), wait_ms=4.0)
+    monitor.record_checkout("replica", StubPool(5, 1), wait_ms=1.0)
+
+    stats = monitor.get_pool_stats()
+    assert stats["primary"]["checkouts"] == 2
+    assert stats["primary"]["overflow_checkouts"] == 1
+    assert stats["primary"]["avg_wait_ms"] == 3.0
+    assert stats["primary"]["overflow"] == 0
+    assert stats["replica"]["checkouts"] == 1
+    assert stats["replica"]["overflow_checkouts"] == 0
@@ -0,0 +1,203 @@
+"""
+Unit tests for product URL canonicalization, upserts and crawl reuse.
+
+Runs against an in-memory SQLite database with only the products and
+product_reviews tables created; crawler calls are replaced by canned data.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.core.database import Base
+from app.models.product import EcommercePlatform, Product, ProductReview, ProductStatus
+from app.services.product import ProductService, canonicalize_product_url
+from app.services.review_store import ReviewStore
+
+AMAZON = EcommercePlatform.AMAZON
+SHOPIFY = EcommercePlatform.SHOPIFY
+
+
+@pytest.fixture
+async def session_maker():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[Product.__table__, ProductReview.__table__])
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(settings, "PRODUCT_FRESHNESS_TTL", {"amazon": 3600, "shopify": 600})
+    service = ProductService.__new__(ProductService)
+    service.review_store = ReviewStore()
+    service.crawls = []
+
+    async def crawl(url, user_id):
+        service.crawls.append(url)
+        return {
+            "title": f"Lamp v{len(service.crawls)}",
+            "price": 20.0 + len(service.crawls),
+            "reviews_data": [{"content": "Bright", "rating": 5}, {"content": "Flickers", "rating": 2}],
+        }
+
+    service._extract_amazon_product = crawl
+    service._extract_shopify_product = crawl
+    return service
+
+
+def crawled(title: str = "Lamp", **fields) -> dict:
+    return {"title": title, "reviews_data": [], **fields}
+
+
+async def count_products(db: AsyncSession) -> int:
+    return await db.scalar(select(func.count()).select_from(Product))
+
+
+class TestCanonicalizeProductUrl:
+    """Different links to the same listing map to one canonical URL and ID."""
+
+    @pytest.mark.parametrize("url", [
+        "https://www.amazon.com/Desk-Lamp-Dimmable/dp/B08N5WRWNW/ref=sr_1_3?keywords=lamp&qid=1",
+        "https://amazon.com/dp/b08n5wrwnw",
+        "https://www.amazon.com/gp/product/B08N5WRWNW?psc=1#reviews",
+        "https://www.amazon.com/gp/aw/d/B08N5WRWNW",
+    ])
+    def test_amazon_paths_reduce_to_asin(self, url):
+        assert canonicalize_product_url(url, AMAZON) == ("https://www.amazon.com/dp/B08N5WRWNW", "B08N5WRWNW")
+
+    def test_amazon_marketplaces_stay_distinct(self):
+        uk = canonicalize_product_url("https://www.amazon.co.uk/Desk-Lamp/dp/B08N5WRWNW?tag=aff-21", AMAZON)
+        de = canonicalize_product_url("https://amazon.de/gp/product/B08N5WRWNW", AMAZON)
+
+        assert uk == ("https://www.amazon.co.uk/dp/B08N5WRWNW", "B08N5WRWNW@amazon.co.uk")
+        assert de == ("https://www.amazon.de/dp/B08N5WRWNW", "B08N5WRWNW@amazon.de")
+
+    def test_amazon_without_asin_keeps_identifying_query(self):
+        url = "https://www.amazon.com/s?k=lamp&ref=nb_sb_noss&utm_source=mail"
+
+        assert canonicalize_product_url(url, AMAZON) == ("https://amazon.com/s?k=lamp", None)
+
+    @pytest.mark.parametrize("url", [
+        "https://lumen.myshopify.com/products/Desk-Lamp?variant=123&utm_campaign=fall",
+        "https://lumen.myshopify.com/collections/lighting/products/desk-lamp",
+        "https://www.lumen.myshopify.com/collections/all/products/desk-lamp/?_pos=1&_sid=abc",
+    ])
+    def test_shopify_collection_paths_reduce_to_handle(self, url):
+        assert canonicalize_product_url(url, SHOPIFY) == (
+            "https://lumen.myshopify.com/products/desk-lamp", "lumen.myshopify.com/desk-lamp"
+        )
+
+    def test_tracking_params_are_dropped_and_the_rest_sorted(self):
+        url = "https://lumen.myshopify.com/pages/catalog/?size=l&utm_source=ad&fbclid=x&color=red&gclid=y#top"
+
+        assert canonicalize_product_url(url, SHOPIFY) == (
+            "https://lumen.myshopify.com/pages/catalog?color=red&size=l", None
+        )
+
+
+class TestUpsertProduct:
+    """Crawls of one listing converge on one row."""
+
+    @pytest.mark.asyncio
+    async def test_conflicting_inserts_update_one_row(self, session_maker, service):
+        url, external_id = canonicalize_product_url("https://www.amazon.com/dp/B08N5WRWNW", AMAZON)
+
+        # Two crawls that both found no stored row, as in a race
+        async with session_maker() as db:
+            first_id = await service._upsert_product(
+                db, AMAZON, url, external_id, crawled("Lamp", price=20.0), user_id=1, stored=None
+            )
+        async with session_maker() as db:
+            second_id = await service._upsert_product(
+                db, AMAZON, url, external_id, crawled("Lamp (2026)", price=18.5), user_id=2, stored=None
+            )
+
+        async with session_maker() as db:
+            assert first_id == second_id
+            assert await count_products(db) == 1
+            product = await db.get(Product, first_id)
+            assert (product.title, product.price, product.status) == ("Lamp (2026)", 18.5, ProductStatus.COMPLETED)
+            # The first crawler keeps ownership of the shared row
+            assert product.user_id == 1
+            assert product.cache_expires_at - product.last_crawled_at == timedelta(hours=1)
+
+    @pytest.mark.asyncio
+    async def test_upsert_stores_reviews_once(self, session_maker, service):
+        data = crawled(reviews_data=[{"content": "Bright", "rating": 5}])
+
+        async with session_maker() as db:
+            product_id = await service._upsert_product(db, AMAZON, "https://www.amazon.com/dp/B0", "B0", data, 1, None)
+            await service._upsert_product(db, AMAZON, "https://www.amazon.com/dp/B0", "B0", data, 1, None)
+
+            reviews = await db.scalar(select(func.count()).where(ProductReview.product_id == product_id))
+            assert reviews == 1
+
+    @pytest.mark.asyncio
+    async def test_products_without_platform_id_update_the_stored_row(self, session_maker, service):
+        url = "https://lumen.myshopify.com/pages/catalog"
+
+        async with session_maker() as db:
+            product_id = await service._upsert_product(db, SHOPIFY, url, None, crawled("Catalog"), 1, None)
+            stored = await service._find_stored_product(db, SHOPIFY, url, None)
+            assert stored.id == product_id
+
+            assert await service._upsert_product(db, SHOPIFY, url, None, crawled("Catalog v2"), 1, stored) == product_id
+            assert await count_products(db) == 1
+            assert (await db.get(Product, product_id)).title == "Catalog v2"
+
+
+class TestCrawlReuse:
+    """A stored crawl is reused until the platform's freshness TTL passes."""
+
+    def test_is_fresh_follows_platform_ttl(self, service):
+        now = datetime.utcnow()
+
+        def product(platform, age, status=ProductStatus.COMPLETED):
+            return Product(platform=platform, status=status, last_crawled_at=now - age)
+
+        assert service._is_fresh(product(AMAZON, timedelta(minutes=59)))
+        assert not service._is_fresh(product(AMAZON, timedelta(minutes=61)))
+        assert not service._is_fresh(product(SHOPIFY, timedelta(minutes=11)))
+        assert not service._is_fresh(product(AMAZON, timedelta(minutes=1), ProductStatus.FAILED))
+        assert not service._is_fresh(Product(platform=AMAZON, status=ProductStatus.COMPLETED))
+
+    @pytest.mark.asyncio
+    async def test_links_to_the_same_listing_reuse_a_fresh_crawl(self, session_maker, service):
+        async with session_maker() as db:
+            ok, first, _ = await service.validate_and_extract_product(
+                "https://www.amazon.com/Desk-Lamp/dp/B08N5WRWNW/ref=sr_1_3", 1, db
+            )
+            _, again, _ = await service.validate_and_extract_product(
+                "https://amazon.com/gp/product/B08N5WRWNW?psc=1", 2, db
+            )
+
+        assert ok
+        assert service.crawls == ["https://www.amazon.com/dp/B08N5WRWNW"]
+        assert again["id"] == first["id"]
+        assert again["title"] == "Lamp v1"
+        assert "reviews_data" not in first and "reviews_data" not in again
+
+    @pytest.mark.asyncio
+    async def test_stale_crawl_is_refreshed_in_place(self, session_maker, service):
+        url = "https://www.amazon.com/dp/B08N5WRWNW"
+
+        async with session_maker() as db:
+            _, first, _ = await service.validate_and_extract_product(url, 1, db)
+            await db.execute(
+                update(Product).values(last_crawled_at=datetime.utcnow() - timedelta(hours=1, minutes=1))
+            )
+            await db.commit()
+
+            _, refreshed, _ = await service.validate_and_extract_product(url, 1, db)
+
+            assert len(service.crawls) == 2
+            assert refreshed["id"] == first["id"]
+            assert refreshed["title"] == "Lamp v2"
+            assert await count_products(db) == 1
+            # The recrawl's reviews deduplicate against the first crawl's
+            assert await db.scalar(select(func.count()).select_from(ProductReview)) == 2
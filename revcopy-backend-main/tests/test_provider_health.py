@@ -0,0 +1,96 @@
+"""
+Unit tests for AI provider circuit breakers, failover and hedging.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services import provider_health as health_module
+from app.services.ai import AIProvider, AIService
+from app.services.provider_health import CircuitState, get_provider_health
+
+
+class FakeProvider(AIProvider):
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.cancelled = 0
+
+    async def generate_content(self, prompt, **kwargs):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail:
+            raise RuntimeError("provider down")
+        return f"{type(self).__name__}:{self.delay}"
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers(monkeypatch):
+    monkeypatch.setattr(health_module, "_provider_health", {})
+    monkeypatch.setattr(settings, "AI_CIRCUIT_MIN_REQUESTS", 3)
+    monkeypatch.setattr(settings, "AI_CIRCUIT_OPEN_SECONDS", 60.0)
+
+
+def make_service(**providers) -> AIService:
+    service = AIService.__new__(AIService)
+    service.providers = providers
+    return service
+
+
+@pytest.mark.asyncio
+async def test_failing_provider_trips_breaker_and_fails_over():
+    openai, deepseek = FakeProvider(fail=True), FakeProvider()
+    service = make_service(openai=openai, deepseek=deepseek)
+
+    for _ in range(5):
+        assert await service.generate_content("ad") == "FakeProvider:0.0"
+
+    # Three failures open the circuit; later requests skip OpenAI entirely
+    assert openai.calls == 3
+    assert get_provider_health("openai").state == CircuitState.OPEN
+    assert service.get_provider_health()["deepseek"]["state"] == "closed"
+
+
+@pytest.mark.asyncio
+async def test_slow_request_is_hedged_to_second_provider(monkeypatch):
+    monkeypatch.setattr(settings, "AI_HEDGING_ENABLED", True)
+    monkeypatch.setattr(settings, "AI_HEDGE_MIN_SAMPLES", 3)
+    monkeypatch.setattr(settings, "AI_HEDGE_MIN_DELAY_SECONDS", 0.0)
+    openai, deepseek = FakeProvider(delay=0.01), FakeProvider(delay=0.01)
+    service = make_service(openai=openai, deepseek=deepseek)
+    for _ in range(3):
+        await service.generate_content("ad")
+
+    openai.delay = 5.0
+    content = await asyncio.wait_for(service.generate_content("ad"), timeout=1.0)
+
+    assert content == "FakeProvider:0.01"
+    assert deepseek.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_cancels_call_awaiting_hedge(monkeypatch):
+    monkeypatch.setattr(settings, "AI_HEDGING_ENABLED", True)
+    monkeypatch.setattr(settings, "AI_HEDGE_MIN_SAMPLES", 3)
+    monkeypatch.setattr(settings, "AI_HEDGE_MIN_DELAY_SECONDS", 1.0)
+    openai, deepseek = FakeProvider(delay=0.01), FakeProvider()
+    service = make_service(openai=openai, deepseek=deepseek)
+    for _ in range(3):
+        await service.generate_content("ad")
+
+    openai.delay = 5.0
+    request = asyncio.create_task(service.generate_content("ad"))
+    await asyncio.sleep(0.05)
+    request.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await request
+
+    assert openai.cancelled == 1
+    assert deepseek.calls == 0
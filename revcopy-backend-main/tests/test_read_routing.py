@@ -0,0 +1,168 @@
+"""
+Unit tests for read replica routing.
+
+The replica's lag probe is stubbed, callers are identified by request
+headers, and the primary and replica are two in-memory SQLite engines.
+"""
+
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from starlette.requests import Request
+
+from app.core import database
+from app.core.cache import cache
+from app.core.database import get_read_session, get_replica_lag, mark_recent_write, request_writer_key
+
+
+class StubReplicaEngine:
+    """Stands in for the replica engine, answering the lag probe."""
+
+    def __init__(self, lag=0.0, error=None):
+        self.lag = lag
+        self.error = error
+        self.probes = 0
+
+    @asynccontextmanager
+    async def connect(self):
+        self.probes += 1
+        if self.error:
+            raise self.error
+        yield SimpleNamespace(execute=self._execute)
+
+    async def _execute(self, statement):
+        return SimpleNamespace(scalar=lambda: self.lag)
+
+
+def make_request(token=None, host="10.0.0.1") -> Request:
+    headers = [(b"authorization", f"Bearer {token}".encode())] if token else []
+    return Request({"type": "http", "headers": headers, "client": (host, 1234)})
+
+
+@pytest.fixture(autouse=True)
+async def routing_state(monkeypatch):
+    monkeypatch.setattr(database.settings, "DATABASE_READ_URL", "postgresql+asyncpg://replica/revcopy")
+    monkeypatch.setattr(database.settings, "DB_REPLICA_MAX_LAG", 5.0)
+    monkeypatch.setattr(database.settings, "DB_REPLICA_LAG_CHECK_INTERVAL", 60.0)
+    monkeypatch.setattr(database.settings, "DB_READ_YOUR_WRITES_WINDOW", 15)
+    monkeypatch.setattr(database, "_replica_lag", None)
+    monkeypatch.setattr(database, "_replica_lag_checked_at", 0.0)
+    monkeypatch.setattr(cache, "_initialized", True)
+    monkeypatch.setattr(cache.redis_cache, "client", None)
+    yield
+    await cache.memory_cache.clear()
+
+
+@pytest.fixture
+async def engines(monkeypatch):
+    primary = create_async_engine("sqlite+aiosqlite:///:memory:")
+    replica = create_async_engine("sqlite+aiosqlite:///:memory:")
+    monkeypatch.setattr(database, "async_session_maker", async_sessionmaker(primary, class_=AsyncSession))
+    monkeypatch.setattr(database, "read_session_maker", async_sessionmaker(replica, class_=AsyncSession))
+    yield SimpleNamespace(primary=primary, replica=replica)
+    await primary.dispose()
+    await replica.dispose()
+
+
+async def routed_engine(request: Request):
+    sessions = get_read_session(request)
+    session = await sessions.__anext__()
+    await sessions.aclose()
+    return session.bind
+
+
+class TestReplicaLag:
+    """Lag probing and its shared cache."""
+
+    @pytest.mark.asyncio
+    async def test_no_replica_configured(self, monkeypatch):
+        monkeypatch.setattr(database, "read_engine", None)
+
+        assert await get_replica_lag() is None
+
+    @pytest.mark.asyncio
+    async def test_probe_result_is_reused_within_interval(self, monkeypatch):
+        replica = StubReplicaEngine(lag=1.5)
+        monkeypatch.setattr(database, "read_engine", replica)
+
+        assert await get_replica_lag() == 1.5
+        replica.lag = 9.0
+        assert await get_replica_lag() == 1.5
+        assert replica.probes == 1
+
+        monkeypatch.setattr(database.settings, "DB_REPLICA_LAG_CHECK_INTERVAL", 0.0)
+        assert await get_replica_lag() == 9.0
+        assert replica.probes == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_probe_reports_unknown_lag(self, monkeypatch):
+        monkeypatch.setattr(database, "read_engine", StubReplicaEngine(error=OSError("replica down")))
+
+        assert await get_replica_lag() is None
+
+
+class TestReadYourWrites:
+    """Writers are pinned to the primary for a window after writing."""
+
+    def test_writer_key_prefers_bearer_token_over_address(self):
+        assert request_writer_key(make_request("abc")) == request_writer_key(make_request("abc", host="10.0.0.2"))
+        assert request_writer_key(make_request("abc")) != request_writer_key(make_request("xyz"))
+        assert request_writer_key(make_request()) == "ip:10.0.0.1"
+
+    @pytest.mark.asyncio
+    async def test_recent_write_expires_after_window(self, monkeypatch):
+        clock = [1000.0]
+        monkeypatch.setattr(database.time, "time", lambda: clock[0])
+        await mark_recent_write(make_request("abc"))
+
+        assert await database._has_recent_write(make_request("abc"))
+        assert not await database._has_recent_write(make_request("xyz"))
+        clock[0] += 16
+        assert not await database._has_recent_write(make_request("abc"))
+
+    @pytest.mark.asyncio
+    async def test_writes_are_not_tracked_without_replica(self, monkeypatch):
+        monkeypatch.setattr(database.settings, "DATABASE_READ_URL", None)
+        await mark_recent_write(make_request("abc"))
+
+        assert not await database._has_recent_write(make_request("abc"))
+
+
+class TestReadSessionRouting:
+    """get_read_session picks the replica only when it is safe."""
+
+    @pytest.mark.asyncio
+    async def test_reads_go_to_replica_within_max_lag(self, monkeypatch, engines):
+        monkeypatch.setattr(database, "read_engine", StubReplicaEngine(lag=5.0))
+
+        assert await routed_engine(make_request("abc")) is engines.replica
+
+    @pytest.mark.asyncio
+    async def test_lagging_replica_falls_back_to_primary(self, monkeypatch, engines):
+        monkeypatch.setattr(database, "read_engine", StubReplicaEngine(lag=5.1))
+
+        assert await routed_engine(make_request("abc")) is engines.primary
+
+    @pytest.mark.asyncio
+    async def test_unknown_lag_falls_back_to_primary(self, monkeypatch, engines):
+        monkeypatch.setattr(database, "read_engine", StubReplicaEngine(error=OSError("replica down")))
+
+        assert await routed_engine(make_request("abc")) is engines.primary
+
+    @pytest.mark.asyncio
+    async def test_recent_writer_reads_from_primary(self, monkeypatch, engines):
+        monkeypatch.setattr(database, "read_engine", StubReplicaEngine(lag=0.0))
+        await mark_recent_write(make_request("abc"))
+
+        assert await routed_engine(make_request("abc")) is engines.primary
+        assert await routed_engine(make_request("xyz")) is engines.replica
+
+    @pytest.mark.asyncio
+    async def test_no_replica_configured_reads_from_primary(self, monkeypatch, engines):
+        monkeypatch.setattr(database.settings, "DATABASE_READ_URL", None)
+        monkeypatch.setattr(database, "read_engine", None)
+        monkeypatch.setattr(database, "read_session_maker", None)
+
+        assert await routed_engine(make_request("abc")) is engines.primary
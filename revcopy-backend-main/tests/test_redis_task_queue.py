@@ -0,0 +1,550 @@
+"""
+Unit tests for the Redis task queue backend.
+
+Run against fakeredis (with lupa for the Lua scripts), covering the
+leased dequeue scripts (lease expiry, reaping, heartbeats and failing
+tasks that keep losing their lease), delayed-task promotion,
+deduplicated submission, task dependencies and large results stored
+out of line, plus consumer-group delivery on the Streams backend.
+"""
+
+import asyncio
+import json
+import uuid
+from datetime import datetime, timedelta
+
+import fakeredis
+import pytest
+
+from app.core import background_tasks
+from app.core.background_tasks import (
+    StreamTaskQueue,
+    Task,
+    TaskConfig,
+    TaskPriority,
+    TaskQueue,
+    TaskRegistry,
+    TaskResult,
+    TaskStatus,
+    TaskWorker,
+    _pack_task,
+    _unpack_task,
+)
+
+
+def make_task(priority: TaskPriority = TaskPriority.NORMAL, **config) -> Task:
+    return Task(
+        id=str(uuid.uuid4()),
+        name="test",
+        function="tests.noop",
+        config=TaskConfig(priority=priority, **config),
+    )
+
+
+@pytest.fixture
+def redis_server(monkeypatch):
+    server = fakeredis.FakeServer()
+
+    def from_url(url, decode_responses=False, **kwargs):
+        return fakeredis.FakeAsyncRedis(server=server, decode_responses=decode_responses)
+
+    monkeypatch.setattr(background_tasks.redis, "from_url", from_url)
+    return server
+
+
+@pytest.fixture
+async def queue(redis_server):
+    queue = TaskQueue(queue_name="test", lease_seconds=0.1)
+    await queue.connect()
+    yield queue
+    await queue.disconnect()
+
+
+class TestTaskQueueLeases:
+    """Leased dequeue, heartbeats and lease reaping on the sorted-set backend."""
+
+    @pytest.mark.asyncio
+    async def test_dequeue_moves_task_in_flight(self, queue):
+        task = make_task()
+        await queue.enqueue(task)
+
+        leased = await queue.dequeue(timeout=0)
+        assert leased.id == task.id
+        assert leased.lease_token
+        assert await queue.client.zcard(queue.priority_key) == 0
+        assert await queue.client.zscore(queue.inflight_key, task.id) is not None
+        assert await queue.client.zscore(queue.queued_since_key, task.id) is None
+
+        assert await queue.ack(leased)
+        assert await queue.client.zcard(queue.inflight_key) == 0
+        assert not await queue.client.hexists(queue.leases_key, task.id)
+
+    @pytest.mark.asyncio
+    async def test_expired_lease_is_requeued_then_failed(self, queue):
+        task = make_task(max_retries=1)
+        await queue.enqueue(task)
+
+        leased = await queue.dequeue(timeout=0)
+        await asyncio.sleep(0.15)
+        assert await queue.requeue_expired_leases() == 1
+        assert not await queue.ack(leased)
+        assert (await queue.get_task_status(task.id)).status == TaskStatus.PENDING
+
+        leased = await queue.dequeue(timeout=0)
+        assert leased.lease_expirations == 1
+        await asyncio.sleep(0.15)
+        assert await queue.requeue_expired_leases() == 1
+
+        stored = await queue.get_task_status(task.id)
+        assert stored.status == TaskStatus.FAILED
+        assert stored.result.error == "Lease expired 2 times"
+        assert await queue.dequeue(timeout=0) is None
+        assert await queue.client.zscore(queue.failed_key, task.id) is not None
+
+    @pytest.mark.asyncio
+    async def test_reaped_task_keeps_its_priority(self, queue):
+        low = make_task(TaskPriority.LOW)
+        high = make_task(TaskPriority.HIGH)
+        await queue.enqueue(low)
+        await queue.enqueue(high)
+        await queue.dequeue(timeout=0)
+        await queue.dequeue(timeout=0)
+
+        await asyncio.sleep(0.15)
+        assert await queue.requeue_expired_leases() == 2
+
+        assert await queue.client.zscore(queue.priority_key, high.id) == TaskPriority.HIGH.value
+        assert (await queue.dequeue(timeout=0)).id == high.id
+        assert (await queue.dequeue(timeout=0)).id == low.id
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_keeps_lease(self, queue):
+        await queue.enqueue(make_task())
+        leased = await queue.dequeue(timeout=0)
+
+        await asyncio.sleep(0.06)
+        assert await queue.extend_lease(leased)
+        await asyncio.sleep(0.06)
+        assert await queue.requeue_expired_leases() == 0
+        assert await queue.ack(leased)
+
+    @pytest.mark.asyncio
+    async def test_lost_lease_cannot_be_extended_or_acked(self, queue):
+        task = make_task()
+        await queue.enqueue(task)
+        stale = await queue.dequeue(timeout=0)
+        await asyncio.sleep(0.15)
+        await queue.requeue_expired_leases()
+        current = await queue.dequeue(timeout=0)
+
+        assert not await queue.extend_lease(stale)
+        assert not await queue.ack(stale)
+        assert await queue.client.zscore(queue.inflight_key, task.id) is not None
+        assert await queue.ack(current)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_worker_leaves_task_for_reaper(self, queue):
+        registry = TaskRegistry()
+        started = asyncio.Event()
+
+        @registry.register("tests.noop")
+        async def noop():
+            started.set()
+            await asyncio.Event().wait()
+
+        task = make_task()
+        await queue.enqueue(task)
+        worker = TaskWorker("worker-1", queue, registry)
+        running = asyncio.create_task(worker.start())
+        await asyncio.wait_for(started.wait(), timeout=1.0)
+
+        running.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await running
+
+        await asyncio.sleep(0.15)
+        assert await queue.requeue_expired_leases() == 1
+        assert (await queue.get_task_status(task.id)).status == TaskStatus.PENDING
+        assert (await queue.dequeue(timeout=0)).id == task.id
+
+
+class TestTaskQueueDelayedTasks:
+    """Delayed tasks wait in the delayed set until promoted."""
+
+    @pytest.mark.asyncio
+    async def test_delayed_task_waits_until_due(self, queue):
+        task = make_task(TaskPriority.HIGH)
+        task.scheduled_at = datetime.utcnow() + timedelta(seconds=0.1)
+        await queue.enqueue(task)
+
+        assert await queue.promote_due_tasks() == 0
+        assert await queue.dequeue(timeout=0) is None
+        assert (await queue.get_queue_stats())['delayed'] == 1
+
+        await asyncio.sleep(0.15)
+        assert await queue.promote_due_tasks() == 1
+        assert await queue.client.zscore(queue.priority_key, task.id) == TaskPriority.HIGH.value
+        assert not await queue.client.hexists(queue.delayed_priority_key, task.id)
+        dequeued = await queue.dequeue(timeout=0)
+        assert dequeued.id == task.id
+        assert await queue.promote_due_tasks() == 0
+
+    @pytest.mark.asyncio
+    async def test_promotion_respects_limit_and_due_order(self, queue):
+        now = datetime.utcnow()
+        tasks = [make_task() for _ in range(3)]
+        for offset, task in zip((0.03, 0.01, 0.02), tasks):
+            task.scheduled_at = now + timedelta(seconds=offset)
+            await queue.enqueue(task)
+        later = make_task()
+        later.scheduled_at = now + timedelta(hours=1)
+        await queue.enqueue(later)
+
+        await asyncio.sleep(0.05)
+        assert await queue.promote_due_tasks(limit=2) == 2
+        assert set(await queue.client.zrange(queue.priority_key, 0, -1)) == {tasks[1].id, tasks[2].id}
+        assert await queue.promote_due_tasks() == 1
+        assert await queue.client.zrange(queue.delayed_key, 0, -1) == [later.id]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_delayed_task_is_never_promoted(self, queue):
+        task = make_task()
+        task.scheduled_at = datetime.utcnow() + timedelta(seconds=0.05)
+        await queue.enqueue(task)
+
+        assert await queue.cancel_delayed(task.id)
+        assert not await queue.cancel_delayed(task.id)
+        await asyncio.sleep(0.1)
+        assert await queue.promote_due_tasks() == 0
+        assert (await queue.get_task_status(task.id)).status == TaskStatus.CANCELLED
+
+
+class TestTaskQueueDeduplication:
+    """Submissions sharing a dedup key collapse into one task and one result."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_submissions_share_one_task_and_result(self, queue, monkeypatch):
+        monkeypatch.setattr(background_tasks.settings, "TASK_DEDUP_WINDOW", 60)
+        registry = TaskRegistry()
+        calls = []
+
+        @registry.register("tests.noop")
+        async def noop():
+            calls.append(1)
+            return {"summary": "done"}
+
+        submissions = [make_task(dedup_key="product:42") for _ in range(5)]
+        ids = await asyncio.gather(*(queue.enqueue_unique(task) for task in submissions))
+
+        owner = ids[0]
+        assert set(ids) == {owner}
+        assert await queue.client.get(queue.dedup_key("product:42")) == owner
+        assert await queue.client.zcard(queue.priority_key) == 1
+        # Losing submissions do not leave records behind
+        assert await queue.client.hlen(queue.tasks_key) == 1
+
+        worker = TaskWorker("worker-1", queue, registry)
+        await worker._execute_task(await queue.dequeue(timeout=0))
+
+        # Within the dedup window a resubmission reuses the completed result
+        assert await queue.enqueue_unique(make_task(dedup_key="product:42")) == owner
+        assert await queue.get_task_result(owner) == {"summary": "done"}
+        assert await queue.dequeue(timeout=0) is None
+        assert len(calls) == 1
+        assert 0 < await queue.client.ttl(queue.dedup_key("product:42")) <= 60
+
+    @pytest.mark.asyncio
+    async def test_key_is_released_without_a_reuse_window(self, queue):
+        first = make_task(dedup_key="product:42", dedup_window=0)
+        assert await queue.enqueue_unique(first) == first.id
+
+        leased = await queue.dequeue(timeout=0)
+        leased.status = TaskStatus.COMPLETED
+        await queue.finalize(leased)
+        await queue.ack(leased)
+
+        second = make_task(dedup_key="product:42", dedup_window=0)
+        assert await queue.enqueue_unique(second) == second.id
+
+    @pytest.mark.asyncio
+    async def test_failed_task_does_not_block_resubmission(self, queue):
+        first = make_task(dedup_key="product:42")
+        await queue.enqueue_unique(first)
+
+        leased = await queue.dequeue(timeout=0)
+        leased.status = TaskStatus.FAILED
+        await queue.finalize(leased)
+        await queue.ack(leased)
+
+        second = make_task(dedup_key="product:42")
+        assert await queue.enqueue_unique(second) == second.id
+        assert (await queue.dequeue(timeout=0)).id == second.id
+
+
+class TestTaskQueueDependencies:
+    """Dependent tasks wait for their parents on the Redis backend."""
+
+    @pytest.mark.asyncio
+    async def test_dependents_run_after_parent_completes(self, queue):
+        parent = make_task()
+        child = make_task(depends_on=[parent.id])
+        await queue.enqueue(parent)
+        await queue.enqueue(child)
+
+        leased = await queue.dequeue(timeout=0)
+        assert leased.id == parent.id
+        assert await queue.dequeue(timeout=0) is None
+        assert (await queue.get_task_status(child.id)).status == TaskStatus.WAITING
+
+        leased.status = TaskStatus.COMPLETED
+        leased.result = TaskResult(task_id=leased.id, status=TaskStatus.COMPLETED, result={"ok": True})
+        await queue.finalize(leased)
+        await queue.ack(leased)
+
+        assert (await queue.dequeue(timeout=0)).id == child.id
+        assert await queue.get_task_result(parent.id) == {"ok": True}
+        assert not await queue.client.hexists(queue.waiting_key, child.id)
+
+    @pytest.mark.asyncio
+    async def test_child_waits_for_every_parent(self, queue):
+        parents = [make_task(), make_task()]
+        child = make_task(TaskPriority.HIGH, depends_on=[task.id for task in parents])
+        for task in (*parents, child):
+            await queue.enqueue(task)
+
+        for _ in parents:
+            leased = await queue.dequeue(timeout=0)
+            assert leased.id != child.id
+            leased.status = TaskStatus.COMPLETED
+            await queue.finalize(leased)
+            await queue.ack(leased)
+
+        assert await queue.client.zscore(queue.priority_key, child.id) == TaskPriority.HIGH.value
+        assert (await queue.dequeue(timeout=0)).id == child.id
+
+    @pytest.mark.asyncio
+    async def test_child_of_completed_parent_is_queued_at_once(self, queue):
+        parent = make_task()
+        await queue.enqueue(parent)
+        leased = await queue.dequeue(timeout=0)
+        leased.status = TaskStatus.COMPLETED
+        await queue.finalize(leased)
+
+        child = make_task(depends_on=[parent.id])
+        await queue.enqueue(child)
+        assert (await queue.get_task_status(child.id)).status == TaskStatus.PENDING
+        assert (await queue.dequeue(timeout=0)).id == child.id
+
+    @pytest.mark.asyncio
+    async def test_failed_parent_fails_dependents(self, queue):
+        parent = make_task()
+        child = make_task(depends_on=[parent.id])
+        grandchild = make_task(depends_on=[child.id])
+        for task in (parent, child, grandchild):
+            await queue.enqueue(task)
+
+        leased = await queue.dequeue(timeout=0)
+        leased.status = TaskStatus.FAILED
+        await queue.finalize(leased)
+
+        for task in (child, grandchild):
+            stored = await queue.get_task_status(task.id)
+            assert stored.status == TaskStatus.FAILED
+            assert stored.result.error.startswith("Dependency")
+        assert await queue.client.hlen(queue.waiting_key) == 0
+
+        late_child = make_task(depends_on=[parent.id])
+        await queue.enqueue(late_child)
+        assert (await queue.get_task_status(late_child.id)).status == TaskStatus.FAILED
+        assert await queue.dequeue(timeout=0) is None
+
+
+@pytest.fixture
+async def stream_queue(redis_server):
+    queue = StreamTaskQueue(queue_name="test", lease_seconds=0.1)
+    await queue.connect()
+    yield queue
+    await queue.disconnect()
+
+
+class TestStreamTaskQueue:
+    """Consumer-group delivery, acknowledgement and reclaim on the Streams backend."""
+
+    @pytest.mark.asyncio
+    async def test_dequeues_by_priority_then_fifo(self, stream_queue):
+        low = make_task(TaskPriority.LOW)
+        first_high = make_task(TaskPriority.HIGH)
+        second_high = make_task(TaskPriority.HIGH)
+        for task in (low, first_high, second_high):
+            await stream_queue.enqueue(task)
+
+        order = [(await stream_queue.dequeue(timeout=0)).id for _ in range(3)]
+        assert order == [first_high.id, second_high.id, low.id]
+        assert await stream_queue.dequeue(timeout=0.05) is None
+
+    @pytest.mark.asyncio
+    async def test_delivered_entry_stays_pending_until_acked(self, stream_queue):
+        task = make_task()
+        await stream_queue.enqueue(task)
+        stream = stream_queue.stream_key(task.config.priority.value)
+
+        leased = await stream_queue.dequeue(timeout=0)
+        pending = await stream_queue.client.xpending(stream, stream_queue.group_name)
+        assert pending['pending'] == 1
+        assert pending['consumers'][0]['name'] == stream_queue.consumer_name
+        metrics = await stream_queue.get_load_metrics()
+        assert metrics['queue_length'] == 0
+        assert (await stream_queue.get_queue_stats())['in_flight'] == 1
+
+        assert await stream_queue.ack(leased)
+        assert (await stream_queue.client.xpending(stream, stream_queue.group_name))['pending'] == 0
+        assert await stream_queue.client.xlen(stream) == 0
+
+    @pytest.mark.asyncio
+    async def test_idle_entry_is_reclaimed_by_another_consumer(self, redis_server, stream_queue):
+        other = StreamTaskQueue(queue_name="test", lease_seconds=0.1)
+        await other.connect()
+        try:
+            task = make_task(max_retries=1)
+            await stream_queue.enqueue(task)
+            stale = await stream_queue.dequeue(timeout=0)
+
+            await asyncio.sleep(0.15)
+            assert await other.requeue_expired_leases() == 1
+            assert not await stream_queue.ack(stale)
+
+            reclaimed = await other.dequeue(timeout=0)
+            assert reclaimed.id == task.id
+            assert reclaimed.lease_expirations == 1
+            assert not await stream_queue.extend_lease(stale)
+            assert await other.ack(reclaimed)
+        finally:
+            await other.disconnect()
+
+    @pytest.mark.asyncio
+    async def test_entry_that_keeps_expiring_is_failed(self, stream_queue):
+        task = make_task(max_retries=0)
+        await stream_queue.enqueue(task)
+        await stream_queue.dequeue(timeout=0)
+
+        await asyncio.sleep(0.15)
+        assert await stream_queue.requeue_expired_leases() == 1
+
+        stored = await stream_queue.get_task_status(task.id)
+        assert stored.status == TaskStatus.FAILED
+        assert await stream_queue.dequeue(timeout=0.05) is None
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_keeps_entry(self, stream_queue):
+        await stream_queue.enqueue(make_task())
+        leased = await stream_queue.dequeue(timeout=0)
+
+        await asyncio.sleep(0.06)
+        assert await stream_queue.extend_lease(leased)
+        await asyncio.sleep(0.06)
+        assert await stream_queue.requeue_expired_leases() == 0
+        assert await stream_queue.ack(leased)
+
+    @pytest.mark.asyncio
+    async def test_released_tasks_are_moved_onto_streams(self, stream_queue):
+        delayed = make_task(TaskPriority.URGENT)
+        delayed.scheduled_at = datetime.utcnow() + timedelta(seconds=0.05)
+        parent = make_task()
+        child = make_task(TaskPriority.HIGH, depends_on=[parent.id])
+        for task in (delayed, parent, child):
+            await stream_queue.enqueue(task)
+
+        leased = await stream_queue.dequeue(timeout=0)
+        assert leased.id == parent.id
+        leased.status = TaskStatus.COMPLETED
+        await stream_queue.finalize(leased)
+        await stream_queue.ack(leased)
+
+        await asyncio.sleep(0.1)
+        assert await stream_queue.promote_due_tasks() == 1
+        assert await stream_queue.client.zcard(stream_queue.priority_key) == 0
+        assert (await stream_queue.dequeue(timeout=0)).id == delayed.id
+        assert (await stream_queue.dequeue(timeout=0)).id == child.id
+
+
+class TestTaskRecords:
+    """msgpack task envelopes and results stored out of line."""
+
+    def test_envelope_round_trip(self):
+        task = make_task(TaskPriority.HIGH, max_retries=5, tags=["reports"], dedup_key="report:7")
+        task.args = [1, "two", {"three": [3.0]}]
+        task.kwargs = {"blob": b"\x00\x01", "flag": True}
+        task.scheduled_at = datetime(2026, 10, 19, 12, 30, 15, 250000)
+        task.status = TaskStatus.COMPLETED
+        task.lease_expirations = 2
+        task.lease_token = "not persisted"
+        task.result = TaskResult(
+            task_id=task.id,
+            status=TaskStatus.COMPLETED,
+            result={"rows": [1, 2]},
+            started_at=datetime(2026, 10, 19, 12, 30, 16),
+            completed_at=datetime(2026, 10, 19, 12, 30, 17, 500000),
+            duration_ms=1500.0,
+            retries_attempted=1,
+            worker_id="worker-1",
+        )
+
+        restored = _unpack_task(_pack_task(task))
+
+        assert restored.lease_token is None
+        restored.lease_token = task.lease_token
+        assert restored == task
+
+    def test_envelope_is_smaller_than_json(self):
+        task = make_task()
+        packed = _pack_task(task)
+
+        assert _unpack_task(packed) == task
+        assert len(packed) < len(json.dumps(task.to_dict()))
+
+    def test_reads_legacy_json_records(self):
+        task = make_task(depends_on=["parent"])
+
+        assert _unpack_task(json.dumps(task.to_dict()).encode()) == task
+
+    def test_envelope_omits_result_stored_out_of_line(self):
+        task = make_task()
+        task.result = TaskResult(
+            task_id=task.id, status=TaskStatus.COMPLETED, result="x" * 5000, result_key="task_result:test:1"
+        )
+
+        packed = _pack_task(task)
+        restored = _unpack_task(packed)
+
+        assert len(packed) < 500
+        assert restored.result.result is None
+        assert restored.result.result_key == "task_result:test:1"
+
+    @pytest.mark.asyncio
+    async def test_large_result_is_stored_under_its_own_key(self, queue, monkeypatch):
+        monkeypatch.setattr(background_tasks.settings, "TASK_RESULT_INLINE_BYTES", 256)
+        small = make_task()
+        large = make_task()
+        for task, value in ((small, {"ok": True}), (large, {"rows": ["x" * 100] * 10})):
+            await queue.enqueue(task)
+            task.status = TaskStatus.COMPLETED
+            task.result = TaskResult(task_id=task.id, status=TaskStatus.COMPLETED, result=value)
+            await queue.finalize(task)
+
+        assert (await queue.get_task_status(small.id)).result.result == {"ok": True}
+        assert not await queue.client.exists(queue.result_key(small.id))
+
+        stored = await queue.get_task_status(large.id)
+        assert stored.result.result is None
+        assert stored.result.result_key == f"task_result:test:{large.id}"
+        assert 0 < await queue.client.ttl(stored.result.result_key) <= background_tasks.settings.TASK_RESULT_TTL
+        assert len(await queue.binary_client.hget(queue.tasks_key, large.id)) < 256
+        assert await queue.get_task_result(large.id) == {"rows": ["x" * 100] * 10}
+
+        # Later status writes keep the reference instead of rewriting the value
+        stored.lease_expirations = 1
+        await queue.update_task_status(stored)
+        assert await queue.get_task_result(large.id) == {"rows": ["x" * 100] * 10}
+
+        await queue.clear_completed_tasks(older_than_hours=-1)
+        assert not await queue.client.exists(queue.result_key(large.id))
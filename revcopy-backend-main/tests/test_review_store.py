@@ -0,0 +1,190 @@
+"""
+Unit tests for review storage and rating-stratified sampling.
+
+Runs against an in-memory SQLite database with only the product_reviews
+table created; SQLite does not enforce its foreign key to products.
+"""
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.database import Base
+from app.models.product import ProductReview
+from app.services.review_store import ReviewStore, allocate_sample
+
+PRODUCT_ID = 1
+
+
+def review(content: str, rating: float = 5, **fields) -> dict:
+    return {"content": content, "rating": rating, **fields}
+
+
+@pytest.fixture
+async def session_maker():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[ProductReview.__table__])
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def stored_count(db: AsyncSession, product_id: int = PRODUCT_ID) -> int:
+    return await db.scalar(select(func.count()).where(ProductReview.product_id == product_id))
+
+
+def test_allocate_sample_keeps_small_products_whole():
+    assert allocate_sample({5: 3, 1: 2}, 10) == {5: 3, 1: 2}
+
+
+def test_allocate_sample_is_proportional():
+    quotas = allocate_sample({5: 600, 4: 300, 3: 100}, 100)
+
+    assert quotas == {5: 60, 4: 30, 3: 10}
+
+
+def test_allocate_sample_keeps_rare_ratings():
+    quotas = allocate_sample({5: 990, 1: 10}, 50)
+
+    assert sum(quotas.values()) == 50
+    assert quotas[1] >= 1
+    assert quotas[5] == 49
+
+
+def test_allocate_sample_fills_rounding_gap_without_exceeding_buckets():
+    counts = {5: 7, 4: 7, 3: 7, 2: 1}
+    quotas = allocate_sample(counts, 20)
+
+    assert sum(quotas.values()) == 20
+    assert all(quotas[bucket] <= counts[bucket] for bucket in counts)
+    assert quotas[2] == 1
+
+
+def test_allocate_sample_skips_floor_when_limit_below_bucket_count():
+    quotas = allocate_sample({5: 10, 4: 10, 3: 10, 2: 10, 1: 10}, 3)
+
+    assert sum(quotas.values()) == 3
+
+
+def test_normalize_review_maps_crawler_fields():
+    row = ReviewStore.normalize_review(PRODUCT_ID, {
+        "review_id": "R1",
+        "text": "  Works   great  ",
+        "rating": "4",
+        "title": " Nice ",
+        "reviewer_name": "Dana",
+        "date": "2026-01-02T10:00:00Z",
+        "verified": True,
+        "helpful_votes": "3",
+        "source": "crawler",
+        "country": "US",
+    })
+
+    assert row["external_review_id"] == "R1"
+    assert row["content"] == "Works   great"
+    assert row["rating"] == 4.0
+    assert row["title"] == "Nice"
+    assert row["author"] == "Dana"
+    assert row["review_date"].isoformat() == "2026-01-02T10:00:00"
+    assert row["verified_purchase"] is True
+    assert row["helpful_votes"] == 3
+    assert row["review_metadata"] == {"country": "US"}
+
+
+def test_normalize_review_hash_ignores_case_and_whitespace():
+    first = ReviewStore.normalize_review(PRODUCT_ID, review("Works great", title="Nice"))
+    second = ReviewStore.normalize_review(PRODUCT_ID, review("  works\n GREAT ", title="nice"))
+    other_rating = ReviewStore.normalize_review(PRODUCT_ID, review("Works great", rating=4, title="Nice"))
+
+    assert first["content_hash"] == second["content_hash"]
+    assert first["content_hash"] != other_rating["content_hash"]
+
+
+def test_normalize_review_drops_empty_reviews_and_bad_values():
+    assert ReviewStore.normalize_review(PRODUCT_ID, {"content": "   ", "rating": 5}) is None
+
+    row = ReviewStore.normalize_review(PRODUCT_ID, {"content": "ok", "rating": "n/a", "date": "yesterday"})
+    assert row["rating"] is None
+    assert row["review_date"] is None
+    assert row["review_metadata"] is None
+
+
+@pytest.mark.asyncio
+async def test_store_reviews_dedups_on_recrawl(session_maker):
+    store = ReviewStore()
+    first_crawl = [review("Great"), review("Great "), review("Broke fast", rating=1)]
+    recrawl = [review("great"), review("Broke fast", rating=1), review("Decent", rating=3)]
+
+    async with session_maker() as db:
+        assert await store.store_reviews(db, PRODUCT_ID, first_crawl) == 2
+        await db.commit()
+        assert await stored_count(db) == 2
+
+        await store.store_reviews(db, PRODUCT_ID, recrawl)
+        await store.store_reviews(db, PRODUCT_ID + 1, recrawl)
+        await db.commit()
+
+        assert await stored_count(db) == 3
+        assert await stored_count(db, PRODUCT_ID + 1) == 3
+
+
+@pytest.mark.asyncio
+async def test_store_reviews_ignores_empty_batches(session_maker):
+    async with session_maker() as db:
+        assert await ReviewStore().store_reviews(db, PRODUCT_ID, [{"content": ""}]) == 0
+        assert await stored_count(db) == 0
+
+
+@pytest.mark.asyncio
+async def test_sample_reviews_is_stratified_by_rating(session_maker):
+    store = ReviewStore()
+    reviews = (
+        [review(f"Love it {i}", rating=5, helpful_votes=i) for i in range(80)]
+        + [review(f"Fine {i}", rating=3) for i in range(15)]
+        + [review(f"Awful {i}", rating=1, helpful_votes=i) for i in range(5)]
+        + [review("No stars given", rating=None)]
+    )
+
+    async with session_maker() as db:
+        await store.store_reviews(db, PRODUCT_ID, reviews)
+        await db.commit()
+
+        sample = await store.sample_reviews(db, PRODUCT_ID, 20)
+
+    ratings = [item["rating"] for item in sample]
+    assert len(sample) == 20
+    assert ratings == sorted(ratings, key=lambda rating: rating or 0, reverse=True)
+    assert ratings.count(1.0) >= 1
+    assert ratings.count(None) == 1
+    assert ratings.count(5.0) > ratings.count(3.0) > 0
+
+    # Most helpful reviews first within a bucket
+    five_star = [item for item in sample if item["rating"] == 5.0]
+    assert five_star[0]["helpful_votes"] == 79
+    assert [item["helpful_votes"] for item in five_star] == sorted(
+        (item["helpful_votes"] for item in five_star), reverse=True
+    )
+
+
+@pytest.mark.asyncio
+async def test_sample_reviews_returns_crawler_shape(session_maker):
+    store = ReviewStore()
+
+    async with session_maker() as db:
+        assert await store.sample_reviews(db, PRODUCT_ID, 10) == []
+
+        await store.store_reviews(db, PRODUCT_ID, [review("Solid", rating=4, review_id="R9", date="2026-03-04")])
+        await db.commit()
+        sample = await store.sample_reviews(db, PRODUCT_ID, 10)
+
+    assert sample == [{
+        "review_id": "R9",
+        "rating": 4.0,
+        "title": None,
+        "content": "Solid",
+        "author": None,
+        "date": "2026-03-04T00:00:00",
+        "verified_purchase": False,
+        "helpful_votes": 0,
+        "source": None,
+    }]
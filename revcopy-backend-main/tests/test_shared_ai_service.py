@@ -0,0 +1,31 @@
+"""
+Unit tests for the application-scoped AIService.
+"""
+
+import pytest
+
+from app.core.config import settings
+from app.services import ai as ai_module
+from app.services.ai import close_ai_service, get_ai_service
+
+
+@pytest.fixture(autouse=True)
+def openai_only(monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "DEEPSEEK_API_KEY", "")
+    monkeypatch.setattr(ai_module, "_ai_service", None)
+
+
+@pytest.mark.asyncio
+async def test_service_is_shared_until_closed():
+    service = get_ai_service()
+    client = service.providers["openai"].client
+
+    assert get_ai_service() is service
+
+    await close_ai_service()
+
+    assert client.is_closed()
+    assert ai_module._ai_service is None
+    assert get_ai_service() is not service
+    await close_ai_service()